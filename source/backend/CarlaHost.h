@@ -774,6 +774,24 @@ CARLA_API_EXPORT const ParameterRanges* carla_get_parameter_ranges(CarlaHostHand
                                                                uint pluginId,
                                                                uint32_t parameterId);
 
+/*!
+ * Get the data, ranges and current values of all of a plugin's parameters in one go.
+ * Each buffer is filled starting from parameter 0, and can be null if not needed.
+ * @param pluginId          Plugin
+ * @param data              Buffer to write parameter data into, must hold at least @a maxParameterCount items
+ * @param ranges            Buffer to write parameter ranges into, must hold at least @a maxParameterCount items
+ * @param values            Buffer to write current parameter values into, must hold at least @a maxParameterCount items
+ * @param maxParameterCount Maximum number of parameters to write
+ * @return Number of parameters written
+ * @see carla_get_parameter_count()
+ */
+CARLA_API_EXPORT uint32_t carla_get_all_parameters(CarlaHostHandle handle,
+                                                   uint pluginId,
+                                                   ParameterData* data,
+                                                   ParameterRanges* ranges,
+                                                   float* values,
+                                                   uint32_t maxParameterCount);
+
 /*!
  * Get a plugin's MIDI program data.
  * @param pluginId      Plugin
@@ -916,6 +934,16 @@ CARLA_API_EXPORT uint32_t carla_get_plugin_latency(CarlaHostHandle handle, uint
  */
 CARLA_API_EXPORT const float* carla_get_peak_values(CarlaHostHandle handle, uint pluginId);
 
+/*!
+ * Get the peak values of all plugins in one go.
+ * Values are written as 4 floats per plugin (input left, input right, output left, output right),
+ * starting from plugin 0.
+ * @param peaks          Buffer to write into, must hold at least 4 * maxPluginCount floats
+ * @param maxPluginCount Maximum number of plugins to write peaks for
+ * @return Number of plugins written into @a peaks
+ */
+CARLA_API_EXPORT uint carla_get_all_peak_values(CarlaHostHandle handle, float* peaks, uint maxPluginCount);
+
 /*!
  * Get a plugin's input peak value.
  * @param pluginId Plugin
@@ -1664,6 +1664,35 @@ const ParameterRanges* carla_get_parameter_ranges(CarlaHostHandle handle, uint p
     return &retParamRanges;
 }
 
+uint32_t carla_get_all_parameters(CarlaHostHandle handle, uint pluginId,
+                                  ParameterData* const data,
+                                  ParameterRanges* const ranges,
+                                  float* const values,
+                                  const uint32_t maxParameterCount)
+{
+    CARLA_SAFE_ASSERT_RETURN(handle->engine != nullptr, 0);
+
+    if (const CarlaPluginPtr plugin = handle->engine->getPlugin(pluginId))
+    {
+        const uint32_t parameterCount = plugin->getParameterCount();
+        const uint32_t count = parameterCount < maxParameterCount ? parameterCount : maxParameterCount;
+
+        for (uint32_t i=0; i<count; ++i)
+        {
+            if (data != nullptr)
+                data[i] = plugin->getParameterData(i);
+            if (ranges != nullptr)
+                ranges[i] = plugin->getParameterRanges(i);
+            if (values != nullptr)
+                values[i] = plugin->getParameterValue(i);
+        }
+
+        return count;
+    }
+
+    return 0;
+}
+
 const MidiProgramData* carla_get_midi_program_data(CarlaHostHandle handle, uint pluginId, uint32_t midiProgramId)
 {
     static MidiProgramData retMidiProgData = { 0, 0, gNullCharPtr };
@@ -2006,6 +2035,20 @@ const float* carla_get_peak_values(CarlaHostHandle handle, uint pluginId)
     return handle->engine->getPeaks(pluginId);
 }
 
+uint carla_get_all_peak_values(CarlaHostHandle handle, float* const peaks, const uint maxPluginCount)
+{
+    CARLA_SAFE_ASSERT_RETURN(handle->engine != nullptr, 0);
+    CARLA_SAFE_ASSERT_RETURN(peaks != nullptr, 0);
+
+    const uint pluginCount = handle->engine->getCurrentPluginCount();
+    const uint count = pluginCount < maxPluginCount ? pluginCount : maxPluginCount;
+
+    for (uint i=0; i<count; ++i)
+        carla_copy<float>(peaks + i*4, handle->engine->getPeaks(i), 4);
+
+    return count;
+}
+
 float carla_get_input_peak_value(CarlaHostHandle handle, uint pluginId, bool isLeft)
 {
     CARLA_SAFE_ASSERT_RETURN(handle->engine != nullptr, 0.0f);
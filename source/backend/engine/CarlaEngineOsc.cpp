@@ -33,7 +33,8 @@ CarlaEngineOsc::CarlaEngineOsc(CarlaEngine* const engine) noexcept
       fServerPathTCP(),
       fServerPathUDP(),
       fServerTCP(nullptr),
-      fServerUDP(nullptr)
+      fServerUDP(nullptr),
+      fBundleUDP(nullptr)
 {
     CARLA_SAFE_ASSERT(engine != nullptr);
     carla_debug("CarlaEngineOsc::CarlaEngineOsc(%p)", engine);
@@ -46,6 +47,7 @@ CarlaEngineOsc::~CarlaEngineOsc() noexcept
     CARLA_SAFE_ASSERT(fServerPathUDP.isEmpty());
     CARLA_SAFE_ASSERT(fServerTCP == nullptr);
     CARLA_SAFE_ASSERT(fServerUDP == nullptr);
+    CARLA_SAFE_ASSERT(fBundleUDP == nullptr);
     carla_debug("CarlaEngineOsc::~CarlaEngineOsc()");
 }
 
@@ -185,6 +187,12 @@ void CarlaEngineOsc::close() noexcept
 
     fName.clear();
 
+    if (fBundleUDP != nullptr)
+    {
+        lo_bundle_free_recursive(fBundleUDP);
+        fBundleUDP = nullptr;
+    }
+
     if (fServerTCP != nullptr)
     {
         lo_server_del_method(fServerTCP, nullptr, nullptr);
@@ -118,6 +118,10 @@ public:
     void sendParameterValue(uint pluginId, uint32_t index, float value) const noexcept;
     void sendPeaks(uint pluginId, const float peaks[4]) const noexcept;
 
+    // messages sent between these two calls are grouped into as few bundles as possible
+    void startUDPBundle() noexcept;
+    void sendUDPBundle() noexcept;
+
     // -------------------------------------------------------------------
 
 private:
@@ -133,6 +137,11 @@ private:
     lo_server    fServerTCP;
     lo_server    fServerUDP;
 
+    // current UDP bundle, only valid between startUDPBundle() and sendUDPBundle()
+    mutable lo_bundle fBundleUDP;
+
+    void sendUDPMessage(const char* path, lo_message msg) const noexcept;
+
     // -------------------------------------------------------------------
 
     int handleMessage(bool isTCP, const char* path,
@@ -359,15 +359,21 @@ void CarlaEngineOsc::sendRuntimeInfo() const noexcept
     char targetPath[std::strlen(fControlDataUDP.path)+9];
     std::strcpy(targetPath, fControlDataUDP.path);
     std::strcat(targetPath, "/runtime");
-    try_lo_send(fControlDataUDP.target, targetPath, "fiihiiif",
-                static_cast<double>(fEngine->getDSPLoad()),
-                static_cast<int32_t>(fEngine->getTotalXruns()),
-                timeInfo.playing ? 1 : 0,
-                static_cast<int64_t>(timeInfo.frame),
-                static_cast<int32_t>(timeInfo.bbt.bar),
-                static_cast<int32_t>(timeInfo.bbt.beat),
-                static_cast<int32_t>(timeInfo.bbt.tick),
-                timeInfo.bbt.beatsPerMinute);
+
+    const lo_message msg = lo_message_new();
+    CARLA_SAFE_ASSERT_RETURN(msg != nullptr,);
+
+    lo_message_add(msg, "fiihiiif",
+                   static_cast<double>(fEngine->getDSPLoad()),
+                   static_cast<int32_t>(fEngine->getTotalXruns()),
+                   timeInfo.playing ? 1 : 0,
+                   static_cast<int64_t>(timeInfo.frame),
+                   static_cast<int32_t>(timeInfo.bbt.bar),
+                   static_cast<int32_t>(timeInfo.bbt.beat),
+                   static_cast<int32_t>(timeInfo.bbt.tick),
+                   timeInfo.bbt.beatsPerMinute);
+
+    sendUDPMessage(targetPath, msg);
 }
 
 void CarlaEngineOsc::sendParameterValue(const uint pluginId, const uint32_t index, const float value) const noexcept
@@ -378,10 +384,16 @@ void CarlaEngineOsc::sendParameterValue(const uint pluginId, const uint32_t inde
     char targetPath[std::strlen(fControlDataUDP.path)+7];
     std::strcpy(targetPath, fControlDataUDP.path);
     std::strcat(targetPath, "/param");
-    try_lo_send(fControlDataUDP.target, targetPath, "iif",
-                static_cast<int32_t>(pluginId),
-                index,
-                static_cast<double>(value));
+
+    const lo_message msg = lo_message_new();
+    CARLA_SAFE_ASSERT_RETURN(msg != nullptr,);
+
+    lo_message_add(msg, "iif",
+                   static_cast<int32_t>(pluginId),
+                   index,
+                   static_cast<double>(value));
+
+    sendUDPMessage(targetPath, msg);
 }
 
 void CarlaEngineOsc::sendPeaks(const uint pluginId, const float peaks[4]) const noexcept
@@ -392,11 +404,80 @@ void CarlaEngineOsc::sendPeaks(const uint pluginId, const float peaks[4]) const
     char targetPath[std::strlen(fControlDataUDP.path)+7];
     std::strcpy(targetPath, fControlDataUDP.path);
     std::strcat(targetPath, "/peaks");
-    try_lo_send(fControlDataUDP.target, targetPath, "iffff", static_cast<int32_t>(pluginId),
-                static_cast<double>(peaks[0]),
-                static_cast<double>(peaks[1]),
-                static_cast<double>(peaks[2]),
-                static_cast<double>(peaks[3]));
+
+    const lo_message msg = lo_message_new();
+    CARLA_SAFE_ASSERT_RETURN(msg != nullptr,);
+
+    lo_message_add(msg, "iffff", static_cast<int32_t>(pluginId),
+                   static_cast<double>(peaks[0]),
+                   static_cast<double>(peaks[1]),
+                   static_cast<double>(peaks[2]),
+                   static_cast<double>(peaks[3]));
+
+    sendUDPMessage(targetPath, msg);
+}
+
+// -----------------------------------------------------------------------
+
+// keep bundles well below the maximum UDP datagram size
+static const std::size_t kMaxUDPBundleSize = 8192;
+
+void CarlaEngineOsc::startUDPBundle() noexcept
+{
+    CARLA_SAFE_ASSERT_RETURN(fBundleUDP == nullptr,);
+
+    fBundleUDP = lo_bundle_new(LO_TT_IMMEDIATE);
+}
+
+void CarlaEngineOsc::sendUDPBundle() noexcept
+{
+    if (fBundleUDP == nullptr)
+        return;
+
+    if (fControlDataUDP.target != nullptr && lo_bundle_count(fBundleUDP) != 0)
+    {
+        try {
+            lo_send_bundle(fControlDataUDP.target, fBundleUDP);
+        } CARLA_SAFE_EXCEPTION("lo_send_bundle");
+    }
+
+    lo_bundle_free_recursive(fBundleUDP);
+    fBundleUDP = nullptr;
+}
+
+// takes ownership of msg
+void CarlaEngineOsc::sendUDPMessage(const char* const path, const lo_message msg) const noexcept
+{
+    if (fBundleUDP == nullptr)
+    {
+        try {
+            lo_send_message(fControlDataUDP.target, path, msg);
+        } CARLA_SAFE_EXCEPTION("lo_send_message");
+
+        lo_message_free(msg);
+        return;
+    }
+
+    // bundle is full, send what we have so far and start a new one
+    if (lo_bundle_length(fBundleUDP) + lo_message_length(msg, path) > kMaxUDPBundleSize
+        && lo_bundle_count(fBundleUDP) != 0)
+    {
+        try {
+            lo_send_bundle(fControlDataUDP.target, fBundleUDP);
+        } CARLA_SAFE_EXCEPTION("lo_send_bundle");
+
+        lo_bundle_free_recursive(fBundleUDP);
+        fBundleUDP = lo_bundle_new(LO_TT_IMMEDIATE);
+
+        if (fBundleUDP == nullptr)
+        {
+            lo_message_free(msg);
+            return;
+        }
+    }
+
+    // the bundle keeps a copy of the path and owns the message from now on
+    lo_bundle_add_message(fBundleUDP, path, msg);
 }
 
 // -----------------------------------------------------------------------
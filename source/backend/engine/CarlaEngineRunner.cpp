@@ -70,7 +70,7 @@ bool CarlaEngineRunner::run() noexcept
 
 #if defined(HAVE_LIBLO) && ! defined(BUILD_BRIDGE)
     // int64_t lastPingTime = 0;
-    const CarlaEngineOsc& engineOsc(kEngine->pData->osc);
+    CarlaEngineOsc& engineOsc(kEngine->pData->osc);
 #endif
 
     // runner must do something...
@@ -85,6 +85,10 @@ bool CarlaEngineRunner::run() noexcept
 #if defined(HAVE_LIBLO) && !defined(BUILD_BRIDGE)
     if (fIsPlugin)
         engineOsc.idle();
+
+    // send all parameter outputs, peaks and runtime info of this cycle together
+    if (oscRegistedForUDP)
+        engineOsc.startUDPBundle();
 #endif
 
     for (uint i=0, count = kEngine->getCurrentPluginCount(); i < count; ++i)
@@ -152,7 +156,10 @@ bool CarlaEngineRunner::run() noexcept
 
 #if defined(HAVE_LIBLO) && !defined(BUILD_BRIDGE)
     if (oscRegistedForUDP)
+    {
         engineOsc.sendRuntimeInfo();
+        engineOsc.sendUDPBundle();
+    }
 
     /*
     if (engineOsc.isControlRegisteredForTCP())
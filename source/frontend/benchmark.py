@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Carla host API benchmark
+# Copyright (C) 2011-2021 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Reading all parameters of a plugin, get_all_parameters() against the per-parameter getters
+# that PluginEdit.reloadParameters() used before.
+# Loads the plugin into a "Dummy" engine, so no audio device is needed.
+# Run from source/frontend as:
+#   python3 benchmark.py [--lib path/to/libcarla_standalone2] <type> <filename> <label> [iterations]
+# for example:
+#   python3 benchmark.py lv2 "" http://calf.sourceforge.net/plugins/Equalizer12Band
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import os
+import sys
+
+from time import perf_counter
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom)
+
+from carla_backend import (
+    BINARY_NATIVE,
+    PLUGIN_DSSI,
+    PLUGIN_INTERNAL,
+    PLUGIN_LADSPA,
+    PLUGIN_LV2,
+    PLUGIN_VST2,
+    PLUGIN_VST3,
+    CarlaHostDLL,
+)
+
+from common import MACOS, WINDOWS
+
+# ------------------------------------------------------------------------------------------------------------
+
+DEFAULT_ITERATIONS = 10
+
+PLUGIN_TYPES = {
+    'internal': PLUGIN_INTERNAL,
+    'ladspa': PLUGIN_LADSPA,
+    'dssi': PLUGIN_DSSI,
+    'lv2': PLUGIN_LV2,
+    'vst2': PLUGIN_VST2,
+    'vst3': PLUGIN_VST3,
+}
+
+def getDefaultLibrary():
+    extension = "dll" if WINDOWS else "dylib" if MACOS else "so"
+    return os.path.join(os.path.dirname(__file__), "..", "..", "bin", "libcarla_standalone2.%s" % extension)
+
+# What PluginEdit.reloadParameters() did before get_all_parameters()
+def getParametersOneByOne(host, pluginId):
+    parameters = []
+
+    for i in range(host.get_parameter_count(pluginId)):
+        paramData   = host.get_parameter_data(pluginId, i)
+        paramInfo   = host.get_parameter_info(pluginId, i)
+        paramRanges = host.get_parameter_ranges(pluginId, i)
+        paramValue  = host.get_current_parameter_value(pluginId, i)
+
+        scalePoints = []
+        for j in range(paramInfo['scalePointCount']):
+            scalePointInfo = host.get_parameter_scalepoint_info(pluginId, i, j)
+            scalePoints.append((scalePointInfo['value'], scalePointInfo['label']))
+
+        parameters.append((paramData, paramInfo, paramRanges, paramValue, scalePoints))
+
+    return parameters
+
+def run(host, iterations):
+    results = []
+    count   = host.get_parameter_count(0)
+
+    def measure(name, func):
+        start = perf_counter()
+        for _ in range(iterations):
+            func(host, 0)
+        results.append((name, (perf_counter() - start) / iterations))
+
+    measure("one by one", getParametersOneByOne)
+    measure("get_all_parameters", CarlaHostDLL.get_all_parameters)
+
+    print("%8s  %-20s  %10s  %12s" % ("params", "method", "ms per read", "us per param"))
+    for name, elapsed in results:
+        print("%8i  %-20s  %10.2f  %12.2f" % (count, name, elapsed * 1000.0, elapsed * 1000000.0 / max(1, count)))
+
+    if results[1][1] > 0.0:
+        print("speedup: %.1fx" % (results[0][1] / results[1][1]))
+
+def main(args):
+    libname = getDefaultLibrary()
+
+    if len(args) >= 2 and args[0] == "--lib":
+        libname = args[1]
+        args = args[2:]
+
+    if len(args) < 3 or args[0].lower() not in PLUGIN_TYPES:
+        print("usage: %s [--lib path] <%s> <filename> <label> [iterations]" % (sys.argv[0], "|".join(PLUGIN_TYPES)))
+        return 1
+
+    ptype, filename, label = args[:3]
+    iterations = int(args[3]) if len(args) > 3 else DEFAULT_ITERATIONS
+
+    host = CarlaHostDLL(libname, False)
+
+    if not host.engine_init("Dummy", "Carla-Benchmark"):
+        print("Engine failed to initialize, possible reasons:\n%s" % host.get_last_error())
+        return 1
+
+    try:
+        if not host.add_plugin(BINARY_NATIVE, PLUGIN_TYPES[ptype.lower()], filename, None, label, 0, None, 0x0):
+            print("Failed to load plugin, possible reasons:\n%s" % host.get_last_error())
+            return 1
+
+        run(host, iterations)
+
+    finally:
+        host.engine_close()
+
+    return 0
+
+# ------------------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -20,7 +20,8 @@
 # Imports (Global)
 
 from abc import abstractmethod
-from struct import pack
+from array import array
+from struct import iter_unpack
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Imports (ctypes)
@@ -28,7 +29,7 @@ from struct import pack
 from ctypes import (
     c_bool, c_char_p, c_double, c_float, c_int, c_long, c_longdouble, c_longlong, c_ubyte, c_uint, c_void_p,
     c_int8, c_int16, c_int32, c_int64, c_uint8, c_uint16, c_uint32, c_uint64,
-    cast, Structure,
+    cast, string_at, Structure,
     CDLL, CFUNCTYPE, RTLD_GLOBAL, RTLD_LOCAL, POINTER
 )
 
@@ -1161,6 +1162,10 @@ class ParameterData(Structure):
         ("mappedFlags", c_uint)
     ]
 
+# Same layout as ParameterData, in struct module format.
+# Used to unpack many ParameterData items at once, see CarlaHostDLL.get_all_parameters().
+kParameterDataFormat = "@iIiiBhffI"
+
 # Parameter ranges.
 class ParameterRanges(Structure):
     _fields_ = [
@@ -1510,6 +1515,114 @@ PyCarlaRuntimeEngineDriverDeviceInfo = {
     'sampleRates': []
 }
 
+# ---------------------------------------------------------------------------------------------------------------------
+# Packed snapshot of all parameters from a plugin
+# Numeric fields are kept in typed arrays (one item per parameter), strings and scale-points in plain lists.
+# @see CarlaHostMeta.get_all_parameters()
+
+class PluginParameterSnapshot():
+    def __init__(self, count = 0):
+        self.count = count
+
+        # @see ParameterData
+        self.types   = array('i', (PARAMETER_UNKNOWN,)) * count
+        self.hints   = array('I', (0x0,)) * count
+        self.indexes  = array('i', (PARAMETER_NULL,)) * count
+        self.rindexes = array('i', (-1,)) * count
+        self.midiChannels = array('B', (0,)) * count
+        self.mappedControlIndexes = array('h', (CONTROL_INDEX_NONE,)) * count
+        self.mappedMinimums = array('f', (0.0,)) * count
+        self.mappedMaximums = array('f', (0.0,)) * count
+        self.mappedFlags    = array('I', (0x0,)) * count
+
+        # @see ParameterRanges
+        self.defaults   = array('f', (0.0,)) * count
+        self.minimums   = array('f', (0.0,)) * count
+        self.maximums   = array('f', (1.0,)) * count
+        self.steps      = array('f', (0.01,)) * count
+        self.stepsSmall = array('f', (0.0001,)) * count
+        self.stepsLarge = array('f', (0.1,)) * count
+
+        # current values
+        self.values = array('f', (0.0,)) * count
+
+        # @see CarlaParameterInfo
+        self.names      = [""] * count
+        self.symbols    = [""] * count
+        self.units      = [""] * count
+        self.comments   = [""] * count
+        self.groupNames = [""] * count
+
+        # tuple of (value, label) pairs for each parameter
+        # @see CarlaScalePointInfo
+        self.scalePoints = [()] * count
+
+    # Store parameter data, as returned by get_parameter_data()
+    def setParameterData(self, index, data):
+        self.types[index]   = data['type']
+        self.hints[index]   = data['hints']
+        self.indexes[index]  = data['index']
+        self.rindexes[index] = data['rindex']
+        self.midiChannels[index] = data['midiChannel']
+        self.mappedControlIndexes[index] = data['mappedControlIndex']
+        self.mappedMinimums[index] = data['mappedMinimum']
+        self.mappedMaximums[index] = data['mappedMaximum']
+        self.mappedFlags[index]    = data.get('mappedFlags', 0x0)
+
+    # Store parameter info, as returned by get_parameter_info()
+    def setParameterInfo(self, index, info, scalePoints):
+        self.names[index]      = info['name']
+        self.symbols[index]    = info['symbol']
+        self.units[index]      = info['unit']
+        self.comments[index]   = info['comment']
+        self.groupNames[index] = info['groupName']
+        self.scalePoints[index] = tuple(scalePoints)
+
+    # Store parameter ranges, as returned by get_parameter_ranges()
+    def setParameterRanges(self, index, ranges):
+        self.defaults[index]   = ranges['def']
+        self.minimums[index]   = ranges['min']
+        self.maximums[index]   = ranges['max']
+        self.steps[index]      = ranges['step']
+        self.stepsSmall[index] = ranges['stepSmall']
+        self.stepsLarge[index] = ranges['stepLarge']
+
+    # Get parameter data in the same format as get_parameter_data()
+    def getParameterData(self, index):
+        return {
+            'type': self.types[index],
+            'hints': self.hints[index],
+            'index': self.indexes[index],
+            'rindex': self.rindexes[index],
+            'midiChannel': self.midiChannels[index],
+            'mappedControlIndex': self.mappedControlIndexes[index],
+            'mappedMinimum': self.mappedMinimums[index],
+            'mappedMaximum': self.mappedMaximums[index],
+            'mappedFlags': self.mappedFlags[index],
+        }
+
+    # Get parameter info in the same format as get_parameter_info()
+    def getParameterInfo(self, index):
+        return {
+            'name': self.names[index],
+            'symbol': self.symbols[index],
+            'unit': self.units[index],
+            'comment': self.comments[index],
+            'groupName': self.groupNames[index],
+            'scalePointCount': len(self.scalePoints[index]),
+        }
+
+    # Get parameter ranges in the same format as get_parameter_ranges()
+    def getParameterRanges(self, index):
+        return {
+            'def': self.defaults[index],
+            'min': self.minimums[index],
+            'max': self.maximums[index],
+            'step': self.steps[index],
+            'stepSmall': self.stepsSmall[index],
+            'stepLarge': self.stepsLarge[index]
+        }
+
 # ---------------------------------------------------------------------------------------------------------------------
 # Set BINARY_NATIVE
 
@@ -1904,6 +2017,14 @@ class CarlaHostMeta():
     def get_parameter_ranges(self, pluginId, parameterId):
         raise NotImplementedError
 
+    # Get a snapshot of all parameters from a plugin, including data, ranges, info and current value.
+    # This is much faster than calling the individual parameter getters in a loop.
+    # @param pluginId Plugin
+    # @see PluginParameterSnapshot
+    @abstractmethod
+    def get_all_parameters(self, pluginId):
+        raise NotImplementedError
+
     # Get a plugin's MIDI program data.
     # @param pluginId      Plugin
     # @param midiProgramId MIDI Program index
@@ -2042,6 +2163,14 @@ class CarlaHostMeta():
     def get_output_peak_value(self, pluginId, isLeft):
         raise NotImplementedError
 
+    # Get the peak values of all plugins in one go.
+    # Returns a flat float32 array with 4 values per plugin (input left, input right, output left, output right),
+    # which can be wrapped by numpy.frombuffer() without copying.
+    # The same buffer is reused and refilled on each call, so its contents should not be kept around.
+    @abstractmethod
+    def get_all_peak_values(self):
+        raise NotImplementedError
+
     # Render a plugin's inline display.
     # @param pluginId Plugin
     @abstractmethod
@@ -2253,6 +2382,17 @@ class CarlaHostMeta():
     def nsm_ready(self, opcode):
         raise NotImplementedError
 
+    # Start collecting setters, to be sent together once the batch ends.
+    # Meant for remote hosts, where each call is a round-trip. Local hosts apply calls right away.
+    # Batches can be nested, calls are sent when the outermost one ends.
+    def begin_batch(self):
+        return
+
+    # End a batch started with begin_batch().
+    # Returns a list with one result per batched call, in call order. It is empty for local hosts.
+    def end_batch(self):
+        return []
+
 # ---------------------------------------------------------------------------------------------------------------------
 # Carla Host object (dummy/null, does nothing)
 
@@ -2435,6 +2575,9 @@ class CarlaHostNull(CarlaHostMeta):
     def get_parameter_ranges(self, pluginId, parameterId):
         return PyParameterRanges
 
+    def get_all_parameters(self, pluginId):
+        return PluginParameterSnapshot()
+
     def get_midi_program_data(self, pluginId, midiProgramId):
         return PyMidiProgramData
 
@@ -2492,6 +2635,9 @@ class CarlaHostNull(CarlaHostMeta):
     def get_output_peak_value(self, pluginId, isLeft):
         return 0.0
 
+    def get_all_peak_values(self):
+        return array('f')
+
     def render_inline_display(self, pluginId, width, height):
         return None
 
@@ -2592,6 +2738,10 @@ class CarlaHostDLL(CarlaHostMeta):
         # info about this host object
         self.isPlugin = False
 
+        # buffer for get_all_peak_values
+        self.fPeakValues    = array('f')
+        self.fPeakValuesPtr = None
+
         self.lib = CDLL(libName, RTLD_GLOBAL if loadGlobal else RTLD_LOCAL)
 
         self.lib.carla_get_engine_driver_count.argtypes = None
@@ -2757,6 +2907,10 @@ class CarlaHostDLL(CarlaHostMeta):
         self.lib.carla_get_parameter_ranges.argtypes = (c_void_p, c_uint, c_uint32)
         self.lib.carla_get_parameter_ranges.restype = POINTER(ParameterRanges)
 
+        self.lib.carla_get_all_parameters.argtypes = (c_void_p, c_uint, POINTER(ParameterData),
+                                                      POINTER(ParameterRanges), POINTER(c_float), c_uint32)
+        self.lib.carla_get_all_parameters.restype = c_uint32
+
         self.lib.carla_get_midi_program_data.argtypes = (c_void_p, c_uint, c_uint32)
         self.lib.carla_get_midi_program_data.restype = POINTER(MidiProgramData)
 
@@ -2814,6 +2968,9 @@ class CarlaHostDLL(CarlaHostMeta):
         self.lib.carla_get_output_peak_value.argtypes = (c_void_p, c_uint, c_bool)
         self.lib.carla_get_output_peak_value.restype = c_float
 
+        self.lib.carla_get_all_peak_values.argtypes = (c_void_p, POINTER(c_float), c_uint)
+        self.lib.carla_get_all_peak_values.restype = c_uint
+
         self.lib.carla_render_inline_display.argtypes = (c_void_p, c_uint, c_uint, c_uint)
         self.lib.carla_render_inline_display.restype = POINTER(CarlaInlineDisplayImageSurface)
 
@@ -3083,6 +3240,68 @@ class CarlaHostDLL(CarlaHostMeta):
     def get_parameter_ranges(self, pluginId, parameterId):
         return structToDict(self.lib.carla_get_parameter_ranges(self.handle, pluginId, parameterId).contents)
 
+    def get_all_parameters(self, pluginId):
+        handle   = self.handle
+        count    = int(self.lib.carla_get_parameter_count(handle, pluginId))
+        snapshot = PluginParameterSnapshot(count)
+
+        if count == 0:
+            return snapshot
+
+        # data, ranges and current values of all parameters are filled in a single call.
+        # values go straight into the snapshot, ranges into a flat float buffer so each field is a strided slice,
+        # and data is unpacked with the struct module, avoiding per-parameter ctypes calls and attribute lookups.
+        data   = (ParameterData * count)()
+        ranges = array('f', (0.0,)) * (count * 6)
+
+        self.lib.carla_get_all_parameters(handle, pluginId, data,
+                                          (ParameterRanges * count).from_buffer(ranges),
+                                          (c_float * count).from_buffer(snapshot.values),
+                                          count)
+
+        fields = tuple(zip(*iter_unpack(kParameterDataFormat, data)))
+        snapshot.types   = array('i', fields[0])
+        snapshot.hints   = array('I', fields[1])
+        snapshot.indexes  = array('i', fields[2])
+        snapshot.rindexes = array('i', fields[3])
+        snapshot.midiChannels = array('B', fields[4])
+        snapshot.mappedControlIndexes = array('h', fields[5])
+        snapshot.mappedMinimums = array('f', fields[6])
+        snapshot.mappedMaximums = array('f', fields[7])
+        snapshot.mappedFlags    = array('I', fields[8])
+
+        snapshot.defaults   = ranges[0::6]
+        snapshot.minimums   = ranges[1::6]
+        snapshot.maximums   = ranges[2::6]
+        snapshot.steps      = ranges[3::6]
+        snapshot.stepsSmall = ranges[4::6]
+        snapshot.stepsLarge = ranges[5::6]
+
+        # strings still need one call per parameter, as their storage is reused between calls
+        get_parameter_info  = self.lib.carla_get_parameter_info
+        get_scalepoint_info = self.lib.carla_get_parameter_scalepoint_info
+
+        for i in range(count):
+            info = get_parameter_info(handle, pluginId, i).contents
+            snapshot.names[i]      = charPtrToString(info.name)
+            snapshot.symbols[i]    = charPtrToString(info.symbol)
+            snapshot.units[i]      = charPtrToString(info.unit)
+            snapshot.comments[i]   = charPtrToString(info.comment)
+            snapshot.groupNames[i] = charPtrToString(info.groupName)
+
+            scalePointCount = info.scalePointCount
+            if scalePointCount == 0:
+                continue
+
+            scalePoints = []
+            for j in range(scalePointCount):
+                scalePointInfo = get_scalepoint_info(handle, pluginId, i, j).contents
+                scalePoints.append((scalePointInfo.value, charPtrToString(scalePointInfo.label)))
+
+            snapshot.scalePoints[i] = tuple(scalePoints)
+
+        return snapshot
+
     def get_midi_program_data(self, pluginId, midiProgramId):
         return structToDict(self.lib.carla_get_midi_program_data(self.handle, pluginId, midiProgramId).contents)
 
@@ -3143,13 +3362,25 @@ class CarlaHostDLL(CarlaHostMeta):
     def get_output_peak_value(self, pluginId, isLeft):
         return float(self.lib.carla_get_output_peak_value(self.handle, pluginId, isLeft))
 
+    def get_all_peak_values(self):
+        count = int(self.lib.carla_get_current_plugin_count(self.handle))
+
+        if len(self.fPeakValues) != count * 4:
+            self.fPeakValues    = array('f', (0.0,)) * (count * 4)
+            self.fPeakValuesPtr = (c_float * (count * 4)).from_buffer(self.fPeakValues)
+
+        if count != 0:
+            self.lib.carla_get_all_peak_values(self.handle, self.fPeakValuesPtr, count)
+
+        return self.fPeakValues
+
     def render_inline_display(self, pluginId, width, height):
         ptr = self.lib.carla_render_inline_display(self.handle, pluginId, width, height)
         if not ptr or not ptr.contents:
             return None
         contents = ptr.contents
         datalen = contents.height * contents.stride
-        databuf = pack("%iB" % datalen, *contents.data[:datalen])
+        databuf = string_at(contents.data, datalen)
         data = {
             'data': databuf,
             'width': contents.width,
@@ -3297,6 +3528,9 @@ class CarlaHostPlugin(CarlaHostMeta):
         self.fPluginsInfo = {}
         self.fFallbackPluginInfo = PluginStoreInfo()
 
+        # buffer for get_all_peak_values
+        self.fPeakValues = array('f')
+
         # runtime engine info
         self.fRuntimeEngineInfo = {
             "load": 0.0,
@@ -3488,6 +3722,22 @@ class CarlaHostPlugin(CarlaHostMeta):
     def get_parameter_ranges(self, pluginId, parameterId):
         return self.fPluginsInfo.get(pluginId, self.fFallbackPluginInfo).parameterRanges[parameterId]
 
+    def get_all_parameters(self, pluginId):
+        plugin   = self.fPluginsInfo.get(pluginId, self.fFallbackPluginInfo)
+        snapshot = PluginParameterSnapshot(plugin.parameterCount)
+
+        for i in range(plugin.parameterCount):
+            paramInfo = plugin.parameterInfo[i]
+            scalePoints = (self.get_parameter_scalepoint_info(pluginId, i, j)
+                           for j in range(paramInfo['scalePointCount']))
+
+            snapshot.setParameterData(i, plugin.parameterData[i])
+            snapshot.setParameterRanges(i, plugin.parameterRanges[i])
+            snapshot.setParameterInfo(i, paramInfo, ((sp['value'], sp['label']) for sp in scalePoints))
+            snapshot.values[i] = plugin.parameterValues[i]
+
+        return snapshot
+
     def get_midi_program_data(self, pluginId, midiProgramId):
         return self.fPluginsInfo.get(pluginId, self.fFallbackPluginInfo).midiProgramData[midiProgramId]
 
@@ -3556,6 +3806,20 @@ class CarlaHostPlugin(CarlaHostMeta):
     def get_output_peak_value(self, pluginId, isLeft):
         return self.fPluginsInfo[pluginId].peaks[2 if isLeft else 3]
 
+    def get_all_peak_values(self):
+        count = len(self.fPluginsInfo)
+        peaks = self.fPeakValues
+
+        if len(peaks) != count * 4:
+            peaks = self.fPeakValues = array('f', (0.0,)) * (count * 4)
+
+        for pluginId in range(count):
+            offset = pluginId * 4
+            peaks[offset], peaks[offset+1], peaks[offset+2], peaks[offset+3] = \
+                self.fPluginsInfo.get(pluginId, self.fFallbackPluginInfo).peaks
+
+        return peaks
+
     def render_inline_display(self, pluginId, width, height):
         return None
 
@@ -36,7 +36,7 @@ class CarlaHostSignals(QObject):
     PluginRemovedCallback = pyqtSignal(int)
     PluginRenamedCallback = pyqtSignal(int, str)
     PluginUnavailableCallback = pyqtSignal(int, str)
-    ParameterValueChangedCallback = pyqtSignal(int, int, float)
+    ParameterValuesChangedCallback = pyqtSignal(list) # [(pluginId, index, value), ...], once per frame
     ParameterDefaultChangedCallback = pyqtSignal(int, int, float)
     ParameterMappedControlIndexChangedCallback = pyqtSignal(int, int, int)
     ParameterMappedRangeChangedCallback = pyqtSignal(int, int, float, float)
@@ -19,17 +19,71 @@
 # ---------------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
+import json
+
+from array import array
+from collections import deque
+from struct import iter_unpack
+from threading import Thread
+
 import requests
-from websocket import WebSocket, WebSocketConnectionClosedException
+from websocket import WebSocket, WebSocketConnectionClosedException, WebSocketTimeoutException
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Imports (Custom)
 
-from carla_backend_qt import *
+from carla_backend import (
+    ENGINE_CALLBACK_ENGINE_STARTED,
+    ENGINE_CALLBACK_ENGINE_STOPPED,
+    ENGINE_CALLBACK_MIDI_PROGRAM_CHANGED,
+    ENGINE_CALLBACK_PARAMETER_DEFAULT_CHANGED,
+    ENGINE_CALLBACK_PARAMETER_MAPPED_CONTROL_INDEX_CHANGED,
+    ENGINE_CALLBACK_PARAMETER_MAPPED_RANGE_CHANGED,
+    ENGINE_CALLBACK_PARAMETER_MIDI_CHANNEL_CHANGED,
+    ENGINE_CALLBACK_PARAMETER_VALUE_CHANGED,
+    ENGINE_CALLBACK_PLUGIN_ADDED,
+    ENGINE_CALLBACK_PLUGIN_REMOVED,
+    ENGINE_CALLBACK_PLUGIN_RENAMED,
+    ENGINE_CALLBACK_PROGRAM_CHANGED,
+    ENGINE_CALLBACK_QUIT,
+    ENGINE_CALLBACK_RELOAD_ALL,
+    ENGINE_CALLBACK_RELOAD_INFO,
+    ENGINE_CALLBACK_RELOAD_PARAMETERS,
+    ENGINE_CALLBACK_RELOAD_PROGRAMS,
+    ENGINE_CALLBACK_UPDATE,
+    PARAMETER_ACTIVE,
+    PARAMETER_BALANCE_LEFT,
+    PARAMETER_BALANCE_RIGHT,
+    PARAMETER_CTRL_CHANNEL,
+    PARAMETER_DRYWET,
+    PARAMETER_INPUT,
+    PARAMETER_PANNING,
+    PARAMETER_VOLUME,
+    PluginParameterSnapshot,
+    PyCarlaTransportInfo,
+)
+from carla_backend_qt import CarlaHostQtNull
 
 import os
 from time import sleep
 
+# ---------------------------------------------------------------------------------------------------------------------
+# Binary peaks frame sent by the REST server, repeated for each plugin
+# uint32 pluginId, float32 input left, input right, output left, output right
+
+kPeaksFrameFormat = "<I4f"
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Groups of local cache keys, invalidated together
+
+kCacheKeysInfo       = ('pluginInfo', 'realName', 'audioCountInfo', 'midiCountInfo')
+kCacheKeysParameters = ('parameterCountInfo', 'parameterCount', 'parameterInfo', 'parameterScalePoint',
+                        'parameterData', 'parameterRanges', 'parameterText', 'parameterDefault', 'parameterValue')
+kCacheKeysParameterValues = ('parameterText', 'parameterValue')
+kCacheKeysPrograms   = ('programCount', 'programName', 'programCurrent',
+                        'midiProgramCount', 'midiProgramData', 'midiProgramName', 'midiProgramCurrent')
+kCacheKeysCustomData = ('customDataCount', 'customData')
+
 # ---------------------------------------------------------------------------------------------------------------------
 # Carla Host object for connecting to the REST API backend
 
@@ -42,64 +96,285 @@ class CarlaHostQtWeb(CarlaHostQtNull):
 
         self.baseurl = "http://{}:{}".format(self.host, self.port)
 
+        # keep-alive connection pool, reused for all requests
+        self.session = requests.Session()
+
         self.socket = WebSocket()
         self.socket.connect("ws://{}:{}/ws".format(self.host, self.port), timeout=1)
 
         self.isRemote = True
         self.isRunning = True
+
+        # messages received by the socket thread, handled in engine_idle()
+        # deque append and popleft are atomic, so no extra locking is needed
+        self.fSocketMessages = deque()
+        self.fSocketThread = Thread(target=self._socketThreadRun, daemon=True)
+        self.fSocketThread.start()
         self.peaks = []
 
         for i in range(99):
             self.peaks.append((0.0, 0.0, 0.0, 0.0))
 
+        # buffer for get_all_peak_values
+        self.fPeakValues = array('f')
+
+        # batch mode, see begin_batch()
+        self.fBatchDepth   = 0
+        self.fBatchCalls   = []
+        self.fBatchResults = []
+
+        # local cache of plugin data, see _cached()
+        self.fPluginsCache = {}
+        self.fCacheHits    = 0
+        self.fCacheMisses  = 0
+
+    # --------------------------------------------------------------------------------------------------------
+    # Local cache
+    # Mirrors plugin data like CarlaHostPlugin does with PluginStoreInfo, but filled on first request.
+    # Kept up to date by setters and engine callbacks, see _updateCacheViaCallback().
+
+    # Get a cached value, or fetch and store it if not available
+    def _cached(self, pluginId, key, fetch):
+        pluginCache = self.fPluginsCache.get(pluginId, None)
+
+        if pluginCache is None:
+            pluginCache = self.fPluginsCache[pluginId] = {}
+        elif key in pluginCache:
+            self.fCacheHits += 1
+            return pluginCache[key]
+
+        self.fCacheMisses += 1
+        value = pluginCache[key] = fetch()
+        return value
+
+    # Same as _cached() for many values at once, with calls given as (key, method, args) tuples
+    # Values not cached yet are fetched together in a single multi-call request, failed calls return None
+    def _cachedMulti(self, pluginId, calls):
+        pluginCache = self.fPluginsCache.setdefault(pluginId, {})
+        missing = [call for call in calls if call[0] not in pluginCache]
+
+        self.fCacheHits   += len(calls) - len(missing)
+        self.fCacheMisses += len(missing)
+
+        if missing:
+            # send any pending batched calls first to keep things in order
+            if self.fBatchCalls:
+                self.flush_batch()
+
+            results = self._multiCall([self._multiCallLine(method, args) for _, method, args in missing])
+
+            for (key, _, _), value in zip(missing, results):
+                if value is not None:
+                    pluginCache[key] = value
+
+        return [pluginCache.get(key, None) for key, _, _ in calls]
+
+    # Output parameter values change without any engine callback, so they are never cached
+    def _isInputParameter(self, pluginId, parameterId):
+        paramData = self.get_parameter_data(pluginId, parameterId)
+        return paramData is not None and paramData['type'] == PARAMETER_INPUT
+
+    def _cacheStore(self, pluginId, key, value):
+        self.fPluginsCache.setdefault(pluginId, {})[key] = value
+
+    def _cacheDiscard(self, pluginId, key):
+        pluginCache = self.fPluginsCache.get(pluginId, None)
+        if pluginCache is not None:
+            pluginCache.pop(key, None)
+
+    # Invalidate all cached data of a plugin, or only the key groups given
+    def _invalidateCache(self, pluginId, groups = None):
+        if groups is None:
+            self.fPluginsCache.pop(pluginId, None)
+            return
+
+        pluginCache = self.fPluginsCache.get(pluginId, None)
+        if pluginCache is None:
+            return
+
+        for key in [key for key in pluginCache if key[0] in groups]:
+            del pluginCache[key]
+
+    def _updateCacheViaCallback(self, action, pluginId, value1, value2, valuef, valueStr):
+        if action in (ENGINE_CALLBACK_ENGINE_STARTED, ENGINE_CALLBACK_ENGINE_STOPPED):
+            self.fPluginsCache = {}
+
+        elif action == ENGINE_CALLBACK_PLUGIN_ADDED:
+            self._invalidateCache(pluginId)
+
+        elif action == ENGINE_CALLBACK_PLUGIN_REMOVED:
+            # push all plugins 1 slot back starting from the plugin that got removed
+            cache = self.fPluginsCache
+            cache.pop(pluginId, None)
+            for pid in sorted(pid for pid in cache if pid > pluginId):
+                cache[pid-1] = cache.pop(pid)
+
+        elif action == ENGINE_CALLBACK_PLUGIN_RENAMED:
+            self._cacheDiscard(pluginId, ('pluginInfo',))
+
+        elif action == ENGINE_CALLBACK_PARAMETER_VALUE_CHANGED:
+            if value1 < 0:
+                self._cacheStore(pluginId, ('internalValue', value1), valuef)
+            else:
+                paramData = self.fPluginsCache.get(pluginId, {}).get(('parameterData', value1), None)
+                if paramData is not None and paramData['type'] == PARAMETER_INPUT:
+                    self._cacheStore(pluginId, ('parameterValue', value1), valuef)
+                else:
+                    self._cacheDiscard(pluginId, ('parameterValue', value1))
+                self._cacheDiscard(pluginId, ('parameterText', value1))
+
+        elif action == ENGINE_CALLBACK_PARAMETER_DEFAULT_CHANGED:
+            self._cacheStore(pluginId, ('parameterDefault', value1), valuef)
+            self._cacheDiscard(pluginId, ('parameterRanges', value1))
+
+        elif action in (ENGINE_CALLBACK_PARAMETER_MAPPED_CONTROL_INDEX_CHANGED,
+                        ENGINE_CALLBACK_PARAMETER_MAPPED_RANGE_CHANGED,
+                        ENGINE_CALLBACK_PARAMETER_MIDI_CHANNEL_CHANGED):
+            self._cacheDiscard(pluginId, ('parameterData', value1))
+
+        elif action == ENGINE_CALLBACK_PROGRAM_CHANGED:
+            self._cacheStore(pluginId, ('programCurrent',), value1)
+            self._invalidateCache(pluginId, kCacheKeysParameterValues)
+
+        elif action == ENGINE_CALLBACK_MIDI_PROGRAM_CHANGED:
+            self._cacheStore(pluginId, ('midiProgramCurrent',), value1)
+            self._invalidateCache(pluginId, kCacheKeysParameterValues)
+
+        elif action == ENGINE_CALLBACK_RELOAD_INFO:
+            self._invalidateCache(pluginId, kCacheKeysInfo)
+
+        elif action == ENGINE_CALLBACK_RELOAD_PARAMETERS:
+            self._invalidateCache(pluginId, kCacheKeysParameters)
+
+        elif action == ENGINE_CALLBACK_RELOAD_PROGRAMS:
+            self._invalidateCache(pluginId, kCacheKeysPrograms)
+
+        elif action in (ENGINE_CALLBACK_RELOAD_ALL, ENGINE_CALLBACK_UPDATE):
+            self._invalidateCache(pluginId)
+
+    # Get local cache statistics, for debugging and benchmarks
+    def get_cache_stats(self):
+        return {
+            'hits': self.fCacheHits,
+            'misses': self.fCacheMisses,
+            'plugins': len(self.fPluginsCache),
+        }
+
+    # --------------------------------------------------------------------------------------------------------
+    # Batch mode
+    # While active, setters and calls added via queue_call() are not sent right away,
+    # but collected and sent together as a single multi-call request.
+
+    def begin_batch(self):
+        self.fBatchDepth += 1
+
+    # Returns the results of all queued calls, decoded from JSON (None for setters and failed calls)
+    def end_batch(self):
+        self.fBatchDepth -= 1
+
+        if self.fBatchDepth != 0:
+            return []
+
+        self.flush_batch()
+
+        results = self.fBatchResults
+        self.fBatchResults = []
+        return results
+
+    # Queue a call for the next multi-call request
+    # Returns the index of its result in the list returned by end_batch()
+    def queue_call(self, method, *args):
+        self.fBatchCalls.append(self._multiCallLine(method, args))
+        return len(self.fBatchResults) + len(self.fBatchCalls) - 1
+
+    # Regular single request, sending any pending batched calls first to keep things in order
+    def _get(self, path, params = None):
+        if self.fBatchCalls:
+            self.flush_batch()
+
+        return self.session.get(self.baseurl + path, params=params)
+
+    # Send all queued calls now, keeping their results for end_batch()
+    def flush_batch(self):
+        if not self.fBatchCalls:
+            return
+
+        calls = self.fBatchCalls
+        self.fBatchCalls = []
+
+        self.fBatchResults += self._multiCall(calls)
+
+    @staticmethod
+    def _multiCallLine(method, args):
+        return " ".join([method] + [str(int(arg) if isinstance(arg, bool) else arg) for arg in args])
+
+    # Send a multi-call request, returning its results
+    def _multiCall(self, calls):
+        # strings are only escaped for quotes and newlines on the server side, so allow raw control characters
+        results = json.loads(self.session.post(self.baseurl + "/multi_call", data="\n".join(calls)).text, strict=False)
+
+        if not isinstance(results, list) or len(results) != len(calls):
+            return [None] * len(calls)
+
+        return results
+
+    # --------------------------------------------------------------------------------------------------------
+
     def get_engine_driver_count(self):
-        return int(requests.get("{}/get_engine_driver_count".format(self.baseurl)).text)
+        return int(self._get("/get_engine_driver_count").text)
 
     def get_engine_driver_name(self, index):
-        return requests.get("{}/get_engine_driver_name".format(self.baseurl), params={
+        return self._get("/get_engine_driver_name", params={
             'index': index,
         }).text
 
     def get_engine_driver_device_names(self, index):
-        return requests.get("{}/get_engine_driver_device_names".format(self.baseurl), params={
+        return self._get("/get_engine_driver_device_names", params={
             'index': index,
         }).text.split("\n")
 
     def get_engine_driver_device_info(self, index, name):
-        return requests.get("{}/get_engine_driver_device_info".format(self.baseurl), params={
+        return self._get("/get_engine_driver_device_info", params={
             'index': index,
             'name': name,
         }).json()
 
     def engine_init(self, driverName, clientName):
-        return bool(int(requests.get("{}/engine_init".format(self.baseurl), params={
+        return bool(int(self._get("/engine_init", params={
             'driverName': driverName,
             'clientName': clientName,
         }).text))
 
     def engine_close(self):
-        return bool(int(requests.get("{}/engine_close".format(self.baseurl)).text))
+        return bool(int(self._get("/engine_close").text))
 
     def engine_idle(self):
         if not self.isRunning:
             return
 
-        while True:
-            try:
-                line = self.socket.recv().strip()
-            except WebSocketConnectionClosedException:
+        # only handle what the socket thread already received, never block here
+        messages = self.fSocketMessages
+
+        while messages:
+            message = messages.popleft()
+
+            if message is None:
                 self.isRunning = False
-                if self.fEngineCallback is None:
+                if self.fEngineCallback is not None:
                     self.fEngineCallback(None, ENGINE_CALLBACK_QUIT, 0, 0, 0, 0.0, "")
                 return
 
-            if line == "Keep-Alive":
-                return
+            if isinstance(message, bytes):
+                # binary peaks frame, pluginId + 4 floats per plugin
+                peaks = self.peaks
+                for pluginId, value1, value2, value3, value4 in iter_unpack(kPeaksFrameFormat, message):
+                    if pluginId < len(peaks):
+                        peaks[pluginId] = (value1, value2, value3, value4)
+                continue
 
-            elif line.startswith("Carla: "):
-                if self.fEngineCallback is None:
-                    continue
+            line = message.strip()
 
+            if line.startswith("Carla: "):
                 # split values from line
                 action, pluginId, value1, value2, value3, valueStr = line[7:].split(" ",5)
 
@@ -110,6 +385,12 @@ class CarlaHostQtWeb(CarlaHostQtNull):
                 value2   = int(value2)
                 value3   = float(value3)
 
+                # keep local cache up to date
+                self._updateCacheViaCallback(action, pluginId, value1, value2, value3, valueStr)
+
+                if self.fEngineCallback is None:
+                    continue
+
                 # pass to callback
                 self.fEngineCallback(None, action, pluginId, value1, value2, value3, valueStr)
 
@@ -127,43 +408,65 @@ class CarlaHostQtWeb(CarlaHostQtNull):
                 # store peaks
                 self.peaks[pluginId] = (value1, value2, value3, value4)
 
+    # runs on a separate thread, receiving websocket messages for engine_idle()
+    def _socketThreadRun(self):
+        messages = self.fSocketMessages
+
+        while self.isRunning:
+            try:
+                message = self.socket.recv()
+            except WebSocketTimeoutException:
+                continue
+            except WebSocketConnectionClosedException:
+                messages.append(None)
+                return
+            except Exception as e:
+                print("Websocket receive failed:", e)
+                messages.append(None)
+                return
+
+            if message == "Keep-Alive":
+                continue
+
+            messages.append(message)
+
     def is_engine_running(self):
         if not self.isRunning:
             return False
 
         try:
-            return bool(int(requests.get("{}/is_engine_running".format(self.baseurl)).text))
+            return bool(int(self._get("/is_engine_running").text))
         except requests.exceptions.ConnectionError:
-            if self.fEngineCallback is None:
+            if self.fEngineCallback is not None:
                 self.fEngineCallback(None, ENGINE_CALLBACK_QUIT, 0, 0, 0, 0.0, "")
 
     def set_engine_about_to_close(self):
-        return bool(int(requests.get("{}/set_engine_about_to_close".format(self.baseurl)).text))
+        return bool(int(self._get("/set_engine_about_to_close").text))
 
     def set_engine_option(self, option, value, valueStr):
-        requests.get("{}/set_engine_option".format(self.baseurl), params={
+        self._get("/set_engine_option", params={
             'option': option,
             'value': value,
             'valueStr': valueStr,
         })
 
     def load_file(self, filename):
-        return bool(int(requests.get("{}/load_file".format(self.baseurl), params={
+        return bool(int(self._get("/load_file", params={
             'filename': filename,
         }).text))
 
     def load_project(self, filename):
-        return bool(int(requests.get("{}/load_project".format(self.baseurl), params={
+        return bool(int(self._get("/load_project", params={
             'filename': filename,
         }).text))
 
     def save_project(self, filename):
-        return bool(int(requests.get("{}/save_project".format(self.baseurl), params={
+        return bool(int(self._get("/save_project", params={
             'filename': filename,
         }).text))
 
     def patchbay_connect(self, groupIdA, portIdA, groupIdB, portIdB):
-        return bool(int(requests.get("{}/patchbay_connect".format(self.baseurl), params={
+        return bool(int(self._get("/patchbay_connect", params={
             'groupIdA': groupIdA,
             'portIdA': portIdA,
             'groupIdB': groupIdB,
@@ -171,51 +474,51 @@ class CarlaHostQtWeb(CarlaHostQtNull):
         }).text))
 
     def patchbay_disconnect(self, connectionId):
-        return bool(int(requests.get("{}/patchbay_disconnect".format(self.baseurl), params={
+        return bool(int(self._get("/patchbay_disconnect", params={
             'connectionId': connectionId,
         }).text))
 
     def patchbay_refresh(self, external):
-        return bool(int(requests.get("{}/patchbay_refresh".format(self.baseurl), params={
+        return bool(int(self._get("/patchbay_refresh", params={
             'external': int(external),
         }).text))
 
     def transport_play(self):
-        requests.get("{}/transport_play".format(self.baseurl))
+        self._get("/transport_play")
 
     def transport_pause(self):
-        requests.get("{}/transport_pause".format(self.baseurl))
+        self._get("/transport_pause")
 
     def transport_bpm(self, bpm):
-        requests.get("{}/transport_bpm".format(self.baseurl), params={
+        self._get("/transport_bpm", params={
             'bpm': bpm,
         })
 
     def transport_relocate(self, frame):
-        requests.get("{}/transport_relocate".format(self.baseurl), params={
+        self._get("/transport_relocate", params={
             'frame': frame,
         })
 
     def get_current_transport_frame(self):
-        return int(requests.get("{}/get_current_transport_frame".format(self.baseurl)).text)
+        return int(self._get("/get_current_transport_frame").text)
 
     def get_transport_info(self):
         if self.isRunning:
             try:
-                return requests.get("{}/get_transport_info".format(self.baseurl)).json()
+                return self._get("/get_transport_info").json()
             except requests.exceptions.ConnectionError:
-                if self.fEngineCallback is None:
+                if self.fEngineCallback is not None:
                     self.fEngineCallback(None, ENGINE_CALLBACK_QUIT, 0, 0, 0, 0.0, "")
         return PyCarlaTransportInfo()
 
     def get_current_plugin_count(self):
-        return int(requests.get("{}/get_current_plugin_count".format(self.baseurl)).text)
+        return int(self._get("/get_current_plugin_count").text)
 
     def get_max_plugin_number(self):
-        return int(requests.get("{}/get_max_plugin_number".format(self.baseurl)).text)
+        return int(self._get("/get_max_plugin_number").text)
 
     def add_plugin(self, btype, ptype, filename, name, label, uniqueId, extraPtr, options):
-        return bool(int(requests.get("{}/add_plugin".format(self.baseurl), params={
+        return bool(int(self._get("/add_plugin", params={
             'btype': btype,
             'ptype': ptype,
             'filename': filename,
@@ -226,198 +529,288 @@ class CarlaHostQtWeb(CarlaHostQtNull):
         }).text))
 
     def remove_plugin(self, pluginId):
-        return bool(int(requests.get("{}/remove_plugin".format(self.baseurl), params={
+        return bool(int(self._get("/remove_plugin", params={
             'filename': pluginId,
         }).text))
 
     def remove_all_plugins(self):
-        return bool(int(requests.get("{}/remove_all_plugins".format(self.baseurl)).text))
+        self.fPluginsCache = {}
+        return bool(int(self._get("/remove_all_plugins").text))
 
     def rename_plugin(self, pluginId, newName):
-        return requests.get("{}/rename_plugin".format(self.baseurl), params={
+        self._cacheDiscard(pluginId, ('pluginInfo',))
+        return self._get("/rename_plugin", params={
             'pluginId': pluginId,
             'newName': newName,
         }).text
 
     def clone_plugin(self, pluginId):
-        return bool(int(requests.get("{}/clone_plugin".format(self.baseurl), params={
+        return bool(int(self._get("/clone_plugin", params={
             'pluginId': pluginId,
         }).text))
 
     def replace_plugin(self, pluginId):
-        return bool(int(requests.get("{}/replace_plugin".format(self.baseurl), params={
+        return bool(int(self._get("/replace_plugin", params={
             'pluginId': pluginId,
         }).text))
 
     def switch_plugins(self, pluginIdA, pluginIdB):
-        return bool(int(requests.get("{}/switch_plugins".format(self.baseurl), params={
+        ret = bool(int(self._get("/switch_plugins", params={
             'pluginIdA': pluginIdA,
             'pluginIdB': pluginIdB,
         }).text))
+        if ret:
+            cacheA = self.fPluginsCache.pop(pluginIdA, None)
+            cacheB = self.fPluginsCache.pop(pluginIdB, None)
+            if cacheA is not None:
+                self.fPluginsCache[pluginIdB] = cacheA
+            if cacheB is not None:
+                self.fPluginsCache[pluginIdA] = cacheB
+        return ret
 
     def load_plugin_state(self, pluginId, filename):
-        return bool(int(requests.get("{}/load_plugin_state".format(self.baseurl), params={
+        self._invalidateCache(pluginId)
+        return bool(int(self._get("/load_plugin_state", params={
             'pluginId': pluginId,
             'filename': filename,
         }).text))
 
     def save_plugin_state(self, pluginId, filename):
-        return bool(int(requests.get("{}/save_plugin_state".format(self.baseurl), params={
+        return bool(int(self._get("/save_plugin_state", params={
             'pluginId': pluginId,
             'filename': filename,
         }).text))
 
     def export_plugin_lv2(self, pluginId, lv2path):
-        return bool(int(requests.get("{}/export_plugin_lv2".format(self.baseurl), params={
+        return bool(int(self._get("/export_plugin_lv2", params={
             'pluginId': pluginId,
             'lv2path': lv2path,
         }).text))
 
     def get_plugin_info(self, pluginId):
-        return requests.get("{}/get_plugin_info".format(self.baseurl), params={
-            'pluginId': pluginId,
-        }).json()
+        return self._cached(pluginId, ('pluginInfo',), lambda:
+            self._get("/get_plugin_info", params={
+                'pluginId': pluginId,
+            }).json())
 
     def get_audio_port_count_info(self, pluginId):
-        return requests.get("{}/get_audio_port_count_info".format(self.baseurl), params={
-            'pluginId': pluginId,
-        }).json()
+        return self._cached(pluginId, ('audioCountInfo',), lambda:
+            self._get("/get_audio_port_count_info", params={
+                'pluginId': pluginId,
+            }).json())
 
     def get_midi_port_count_info(self, pluginId):
-        return requests.get("{}/get_midi_port_count_info".format(self.baseurl), params={
-            'pluginId': pluginId,
-        }).json()
+        return self._cached(pluginId, ('midiCountInfo',), lambda:
+            self._get("/get_midi_port_count_info", params={
+                'pluginId': pluginId,
+            }).json())
 
     def get_parameter_count_info(self, pluginId):
-        return requests.get("{}/get_parameter_count_info".format(self.baseurl), params={
-            'pluginId': pluginId,
-        }).json()
+        return self._cached(pluginId, ('parameterCountInfo',), lambda:
+            self._get("/get_parameter_count_info", params={
+                'pluginId': pluginId,
+            }).json())
 
     def get_parameter_info(self, pluginId, parameterId):
-        return requests.get("{}/get_parameter_info".format(self.baseurl), params={
-            'pluginId': pluginId,
-            'parameterId': parameterId,
-        }).json()
+        return self._cached(pluginId, ('parameterInfo', parameterId), lambda:
+            self._get("/get_parameter_info", params={
+                'pluginId': pluginId,
+                'parameterId': parameterId,
+            }).json())
 
     def get_parameter_scalepoint_info(self, pluginId, parameterId, scalePointId):
-        return requests.get("{}/get_parameter_scalepoint_info".format(self.baseurl), params={
-            'pluginId': pluginId,
-            'parameterId': parameterId,
-            'scalePointId': scalePointId,
-        }).json()
+        return self._cached(pluginId, ('parameterScalePoint', parameterId, scalePointId), lambda:
+            self._get("/get_parameter_scalepoint_info", params={
+                'pluginId': pluginId,
+                'parameterId': parameterId,
+                'scalePointId': scalePointId,
+            }).json())
 
     def get_parameter_data(self, pluginId, parameterId):
-        return requests.get("{}/get_parameter_data".format(self.baseurl), params={
-            'pluginId': pluginId,
-            'parameterId': parameterId,
-        }).json()
+        return self._cached(pluginId, ('parameterData', parameterId), lambda:
+            self._get("/get_parameter_data", params={
+                'pluginId': pluginId,
+                'parameterId': parameterId,
+            }).json())
 
     def get_parameter_ranges(self, pluginId, parameterId):
-        return requests.get("{}/get_parameter_ranges".format(self.baseurl), params={
-            'pluginId': pluginId,
-            'parameterId': parameterId,
-        }).json()
+        return self._cached(pluginId, ('parameterRanges', parameterId), lambda:
+            self._get("/get_parameter_ranges", params={
+                'pluginId': pluginId,
+                'parameterId': parameterId,
+            }).json())
+
+    def get_all_parameters(self, pluginId):
+        count    = self.get_parameter_count(pluginId)
+        snapshot = PluginParameterSnapshot(count)
+
+        if count == 0:
+            return snapshot
+
+        # one request for everything per parameter, and one more for scale points once their count is known
+        results = self._cachedMulti(pluginId, [call for i in range(count) for call in (
+            (('parameterData', i), "get_parameter_data", (pluginId, i)),
+            (('parameterRanges', i), "get_parameter_ranges", (pluginId, i)),
+            (('parameterInfo', i), "get_parameter_info", (pluginId, i)),
+            (('parameterValue', i), "get_current_parameter_value", (pluginId, i)),
+        )])
+
+        scalePointCalls = []
+
+        for i in range(count):
+            data, ranges, info, value = results[i*4:i*4+4]
+
+            if data is None or data['type'] != PARAMETER_INPUT:
+                self._cacheDiscard(pluginId, ('parameterValue', i))
+            if data is not None:
+                snapshot.setParameterData(i, data)
+            if ranges is not None:
+                snapshot.setParameterRanges(i, ranges)
+            if value is not None:
+                snapshot.values[i] = value
+            if info is None:
+                continue
+
+            snapshot.setParameterInfo(i, info, ())
+            scalePointCalls += [(('parameterScalePoint', i, j), "get_parameter_scalepoint_info", (pluginId, i, j))
+                                for j in range(info['scalePointCount'])]
+
+        if scalePointCalls:
+            scalePoints = {}
+            for (key, _, _), scalePoint in zip(scalePointCalls, self._cachedMulti(pluginId, scalePointCalls)):
+                if scalePoint is not None:
+                    scalePoints.setdefault(key[1], []).append((scalePoint['value'], scalePoint['label']))
+
+            for i, values in scalePoints.items():
+                snapshot.scalePoints[i] = tuple(values)
+
+        return snapshot
 
     def get_midi_program_data(self, pluginId, midiProgramId):
-        return requests.get("{}/get_midi_program_data".format(self.baseurl), params={
-            'pluginId': pluginId,
-            'midiProgramId': midiProgramId,
-        }).json()
+        return self._cached(pluginId, ('midiProgramData', midiProgramId), lambda:
+            self._get("/get_midi_program_data", params={
+                'pluginId': pluginId,
+                'midiProgramId': midiProgramId,
+            }).json())
 
     def get_custom_data(self, pluginId, customDataId):
-        return requests.get("{}/get_custom_data".format(self.baseurl), params={
-            'pluginId': pluginId,
-            'customDataId': customDataId,
-        }).json()
+        return self._cached(pluginId, ('customData', customDataId), lambda:
+            self._get("/get_custom_data", params={
+                'pluginId': pluginId,
+                'customDataId': customDataId,
+            }).json())
 
     def get_custom_data_value(self, pluginId, type_, key):
-        return requests.get("{}/get_custom_data_value".format(self.baseurl), params={
+        return self._get("/get_custom_data_value", params={
             'pluginId': pluginId,
             'type_': type_,
             'key': key,
         }).text
 
     def get_chunk_data(self, pluginId):
-        return requests.get("{}/get_chunk_data".format(self.baseurl), params={
+        return self._get("/get_chunk_data", params={
             'pluginId': pluginId,
         }).text
 
     def get_parameter_count(self, pluginId):
-        return int(requests.get("{}/get_parameter_count".format(self.baseurl), params={
-            'pluginId': pluginId,
-        }).text)
+        return self._cached(pluginId, ('parameterCount',), lambda:
+            int(self._get("/get_parameter_count", params={
+                'pluginId': pluginId,
+            }).text))
 
     def get_program_count(self, pluginId):
-        return int(requests.get("{}/get_program_count".format(self.baseurl), params={
-            'pluginId': pluginId,
-        }).text)
+        return self._cached(pluginId, ('programCount',), lambda:
+            int(self._get("/get_program_count", params={
+                'pluginId': pluginId,
+            }).text))
 
     def get_midi_program_count(self, pluginId):
-        return int(requests.get("{}/get_midi_program_count".format(self.baseurl), params={
-            'pluginId': pluginId,
-        }).text)
+        return self._cached(pluginId, ('midiProgramCount',), lambda:
+            int(self._get("/get_midi_program_count", params={
+                'pluginId': pluginId,
+            }).text))
 
     def get_custom_data_count(self, pluginId):
-        return int(requests.get("{}/get_custom_data_count".format(self.baseurl), params={
-            'pluginId': pluginId,
-        }).text)
+        return self._cached(pluginId, ('customDataCount',), lambda:
+            int(self._get("/get_custom_data_count", params={
+                'pluginId': pluginId,
+            }).text))
 
     def get_parameter_text(self, pluginId, parameterId):
-        return requests.get("{}/get_parameter_text".format(self.baseurl), params={
-            'pluginId': pluginId,
-            'parameterId': parameterId,
-        }).text
+        def fetch():
+            return self._get("/get_parameter_text", params={
+                'pluginId': pluginId,
+                'parameterId': parameterId,
+            }).text
+
+        if not self._isInputParameter(pluginId, parameterId):
+            return fetch()
+
+        return self._cached(pluginId, ('parameterText', parameterId), fetch)
 
     def get_program_name(self, pluginId, programId):
-        return requests.get("{}/get_program_name".format(self.baseurl), params={
-            'pluginId': pluginId,
-            'programId': programId,
-        }).text
+        return self._cached(pluginId, ('programName', programId), lambda:
+            self._get("/get_program_name", params={
+                'pluginId': pluginId,
+                'programId': programId,
+            }).text)
 
     def get_midi_program_name(self, pluginId, midiProgramId):
-        return requests.get("{}/get_midi_program_name".format(self.baseurl), params={
-            'pluginId': pluginId,
-            'midiProgramId': midiProgramId,
-        }).text
+        return self._cached(pluginId, ('midiProgramName', midiProgramId), lambda:
+            self._get("/get_midi_program_name", params={
+                'pluginId': pluginId,
+                'midiProgramId': midiProgramId,
+            }).text)
 
     def get_real_plugin_name(self, pluginId):
-        return requests.get("{}/get_real_plugin_name".format(self.baseurl), params={
-            'pluginId': pluginId,
-        }).text
+        return self._cached(pluginId, ('realName',), lambda:
+            self._get("/get_real_plugin_name", params={
+                'pluginId': pluginId,
+            }).text)
 
     def get_current_program_index(self, pluginId):
-        return int(requests.get("{}/get_custom_data_count".format(self.baseurl), params={
-            'pluginId': pluginId,
-        }).text)
+        return self._cached(pluginId, ('programCurrent',), lambda:
+            int(self._get("/get_current_program_index", params={
+                'pluginId': pluginId,
+            }).text))
 
     def get_current_midi_program_index(self, pluginId):
-        return int(requests.get("{}/get_custom_data_count".format(self.baseurl), params={
-            'pluginId': pluginId,
-        }).text)
+        return self._cached(pluginId, ('midiProgramCurrent',), lambda:
+            int(self._get("/get_current_midi_program_index", params={
+                'pluginId': pluginId,
+            }).text))
 
     def get_default_parameter_value(self, pluginId, parameterId):
-        return float(requests.get("{}/get_default_parameter_value".format(self.baseurl), params={
-            'pluginId': pluginId,
-            'parameterId': parameterId,
-        }).text)
+        return self._cached(pluginId, ('parameterDefault', parameterId), lambda:
+            float(self._get("/get_default_parameter_value", params={
+                'pluginId': pluginId,
+                'parameterId': parameterId,
+            }).text))
 
     def get_current_parameter_value(self, pluginId, parameterId):
+        def fetch():
+            return float(self._get("/get_current_parameter_value", params={
+                'pluginId': pluginId,
+                'parameterId': parameterId,
+            }).text)
+
         if self.isRunning:
             try:
-                return float(requests.get("{}/get_current_parameter_value".format(self.baseurl), params={
-                    'pluginId': pluginId,
-                    'parameterId': parameterId,
-                }).text)
+                if not self._isInputParameter(pluginId, parameterId):
+                    return fetch()
+
+                return self._cached(pluginId, ('parameterValue', parameterId), fetch)
             except requests.exceptions.ConnectionError:
-                if self.fEngineCallback is None:
+                if self.fEngineCallback is not None:
                     self.fEngineCallback(None, ENGINE_CALLBACK_QUIT, 0, 0, 0, 0.0, "")
         return 0.0
 
     def get_internal_parameter_value(self, pluginId, parameterId):
-        return float(requests.get("{}/get_internal_parameter_value".format(self.baseurl), params={
-            'pluginId': pluginId,
-            'parameterId': parameterId,
-        }).text)
+        return self._cached(pluginId, ('internalValue', parameterId), lambda:
+            float(self._get("/get_internal_parameter_value", params={
+                'pluginId': pluginId,
+                'parameterId': parameterId,
+            }).text))
 
     def get_input_peak_value(self, pluginId, isLeft):
         return self.peaks[pluginId][0 if isLeft else 1]
@@ -425,89 +818,156 @@ class CarlaHostQtWeb(CarlaHostQtNull):
     def get_output_peak_value(self, pluginId, isLeft):
         return self.peaks[pluginId][2 if isLeft else 3]
 
+    def get_all_peak_values(self):
+        count = len(self.peaks)
+        peaks = self.fPeakValues
+
+        if len(peaks) != count * 4:
+            peaks = self.fPeakValues = array('f', (0.0,)) * (count * 4)
+
+        for pluginId in range(count):
+            offset = pluginId * 4
+            peaks[offset], peaks[offset+1], peaks[offset+2], peaks[offset+3] = self.peaks[pluginId]
+
+        return peaks
+
     def set_option(self, pluginId, option, yesNo):
-        requests.get("{}/set_option".format(self.baseurl), params={
+        self._cacheDiscard(pluginId, ('pluginInfo',))
+        self._get("/set_option", params={
             'pluginId': pluginId,
             'option': option,
             'yesNo': int(yesNo),
         })
 
     def set_active(self, pluginId, onOff):
-        requests.get("{}/set_active".format(self.baseurl), params={
+        self._cacheStore(pluginId, ('internalValue', PARAMETER_ACTIVE), 1.0 if onOff else 0.0)
+        if self.fBatchDepth != 0:
+            self.queue_call("set_active", pluginId, onOff)
+            return
+
+        self._get("/set_active", params={
             'pluginId': pluginId,
             'onOff': int(onOff),
         })
 
     def set_drywet(self, pluginId, value):
-        requests.get("{}/set_drywet".format(self.baseurl), params={
+        self._cacheStore(pluginId, ('internalValue', PARAMETER_DRYWET), value)
+        if self.fBatchDepth != 0:
+            self.queue_call("set_drywet", pluginId, value)
+            return
+
+        self._get("/set_drywet", params={
             'pluginId': pluginId,
             'value': value,
         })
 
     def set_volume(self, pluginId, value):
-        requests.get("{}/set_volume".format(self.baseurl), params={
+        self._cacheStore(pluginId, ('internalValue', PARAMETER_VOLUME), value)
+        if self.fBatchDepth != 0:
+            self.queue_call("set_volume", pluginId, value)
+            return
+
+        self._get("/set_volume", params={
             'pluginId': pluginId,
             'value': value,
         })
 
     def set_balance_left(self, pluginId, value):
-        requests.get("{}/set_balance_left".format(self.baseurl), params={
+        self._cacheStore(pluginId, ('internalValue', PARAMETER_BALANCE_LEFT), value)
+        if self.fBatchDepth != 0:
+            self.queue_call("set_balance_left", pluginId, value)
+            return
+
+        self._get("/set_balance_left", params={
             'pluginId': pluginId,
             'value': value,
         })
 
     def set_balance_right(self, pluginId, value):
-        requests.get("{}/set_balance_right".format(self.baseurl), params={
+        self._cacheStore(pluginId, ('internalValue', PARAMETER_BALANCE_RIGHT), value)
+        if self.fBatchDepth != 0:
+            self.queue_call("set_balance_right", pluginId, value)
+            return
+
+        self._get("/set_balance_right", params={
             'pluginId': pluginId,
             'value': value,
         })
 
     def set_panning(self, pluginId, value):
-        requests.get("{}/set_panning".format(self.baseurl), params={
+        self._cacheStore(pluginId, ('internalValue', PARAMETER_PANNING), value)
+        if self.fBatchDepth != 0:
+            self.queue_call("set_panning", pluginId, value)
+            return
+
+        self._get("/set_panning", params={
             'pluginId': pluginId,
             'value': value,
         })
 
     def set_ctrl_channel(self, pluginId, channel):
-        requests.get("{}/set_ctrl_channel".format(self.baseurl), params={
+        self._cacheStore(pluginId, ('internalValue', PARAMETER_CTRL_CHANNEL), float(channel))
+        self._get("/set_ctrl_channel", params={
             'pluginId': pluginId,
             'channel': channel,
         })
 
     def set_parameter_value(self, pluginId, parameterId, value):
-        requests.get("{}/set_parameter_value".format(self.baseurl), params={
+        self._cacheStore(pluginId, ('parameterValue', parameterId), value)
+        self._cacheDiscard(pluginId, ('parameterText', parameterId))
+        if self.fBatchDepth != 0:
+            self.queue_call("set_parameter_value", pluginId, parameterId, value)
+            return
+
+        self._get("/set_parameter_value", params={
             'pluginId': pluginId,
             'parameterId': parameterId,
             'value': value,
         })
 
     def set_parameter_midi_channel(self, pluginId, parameterId, channel):
-        requests.get("{}/set_parameter_midi_channel".format(self.baseurl), params={
+        self._cacheDiscard(pluginId, ('parameterData', parameterId))
+        self._get("/set_parameter_midi_channel", params={
             'pluginId': pluginId,
             'parameterId': parameterId,
             'channel': channel,
         })
 
     def set_parameter_midi_cc(self, pluginId, parameterId, cc):
-        requests.get("{}/set_parameter_midi_cc".format(self.baseurl), params={
+        self._cacheDiscard(pluginId, ('parameterData', parameterId))
+        self._get("/set_parameter_midi_cc", params={
             'pluginId': pluginId,
             'parameterId': parameterId,
             'cc': cc,
         })
 
     def set_program(self, pluginId, programId):
-        requests.get("{}/set_program".format(self.baseurl), params={
+        self._cacheStore(pluginId, ('programCurrent',), programId)
+        self._invalidateCache(pluginId, kCacheKeysParameterValues)
+        if self.fBatchDepth != 0:
+            self.queue_call("set_program", pluginId, programId)
+            return
+
+        self._get("/set_program", params={
             'pluginId': pluginId,
+            'programId': programId,
         })
 
     def set_midi_program(self, pluginId, midiProgramId):
-        requests.get("{}/set_midi_program".format(self.baseurl), params={
+        self._cacheStore(pluginId, ('midiProgramCurrent',), midiProgramId)
+        self._invalidateCache(pluginId, kCacheKeysParameterValues)
+        if self.fBatchDepth != 0:
+            self.queue_call("set_midi_program", pluginId, midiProgramId)
+            return
+
+        self._get("/set_midi_program", params={
             'pluginId': pluginId,
             'midiProgramId': midiProgramId,
         })
 
     def set_custom_data(self, pluginId, type_, key, value):
-        requests.get("{}/set_custom_data".format(self.baseurl), params={
+        self._invalidateCache(pluginId, kCacheKeysCustomData)
+        self._get("/set_custom_data", params={
             'pluginId': pluginId,
             'type': type_,
             'key': key,
@@ -515,28 +975,31 @@ class CarlaHostQtWeb(CarlaHostQtNull):
         })
 
     def set_chunk_data(self, pluginId, chunkData):
-        requests.get("{}/set_chunk_data".format(self.baseurl), params={
+        self._invalidateCache(pluginId, kCacheKeysCustomData + kCacheKeysParameterValues)
+        self._get("/set_chunk_data", params={
             'pluginId': pluginId,
             'chunkData': chunkData,
         })
 
     def prepare_for_save(self, pluginId):
-        requests.get("{}/prepare_for_save".format(self.baseurl), params={
+        self._get("/prepare_for_save", params={
             'pluginId': pluginId,
         })
 
     def reset_parameters(self, pluginId):
-        requests.get("{}/reset_parameters".format(self.baseurl), params={
+        self._invalidateCache(pluginId, kCacheKeysParameterValues)
+        self._get("/reset_parameters", params={
             'pluginId': pluginId,
         })
 
     def randomize_parameters(self, pluginId):
-        requests.get("{}/randomize_parameters".format(self.baseurl), params={
+        self._invalidateCache(pluginId, kCacheKeysParameterValues)
+        self._get("/randomize_parameters", params={
             'pluginId': pluginId,
         })
 
     def send_midi_note(self, pluginId, channel, note, velocity):
-        requests.get("{}/send_midi_note".format(self.baseurl), params={
+        self._get("/send_midi_note", params={
             'pluginId': pluginId,
             'channel': channel,
             'note': note,
@@ -544,16 +1007,16 @@ class CarlaHostQtWeb(CarlaHostQtNull):
         })
 
     def get_buffer_size(self):
-        return int(requests.get("{}/get_buffer_size".format(self.baseurl)).text)
+        return int(self._get("/get_buffer_size").text)
 
     def get_sample_rate(self):
-        return float(requests.get("{}/get_sample_rate".format(self.baseurl)).text)
+        return float(self._get("/get_sample_rate").text)
 
     def get_last_error(self):
-        return requests.get("{}/get_last_error".format(self.baseurl)).text
+        return self._get("/get_last_error").text
 
     def get_host_osc_url_tcp(self):
-        return requests.get("{}/get_host_osc_url_tcp".format(self.baseurl)).text
+        return self._get("/get_host_osc_url_tcp").text
 
     def get_host_osc_url_udp(self):
-        return requests.get("{}/get_host_osc_url_udp".format(self.baseurl)).text
+        return self._get("/get_host_osc_url_udp").text
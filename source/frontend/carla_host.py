@@ -62,6 +62,7 @@ from carla_utils import *
 from carla_widgets import *
 
 from patchcanvas import patchcanvas
+from patchcanvas.snapshot import GraphSnapshotRecorder
 from pluginlist import PluginListDialog
 from widgets.digitalpeakmeter import DigitalPeakMeter
 from widgets.pixmapkeyboard import PixmapKeyboardHArea
@@ -81,6 +82,15 @@ except:
 def sys_excepthook(typ, value, tback):
     return sys.__excepthook__(typ, value, tback)
 
+# ------------------------------------------------------------------------------------------------------------
+# Adaptive idle
+# The fast timer always runs at the configured refresh interval, as it drives engine_idle().
+# After this many GUI refreshes without anything changing, the GUI is refreshed half as often, up to the max divider.
+# Any change brings it back to refreshing on every fast tick.
+
+IDLE_TICKS_BEFORE_BACKOFF = 25
+IDLE_MAX_REFRESH_DIVIDER  = 8
+
 # ------------------------------------------------------------------------------------------------------------
 # Session Management support
 
@@ -156,6 +166,12 @@ class HostWindow(QMainWindow):
         self.fIdleTimerFast = 0
         self.fIdleTimerSlow = 0
 
+        # see adaptive idle
+        self.fIdleTicksWithoutChanges = 0
+        self.fIdleRefreshDivider = 1
+        self.fIdleRefreshSkipped = 0
+        self.fLastPeaks = None
+
         self.fLadspaRdfNeedsUpdate = True
         self.fLadspaRdfList = []
 
@@ -224,6 +240,16 @@ class HostWindow(QMainWindow):
         self.fCanvasWidth  = 0
         self.fCanvasHeight = 0
         self.fMiniCanvasUpdateTimeout = 0
+        self.fMiniCanvasUpdatePending = False
+
+        # patchbay callbacks are recorded here during a refresh, see beginCanvasSnapshot()
+        self.fCanvasRecorder = None
+        self.fCanvasRecorderExternal = False
+        self.fCanvasShownExternal = None
+        self.fCanvasRecorderTimer = QTimer(self)
+        self.fCanvasRecorderTimer.setInterval(500)
+        self.fCanvasRecorderTimer.setSingleShot(True)
+        self.fCanvasRecorderTimer.timeout.connect(self.endCanvasSnapshot)
 
         self.fWithCanvas = withCanvas
 
@@ -560,7 +586,6 @@ class HostWindow(QMainWindow):
             self.ui.act_canvas_save_image_2x.triggered.connect(self.slot_canvasSaveImage)
             self.ui.act_canvas_save_image_4x.triggered.connect(self.slot_canvasSaveImage)
             self.ui.act_canvas_copy_clipboard.triggered.connect(self.slot_canvasCopyToClipboard)
-            self.ui.act_canvas_arrange.setEnabled(False) # TODO, later
             self.ui.graphicsView.horizontalScrollBar().valueChanged.connect(self.slot_horizontalScrollBarChanged)
             self.ui.graphicsView.verticalScrollBar().valueChanged.connect(self.slot_verticalScrollBarChanged)
             self.ui.miniCanvasPreview.miniCanvasMoved.connect(self.slot_miniCanvasMoved)
@@ -583,6 +608,8 @@ class HostWindow(QMainWindow):
         host.PluginRemovedCallback.connect(self.slot_handlePluginRemovedCallback)
         host.ReloadAllCallback.connect(self.slot_handleReloadAllCallback)
 
+        host.ParameterValuesChangedCallback.connect(self.slot_handleParameterValuesChangedCallback)
+
         host.NoteOnCallback.connect(self.slot_handleNoteOnCallback)
         host.NoteOffCallback.connect(self.slot_handleNoteOffCallback)
 
@@ -799,7 +826,14 @@ class HostWindow(QMainWindow):
         self.projectLoadingStarted()
         self.fIsProjectLoading = True
 
-        if not self.host.load_project(self.fProjectFilename):
+        self.beginCanvasBatch()
+
+        try:
+            ok = self.host.load_project(self.fProjectFilename)
+        finally:
+            self.endCanvasBatch()
+
+        if not ok:
             self.fIsProjectLoading = False
             self.projectLoadingFinished(True)
 
@@ -1380,79 +1414,107 @@ class HostWindow(QMainWindow):
         if not self.host.is_engine_running():
             return
 
-        for pitem in self.fPluginList:
-            if pitem is None:
-                break
+        self.host.begin_batch()
+        try:
+            for pitem in self.fPluginList:
+                if pitem is None:
+                    break
 
-            pitem.getWidget().setActive(True, True, True)
+                pitem.getWidget().setActive(True, True, True)
+        finally:
+            self.host.end_batch()
 
     @pyqtSlot()
     def slot_pluginsDisable(self):
         if not self.host.is_engine_running():
             return
 
-        for pitem in self.fPluginList:
-            if pitem is None:
-                break
+        self.host.begin_batch()
+        try:
+            for pitem in self.fPluginList:
+                if pitem is None:
+                    break
 
-            pitem.getWidget().setActive(False, True, True)
+                pitem.getWidget().setActive(False, True, True)
+        finally:
+            self.host.end_batch()
 
     @pyqtSlot()
     def slot_pluginsVolume100(self):
         if not self.host.is_engine_running():
             return
 
-        for pitem in self.fPluginList:
-            if pitem is None:
-                break
+        self.host.begin_batch()
+        try:
+            for pitem in self.fPluginList:
+                if pitem is None:
+                    break
 
-            pitem.getWidget().setInternalParameter(PLUGIN_CAN_VOLUME, 1.0)
+                pitem.getWidget().setInternalParameter(PLUGIN_CAN_VOLUME, 1.0)
+        finally:
+            self.host.end_batch()
 
     @pyqtSlot()
     def slot_pluginsMute(self):
         if not self.host.is_engine_running():
             return
 
-        for pitem in self.fPluginList:
-            if pitem is None:
-                break
+        self.host.begin_batch()
+        try:
+            for pitem in self.fPluginList:
+                if pitem is None:
+                    break
 
-            pitem.getWidget().setInternalParameter(PLUGIN_CAN_VOLUME, 0.0)
+                pitem.getWidget().setInternalParameter(PLUGIN_CAN_VOLUME, 0.0)
+        finally:
+            self.host.end_batch()
 
     @pyqtSlot()
     def slot_pluginsWet100(self):
         if not self.host.is_engine_running():
             return
 
-        for pitem in self.fPluginList:
-            if pitem is None:
-                break
+        self.host.begin_batch()
+        try:
+            for pitem in self.fPluginList:
+                if pitem is None:
+                    break
 
-            pitem.getWidget().setInternalParameter(PLUGIN_CAN_DRYWET, 1.0)
+                pitem.getWidget().setInternalParameter(PLUGIN_CAN_DRYWET, 1.0)
+        finally:
+            self.host.end_batch()
 
     @pyqtSlot()
     def slot_pluginsBypass(self):
         if not self.host.is_engine_running():
             return
 
-        for pitem in self.fPluginList:
-            if pitem is None:
-                break
+        self.host.begin_batch()
+        try:
+            for pitem in self.fPluginList:
+                if pitem is None:
+                    break
 
-            pitem.getWidget().setInternalParameter(PLUGIN_CAN_DRYWET, 0.0)
+                pitem.getWidget().setInternalParameter(PLUGIN_CAN_DRYWET, 0.0)
+        finally:
+            self.host.end_batch()
 
     @pyqtSlot()
     def slot_pluginsCenter(self):
         if not self.host.is_engine_running():
             return
 
-        for pitem in self.fPluginList:
-            if pitem is None:
-                break
+        self.host.begin_batch()
+        try:
+            for pitem in self.fPluginList:
+                if pitem is None:
+                    break
 
-            pitem.getWidget().setInternalParameter(PARAMETER_BALANCE_LEFT, -1.0)
-            pitem.getWidget().setInternalParameter(PARAMETER_BALANCE_RIGHT, 1.0)
-            pitem.getWidget().setInternalParameter(PARAMETER_PANNING, 0.0)
+                pitem.getWidget().setInternalParameter(PARAMETER_BALANCE_LEFT, -1.0)
+                pitem.getWidget().setInternalParameter(PARAMETER_BALANCE_RIGHT, 1.0)
+                pitem.getWidget().setInternalParameter(PARAMETER_PANNING, 0.0)
+        finally:
+            self.host.end_batch()
 
     @pyqtSlot()
     def slot_pluginsCompact(self):
@@ -1549,6 +1611,10 @@ class HostWindow(QMainWindow):
         pOptions.use_bezier_lines  = self.fSavedSettings[CARLA_KEY_CANVAS_USE_BEZIER_LINES]
         pOptions.antialiasing      = self.fSavedSettings[CARLA_KEY_CANVAS_ANTIALIASING]
         pOptions.inline_displays   = self.fSavedSettings[CARLA_KEY_CANVAS_INLINE_DISPLAYS]
+        pOptions.lod_text_scale    = self.fSavedSettings[CARLA_KEY_CANVAS_LOD_TEXT_SCALE]
+        pOptions.lod_effects_scale = self.fSavedSettings[CARLA_KEY_CANVAS_LOD_EFFECTS_SCALE]
+        pOptions.lod_lines_scale   = self.fSavedSettings[CARLA_KEY_CANVAS_LOD_LINES_SCALE]
+        pOptions.lod_ports_scale   = self.fSavedSettings[CARLA_KEY_CANVAS_LOD_PORTS_SCALE]
 
         if self.fSavedSettings[CARLA_KEY_CANVAS_FANCY_EYE_CANDY]:
             pOptions.eyecandy = patchcanvas.EYECANDY_FULL
@@ -1608,7 +1674,68 @@ class HostWindow(QMainWindow):
         patchcanvas.setInitialPos(x, y)
 
     def updateMiniCanvasLater(self):
-        QTimer.singleShot(self.fMiniCanvasUpdateTimeout, self.ui.miniCanvasPreview.update)
+        if patchcanvas.inBatch():
+            self.fMiniCanvasUpdatePending = True
+            return
+
+        QTimer.singleShot(self.fMiniCanvasUpdateTimeout, self.ui.miniCanvasPreview.invalidateCache)
+
+    # defers canvas layout, z-ordering and minicanvas updates while replaying many patchbay callbacks
+    def beginCanvasBatch(self):
+        if self.fWithCanvas:
+            patchcanvas.beginBatch()
+
+    def endCanvasBatch(self):
+        if not self.fWithCanvas:
+            return
+
+        patchcanvas.endBatch()
+
+        if self.fMiniCanvasUpdatePending and not patchcanvas.inBatch():
+            self.fMiniCanvasUpdatePending = False
+            self.updateMiniCanvasLater()
+
+    # Records patchbay callbacks into a graph snapshot instead of the canvas.
+    # When done, only the differences with the current canvas are applied.
+    # Remote hosts reply asynchronously, in that case recording ends once callbacks stop arriving.
+    def beginCanvasSnapshot(self, waitForCallbacks):
+        self.fCanvasRecorder = GraphSnapshotRecorder()
+        self.fCanvasRecorderExternal = self.fExternalPatchbay
+
+        if waitForCallbacks:
+            self.fCanvasRecorderTimer.start()
+
+    @pyqtSlot()
+    def endCanvasSnapshot(self):
+        self.fCanvasRecorderTimer.stop()
+
+        recorder = self.fCanvasRecorder
+
+        if recorder is None:
+            return
+
+        self.fCanvasRecorder = None
+
+        # internal and external patchbays use the same ids for different groups
+        fullReload = self.fCanvasShownExternal != self.fCanvasRecorderExternal
+        self.fCanvasShownExternal = self.fCanvasRecorderExternal
+
+        patchcanvas.loadGraphSnapshot(recorder.snapshot(), fullReload)
+        self.updateMiniCanvasLater()
+
+    def cancelCanvasSnapshot(self):
+        self.fCanvasRecorderTimer.stop()
+        self.fCanvasRecorder = None
+
+    # where patchbay callbacks go, the canvas or the current snapshot
+    def canvasTarget(self):
+        if self.fCanvasRecorder is None:
+            return patchcanvas
+
+        if self.fCanvasRecorderTimer.isActive():
+            self.fCanvasRecorderTimer.start()
+
+        return self.fCanvasRecorder
 
     # --------------------------------------------------------------------------------------------------------
     # Canvas (menu actions)
@@ -1641,15 +1768,29 @@ class HostWindow(QMainWindow):
 
     @pyqtSlot()
     def slot_canvasRefresh(self):
-        patchcanvas.clear()
+        self.cancelCanvasSnapshot()
 
         if self.host.processMode == ENGINE_PROCESS_MODE_CONTINUOUS_RACK and self.host.isPlugin:
+            patchcanvas.clear()
+            return
+
+        if not self.host.is_engine_running():
+            patchcanvas.clear()
+            self.updateMiniCanvasLater()
             return
 
-        if self.host.is_engine_running():
+        # carla-control and the REST host receive the patchbay later, through OSC or engine_idle()
+        if self.host.isControl or self.host.isRemote:
+            self.beginCanvasSnapshot(True)
             self.host.patchbay_refresh(self.fExternalPatchbay)
+            return
 
-        self.updateMiniCanvasLater()
+        self.beginCanvasSnapshot(False)
+
+        try:
+            self.host.patchbay_refresh(self.fExternalPatchbay)
+        finally:
+            self.endCanvasSnapshot()
 
     @pyqtSlot()
     def slot_canvasZoomFit(self):
@@ -1774,6 +1915,8 @@ class HostWindow(QMainWindow):
 
     @pyqtSlot(int, int, int, str)
     def slot_handlePatchbayClientAddedCallback(self, clientId, clientIcon, pluginId, clientName):
+        pcanvas = self.canvasTarget()
+
         pcSplit = patchcanvas.SPLIT_UNDEF
         pcIcon  = patchcanvas.ICON_APPLICATION
 
@@ -1788,7 +1931,7 @@ class HostWindow(QMainWindow):
         elif clientIcon == PATCHBAY_ICON_FILE:
             pcIcon = patchcanvas.ICON_FILE
 
-        patchcanvas.addGroup(clientId, clientName, pcSplit, pcIcon)
+        pcanvas.addGroup(clientId, clientName, pcSplit, pcIcon)
 
         self.updateMiniCanvasLater()
 
@@ -1806,20 +1949,22 @@ class HostWindow(QMainWindow):
             hasCustomUI = bool(hints & PLUGIN_HAS_CUSTOM_UI)
             hasInlineDisplay = bool(hints & PLUGIN_HAS_INLINE_DISPLAY)
 
-        patchcanvas.setGroupAsPlugin(clientId, pluginId, hasCustomUI, hasInlineDisplay)
+        pcanvas.setGroupAsPlugin(clientId, pluginId, hasCustomUI, hasInlineDisplay)
 
     @pyqtSlot(int)
     def slot_handlePatchbayClientRemovedCallback(self, clientId):
-        patchcanvas.removeGroup(clientId)
+        self.canvasTarget().removeGroup(clientId)
         self.updateMiniCanvasLater()
 
     @pyqtSlot(int, str)
     def slot_handlePatchbayClientRenamedCallback(self, clientId, newClientName):
-        patchcanvas.renameGroup(clientId, newClientName)
+        self.canvasTarget().renameGroup(clientId, newClientName)
         self.updateMiniCanvasLater()
 
     @pyqtSlot(int, int, int)
     def slot_handlePatchbayClientDataChangedCallback(self, clientId, clientIcon, pluginId):
+        pcanvas = self.canvasTarget()
+
         pcIcon = patchcanvas.ICON_APPLICATION
 
         if clientIcon == PATCHBAY_ICON_PLUGIN:
@@ -1833,7 +1978,7 @@ class HostWindow(QMainWindow):
         elif clientIcon == PATCHBAY_ICON_FILE:
             pcIcon = patchcanvas.ICON_FILE
 
-        patchcanvas.setGroupIcon(clientId, pcIcon)
+        pcanvas.setGroupIcon(clientId, pcIcon)
         self.updateMiniCanvasLater()
 
         if pluginId < 0:
@@ -1850,15 +1995,17 @@ class HostWindow(QMainWindow):
             hasCustomUI = bool(hints & PLUGIN_HAS_CUSTOM_UI)
             hasInlineDisplay = bool(hints & PLUGIN_HAS_INLINE_DISPLAY)
 
-        patchcanvas.setGroupAsPlugin(clientId, pluginId, hasCustomUI, hasInlineDisplay)
+        pcanvas.setGroupAsPlugin(clientId, pluginId, hasCustomUI, hasInlineDisplay)
 
     @pyqtSlot(int, int, int, int, int)
     def slot_handlePatchbayClientPositionChangedCallback(self, clientId, x1, y1, x2, y2):
+        pcanvas = self.canvasTarget()
+
         if (x1 != 0 and x2 != 0) or (y1 != 0 and y2 != 0):
-            patchcanvas.splitGroup(clientId)
+            pcanvas.splitGroup(clientId)
         else:
-            patchcanvas.joinGroup(clientId)
-        patchcanvas.setGroupPosFull(clientId, x1, y1, x2, y2)
+            pcanvas.joinGroup(clientId)
+        pcanvas.setGroupPosFull(clientId, x1, y1, x2, y2)
         self.updateMiniCanvasLater()
 
     @pyqtSlot(int, int, int, int, str)
@@ -1881,17 +2028,17 @@ class HostWindow(QMainWindow):
             portType    = patchcanvas.PORT_TYPE_NULL
             isAlternate = False
 
-        patchcanvas.addPort(clientId, portId, portName, portMode, portType, isAlternate)
+        self.canvasTarget().addPort(clientId, portId, portName, portMode, portType, isAlternate)
         self.updateMiniCanvasLater()
 
     @pyqtSlot(int, int)
     def slot_handlePatchbayPortRemovedCallback(self, groupId, portId):
-        patchcanvas.removePort(groupId, portId)
+        self.canvasTarget().removePort(groupId, portId)
         self.updateMiniCanvasLater()
 
     @pyqtSlot(int, int, int, int, str)
     def slot_handlePatchbayPortChangedCallback(self, groupId, portId, portFlags, portGroupId, newPortName):
-        patchcanvas.renamePort(groupId, portId, newPortName)
+        self.canvasTarget().renamePort(groupId, portId, newPortName)
         self.updateMiniCanvasLater()
 
     @pyqtSlot(int, int, int, str)
@@ -1911,12 +2058,12 @@ class HostWindow(QMainWindow):
 
     @pyqtSlot(int, int, int, int, int)
     def slot_handlePatchbayConnectionAddedCallback(self, connectionId, groupOutId, portOutId, groupInId, portInId):
-        patchcanvas.connectPorts(connectionId, groupOutId, portOutId, groupInId, portInId)
+        self.canvasTarget().connectPorts(connectionId, groupOutId, portOutId, groupInId, portInId)
         self.updateMiniCanvasLater()
 
     @pyqtSlot(int, int, int)
     def slot_handlePatchbayConnectionRemovedCallback(self, connectionId, portOutId, portInId):
-        patchcanvas.disconnectPorts(connectionId)
+        self.canvasTarget().disconnectPorts(connectionId)
         self.updateMiniCanvasLater()
 
     # --------------------------------------------------------------------------------------------------------
@@ -2018,6 +2165,10 @@ class HostWindow(QMainWindow):
             CARLA_KEY_CANVAS_ANTIALIASING:      settings.value(CARLA_KEY_CANVAS_ANTIALIASING,      CARLA_DEFAULT_CANVAS_ANTIALIASING,      int),
             CARLA_KEY_CANVAS_HQ_ANTIALIASING:   settings.value(CARLA_KEY_CANVAS_HQ_ANTIALIASING,   CARLA_DEFAULT_CANVAS_HQ_ANTIALIASING,   bool),
             CARLA_KEY_CANVAS_FULL_REPAINTS:     settings.value(CARLA_KEY_CANVAS_FULL_REPAINTS,     CARLA_DEFAULT_CANVAS_FULL_REPAINTS,     bool),
+            CARLA_KEY_CANVAS_LOD_TEXT_SCALE:    settings.value(CARLA_KEY_CANVAS_LOD_TEXT_SCALE,    CARLA_DEFAULT_CANVAS_LOD_TEXT_SCALE,    float),
+            CARLA_KEY_CANVAS_LOD_EFFECTS_SCALE: settings.value(CARLA_KEY_CANVAS_LOD_EFFECTS_SCALE, CARLA_DEFAULT_CANVAS_LOD_EFFECTS_SCALE, float),
+            CARLA_KEY_CANVAS_LOD_LINES_SCALE:   settings.value(CARLA_KEY_CANVAS_LOD_LINES_SCALE,   CARLA_DEFAULT_CANVAS_LOD_LINES_SCALE,   float),
+            CARLA_KEY_CANVAS_LOD_PORTS_SCALE:   settings.value(CARLA_KEY_CANVAS_LOD_PORTS_SCALE,   CARLA_DEFAULT_CANVAS_LOD_PORTS_SCALE,   float),
             CARLA_KEY_CUSTOM_PAINTING:         (settings.value(CARLA_KEY_MAIN_USE_PRO_THEME,    True,   bool) and
                                                 settings.value(CARLA_KEY_MAIN_PRO_THEME_COLOR, "Black", str).lower() == "black"),
         }
@@ -2107,7 +2258,11 @@ class HostWindow(QMainWindow):
         if self.host.processMode == ENGINE_PROCESS_MODE_CONTINUOUS_RACK and self.host.isPlugin:
             pass
         elif self.host.is_engine_running():
-            self.host.patchbay_refresh(self.fExternalPatchbay)
+            self.beginCanvasBatch()
+            try:
+                self.host.patchbay_refresh(self.fExternalPatchbay)
+            finally:
+                self.endCanvasBatch()
 
     # --------------------------------------------------------------------------------------------------------
     # About (menu actions)
@@ -2367,6 +2522,22 @@ class HostWindow(QMainWindow):
             pedit = self.getPluginEditDialog(pluginId)
             pedit.noteOff(0, note)
 
+    # --------------------------------------------------------------------------------------------------------
+    # Parameter values (host callbacks)
+
+    @pyqtSlot(list)
+    def slot_handleParameterValuesChangedCallback(self, values):
+        for pluginId, index, value in values:
+            if pluginId >= self.fPluginCount:
+                continue
+
+            pitem = self.fPluginList[pluginId]
+
+            if pitem is None:
+                continue
+
+            pitem.getWidget().slot_handleParameterValueChangedCallback(pluginId, index, value)
+
     # --------------------------------------------------------------------------------------------------------
     # Canvas keyboard (host callbacks)
 
@@ -2487,6 +2658,10 @@ class HostWindow(QMainWindow):
     # Timers
 
     def startTimers(self):
+        self.fIdleTicksWithoutChanges = 0
+        self.fIdleRefreshDivider = 1
+        self.fIdleRefreshSkipped = 0
+
         if self.fIdleTimerFast == 0:
             self.fIdleTimerFast = self.startTimer(self.fSavedSettings[CARLA_KEY_MAIN_REFRESH_INTERVAL])
 
@@ -2494,6 +2669,10 @@ class HostWindow(QMainWindow):
             self.fIdleTimerSlow = self.startTimer(self.fSavedSettings[CARLA_KEY_MAIN_REFRESH_INTERVAL]*4)
 
     def restartTimersIfNeeded(self):
+        self.fIdleTicksWithoutChanges = 0
+        self.fIdleRefreshDivider = 1
+        self.fIdleRefreshSkipped = 0
+
         if self.fIdleTimerFast != 0:
             self.killTimer(self.fIdleTimerFast)
             self.fIdleTimerFast = self.startTimer(self.fSavedSettings[CARLA_KEY_MAIN_REFRESH_INTERVAL])
@@ -2784,25 +2963,47 @@ class HostWindow(QMainWindow):
 
     def idleFast(self):
         self.host.engine_idle()
+        gEngineCallbackDispatcher.flush()
+
+        # engine idle runs on every tick, only the GUI refresh below backs off
+        activity = gEngineCallbackDispatcher.takeActivity()
+
+        if activity:
+            self.fIdleRefreshDivider = 1
+        elif self.fIdleRefreshSkipped + 1 < self.fIdleRefreshDivider:
+            self.fIdleRefreshSkipped += 1
+            return
+
+        self.fIdleRefreshSkipped = 0
         self.refreshTransport()
 
         if self.fPluginCount == 0 or self.fCurrentlyRemovingAllPlugins:
+            self.updateIdleBackoff(activity or self.fLastTransportState)
             return
 
+        # fetch peaks for all plugins at once, shared by rack slots and canvas meters
+        peaks = self.host.get_all_peak_values()
+
+        self.updateIdleBackoff(activity or self.fLastTransportState or peaks != self.fLastPeaks)
+        self.fLastPeaks = peaks[:]
+
         for pitem in self.fPluginList:
             if pitem is None:
                 break
 
-            pitem.getWidget().idleFast()
+            pitem.getWidget().idleFast(peaks)
 
         for pluginId in self.fSelectedPlugins:
             self.fPeaksCleared = False
+            offset = pluginId * 4
+            if offset + 4 > len(peaks):
+                return
             if self.ui.peak_in.isVisible():
-                self.ui.peak_in.displayMeter(1, self.host.get_input_peak_value(pluginId, True))
-                self.ui.peak_in.displayMeter(2, self.host.get_input_peak_value(pluginId, False))
+                self.ui.peak_in.displayMeter(1, peaks[offset])
+                self.ui.peak_in.displayMeter(2, peaks[offset+1])
             if self.ui.peak_out.isVisible():
-                self.ui.peak_out.displayMeter(1, self.host.get_output_peak_value(pluginId, True))
-                self.ui.peak_out.displayMeter(2, self.host.get_output_peak_value(pluginId, False))
+                self.ui.peak_out.displayMeter(1, peaks[offset+2])
+                self.ui.peak_out.displayMeter(2, peaks[offset+3])
             return
 
         if self.fPeaksCleared:
@@ -2824,7 +3025,27 @@ class HostWindow(QMainWindow):
             if pitem is None:
                 break
 
-            pitem.getWidget().idleSlow()
+            widget = pitem.getWidget()
+
+            if widget.isIdleSlowNeeded():
+                widget.idleSlow()
+
+    # Refresh the GUI less often while nothing is happening, go back to every fast tick as soon as something changes
+    def updateIdleBackoff(self, changed):
+        if changed:
+            self.fIdleTicksWithoutChanges = 0
+            self.fIdleRefreshDivider = 1
+            return
+
+        self.fIdleTicksWithoutChanges += 1
+
+        if self.fIdleTicksWithoutChanges < IDLE_TICKS_BEFORE_BACKOFF:
+            return
+        if self.fIdleRefreshDivider >= IDLE_MAX_REFRESH_DIVIDER:
+            return
+
+        self.fIdleTicksWithoutChanges = 0
+        self.fIdleRefreshDivider *= 2
 
     def timerEvent(self, event):
         if event.timerId() == self.fIdleTimerFast:
@@ -3074,6 +3295,89 @@ def canvasCallback(action, value1, value2, valueStr):
         width, height = [int(v) for v in valueStr.split(":")]
         return host.render_inline_display(pluginId, width, height)
 
+# ------------------------------------------------------------------------------------------------------------
+# Engine callback dispatcher
+# High-rate callbacks are kept here until the end of the current frame, where only the latest one of each kind
+# (per plugin and parameter/note) is delivered. Any other callback delivers the pending ones first, so ordering
+# relative to plugin add/remove/reload is kept.
+
+class EngineCallbackDispatcher(object):
+    def __init__(self):
+        self.fHost = None
+        self.fPending = {}
+        self.fHasActivity = False
+        self.resetStats()
+
+    def resetStats(self):
+        self.fStats = {
+            'received': 0,  # callbacks that went through the dispatcher
+            'delivered': 0, # callbacks that were actually delivered
+            'merged': 0,    # parameter values and redraws replaced by a newer one
+            'dropped': 0,   # note on/off replaced by a newer event for the same note
+        }
+
+    def getStats(self):
+        return dict(self.fStats)
+
+    # Whether any callback was received since the last call
+    def takeActivity(self):
+        hasActivity = self.fHasActivity
+        self.fHasActivity = False
+        return hasActivity
+
+    def queue(self, host, action, pluginId, value1, value2, value3, valuef):
+        self.fStats['received'] += 1
+
+        if action == ENGINE_CALLBACK_PARAMETER_VALUE_CHANGED:
+            key = (action, pluginId, value1)
+            counter = 'merged'
+        elif action in (ENGINE_CALLBACK_NOTE_ON, ENGINE_CALLBACK_NOTE_OFF):
+            key = (ENGINE_CALLBACK_NOTE_ON, pluginId, value1, value2)
+            counter = 'dropped'
+        else:
+            key = (action, pluginId)
+            counter = 'merged'
+
+        # move to the end, so pending callbacks are delivered in the order they were last received
+        if self.fPending.pop(key, None) is not None:
+            self.fStats[counter] += 1
+
+        self.fHost = host
+        self.fPending[key] = (action, pluginId, value1, value2, value3, valuef)
+
+    def flush(self):
+        if len(self.fPending) == 0:
+            return
+
+        host = self.fHost
+        pending = self.fPending
+        self.fPending = {}
+        self.fStats['delivered'] += len(pending)
+
+        parameterValues = []
+
+        for action, pluginId, value1, value2, value3, valuef in pending.values():
+            if action == ENGINE_CALLBACK_PARAMETER_VALUE_CHANGED:
+                parameterValues.append((pluginId, value1, valuef))
+            elif action == ENGINE_CALLBACK_NOTE_ON:
+                host.NoteOnCallback.emit(pluginId, value1, value2, value3)
+            elif action == ENGINE_CALLBACK_NOTE_OFF:
+                host.NoteOffCallback.emit(pluginId, value1, value2)
+            elif action == ENGINE_CALLBACK_INLINE_DISPLAY_REDRAW:
+                host.InlineDisplayRedrawCallback.emit(pluginId)
+
+        if len(parameterValues) != 0:
+            host.ParameterValuesChangedCallback.emit(parameterValues)
+
+gEngineCallbackDispatcher = EngineCallbackDispatcher()
+
+kCoalescedEngineCallbacks = (
+    ENGINE_CALLBACK_PARAMETER_VALUE_CHANGED,
+    ENGINE_CALLBACK_NOTE_ON,
+    ENGINE_CALLBACK_NOTE_OFF,
+    ENGINE_CALLBACK_INLINE_DISPLAY_REDRAW,
+)
+
 # ------------------------------------------------------------------------------------------------------------
 # Engine callback
 
@@ -3081,6 +3385,14 @@ def engineCallback(host, action, pluginId, value1, value2, value3, valuef, value
     # kdevelop likes this :)
     if False: host = CarlaHostNull()
 
+    gEngineCallbackDispatcher.fHasActivity = True
+
+    if action in kCoalescedEngineCallbacks:
+        gEngineCallbackDispatcher.queue(host, action, pluginId, value1, value2, value3, valuef)
+        return
+
+    gEngineCallbackDispatcher.flush()
+
     valueStr = charPtrToString(valueStr)
 
     if action == ENGINE_CALLBACK_ENGINE_STARTED:
@@ -3102,8 +3414,6 @@ def engineCallback(host, action, pluginId, value1, value2, value3, valuef, value
         host.PluginRenamedCallback.emit(pluginId, valueStr)
     elif action == ENGINE_CALLBACK_PLUGIN_UNAVAILABLE:
         host.PluginUnavailableCallback.emit(pluginId, valueStr)
-    elif action == ENGINE_CALLBACK_PARAMETER_VALUE_CHANGED:
-        host.ParameterValueChangedCallback.emit(pluginId, value1, valuef)
     elif action == ENGINE_CALLBACK_PARAMETER_DEFAULT_CHANGED:
         host.ParameterDefaultChangedCallback.emit(pluginId, value1, valuef)
     elif action == ENGINE_CALLBACK_PARAMETER_MAPPED_CONTROL_INDEX_CHANGED:
@@ -3121,10 +3431,6 @@ def engineCallback(host, action, pluginId, value1, value2, value3, valuef, value
         host.OptionChangedCallback.emit(pluginId, value1, bool(value2))
     elif action == ENGINE_CALLBACK_UI_STATE_CHANGED:
         host.UiStateChangedCallback.emit(pluginId, value1)
-    elif action == ENGINE_CALLBACK_NOTE_ON:
-        host.NoteOnCallback.emit(pluginId, value1, value2, value3)
-    elif action == ENGINE_CALLBACK_NOTE_OFF:
-        host.NoteOffCallback.emit(pluginId, value1, value2)
     elif action == ENGINE_CALLBACK_UPDATE:
         host.UpdateCallback.emit(pluginId)
     elif action == ENGINE_CALLBACK_RELOAD_INFO:
@@ -3188,8 +3494,6 @@ def engineCallback(host, action, pluginId, value1, value2, value3, valuef, value
         host.ErrorCallback.emit(valueStr)
     elif action == ENGINE_CALLBACK_QUIT:
         host.QuitCallback.emit()
-    elif action == ENGINE_CALLBACK_INLINE_DISPLAY_REDRAW:
-        host.InlineDisplayRedrawCallback.emit(pluginId)
     else:
         print("unhandled action", action)
 
@@ -3591,6 +3895,7 @@ def runHostWithoutUI(host):
 
     while host.is_engine_running() and not gCarla.term:
         host.engine_idle()
+        gEngineCallbackDispatcher.flush()
         sleep(0.0333) # 30 Hz
 
     # --------------------------------------------------------------------------------------------------------
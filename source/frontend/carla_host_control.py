@@ -35,6 +35,8 @@ from carla_host import *
 from liblo import (
   Address,
   AddressError,
+  Bundle,
+  Message,
   ServerError,
   Server,
   make_method,
@@ -44,11 +46,15 @@ from liblo import (
 )
 
 from random import random
+from time import monotonic
 
 # ------------------------------------------------------------------------------------------------------------
 
 DEBUG = False
 
+# default time to wait for a reply from the remote Carla, in seconds
+OSC_REQUEST_TIMEOUT = 60.0
+
 # ----------------------------------------------------------------------------------------------------------------------
 # OSC connect Dialog
 
@@ -130,22 +136,36 @@ class CarlaHostOSC(CarlaHostQtPlugin):
 
     def resetPendingMessages(self):
         self.lastMessageId = 1
-        self.pendingMessages = []
+        self.pendingMessages = {}
         self.responses = {}
 
+        # batch mode, see begin_batch()
+        self.fBatchDepth = 0
+        self.fBatchMessageIds = []
+
+        # plugin setters waiting for the next flushPendingValues(), as (path, args[:-1]) -> args
+        self.fPendingValues = {}
+
     def printAndReturnError(self, error):
         print(error)
         self.fLastError = error
         return False
 
-    def sendMsg(self, lines):
+    # -------------------------------------------------------------------
+    # Requests
+    # Messages that need a reply get a unique id and are tracked in pendingMessages until
+    # "/ctrl/resp" arrives or they time out, so any number of them can be in flight at once.
+
+    # Convert a host call into an OSC path and arguments
+    # Returns (path, args, needResp), or None if the call cannot be sent
+    def _buildMessage(self, lines):
         if len(lines) < 1:
             return self.printAndReturnError("not enough arguments")
 
         method = lines.pop(0)
 
         if method == "set_engine_option":
-            return True
+            return None
 
         if self.lo_target_tcp is None:
             return self.printAndReturnError("lo_target_tcp is None")
@@ -216,26 +236,61 @@ class CarlaHostOSC(CarlaHostQtPlugin):
         else:
             return self.printAndReturnError("invalid method '%s'" % method)
 
-        if len(self.pendingMessages) != 0:
-            return self.printAndReturnError("A previous operation is still pending, please wait")
-
         args = [int(line) if isinstance(line, bool) else line for line in lines]
         #print(path, args)
 
+        return (path, args, needResp)
+
+    # Send a message without waiting for its reply
+    # callback, if set, is called as callback(messageId, error) once the reply arrives or the request times out,
+    # with an empty error on success.
+    # Returns the message id, 0 for messages that have no reply, or -1 on failure
+    def sendMsgAsync(self, lines, callback = None, timeout = OSC_REQUEST_TIMEOUT):
+        msg = self._buildMessage(lines)
+
+        if msg is None:
+            return 0
+        if msg is False:
+            return -1
+
+        path, args, needResp = msg
+
         if not needResp:
-            lo_send(self.lo_target_tcp, path, *args)
-            return True
+            # setters are coalesced and sent together on the next idle, last value wins
+            if path.endswith(("/set_parameter_value", "/set_active", "/set_drywet", "/set_volume",
+                              "/set_balance_left", "/set_balance_right", "/set_panning")):
+                key = (path, tuple(args[:-1]))
+                # move to the end, so values are still sent in the order they were last set
+                self.fPendingValues.pop(key, None)
+                self.fPendingValues[key] = args
+            else:
+                self.flushPendingValues()
+                lo_send(self.lo_target_tcp, path, *args)
+            return 0
+
+        self.flushPendingValues()
 
         messageId = self.lastMessageId
         self.lastMessageId += 1
-        self.pendingMessages.append(messageId)
+        self.pendingMessages[messageId] = (monotonic() + timeout, callback)
 
         lo_send(self.lo_target_tcp, path, messageId, *args)
+        return messageId
 
-        while messageId in self.pendingMessages:
-            QApplication.processEvents(QEventLoop.AllEvents, 100)
+    def sendMsg(self, lines):
+        messageId = self.sendMsgAsync(lines)
 
-        error = self.responses.pop(messageId)
+        if messageId == 0:
+            return True
+        if messageId < 0:
+            return False
+
+        # result is reported by end_batch()
+        if self.fBatchDepth != 0:
+            self.fBatchMessageIds.append(messageId)
+            return True
+
+        error = self.waitForResponses((messageId,))[0]
 
         if not error:
             return True
@@ -243,6 +298,90 @@ class CarlaHostOSC(CarlaHostQtPlugin):
         self.fLastError = error
         return False
 
+    # Send all coalesced setters as a single bundle
+    def flushPendingValues(self):
+        if len(self.fPendingValues) == 0:
+            return
+
+        pendingValues = self.fPendingValues
+        self.fPendingValues = {}
+
+        if self.lo_target_tcp is None:
+            return
+
+        bundle = Bundle()
+        for (path, _), args in pendingValues.items():
+            bundle.add(Message(path, *args))
+
+        lo_send(self.lo_target_tcp, bundle)
+
+    # Block until all the given requests have been answered (or timed out), processing events meanwhile
+    # Returns their errors, in the same order
+    def waitForResponses(self, messageIds):
+        while any(messageId in self.pendingMessages for messageId in messageIds):
+            if self.lo_target_tcp is None:
+                self.cancelPendingMessages("Connection to backend was lost")
+                break
+            QApplication.processEvents(QEventLoop.AllEvents, 100)
+            self.checkPendingTimeouts()
+
+        return [self.responses.pop(messageId, "") for messageId in messageIds]
+
+    # Called when "/ctrl/resp" arrives
+    def _setResponse(self, messageId, error):
+        try:
+            deadline, callback = self.pendingMessages.pop(messageId)
+        except KeyError:
+            # timed out or cancelled already
+            return
+
+        if callback is None:
+            self.responses[messageId] = error
+        else:
+            callback(messageId, error)
+
+    def checkPendingTimeouts(self):
+        if len(self.pendingMessages) == 0:
+            return
+
+        now = monotonic()
+
+        for messageId, (deadline, callback) in list(self.pendingMessages.items()):
+            if now >= deadline:
+                self._setResponse(messageId, "Timed out waiting for a reply from backend")
+
+    def cancelPendingMessages(self, error = "Operation was cancelled"):
+        for messageId in list(self.pendingMessages.keys()):
+            self._setResponse(messageId, error)
+
+    # -------------------------------------------------------------------
+    # Batch mode
+    # While active, calls that need a reply do not wait for it, so many operations
+    # (like removing or adding lots of plugins) can be sent without a round-trip each.
+
+    def begin_batch(self):
+        self.fBatchDepth += 1
+
+    # Wait for all replies of the requests sent during the batch
+    # Returns their errors in the order they were sent, empty for successful ones
+    def end_batch(self):
+        self.fBatchDepth -= 1
+
+        if self.fBatchDepth != 0:
+            return []
+
+        messageIds = self.fBatchMessageIds
+        self.fBatchMessageIds = []
+
+        errors = self.waitForResponses(messageIds)
+
+        for error in errors:
+            if error:
+                self.fLastError = error
+                break
+
+        return errors
+
     def sendMsgAndSetError(self, lines):
         return self.sendMsg(lines)
 
@@ -281,6 +420,8 @@ class CarlaControlServerTCP(Server):
         while self.recv(0) and self.fReceivedMsgs:
             pass
 
+        self.host.checkPendingTimeouts()
+
     def getFullURL(self):
         return "%sctrl" % self.get_url()
 
@@ -441,8 +582,7 @@ class CarlaControlServerTCP(Server):
         if DEBUG: print(path, args)
         self.fReceivedMsgs = True
         messageId, error = args
-        self.host.responses[messageId] = error
-        self.host.pendingMessages.remove(messageId)
+        self.host._setResponse(messageId, error)
 
     @make_method('/ctrl/exit', '')
     def carla_exit(self, path, args):
@@ -476,6 +616,7 @@ class CarlaControlServerUDP(Server):
 
         self.host = host
 
+    # the engine sends all peaks and parameter outputs of a cycle as a bundle, which a single recv() dispatches
     def idle(self):
         self.fReceivedMsgs = False
 
@@ -596,12 +737,17 @@ class HostWindowOSC(HostWindow):
 
         self.ui.act_file_refresh.setEnabled(True)
 
+        # the whole patchbay is sent on register, load it in one go
+        self.beginCanvasSnapshot(True)
+
         self.startTimers()
 
     def disconnectOsc(self):
         self.killTimers()
         self.unregister()
+        self.host.cancelPendingMessages("Disconnected from backend")
         self.removeAllPlugins()
+        self.cancelCanvasSnapshot()
         patchcanvas.clear()
 
         self.ui.act_file_refresh.setEnabled(False)
@@ -644,6 +790,8 @@ class HostWindowOSC(HostWindow):
     def idleFast(self):
         HostWindow.idleFast(self)
 
+        self.host.flushPendingValues()
+
         if self.host.lo_server_tcp is not None:
             self.host.lo_server_tcp.idle()
         else:
@@ -654,6 +802,8 @@ class HostWindowOSC(HostWindow):
         else:
             self.disconnectOsc()
 
+        gEngineCallbackDispatcher.flush()
+
     # --------------------------------------------------------------------------------------------------------
 
     def removeAllPlugins(self):
@@ -706,7 +856,9 @@ class HostWindowOSC(HostWindow):
         #self.host.lo_server_tcp.free()
 
         self.removeAllPlugins()
-        patchcanvas.clear()
+
+        # the whole patchbay is sent again, only apply what changed
+        self.beginCanvasSnapshot(True)
 
         self.host.lo_server_tcp = CarlaControlServerTCP(self.host)
         self.host.lo_server_udp = CarlaControlServerUDP(self.host)
@@ -728,7 +880,7 @@ class HostWindowOSC(HostWindow):
     @pyqtSlot()
     def slot_handleSIGTERM(self):
         print("Got SIGTERM -> Closing now")
-        self.host.pendingMessages = []
+        self.host.cancelPendingMessages()
         self.close()
 
     @pyqtSlot()
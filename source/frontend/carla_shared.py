@@ -201,6 +201,10 @@ CARLA_KEY_CANVAS_ANTIALIASING      = "Canvas/Antialiasing"    # enum
 CARLA_KEY_CANVAS_HQ_ANTIALIASING   = "Canvas/HQAntialiasing"  # bool
 CARLA_KEY_CANVAS_INLINE_DISPLAYS   = "Canvas/InlineDisplays"  # bool
 CARLA_KEY_CANVAS_FULL_REPAINTS     = "Canvas/FullRepaints"    # bool
+CARLA_KEY_CANVAS_LOD_TEXT_SCALE    = "Canvas/LodTextScale"    # float
+CARLA_KEY_CANVAS_LOD_EFFECTS_SCALE = "Canvas/LodEffectsScale" # float
+CARLA_KEY_CANVAS_LOD_LINES_SCALE   = "Canvas/LodLinesScale"   # float
+CARLA_KEY_CANVAS_LOD_PORTS_SCALE   = "Canvas/LodPortsScale"   # float
 
 CARLA_KEY_ENGINE_DRIVER_PREFIX         = "Engine/Driver-"
 CARLA_KEY_ENGINE_AUDIO_DRIVER          = "Engine/AudioDriver"         # str
@@ -244,6 +248,9 @@ CARLA_KEY_WINE_RT_PRIO_ENABLED = "Wine/RtPrioEnabled"  # bool
 CARLA_KEY_WINE_BASE_RT_PRIO    = "Wine/BaseRtPrio"     # int
 CARLA_KEY_WINE_SERVER_RT_PRIO  = "Wine/ServerRtPrio"   # int
 
+CARLA_KEY_DISCOVERY_WORKERS = "Discovery/Workers" # int, 0 for one per CPU
+CARLA_KEY_DISCOVERY_TIMEOUT = "Discovery/Timeout" # int, seconds per binary, 0 for none
+
 CARLA_KEY_EXPERIMENTAL_PLUGIN_BRIDGES        = "Experimental/PluginBridges"       # bool
 CARLA_KEY_EXPERIMENTAL_WINE_BRIDGES          = "Experimental/WineBridges"         # bool
 CARLA_KEY_EXPERIMENTAL_JACK_APPS             = "Experimental/JackApplications"    # bool
@@ -283,6 +290,10 @@ CARLA_DEFAULT_CANVAS_ANTIALIASING      = CANVAS_ANTIALIASING_SMALL
 CARLA_DEFAULT_CANVAS_HQ_ANTIALIASING   = False
 CARLA_DEFAULT_CANVAS_INLINE_DISPLAYS   = False
 CARLA_DEFAULT_CANVAS_FULL_REPAINTS     = False
+CARLA_DEFAULT_CANVAS_LOD_TEXT_SCALE    = 0.5
+CARLA_DEFAULT_CANVAS_LOD_EFFECTS_SCALE = 0.6
+CARLA_DEFAULT_CANVAS_LOD_LINES_SCALE   = 0.4
+CARLA_DEFAULT_CANVAS_LOD_PORTS_SCALE   = 0.3
 
 # Engine
 CARLA_DEFAULT_FORCE_STEREO          = False
@@ -333,6 +344,10 @@ CARLA_DEFAULT_WINE_RT_PRIO_ENABLED = True
 CARLA_DEFAULT_WINE_BASE_RT_PRIO    = 15
 CARLA_DEFAULT_WINE_SERVER_RT_PRIO  = 10
 
+# Plugin discovery
+CARLA_DEFAULT_DISCOVERY_WORKERS = 0
+CARLA_DEFAULT_DISCOVERY_TIMEOUT = 120
+
 # Experimental
 CARLA_DEFAULT_EXPERIMENTAL_PLUGIN_BRIDGES        = False
 CARLA_DEFAULT_EXPERIMENTAL_WINE_BRIDGES          = False
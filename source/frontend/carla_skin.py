@@ -199,6 +199,11 @@ def setScalableDialStyle(widget, parameterId, parameterCount, whiteLabels, skinS
         widget.setLabelColor(colorEnabled, colorDisabled)
         widget.setImage(3)
 
+# ------------------------------------------------------------------------------------------------------------
+# Number of fast idle ticks the peak meters need to settle, enough for their maximum smoothing
+
+PEAKS_SETTLE_TICKS = 32
+
 # ------------------------------------------------------------------------------------------------------------
 # Abstract plugin slot
 
@@ -226,8 +231,13 @@ class AbstractPluginSlot(QFrame, PluginEditParentMeta):
         self.fLastGreenLedState = False
         self.fLastBlueLedState  = False
 
+        # peaks of the last idleFast(), and for how many ticks they have not changed
+        self.fLastPeaks = None
+        self.fPeaksUnchangedTicks = 0
+
         self.fParameterIconTimer = ICON_STATE_NULL
         self.fParameterList      = [] # index, widget
+        self.fParameterWidgets   = {} # index -> widget, filled in ready()
 
         audioCountInfo = host.get_audio_port_count_info(self.fPluginId)
 
@@ -282,7 +292,6 @@ class AbstractPluginSlot(QFrame, PluginEditParentMeta):
         self.customContextMenuRequested.connect(self.slot_showCustomMenu)
         host.PluginRenamedCallback.connect(self.slot_handlePluginRenamedCallback)
         host.PluginUnavailableCallback.connect(self.slot_handlePluginUnavailableCallback)
-        host.ParameterValueChangedCallback.connect(self.slot_handleParameterValueChangedCallback)
         host.ParameterDefaultChangedCallback.connect(self.slot_handleParameterDefaultChangedCallback)
         host.ParameterMappedControlIndexChangedCallback.connect(self.slot_handleParameterMappedControlIndexChangedCallback)
         host.ParameterMappedRangeChangedCallback.connect(self.slot_handleParameterMappedRangeChangedCallback)
@@ -634,6 +643,7 @@ class AbstractPluginSlot(QFrame, PluginEditParentMeta):
             self.w_knobs_right.layout().addWidget(widget)
 
         for paramIndex, paramWidget in self.fParameterList:
+            self.fParameterWidgets[paramIndex] = paramWidget
             paramWidget.setContextMenuPolicy(Qt.CustomContextMenu)
             paramWidget.customContextMenuRequested.connect(self.slot_knobCustomMenu)
             paramWidget.dragStateChanged.connect(self.slot_parameterDragStateChanged)
@@ -903,14 +913,14 @@ class AbstractPluginSlot(QFrame, PluginEditParentMeta):
             self.b_gui.setEnabled(bool(hints & PLUGIN_HAS_CUSTOM_UI))
 
     def editDialogParameterValueChanged(self, pluginId, parameterId, value):
-        for paramIndex, paramWidget in self.fParameterList:
-            if paramIndex != parameterId:
-                continue
+        paramWidget = self.fParameterWidgets.get(parameterId, None)
 
-            paramWidget.blockSignals(True)
-            paramWidget.setValue(value)
-            paramWidget.blockSignals(False)
-            break
+        if paramWidget is None:
+            return
+
+        paramWidget.blockSignals(True)
+        paramWidget.setValue(value)
+        paramWidget.blockSignals(False)
 
     def editDialogProgramChanged(self, pluginId, index):
         if self.cb_presets is None:
@@ -945,12 +955,39 @@ class AbstractPluginSlot(QFrame, PluginEditParentMeta):
 
     # -----------------------------------------------------------------
 
-    def idleFast(self):
+    # peaks is the shared buffer from host.get_all_peak_values(), fetched here if not provided
+    def idleFast(self, peaks = None):
+        if peaks is None:
+            peaks = self.host.get_all_peak_values()
+
+        # nothing to show while hidden or scrolled out of view, repaint in full once visible again
+        if self.visibleRegion().isEmpty():
+            self.fLastPeaks = None
+            return
+
+        offset = self.fPluginId * 4
+
+        if offset + 4 <= len(peaks):
+            slotPeaks = tuple(peaks[offset:offset+4])
+        else:
+            slotPeaks = (0.0, 0.0, 0.0, 0.0)
+
+        # once the meters have settled on unchanged peaks there is nothing left to redraw
+        if slotPeaks == self.fLastPeaks:
+            if self.fPeaksUnchangedTicks >= PEAKS_SETTLE_TICKS:
+                return
+            self.fPeaksUnchangedTicks += 1
+        else:
+            self.fLastPeaks = slotPeaks
+            self.fPeaksUnchangedTicks = 0
+
+        peakIn1, peakIn2, peakOut1, peakOut2 = slotPeaks
+
         # Input peaks
         if self.fPeaksInputCount > 0:
             if self.fPeaksInputCount > 1:
-                peak1 = self.host.get_input_peak_value(self.fPluginId, True)
-                peak2 = self.host.get_input_peak_value(self.fPluginId, False)
+                peak1 = peakIn1
+                peak2 = peakIn2
                 ledState = bool(peak1 != 0.0 or peak2 != 0.0)
 
                 if self.peak_in is not None:
@@ -958,7 +995,7 @@ class AbstractPluginSlot(QFrame, PluginEditParentMeta):
                     self.peak_in.displayMeter(2, peak2)
 
             else:
-                peak = self.host.get_input_peak_value(self.fPluginId, True)
+                peak = peakIn1
                 ledState = bool(peak != 0.0)
 
                 if self.peak_in is not None:
@@ -971,8 +1008,8 @@ class AbstractPluginSlot(QFrame, PluginEditParentMeta):
         # Output peaks
         if self.fPeaksOutputCount > 0:
             if self.fPeaksOutputCount > 1:
-                peak1 = self.host.get_output_peak_value(self.fPluginId, True)
-                peak2 = self.host.get_output_peak_value(self.fPluginId, False)
+                peak1 = peakOut1
+                peak2 = peakOut2
                 ledState = bool(peak1 != 0.0 or peak2 != 0.0)
 
                 if self.peak_out is not None:
@@ -980,7 +1017,7 @@ class AbstractPluginSlot(QFrame, PluginEditParentMeta):
                     self.peak_out.displayMeter(2, peak2)
 
             else:
-                peak = self.host.get_output_peak_value(self.fPluginId, True)
+                peak = peakOut1
                 ledState = bool(peak != 0.0)
 
                 if self.peak_out is not None:
@@ -990,6 +1027,9 @@ class AbstractPluginSlot(QFrame, PluginEditParentMeta):
                 self.fLastBlueLedState = ledState
                 self.led_audio_out.setChecked(ledState)
 
+    def isIdleSlowNeeded(self):
+        return self.fParameterIconTimer != ICON_STATE_NULL or self.fEditDialog.isIdleSlowNeeded()
+
     def idleSlow(self):
         if self.fParameterIconTimer == ICON_STATE_ON:
             self.parameterActivityChanged(True)
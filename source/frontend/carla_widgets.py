@@ -643,13 +643,14 @@ class PluginEdit(QDialog):
         self.fFirstInit      = True
 
         self.fParameterList      = [] # (type, id, widget)
-        self.fParametersToUpdate = [] # (id, value)
+        self.fParameterWidgets   = {} # id -> (type, widget)
+        self.fParametersToUpdate = {} # id -> value, last value wins
 
         self.fPlayingNotes = [] # (channel, note)
 
         self.fTabIconOff    = QIcon(":/scalable/led_off.svg")
         self.fTabIconOn     = QIcon(":/scalable/led_yellow.svg")
-        self.fTabIconTimers = []
+        self.fTabIconTimers = {} # tab index -> icon state, only for tabs with a running timer
 
         # used during testing
         self.fIdleTimerId = 0
@@ -884,7 +885,7 @@ class PluginEdit(QDialog):
         self.ui.keyboard.allNotesOff()
         self._updateCtrlPrograms()
 
-        self.fParametersToUpdate = []
+        self.fParametersToUpdate = {}
 
     #------------------------------------------------------------------
 
@@ -990,8 +991,9 @@ class PluginEdit(QDialog):
     def reloadParameters(self):
         # Reset
         self.fParameterList      = []
-        self.fParametersToUpdate = []
-        self.fTabIconTimers      = []
+        self.fParameterWidgets   = {}
+        self.fParametersToUpdate = {}
+        self.fTabIconTimers      = {}
 
         # Save current tab state
         tabIndex  = self.ui.tabWidget.currentIndex()
@@ -1004,7 +1006,8 @@ class PluginEdit(QDialog):
             self.ui.tabWidget.widget(1).deleteLater()
             self.ui.tabWidget.removeTab(1)
 
-        parameterCount = self.host.get_parameter_count(self.fPluginId)
+        snapshot = self.host.get_all_parameters(self.fPluginId)
+        parameterCount = snapshot.count
 
         # -----------------------------------------------------------------
 
@@ -1026,52 +1029,41 @@ class PluginEdit(QDialog):
             if i - unusedParameters == self.host.maxParameters:
                 break
 
-            paramData = self.host.get_parameter_data(self.fPluginId, i)
+            paramType  = snapshot.types[i]
+            paramHints = snapshot.hints[i]
 
-            if paramData['type'] not in (PARAMETER_INPUT, PARAMETER_OUTPUT):
+            if paramType not in (PARAMETER_INPUT, PARAMETER_OUTPUT):
                 unusedParameters += 1
                 continue
-            if (paramData['hints'] & PARAMETER_IS_ENABLED) == 0:
+            if (paramHints & PARAMETER_IS_ENABLED) == 0:
                 unusedParameters += 1
                 continue
 
-            paramInfo   = self.host.get_parameter_info(self.fPluginId, i)
-            paramRanges = self.host.get_parameter_ranges(self.fPluginId, i)
-            paramValue  = self.host.get_current_parameter_value(self.fPluginId, i)
-
             parameter = {
-                'type':  paramData['type'],
-                'hints': paramData['hints'],
-                'name':  paramInfo['name'],
-                'unit':  paramInfo['unit'],
-                'scalePoints': [],
-
-                'index':   paramData['index'],
-                'default': paramRanges['def'],
-                'minimum': paramRanges['min'],
-                'maximum': paramRanges['max'],
-                'step':    paramRanges['step'],
-                'stepSmall': paramRanges['stepSmall'],
-                'stepLarge': paramRanges['stepLarge'],
-                'mappedControlIndex': paramData['mappedControlIndex'],
-                'mappedMinimum': paramData['mappedMinimum'],
-                'mappedMaximum': paramData['mappedMaximum'],
-                'midiChannel': paramData['midiChannel']+1,
-
-                'comment':   paramInfo['comment'],
-                'groupName': paramInfo['groupName'],
-
-                'current': paramValue
+                'type':  paramType,
+                'hints': paramHints,
+                'name':  snapshot.names[i],
+                'unit':  snapshot.units[i],
+                'scalePoints': [{ 'value': value, 'label': label } for value, label in snapshot.scalePoints[i]],
+
+                'index':   snapshot.indexes[i],
+                'default': snapshot.defaults[i],
+                'minimum': snapshot.minimums[i],
+                'maximum': snapshot.maximums[i],
+                'step':    snapshot.steps[i],
+                'stepSmall': snapshot.stepsSmall[i],
+                'stepLarge': snapshot.stepsLarge[i],
+                'mappedControlIndex': snapshot.mappedControlIndexes[i],
+                'mappedMinimum': snapshot.mappedMinimums[i],
+                'mappedMaximum': snapshot.mappedMaximums[i],
+                'midiChannel': snapshot.midiChannels[i]+1,
+
+                'comment':   snapshot.comments[i],
+                'groupName': snapshot.groupNames[i],
+
+                'current': snapshot.values[i]
             }
 
-            for j in range(paramInfo['scalePointCount']):
-                scalePointInfo = self.host.get_parameter_scalepoint_info(self.fPluginId, i, j)
-
-                parameter['scalePoints'].append({
-                    'value': scalePointInfo['value'],
-                    'label': scalePointInfo['label']
-                })
-
             #parameter['name'] = parameter['name'][:30] + (parameter['name'][30:] and "...")
 
             # -----------------------------------------------------------------
@@ -1192,36 +1184,23 @@ class PluginEdit(QDialog):
     #------------------------------------------------------------------
 
     def setParameterValue(self, parameterId, value):
-        for paramItem in self.fParametersToUpdate:
-            if paramItem[0] == parameterId:
-                paramItem[1] = value
-                break
-        else:
-            self.fParametersToUpdate.append([parameterId, value])
+        self.fParametersToUpdate[parameterId] = value
 
     def setParameterDefault(self, parameterId, value):
-        for _, paramId, paramWidget in self.fParameterList:
-            if paramId == parameterId:
-                paramWidget.setDefault(value)
-                break
+        if parameterId in self.fParameterWidgets:
+            self.fParameterWidgets[parameterId][1].setDefault(value)
 
     def setParameterMappedControlIndex(self, parameterId, control):
-        for _, paramId, paramWidget in self.fParameterList:
-            if paramId == parameterId:
-                paramWidget.setMappedControlIndex(control)
-                break
+        if parameterId in self.fParameterWidgets:
+            self.fParameterWidgets[parameterId][1].setMappedControlIndex(control)
 
     def setParameterMappedRange(self, parameterId, minimum, maximum):
-        for _, paramId, paramWidget in self.fParameterList:
-            if paramId == parameterId:
-                paramWidget.setMappedRange(minimum, maximum)
-                break
+        if parameterId in self.fParameterWidgets:
+            self.fParameterWidgets[parameterId][1].setMappedRange(minimum, maximum)
 
     def setParameterMidiChannel(self, parameterId, channel):
-        for _, paramId, paramWidget in self.fParameterList:
-            if paramId == parameterId:
-                paramWidget.setMidiChannel(channel+1)
-                break
+        if parameterId in self.fParameterWidgets:
+            self.fParameterWidgets[parameterId][1].setMidiChannel(channel+1)
 
     def setProgram(self, index):
         self.ui.cb_programs.blockSignals(True)
@@ -1285,19 +1264,26 @@ class PluginEdit(QDialog):
 
     #------------------------------------------------------------------
 
+    # Only needed while there are pending updates, icons to turn off or output parameters on screen
+    def isIdleSlowNeeded(self):
+        return len(self.fParametersToUpdate) != 0 or len(self.fTabIconTimers) != 0 or self.isVisible()
+
     def idleSlow(self):
         # Check Tab icons
-        for i in range(len(self.fTabIconTimers)):
-            if self.fTabIconTimers[i] == ICON_STATE_ON:
-                self.fTabIconTimers[i] = ICON_STATE_WAIT
-            elif self.fTabIconTimers[i] == ICON_STATE_WAIT:
-                self.fTabIconTimers[i] = ICON_STATE_OFF
-            elif self.fTabIconTimers[i] == ICON_STATE_OFF:
-                self.fTabIconTimers[i] = ICON_STATE_NULL
-                self.ui.tabWidget.setTabIcon(i+1, self.fTabIconOff)
+        for tabIndex, iconState in list(self.fTabIconTimers.items()):
+            if iconState == ICON_STATE_ON:
+                self.fTabIconTimers[tabIndex] = ICON_STATE_WAIT
+            elif iconState == ICON_STATE_WAIT:
+                self.fTabIconTimers[tabIndex] = ICON_STATE_OFF
+            else:
+                del self.fTabIconTimers[tabIndex]
+                self.ui.tabWidget.setTabIcon(tabIndex, self.fTabIconOff)
 
         # Check parameters needing update
-        for index, value in self.fParametersToUpdate:
+        parametersToUpdate = self.fParametersToUpdate
+        self.fParametersToUpdate = {}
+
+        for index, value in parametersToUpdate.items():
             if index == PARAMETER_DRYWET:
                 self.ui.dial_drywet.blockSignals(True)
                 self.ui.dial_drywet.setValue(value)
@@ -1332,30 +1318,27 @@ class PluginEdit(QDialog):
                 self._updateCtrlPrograms()
 
             elif index >= 0:
-                for paramType, paramId, paramWidget in self.fParameterList:
-                    if paramId != index:
-                        continue
-                    # FIXME see below
-                    if paramType != PARAMETER_INPUT:
-                        continue
+                paramType, paramWidget = self.fParameterWidgets.get(index, (None, None))
 
-                    paramWidget.blockSignals(True)
-                    paramWidget.setValue(value)
-                    paramWidget.blockSignals(False)
+                # FIXME outputs are polled below
+                if paramType != PARAMETER_INPUT:
+                    continue
 
-                    #if paramType == PARAMETER_INPUT:
-                    tabIndex = paramWidget.getTabIndex()
+                paramWidget.blockSignals(True)
+                paramWidget.setValue(value)
+                paramWidget.blockSignals(False)
 
-                    if self.fTabIconTimers[tabIndex-1] == ICON_STATE_NULL:
-                        self.ui.tabWidget.setTabIcon(tabIndex, self.fTabIconOn)
+                tabIndex = paramWidget.getTabIndex()
 
-                    self.fTabIconTimers[tabIndex-1] = ICON_STATE_ON
-                    break
+                if tabIndex not in self.fTabIconTimers:
+                    self.ui.tabWidget.setTabIcon(tabIndex, self.fTabIconOn)
 
-        # Clear all parameters
-        self.fParametersToUpdate = []
+                self.fTabIconTimers[tabIndex] = ICON_STATE_ON
+
+        # Update parameter outputs, only while they can be seen
+        if not self.isVisible():
+            return
 
-        # Update parameter outputs | FIXME needed?
         for paramType, paramId, paramWidget in self.fParameterList:
             if paramType != PARAMETER_OUTPUT:
                 continue
@@ -1751,6 +1734,7 @@ class PluginEdit(QDialog):
                 groupLayout.addWidget(paramWidget)
 
                 self.fParameterList.append((paramType, paramInfo['index'], paramWidget))
+                self.fParameterWidgets[paramInfo['index']] = (paramType, paramWidget)
 
                 if paramType == PARAMETER_INPUT:
                     paramWidget.valueChanged.connect(self.slot_parameterValueChanged)
@@ -1768,8 +1752,6 @@ class PluginEdit(QDialog):
             if paramType == PARAMETER_INPUT:
                 self.ui.tabWidget.setTabIcon(tabIndex, self.fTabIconOff)
 
-            self.fTabIconTimers.append(ICON_STATE_NULL)
-
     def _updateCtrlPrograms(self):
         self.ui.keyboard.setEnabled(self.fControlChannel >= 0)
 
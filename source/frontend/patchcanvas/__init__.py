@@ -27,6 +27,11 @@ from PyQt5.QtWidgets import QGraphicsItem
 
 from .theme import getDefaultThemeName
 
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Spatial index)
+
+from .spatialindex import CanvasSpatialIndex
+
 # ------------------------------------------------------------------------------------------------------------
 
 # Maximum Id for a plugin, treated as invalid/zero if above this value
@@ -86,6 +91,11 @@ EYECANDY_NONE  = 0
 EYECANDY_SMALL = 1
 EYECANDY_FULL  = 2
 
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Graph model, needs the constants above)
+
+from .model import PatchbayModel
+
 # ------------------------------------------------------------------------------------------------------------
 
 # object types
@@ -109,7 +119,11 @@ class options_t(object):
         'use_bezier_lines',
         'antialiasing',
         'eyecandy',
-        'inline_displays'
+        'inline_displays',
+        'lod_text_scale',
+        'lod_effects_scale',
+        'lod_lines_scale',
+        'lod_ports_scale'
     ]
 
 # Canvas features
@@ -130,13 +144,23 @@ class Canvas(object):
         self.theme = None
         self.initiated = False
 
-        self.group_list = []
-        self.port_list = []
-        self.connection_list = []
+        self.model = PatchbayModel() # widget-free copy of the graph, used for lookups, layouts and snapshots
+        self.group_map = {}         # group_id -> group_dict_t, with the scene items
+        self.port_map = {}          # (group_id, port_id) -> port_dict_t, with the scene items
+        self.connection_map = {}    # connection_id -> connection_dict_t, with the scene items
         self.animation_list = []
-        self.group_plugin_map = {}
         self.old_group_pos = {}
 
+        self.batch_depth = 0
+        self.batch_boxes = set()    # boxes waiting for updatePositions()
+        self.batch_lines = {}       # connection_id -> line widget waiting for a z-value
+        self.batch_scene_update = False
+
+        self.arrange_thread = None
+        self.spatial_index = CanvasSpatialIndex()
+        self.scale_factor = 1.0
+        self.inline_display = None
+
         self.callback = self.callback
         self.debug = False
         self.scene = None
@@ -260,6 +284,12 @@ options.antialiasing      = ANTIALIASING_SMALL
 options.eyecandy          = EYECANDY_SMALL
 options.inline_displays   = False
 
+# Level of detail, view scale factors below which:
+options.lod_text_scale    = 0.5 # port names are not drawn
+options.lod_effects_scale = 0.6 # shadows, glow and gradients are not drawn
+options.lod_lines_scale   = 0.4 # connections are drawn as straight lines
+options.lod_ports_scale   = 0.3 # ports are collapsed into a summary bar
+
 features = features_t()
 features.group_info   = False
 features.group_rename = False
@@ -277,6 +307,10 @@ def setOptions(new_options):
     options.antialiasing      = new_options.antialiasing
     options.eyecandy          = new_options.eyecandy
     options.inline_displays   = new_options.inline_displays
+    options.lod_text_scale    = new_options.lod_text_scale
+    options.lod_effects_scale = new_options.lod_effects_scale
+    options.lod_lines_scale   = new_options.lod_lines_scale
+    options.lod_ports_scale   = new_options.lod_ports_scale
 
 def setFeatures(new_features):
     if canvas.initiated: return
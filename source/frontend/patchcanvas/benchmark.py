@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchBay Canvas engine using QGraphicsView/Scene
+# Copyright (C) 2010-2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Scaling benchmark for the canvas registry.
+# Run from source/frontend as:
+#   python3 -m patchcanvas.benchmark [num-groups ...]
+# or, for the graph model only (no widgets, usable with very large graphs):
+#   python3 -m patchcanvas.benchmark --headless [num-groups ...]
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import os
+import sys
+
+from time import perf_counter
+
+if "QT_QPA_PLATFORM" not in os.environ:
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+
+from PyQt5.QtWidgets import QApplication, QGraphicsView
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom)
+
+from . import (
+    canvas,
+    options,
+    options_t,
+    features_t,
+    getDefaultThemeName,
+    ANTIALIASING_NONE,
+    EYECANDY_NONE,
+    PORT_MODE_INPUT,
+    PORT_MODE_OUTPUT,
+    PORT_TYPE_AUDIO_JACK,
+    PORT_TYPE_MIDI_JACK,
+    SPLIT_NO,
+)
+
+from . import patchcanvas
+from .model import PatchbayModel
+from .utils import CanvasGetFullPortName, CanvasGetPortConnectionList
+
+# ------------------------------------------------------------------------------------------------------------
+
+PORTS_PER_MODE = 4
+DEFAULT_SIZES = (25, 50, 100, 200, 400)
+DEFAULT_HEADLESS_SIZES = (1000, 4000, 12500)
+
+def canvasCallback(action, value1, value2, valueStr):
+    pass
+
+def setup():
+    pOptions = options_t()
+    pOptions.theme_name        = getDefaultThemeName()
+    pOptions.auto_hide_groups  = False
+    pOptions.auto_select_items = False
+    pOptions.use_bezier_lines  = True
+    pOptions.antialiasing      = ANTIALIASING_NONE
+    pOptions.eyecandy          = EYECANDY_NONE
+    pOptions.inline_displays   = False
+    pOptions.lod_text_scale    = options.lod_text_scale
+    pOptions.lod_effects_scale = options.lod_effects_scale
+    pOptions.lod_lines_scale   = options.lod_lines_scale
+    pOptions.lod_ports_scale   = options.lod_ports_scale
+
+    pFeatures = features_t()
+    pFeatures.group_info   = False
+    pFeatures.group_rename = False
+    pFeatures.port_info    = False
+    pFeatures.port_rename  = False
+    pFeatures.handle_group_pos = False
+
+    view  = QGraphicsView()
+    scene = patchcanvas.PatchScene(None, view)
+    view.setScene(scene)
+
+    patchcanvas.setOptions(pOptions)
+    patchcanvas.setFeatures(pFeatures)
+    patchcanvas.init("Carla2-Benchmark", scene, canvasCallback, False)
+
+    return view, scene
+
+def run(numGroups):
+    results = []
+
+    def measure(name, func):
+        start = perf_counter()
+        count = func()
+        results.append((name, perf_counter() - start, count))
+
+    def addGroupsAndPorts():
+        for group_id in range(numGroups):
+            patchcanvas.addGroup(group_id, "group-%i" % group_id, SPLIT_NO)
+            for i in range(PORTS_PER_MODE):
+                port_type = PORT_TYPE_MIDI_JACK if i == PORTS_PER_MODE - 1 else PORT_TYPE_AUDIO_JACK
+                patchcanvas.addPort(group_id, i, "in-%i" % i, PORT_MODE_INPUT, port_type)
+                patchcanvas.addPort(group_id, PORTS_PER_MODE + i, "out-%i" % i, PORT_MODE_OUTPUT, port_type)
+        return numGroups * PORTS_PER_MODE * 2
+
+    def connectChain():
+        connection_id = canvas.last_connection_id
+        first_connection_id = connection_id
+        for group_id in range(1, numGroups):
+            for i in range(PORTS_PER_MODE):
+                connection_id += 1
+                patchcanvas.connectPorts(connection_id, group_id - 1, PORTS_PER_MODE + i, group_id, i)
+        return connection_id - first_connection_id
+
+    def lookups():
+        count = 0
+        for group_id in range(numGroups):
+            patchcanvas.getGroupPos(group_id)
+            for port_id in range(PORTS_PER_MODE * 2):
+                CanvasGetFullPortName(group_id, port_id)
+                CanvasGetPortConnectionList(group_id, port_id)
+                count += 2
+        return count
+
+    def arrange():
+        patchcanvas.arrange(False)
+        return numGroups
+
+    def disconnectAll():
+        connection_ids = list(canvas.connection_map.keys())
+        for connection_id in connection_ids:
+            patchcanvas.disconnectPorts(connection_id)
+        return len(connection_ids)
+
+    def clear():
+        count = len(canvas.group_map) + len(canvas.port_map)
+        patchcanvas.clear()
+        return count
+
+    measure("add groups+ports", addGroupsAndPorts)
+    measure("connect", connectChain)
+    measure("lookups", lookups)
+    measure("arrange", arrange)
+    measure("disconnect", disconnectAll)
+    connectChain()
+    measure("clear", clear)
+
+    return results
+
+def runHeadless(numGroups):
+    model = PatchbayModel()
+    results = []
+
+    def measure(name, func):
+        start = perf_counter()
+        count = func()
+        results.append((name, perf_counter() - start, count))
+
+    def addGroupsAndPorts():
+        for group_id in range(numGroups):
+            model.addGroup(group_id, "group-%i" % group_id)
+            for i in range(PORTS_PER_MODE):
+                port_type = PORT_TYPE_MIDI_JACK if i == PORTS_PER_MODE - 1 else PORT_TYPE_AUDIO_JACK
+                model.addPort(group_id, i, "in-%i" % i, PORT_MODE_INPUT, port_type)
+                model.addPort(group_id, PORTS_PER_MODE + i, "out-%i" % i, PORT_MODE_OUTPUT, port_type)
+        return numGroups * PORTS_PER_MODE * 2
+
+    def connectChain():
+        connection_id = 0
+        for group_id in range(1, numGroups):
+            for i in range(PORTS_PER_MODE):
+                connection_id += 1
+                model.connectPorts(connection_id, group_id - 1, PORTS_PER_MODE + i, group_id, i)
+        return connection_id
+
+    def lookups():
+        count = 0
+        for group_id in range(numGroups):
+            for port_id in range(PORTS_PER_MODE * 2):
+                model.getPortConnections(group_id, port_id)
+                count += 1
+        return count
+
+    def arrange():
+        model.applyLayout(model.computeLayout())
+        return numGroups
+
+    def snapshot():
+        model.loadSnapshot(model.exportSnapshot())
+        return len(model.port_map)
+
+    def disconnectAll():
+        connection_ids = list(model.connection_map.keys())
+        for connection_id in connection_ids:
+            model.disconnectPorts(connection_id)
+        return len(connection_ids)
+
+    def removeGroups():
+        count = len(model.group_map) + len(model.port_map)
+        for group_id in list(model.group_map.keys()):
+            model.removeGroup(group_id)
+        return count
+
+    measure("add groups+ports", addGroupsAndPorts)
+    measure("connect", connectChain)
+    measure("lookups", lookups)
+    measure("arrange", arrange)
+    measure("snapshot reload", snapshot)
+    measure("disconnect", disconnectAll)
+    connectChain()
+    measure("remove groups", removeGroups)
+
+    return results
+
+def printResults(numGroups, results):
+    for name, elapsed, count in results:
+        print("%8i  %-18s  %10.2f  %8i  %12.2f" % (
+              numGroups, name, elapsed * 1000.0, count, elapsed * 1000000.0 / max(1, count)))
+
+def main(args):
+    headless = "--headless" in args
+    args = [arg for arg in args if arg != "--headless"]
+    sizes = tuple(int(arg) for arg in args) or (DEFAULT_HEADLESS_SIZES if headless else DEFAULT_SIZES)
+
+    print("%8s  %-18s  %10s  %8s  %12s" % ("groups", "operation", "total ms", "items", "us per item"))
+
+    if headless:
+        for numGroups in sizes:
+            printResults(numGroups, runHeadless(numGroups))
+        return
+
+    app = QApplication(sys.argv)
+    view, scene = setup()
+
+    for numGroups in sizes:
+        printResults(numGroups, run(numGroups))
+
+    del view, scene, app
+
+# ------------------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -19,7 +19,7 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
-from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtCore import Qt, QLineF, QPointF
 from PyQt5.QtGui import QColor, QLinearGradient, QPainter, QPainterPath, QPen
 from PyQt5.QtWidgets import QGraphicsPathItem
 
@@ -40,6 +40,7 @@ from . import (
 )
 
 from .canvasportglow import CanvasPortGlow
+from .utils import CanvasGetPortConnections, CanvasShowEffects, CanvasShowBezierLines
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -73,7 +74,7 @@ class CanvasBezierLine(QGraphicsPathItem):
 
         yesno = self.item1.isSelected() or self.item2.isSelected()
         if yesno != self.m_lineSelected and options.eyecandy == EYECANDY_FULL:
-            if yesno:
+            if yesno and CanvasShowEffects():
                 self.setGraphicsEffect(CanvasPortGlow(self.item1.getPortType(), self.toGraphicsObject()))
             else:
                 self.setGraphicsEffect(None)
@@ -81,9 +82,18 @@ class CanvasBezierLine(QGraphicsPathItem):
         self.m_lineSelected = yesno
         self.updateLineGradient()
 
+    def updateLevelOfDetail(self):
+        if not self.m_lineSelected or options.eyecandy != EYECANDY_FULL:
+            return
+
+        if CanvasShowEffects():
+            self.setGraphicsEffect(CanvasPortGlow(self.item1.getPortType(), self.toGraphicsObject()))
+        else:
+            self.setGraphicsEffect(None)
+
     def triggerDisconnect(self):
-        for connection in canvas.connection_list:
-            if (connection.port_out_id == self.item1.getPortId() and connection.port_in_id == self.item2.getPortId()):
+        for connection in CanvasGetPortConnections(self.item1.getGroupId(), self.item1.getPortId()):
+            if (connection.group_in_id == self.item2.getGroupId() and connection.port_in_id == self.item2.getPortId()):
                 canvas.callback(ACTION_PORTS_DISCONNECT, connection.connection_id, 0, "")
                 break
 
@@ -152,8 +162,21 @@ class CanvasBezierLine(QGraphicsPathItem):
         cosm_pen.setCosmetic(True)
         cosm_pen.setWidthF(1.00001)
 
+        # Zoomed out, draw a straight segment between the path ends
+        if not CanvasShowBezierLines():
+            path = self.path()
+            start = path.elementAt(0)
+            painter.setPen(pen)
+            painter.drawLine(QLineF(QPointF(start.x, start.y), path.currentPosition()))
+            painter.restore()
+            return
+
         QGraphicsPathItem.paint(self, painter, option, widget)
 
+        if not CanvasShowEffects():
+            painter.restore()
+            return
+
         painter.setPen(cosm_pen)
         painter.setBrush(Qt.NoBrush)
         painter.setOpacity(0.2)
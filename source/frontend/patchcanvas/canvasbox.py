@@ -19,18 +19,12 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
+from ctypes import memmove
+
 from PyQt5.QtCore import pyqtSignal, pyqtSlot, qCritical, QT_VERSION, Qt, QPointF, QRectF, QTimer
-from PyQt5.QtGui import QCursor, QFont, QFontMetrics, QImage, QLinearGradient, QPainter, QPen
+from PyQt5.QtGui import QCursor, QFont, QImage, QLinearGradient, QPainter, QPen
 from PyQt5.QtWidgets import QGraphicsItem, QGraphicsObject, QMenu
 
-# ------------------------------------------------------------------------------------------------------------
-# Backwards-compatible horizontalAdvance/width call, depending on Qt version
-
-def fontHorizontalAdvance(font, string):
-    if QT_VERSION >= 0x50b00:
-        return QFontMetrics(font).horizontalAdvance(string)
-    return QFontMetrics(font).width(string)
-
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Custom)
 
@@ -52,7 +46,6 @@ from . import (
     ACTION_GROUP_SPLIT,
     ACTION_GROUP_RENAME,
     ACTION_PORTS_DISCONNECT,
-    ACTION_INLINE_DISPLAY,
     EYECANDY_FULL,
     PORT_MODE_NULL,
     PORT_MODE_INPUT,
@@ -69,10 +62,25 @@ from .canvasboxshadow import CanvasBoxShadow
 from .canvasicon import CanvasIcon
 from .canvasport import CanvasPort
 from .theme import Theme
-from .utils import CanvasItemFX, CanvasGetFullPortName, CanvasGetPortConnectionList
+from .utils import (
+    fontHorizontalAdvance,
+    CanvasItemFX,
+    CanvasGetFullPortName,
+    CanvasGetPortConnectionList,
+    CanvasShowEffects,
+    CanvasShowPorts,
+)
 
 # ------------------------------------------------------------------------------------------------------------
 
+# Vertical order of port types inside a box
+PORT_TYPE_ORDER = {
+    PORT_TYPE_AUDIO_JACK: 0,
+    PORT_TYPE_MIDI_JACK: 1,
+    PORT_TYPE_MIDI_ALSA: 2,
+    PORT_TYPE_PARAMETER: 3,
+}
+
 class cb_line_t(object):
     def __init__(self, line, connection_id):
         self.line = line
@@ -107,6 +115,8 @@ class CanvasBox(QGraphicsObject):
         self.p_width_in = 0
         self.p_width_out = 0
         self.p_height = canvas.theme.box_header_height + canvas.theme.box_header_spacing + 1
+        self.p_ports_in_height = 0
+        self.p_ports_out_height = 0
 
         self.m_last_pos = QPointF()
         self.m_split = False
@@ -116,12 +126,20 @@ class CanvasBox(QGraphicsObject):
         self.m_forced_split = False
         self.m_mouse_down = False
         self.m_inline_image = None
+        self.m_inline_image_back = None
         self.m_inline_scaling = 1.0
         self.m_inline_first = True
         self.m_will_signal_pos_change = False
 
         self.m_port_list_ids = []
-        self.m_connection_lines = []
+        self.m_connection_lines = {}
+
+        # Cached port layout, see updatePositions()
+        self.m_layout_valid = False
+        self.m_layout_widths_dirty = False
+        self.m_layout_pending = []   # ids of ports added since the last layout
+        self.m_port_text_widths = {} # port_id -> (port_mode, text width)
+        self.m_port_layout = {}      # port_mode -> [last port type, next y position, max text width]
 
         # Set Font
         self.m_font_name = QFont()
@@ -144,12 +162,14 @@ class CanvasBox(QGraphicsObject):
         if options.eyecandy and QT_VERSION >= 0x50c00:
             self.shadow = CanvasBoxShadow(self.toGraphicsObject())
             self.shadow.setFakeParent(self)
+            self.shadow.setEnabled(CanvasShowEffects())
             self.setGraphicsEffect(self.shadow)
         else:
             self.shadow = None
 
         # Final touches
-        self.setFlags(QGraphicsItem.ItemIsFocusable | QGraphicsItem.ItemIsMovable | QGraphicsItem.ItemIsSelectable)
+        self.setFlags(QGraphicsItem.ItemIsFocusable | QGraphicsItem.ItemIsMovable | QGraphicsItem.ItemIsSelectable |
+                      QGraphicsItem.ItemSendsGeometryChanges)
 
         # Wait for at least 1 port
         if options.auto_hide_groups:
@@ -185,6 +205,14 @@ class CanvasBox(QGraphicsObject):
     def getPortList(self):
         return self.m_port_list_ids
 
+    def getPortDictList(self):
+        port_list = []
+        for port_id in self.m_port_list_ids:
+            port = canvas.port_map.get((self.m_group_id, port_id), None)
+            if port is not None:
+                port_list.append(port)
+        return port_list
+
     def redrawInlineDisplay(self):
         if self.m_plugin_inline == self.INLINE_DISPLAY_CACHED:
             self.m_plugin_inline = self.INLINE_DISPLAY_ENABLED
@@ -205,6 +233,7 @@ class CanvasBox(QGraphicsObject):
 
         if not hasInlineDisplay:
             self.m_inline_image = None
+            self.m_inline_image_back = None
             self.m_inline_scaling = 1.0
 
         self.m_plugin_id = plugin_id
@@ -224,6 +253,10 @@ class CanvasBox(QGraphicsObject):
         self.m_group_name = group_name
         self.updatePositions()
 
+    def updateLevelOfDetail(self):
+        if self.shadow is not None:
+            self.shadow.setEnabled(CanvasShowEffects())
+
     def setShadowOpacity(self, opacity):
         if self.shadow is not None:
             self.shadow.setOpacity(opacity)
@@ -249,6 +282,7 @@ class CanvasBox(QGraphicsObject):
         port_dict.widget = new_widget
 
         self.m_port_list_ids.append(port_id)
+        self.m_layout_pending.append(port_id)
 
         return new_widget
 
@@ -259,6 +293,9 @@ class CanvasBox(QGraphicsObject):
             qCritical("PatchCanvas::CanvasBox.removePort(%i) - unable to find port to remove" % port_id)
             return
 
+        # ports below the removed one need to move up
+        self.m_layout_valid = False
+
         if len(self.m_port_list_ids) > 0:
             self.updatePositions()
 
@@ -271,15 +308,23 @@ class CanvasBox(QGraphicsObject):
                     self.setVisible(False)
                     self.blockSignals(False)
 
+    def renamePortFromGroup(self, port_id, port_name):
+        port_width = self.m_port_text_widths.get(port_id, None)
+
+        # only the port text width changes, vertical positions stay the same
+        if port_width is not None:
+            self.m_port_text_widths[port_id] = (port_width[0], fontHorizontalAdvance(self.m_font_port, port_name))
+            self.m_layout_widths_dirty = True
+
+        self.updatePositions()
+
     def addLineFromGroup(self, line, connection_id):
         new_cbline = cb_line_t(line, connection_id)
-        self.m_connection_lines.append(new_cbline)
+        self.m_connection_lines[connection_id] = new_cbline
 
     def removeLineFromGroup(self, connection_id):
-        for connection in self.m_connection_lines:
-            if connection.connection_id == connection_id:
-                self.m_connection_lines.remove(connection)
-                return
+        if self.m_connection_lines.pop(connection_id, None) is not None:
+            return
         qCritical("PatchCanvas::CanvasBox.removeLineFromGroup(%i) - unable to find line to remove" % connection_id)
 
     def checkItemPos(self):
@@ -312,75 +357,140 @@ class CanvasBox(QGraphicsObject):
         del item
 
     def updatePositions(self):
+        if canvas.batch_depth > 0:
+            canvas.batch_boxes.add(self)
+            return
+
         self.prepareGeometryChange()
 
+        if self.m_layout_valid:
+            self.updatePendingPortPositions()
+        else:
+            self.updateAllPortPositions()
+
+        self.repaintLines(True)
+        self.update()
+
+        canvas.spatial_index.markBoxDirty(self)
+
+    # Full vertical re-layout, ports sorted by type, keeping their insertion order
+    def updateAllPortPositions(self):
+        first_pos = canvas.theme.box_header_height + canvas.theme.box_header_spacing
+
+        self.m_layout_valid = True
+        self.m_layout_widths_dirty = False
+        self.m_layout_pending = []
+        self.m_port_text_widths = {}
+        self.m_port_layout = {
+            PORT_MODE_INPUT:  [PORT_TYPE_NULL, first_pos, 0],
+            PORT_MODE_OUTPUT: [PORT_TYPE_NULL, first_pos, 0],
+        }
+
+        port_list = self.getPortDictList()
+
+        ordered = [(PORT_TYPE_ORDER[port.port_type], i, port)
+                   for i, port in enumerate(port_list) if port.port_type in PORT_TYPE_ORDER]
+        ordered.sort()
+
+        for _, _, port in ordered:
+            self.layoutPort(port)
+
+        self.updateBoxSize()
+        self.repositionPorts(port_list)
+
+    # Only lay out ports added (or renamed) since the last layout.
+    # Ports appended after the last port type of their side do not move any other port.
+    def updatePendingPortPositions(self):
+        old_width = self.p_width
+        old_width_in = self.p_width_in
+        old_width_out = self.p_width_out
+
+        new_ports = []
+        for port_id in self.m_layout_pending:
+            port = canvas.port_map.get((self.m_group_id, port_id), None)
+            if port is None or port.port_type not in PORT_TYPE_ORDER:
+                continue
+            layout = self.m_port_layout.get(port.port_mode, None)
+            if layout is None:
+                continue
+            if layout[0] != PORT_TYPE_NULL and PORT_TYPE_ORDER[port.port_type] < PORT_TYPE_ORDER[layout[0]]:
+                self.updateAllPortPositions()
+                return
+            self.layoutPort(port)
+            new_ports.append(port)
+
+        self.m_layout_pending = []
+
+        if self.m_layout_widths_dirty:
+            self.m_layout_widths_dirty = False
+            max_widths = {PORT_MODE_INPUT: 0, PORT_MODE_OUTPUT: 0}
+            for port_mode, width in self.m_port_text_widths.values():
+                max_widths[port_mode] = max(max_widths[port_mode], width)
+            for port_mode, width in max_widths.items():
+                self.m_port_layout[port_mode][2] = width
+
+        self.updateBoxSize()
+
+        if self.p_width_in != old_width_in:
+            reposition_modes = [PORT_MODE_INPUT]
+        else:
+            reposition_modes = []
+        if self.p_width != old_width or self.p_width_out != old_width_out:
+            reposition_modes.append(PORT_MODE_OUTPUT)
+
+        if reposition_modes:
+            self.repositionPorts([port for port in self.getPortDictList() if port.port_mode in reposition_modes])
+
+        self.repositionPorts([port for port in new_ports if port.port_mode not in reposition_modes])
+
+    def layoutPort(self, port):
+        layout = self.m_port_layout.get(port.port_mode, None)
+        if layout is None:
+            return
+
+        width = fontHorizontalAdvance(self.m_font_port, port.port_name)
+        self.m_port_text_widths[port.port_id] = (port.port_mode, width)
+
+        if port.port_type != layout[0]:
+            if layout[0] != PORT_TYPE_NULL:
+                layout[1] += canvas.theme.port_spacingT
+            layout[0] = port.port_type
+
+        port.widget.setY(layout[1])
+        layout[1] += canvas.theme.port_height + canvas.theme.port_spacing
+        layout[2] = max(layout[2], width)
+
+    def updateBoxSize(self):
         # Check Text Name size
         app_name_size = fontHorizontalAdvance(self.m_font_name, self.m_group_name) + 30
         self.p_width = max(50, app_name_size)
 
-        # Get Port List
-        port_list = []
-        for port in canvas.port_list:
-            if port.group_id == self.m_group_id and port.port_id in self.m_port_list_ids:
-                port_list.append(port)
-
-        if len(port_list) == 0:
+        if len(self.m_port_list_ids) == 0:
             self.p_height = canvas.theme.box_header_height
             self.p_width_in = 0
             self.p_width_out = 0
-        else:
-            max_in_width = max_out_width = 0
-            port_spacing = canvas.theme.port_height + canvas.theme.port_spacing
-
-            # Get Max Box Width, vertical ports re-positioning
-            port_types = (PORT_TYPE_AUDIO_JACK, PORT_TYPE_MIDI_JACK, PORT_TYPE_MIDI_ALSA, PORT_TYPE_PARAMETER)
-            last_in_type = last_out_type = PORT_TYPE_NULL
-            last_in_pos = last_out_pos = canvas.theme.box_header_height + canvas.theme.box_header_spacing
-
-            for port_type in port_types:
-                for port in port_list:
-                    if port.port_type != port_type:
-                        continue
-
-                    size = fontHorizontalAdvance(self.m_font_port, port.port_name)
-
-                    if port.port_mode == PORT_MODE_INPUT:
-                        max_in_width = max(max_in_width, size)
-                        if port.port_type != last_in_type:
-                            if last_in_type != PORT_TYPE_NULL:
-                                last_in_pos += canvas.theme.port_spacingT
-                            last_in_type = port.port_type
-                        port.widget.setY(last_in_pos)
-                        last_in_pos += port_spacing
-
-                    elif port.port_mode == PORT_MODE_OUTPUT:
-                        max_out_width = max(max_out_width, size)
-                        if port.port_type != last_out_type:
-                            if last_out_type != PORT_TYPE_NULL:
-                                last_out_pos += canvas.theme.port_spacingT
-                            last_out_type = port.port_type
-                        port.widget.setY(last_out_pos)
-                        last_out_pos += port_spacing
-
-            self.p_width     = max(self.p_width, 30 + max_in_width + max_out_width)
-            self.p_width_in  = max_in_width
-            self.p_width_out = max_out_width
-
-            self.p_height  = max(last_in_pos, last_out_pos)
-            self.p_height += max(canvas.theme.port_spacing, canvas.theme.port_spacingT) - canvas.theme.port_spacing
-            self.p_height += canvas.theme.box_pen.width()
-
-            self.repositionPorts(port_list)
+            self.p_ports_in_height = 0
+            self.p_ports_out_height = 0
+            return
 
-        self.repaintLines(True)
-        self.update()
+        _, last_in_pos, max_in_width = self.m_port_layout[PORT_MODE_INPUT]
+        _, last_out_pos, max_out_width = self.m_port_layout[PORT_MODE_OUTPUT]
+
+        self.p_width     = max(self.p_width, 30 + max_in_width + max_out_width)
+        self.p_width_in  = max_in_width
+        self.p_width_out = max_out_width
+
+        self.p_height  = max(last_in_pos, last_out_pos)
+        self.p_height += max(canvas.theme.port_spacing, canvas.theme.port_spacingT) - canvas.theme.port_spacing
+        self.p_height += canvas.theme.box_pen.width()
+
+        first_pos = canvas.theme.box_header_height + canvas.theme.box_header_spacing
+        self.p_ports_in_height  = max(0, last_in_pos - first_pos - canvas.theme.port_spacing)
+        self.p_ports_out_height = max(0, last_out_pos - first_pos - canvas.theme.port_spacing)
 
     def repositionPorts(self, port_list = None):
         if port_list is None:
-            port_list = []
-            for port in canvas.port_list:
-                if port.group_id == self.m_group_id and port.port_id in self.m_port_list_ids:
-                    port_list.append(port)
+            port_list = self.getPortDictList()
 
         # Horizontal ports re-positioning
         inX = canvas.theme.port_offset
@@ -396,14 +506,16 @@ class CanvasBox(QGraphicsObject):
 
     def repaintLines(self, forced=False):
         if self.pos() != self.m_last_pos or forced:
-            for connection in self.m_connection_lines:
+            for connection in self.m_connection_lines.values():
                 connection.line.updateLinePos()
 
         self.m_last_pos = self.pos()
 
     def resetLinesZValue(self):
-        for connection in canvas.connection_list:
-            if connection.port_out_id in self.m_port_list_ids and connection.port_in_id in self.m_port_list_ids:
+        for connection_id in canvas.model.group_connections.get(self.m_group_id, ()):
+            connection = canvas.connection_map[connection_id]
+            if (connection.group_out_id == connection.group_in_id and
+                connection.port_out_id in self.m_port_list_ids and connection.port_in_id in self.m_port_list_ids):
                 z_value = canvas.last_z_value
             else:
                 z_value = canvas.last_z_value - 1
@@ -424,6 +536,11 @@ class CanvasBox(QGraphicsObject):
     def type(self):
         return CanvasBoxType
 
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemPositionHasChanged:
+            canvas.spatial_index.markBoxDirty(self)
+        return QGraphicsObject.itemChange(self, change, value)
+
     def contextMenuEvent(self, event):
         event.accept()
         menu = QMenu()
@@ -438,42 +555,41 @@ class CanvasBox(QGraphicsObject):
             PORT_TYPE_MIDI_ALSA: [],
             PORT_TYPE_PARAMETER: [],
         }
-        for port in canvas.port_list:
-            if port.group_id != self.m_group_id:
-                continue
+        for port in self.getPortDictList():
             if port.port_mode != PORT_MODE_OUTPUT:
                 continue
-            if port.port_id not in self.m_port_list_ids:
-                continue
             if port.port_type not in our_port_types:
                 our_port_types.append(port.port_type)
             our_port_outs[port.port_type].append((port.group_id, port.port_id))
 
         if len(our_port_types) != 0:
             act_x_conn = None
-            for group in canvas.group_list:
-                if self.m_group_id == group.group_id:
-                    continue
 
-                has_ports = False
-                target_ports = {
-                    PORT_TYPE_AUDIO_JACK: [],
-                    PORT_TYPE_MIDI_JACK: [],
-                    PORT_TYPE_MIDI_ALSA: [],
-                    PORT_TYPE_PARAMETER: [],
-                }
-
-                for port in canvas.port_list:
-                    if port.group_id != group.group_id:
-                        continue
-                    if port.port_mode != PORT_MODE_INPUT:
-                        continue
-                    if port.port_type not in our_port_types:
-                        continue
-                    has_ports = True
-                    target_ports[port.port_type].append((port.group_id, port.port_id))
-
-                if not has_ports:
+            # Collect matching input ports of every other group in a single pass
+            group_target_ports = {}
+
+            for port in canvas.port_map.values():
+                if port.group_id == self.m_group_id:
+                    continue
+                if port.port_mode != PORT_MODE_INPUT:
+                    continue
+                if port.port_type not in our_port_types:
+                    continue
+                try:
+                    target_ports = group_target_ports[port.group_id]
+                except KeyError:
+                    target_ports = group_target_ports[port.group_id] = {
+                        PORT_TYPE_AUDIO_JACK: [],
+                        PORT_TYPE_MIDI_JACK: [],
+                        PORT_TYPE_MIDI_ALSA: [],
+                        PORT_TYPE_PARAMETER: [],
+                    }
+                target_ports[port.port_type].append((port.group_id, port.port_id))
+
+            for group in canvas.group_map.values():
+                target_ports = group_target_ports.get(group.group_id, None)
+
+                if target_ports is None:
                     continue
 
                 act_x_conn = connMenu.addAction(group.group_name)
@@ -547,12 +663,11 @@ class CanvasBox(QGraphicsObject):
             act_p_replace = act_p_remove = None
 
         haveIns = haveOuts = False
-        for port in canvas.port_list:
-            if port.group_id == self.m_group_id and port.port_id in self.m_port_list_ids:
-                if port.port_mode == PORT_MODE_INPUT:
-                    haveIns = True
-                elif port.port_mode == PORT_MODE_OUTPUT:
-                    haveOuts = True
+        for port in self.getPortDictList():
+            if port.port_mode == PORT_MODE_INPUT:
+                haveIns = True
+            elif port.port_mode == PORT_MODE_OUTPUT:
+                haveOuts = True
 
         if not (self.m_split or bool(haveIns and haveOuts)):
             act_x_sep2.setVisible(False)
@@ -686,7 +801,9 @@ class CanvasBox(QGraphicsObject):
         painter.setPen(pen)
         lineHinting = pen.widthF() / 2
 
-        if canvas.theme.box_bg_type == Theme.THEME_BG_GRADIENT:
+        show_effects = CanvasShowEffects()
+
+        if canvas.theme.box_bg_type == Theme.THEME_BG_GRADIENT and show_effects:
             box_gradient = QLinearGradient(0, 0, 0, self.p_height)
             box_gradient.setColorAt(0, canvas.theme.box_bg_1)
             box_gradient.setColorAt(1, canvas.theme.box_bg_2)
@@ -697,12 +814,16 @@ class CanvasBox(QGraphicsObject):
         rect.adjust(lineHinting, lineHinting, -lineHinting, -lineHinting)
         painter.drawRect(rect)
 
-        # Draw plugin inline display if supported
-        self.paintInlineDisplay(painter)
+        if CanvasShowPorts():
+            # Draw plugin inline display if supported
+            self.paintInlineDisplay(painter)
+        else:
+            # Zoomed out, ports are not drawn, show a summary bar for each side instead
+            self.paintPortsSummary(painter)
 
         # Draw pixmap header
         rect.setHeight(canvas.theme.box_header_height)
-        if canvas.theme.box_header_pixmap:
+        if canvas.theme.box_header_pixmap and show_effects:
             painter.setPen(Qt.NoPen)
             painter.setBrush(canvas.theme.box_bg_2)
 
@@ -734,53 +855,97 @@ class CanvasBox(QGraphicsObject):
 
         painter.restore()
 
+    def paintPortsSummary(self, painter):
+        top = canvas.theme.box_header_height + canvas.theme.box_header_spacing
+
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(canvas.theme.port_audio_jack_bg)
+
+        if self.p_ports_in_height > 0:
+            painter.drawRect(QRectF(canvas.theme.port_offset, top,
+                                    self.p_width_in + 12, self.p_ports_in_height))
+
+        if self.p_ports_out_height > 0:
+            painter.drawRect(QRectF(self.p_width - self.p_width_out - canvas.theme.port_offset - 12, top,
+                                    self.p_width_out + 12, self.p_ports_out_height))
+
     def paintInlineDisplay(self, painter):
         if self.m_plugin_inline == self.INLINE_DISPLAY_DISABLED:
             return
         if not options.inline_displays:
             return
 
-        inwidth  = self.p_width - 16 - self.p_width_in - self.p_width_out
-        inheight = self.p_height - 3 - canvas.theme.box_header_height - canvas.theme.box_header_spacing - canvas.theme.port_spacing
-
-        scaling  = canvas.scene.getScaleFactor() * canvas.scene.getDevicePixelRatioF()
+        scaling = canvas.scene.getScaleFactor() * canvas.scene.getDevicePixelRatioF()
 
-        if self.m_plugin_id >= 0 and self.m_plugin_id <= MAX_PLUGIN_ID_ALLOWED and (
-           self.m_plugin_inline == self.INLINE_DISPLAY_ENABLED or self.m_inline_scaling != scaling):
-            if self.m_inline_first:
-                size = "%i:%i" % (int(50*scaling), int(50*scaling))
-            else:
-                size = "%i:%i" % (int(inwidth*scaling), int(inheight*scaling))
-            data = canvas.callback(ACTION_INLINE_DISPLAY, self.m_plugin_id, 0, size)
-            if data is None:
-                return
-
-            self.m_inline_image   = QImage(data['data'], data['width'], data['height'], data['stride'],
-                                           QImage.Format_ARGB32)
-            self.m_inline_scaling = scaling
-            self.m_plugin_inline  = self.INLINE_DISPLAY_CACHED
-
-            # make room for inline display, in a square shape
-            if self.m_inline_first:
-                self.m_inline_first = False
-                aspectRatio   = data['width'] / data['height']
-                self.p_height = int(max(50*scaling, self.p_height))
-                self.p_width += int(max(0, min((80 - 14)*scaling, (inheight-inwidth) * aspectRatio * scaling)))
-                self.repositionPorts()
-                self.repaintLines(True)
-                self.update()
-                return
+        # rendering is done later by the inline display service, keep drawing the previous image meanwhile
+        if self.m_plugin_id >= 0 and self.m_plugin_id <= MAX_PLUGIN_ID_ALLOWED and self.needsInlineDisplayRender(scaling):
+            canvas.inline_display.requestRender(self)
 
         if self.m_inline_image is None:
-            print("ERROR: inline display image is None for", self.m_plugin_id, self.m_group_name)
             return
 
-        swidth = self.m_inline_image.width() / scaling
-        sheight = self.m_inline_image.height() / scaling
+        inheight = self.p_height - 3 - canvas.theme.box_header_height - canvas.theme.box_header_spacing - canvas.theme.port_spacing
+
+        swidth = self.m_inline_image.width() / self.m_inline_scaling
+        sheight = self.m_inline_image.height() / self.m_inline_scaling
 
         srcx = int(self.p_width_in + (self.p_width - self.p_width_in - self.p_width_out) / 2 - swidth / 2)
         srcy = int(canvas.theme.box_header_height + canvas.theme.box_header_spacing + 1 + (inheight - sheight) / 2)
 
         painter.drawImage(QRectF(srcx, srcy, swidth, sheight), self.m_inline_image)
 
+    def needsInlineDisplayRender(self, scaling):
+        if self.m_plugin_inline == self.INLINE_DISPLAY_ENABLED:
+            return True
+        if self.m_plugin_inline == self.INLINE_DISPLAY_CACHED:
+            return self.m_inline_scaling != scaling
+        return False
+
+    def getInlineDisplaySize(self, scaling):
+        if self.m_inline_first:
+            return "%i:%i" % (int(50*scaling), int(50*scaling))
+
+        inwidth  = self.p_width - 16 - self.p_width_in - self.p_width_out
+        inheight = self.p_height - 3 - canvas.theme.box_header_height - canvas.theme.box_header_spacing - canvas.theme.port_spacing
+        return "%i:%i" % (int(inwidth*scaling), int(inheight*scaling))
+
+    # Copy the rendered data into the back image and swap, images are only reallocated on size changes
+    def setInlineDisplayImage(self, data, scaling):
+        width  = data['width']
+        height = data['height']
+        stride = data['stride']
+
+        image = self.m_inline_image_back
+
+        if image is None or image.width() != width or image.height() != height:
+            image = QImage(width, height, QImage.Format_ARGB32)
+
+        if image.bytesPerLine() == stride:
+            memmove(int(image.bits()), data['data'], height * stride)
+        else:
+            image = QImage(data['data'], width, height, stride, QImage.Format_ARGB32).copy()
+
+        self.m_inline_image_back = self.m_inline_image
+        self.m_inline_image = image
+        self.m_inline_scaling = scaling
+        self.m_plugin_inline = self.INLINE_DISPLAY_CACHED
+
+        # make room for inline display, in a square shape
+        if self.m_inline_first:
+            self.m_inline_first = False
+
+            inwidth  = self.p_width - 16 - self.p_width_in - self.p_width_out
+            inheight = self.p_height - 3 - canvas.theme.box_header_height - canvas.theme.box_header_spacing - canvas.theme.port_spacing
+            aspectRatio = width / height
+
+            self.prepareGeometryChange()
+            self.p_height = int(max(50*scaling, self.p_height))
+            self.p_width += int(max(0, min((80 - 14)*scaling, (inheight-inwidth) * aspectRatio * scaling)))
+            self.repositionPorts()
+            self.repaintLines(True)
+
+            canvas.spatial_index.markBoxDirty(self)
+
+        self.update()
+
 # ------------------------------------------------------------------------------------------------------------
@@ -40,6 +40,7 @@ from . import (
 )
 
 from .canvasportglow import CanvasPortGlow
+from .utils import CanvasGetPortConnections, CanvasShowEffects
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -72,7 +73,7 @@ class CanvasLine(QGraphicsLineItem):
 
         yesno = self.item1.isSelected() or self.item2.isSelected()
         if yesno != self.m_lineSelected and options.eyecandy == EYECANDY_FULL:
-            if yesno:
+            if yesno and CanvasShowEffects():
                 self.setGraphicsEffect(CanvasPortGlow(self.item1.getPortType(), self.toGraphicsObject()))
             else:
                 self.setGraphicsEffect(None)
@@ -80,9 +81,18 @@ class CanvasLine(QGraphicsLineItem):
         self.m_lineSelected = yesno
         self.updateLineGradient()
 
+    def updateLevelOfDetail(self):
+        if not self.m_lineSelected or options.eyecandy != EYECANDY_FULL:
+            return
+
+        if CanvasShowEffects():
+            self.setGraphicsEffect(CanvasPortGlow(self.item1.getPortType(), self.toGraphicsObject()))
+        else:
+            self.setGraphicsEffect(None)
+
     def triggerDisconnect(self):
-        for connection in canvas.connection_list:
-            if (connection.port_out_id == self.item1.getPortId() and connection.port_in_id == self.item2.getPortId()):
+        for connection in CanvasGetPortConnections(self.item1.getGroupId(), self.item1.getPortId()):
+            if (connection.group_in_id == self.item2.getGroupId() and connection.port_in_id == self.item2.getPortId()):
                 canvas.callback(ACTION_PORTS_DISCONNECT, connection.connection_id, 0, "")
                 break
 
@@ -147,6 +157,10 @@ class CanvasLine(QGraphicsLineItem):
 
         QGraphicsLineItem.paint(self, painter, option, widget)
 
+        if not CanvasShowEffects():
+            painter.restore()
+            return
+
         painter.setPen(cosm_pen)
         painter.setBrush(Qt.NoBrush)
         painter.setOpacity(0.2)
@@ -22,7 +22,7 @@
 from math import floor
 
 from PyQt5.QtCore import qCritical, Qt, QLineF, QPointF, QRectF, QTimer
-from PyQt5.QtGui import QCursor, QFont, QFontMetrics, QPainter, QPainterPath, QPen, QPolygonF
+from PyQt5.QtGui import QCursor, QFont, QPainter, QPainterPath, QPen, QPolygonF
 from PyQt5.QtWidgets import QGraphicsItem, QMenu
 
 # ------------------------------------------------------------------------------------------------------------
@@ -51,7 +51,15 @@ from . import (
 from .canvasbezierlinemov import CanvasBezierLineMov
 from .canvaslinemov import CanvasLineMov
 from .theme import Theme
-from .utils import CanvasGetFullPortName, CanvasGetPortConnectionList
+from .utils import (
+    fontHorizontalAdvance,
+    CanvasGetFullPortName,
+    CanvasGetPortConnectionList,
+    CanvasGetPortConnections,
+    CanvasShowEffects,
+    CanvasShowPorts,
+    CanvasShowPortText,
+)
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -120,7 +128,7 @@ class CanvasPort(QGraphicsItem):
         self.update()
 
     def setPortName(self, port_name):
-        if QFontMetrics(self.m_port_font).width(port_name) < QFontMetrics(self.m_port_font).width(self.m_port_name):
+        if fontHorizontalAdvance(self.m_port_font, port_name) < fontHorizontalAdvance(self.m_port_font, self.m_port_name):
             QTimer.singleShot(0, canvas.scene.update)
 
         self.m_port_name = port_name
@@ -169,15 +177,8 @@ class CanvasPort(QGraphicsItem):
             self.setCursor(QCursor(Qt.CrossCursor))
             self.m_cursor_moving = True
 
-            for connection in canvas.connection_list:
-                if (
-                    (connection.group_out_id == self.m_group_id and
-                     connection.port_out_id == self.m_port_id)
-                    or
-                    (connection.group_in_id == self.m_group_id and
-                     connection.port_in_id == self.m_port_id)
-                   ):
-                    connection.widget.setLocked(True)
+            for connection in CanvasGetPortConnections(self.m_group_id, self.m_port_id):
+                connection.widget.setLocked(True)
 
         if not self.m_line_mov:
             if options.use_bezier_lines:
@@ -190,16 +191,7 @@ class CanvasPort(QGraphicsItem):
             canvas.last_z_value += 1
             self.parentItem().setZValue(canvas.last_z_value)
 
-        item = None
-        items = canvas.scene.items(event.scenePos(), Qt.ContainsItemShape, Qt.AscendingOrder)
-        #for i in range(len(items)):
-        for _, itemx in enumerate(items):
-            if itemx.type() != CanvasPortType:
-                continue
-            if itemx == self:
-                continue
-            if item is None or itemx.parentItem().zValue() > item.parentItem().zValue():
-                item = itemx
+        item = canvas.spatial_index.portAt(event.scenePos(), self)
 
         if self.m_hover_item and self.m_hover_item != item:
             self.m_hover_item.setSelected(False)
@@ -223,19 +215,12 @@ class CanvasPort(QGraphicsItem):
                 canvas.scene.removeItem(item)
                 del item
 
-            for connection in canvas.connection_list:
-                if (
-                    (connection.group_out_id == self.m_group_id and
-                     connection.port_out_id == self.m_port_id)
-                    or
-                    (connection.group_in_id == self.m_group_id and
-                     connection.port_in_id == self.m_port_id)
-                   ):
-                    connection.widget.setLocked(False)
+            for connection in CanvasGetPortConnections(self.m_group_id, self.m_port_id):
+                connection.widget.setLocked(False)
 
             if self.m_hover_item:
                 # TODO: a better way to check already existing connection
-                for connection in canvas.connection_list:
+                for connection in CanvasGetPortConnections(self.m_group_id, self.m_port_id):
                     hover_group_id = self.m_hover_item.getGroupId()
                     hover_port_id = self.m_hover_item.getPortId()
 
@@ -324,15 +309,8 @@ class CanvasPort(QGraphicsItem):
             canvas.callback(ACTION_PORT_RENAME, self.m_group_id, self.m_port_id, "")
 
     def setPortSelected(self, yesno):
-        for connection in canvas.connection_list:
-            if (
-                (connection.group_out_id == self.m_group_id and
-                 connection.port_out_id == self.m_port_id)
-                or
-                (connection.group_in_id == self.m_group_id and
-                 connection.port_in_id == self.m_port_id)
-               ):
-                connection.widget.updateLineSelected()
+        for connection in CanvasGetPortConnections(self.m_group_id, self.m_port_id):
+            connection.widget.updateLineSelected()
 
     def itemChange(self, change, value):
         if change == QGraphicsItem.ItemSelectedHasChanged:
@@ -349,6 +327,10 @@ class CanvasPort(QGraphicsItem):
         return QRectF(0, 0, self.m_port_width + 12, self.m_port_height)
 
     def paint(self, painter, option, widget):
+        # Zoomed out, the parent box draws a summary bar instead
+        if not CanvasShowPorts():
+            return
+
         painter.save()
         painter.setRenderHint(QPainter.Antialiasing, bool(options.antialiasing == ANTIALIASING_FULL))
 
@@ -445,7 +427,9 @@ class CanvasPort(QGraphicsItem):
         polygon += QPointF(poly_locx[4], canvas.theme.port_height - lineHinting)
         polygon += QPointF(poly_locx[0], lineHinting)
 
-        if canvas.theme.port_bg_pixmap:
+        show_effects = CanvasShowEffects()
+
+        if canvas.theme.port_bg_pixmap and show_effects:
             portRect = polygon.boundingRect().adjusted(-lineHinting+1, -lineHinting+1, lineHinting-1, lineHinting-1)
             portPos = portRect.topLeft()
             painter.drawTiledPixmap(portRect, canvas.theme.port_bg_pixmap, portPos)
@@ -455,11 +439,12 @@ class CanvasPort(QGraphicsItem):
         painter.setPen(poly_pen)
         painter.drawPolygon(polygon)
 
-        painter.setPen(text_pen)
-        painter.setFont(self.m_port_font)
-        painter.drawText(text_pos, self.m_port_name)
+        if CanvasShowPortText():
+            painter.setPen(text_pen)
+            painter.setFont(self.m_port_font)
+            painter.drawText(text_pos, self.m_port_name)
 
-        if canvas.theme.idx == Theme.THEME_OOSTUDIO and canvas.theme.port_bg_pixmap:
+        if canvas.theme.idx == Theme.THEME_OOSTUDIO and canvas.theme.port_bg_pixmap and show_effects:
             conn_pen.setCosmetic(True)
             conn_pen.setWidthF(0.4)
             painter.setPen(conn_pen)
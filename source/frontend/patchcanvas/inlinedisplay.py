@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchBay Canvas engine using QGraphicsView/Scene
+# Copyright (C) 2010-2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+from time import monotonic
+
+from PyQt5.QtCore import pyqtSlot, QObject, QTimer
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom)
+
+from . import canvas, ACTION_INLINE_DISPLAY, MAX_PLUGIN_ID_ALLOWED
+from .utils import CanvasShowPorts
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Interval between render passes, in ms
+INLINE_DISPLAY_TICK_INTERVAL = 15
+
+# Minimum time between two renders of the same plugin, in seconds
+INLINE_DISPLAY_MIN_INTERVAL = 1.0 / 30
+
+# ------------------------------------------------------------------------------------------------------------
+# Renders plugin inline displays outside of paint().
+# Boxes request a render while painting (so only boxes being drawn ask for one), requests are then served
+# from a timer at a capped rate per plugin, skipping boxes that went offscreen or are zoomed out too far.
+
+class InlineDisplayService(QObject):
+    def __init__(self, parent=None):
+        QObject.__init__(self, parent)
+
+        self.m_pending = {}     # box -> None, in request order
+        self.m_last_render = {} # plugin_id -> time of last render
+
+        self.m_timer = QTimer(self)
+        self.m_timer.setInterval(INLINE_DISPLAY_TICK_INTERVAL)
+        self.m_timer.setSingleShot(True)
+        self.m_timer.timeout.connect(self.slot_renderPending)
+
+    def clear(self):
+        self.m_timer.stop()
+        self.m_pending = {}
+        self.m_last_render = {}
+
+    def removeBox(self, box):
+        self.m_pending.pop(box, None)
+
+    def requestRender(self, box):
+        self.m_pending[box] = None
+
+        if not self.m_timer.isActive():
+            self.m_timer.start()
+
+    def isBoxOnScreen(self, box):
+        view = canvas.scene.getView()
+        visible_rect = view.mapToScene(view.viewport().rect()).boundingRect()
+        return box.isVisible() and visible_rect.intersects(box.sceneBoundingRect())
+
+    @pyqtSlot()
+    def slot_renderPending(self):
+        if not self.m_pending:
+            return
+
+        # zoomed out, inline displays are not drawn
+        if not CanvasShowPorts():
+            self.m_pending = {}
+            return
+
+        now = monotonic()
+        scaling = canvas.scene.getScaleFactor() * canvas.scene.getDevicePixelRatioF()
+        rendered = set()
+        pending = {}
+
+        for box in self.m_pending:
+            plugin_id = box.m_plugin_id
+
+            if plugin_id < 0 or plugin_id > MAX_PLUGIN_ID_ALLOWED or not box.needsInlineDisplayRender(scaling):
+                continue
+
+            # will be requested again when painted
+            if not self.isBoxOnScreen(box):
+                continue
+
+            # split groups render both boxes in the same pass
+            if plugin_id not in rendered and now - self.m_last_render.get(plugin_id, 0.0) < INLINE_DISPLAY_MIN_INTERVAL:
+                pending[box] = None
+                continue
+
+            rendered.add(plugin_id)
+            self.m_last_render[plugin_id] = now
+
+            data = canvas.callback(ACTION_INLINE_DISPLAY, plugin_id, 0, box.getInlineDisplaySize(scaling))
+
+            if data is not None:
+                box.setInlineDisplayImage(data, scaling)
+
+        self.m_pending = pending
+
+        if pending:
+            self.m_timer.start()
+
+# ------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchBay Canvas engine using QGraphicsView/Scene
+# Copyright (C) 2010-2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Layered (Sugiyama-style) graph layout, left to right.
+#
+# Works on plain python data only, so it can safely run outside the main thread:
+#  - nodes: dict of node key -> (width, height), in preferred order
+#  - edges: iterable of (source key, target key)
+# Returns a dict of node key -> (x, y).
+
+# ------------------------------------------------------------------------------------------------------------
+
+LAYOUT_LAYER_SPACING = 100
+LAYOUT_NODE_SPACING  = 24
+LAYOUT_SWEEPS        = 12
+
+# ------------------------------------------------------------------------------------------------------------
+
+def computeLayeredLayout(nodes, edges, origin_x=0, origin_y=0):
+    if not nodes:
+        return {}
+
+    keys = list(nodes.keys())
+    index = dict((key, i) for i, key in enumerate(keys))
+    count = len(keys)
+
+    succs = [[] for _ in range(count)]
+    for src, dst in edges:
+        s = index.get(src, None)
+        d = index.get(dst, None)
+        if s is None or d is None or s == d or d in succs[s]:
+            continue
+        succs[s].append(d)
+
+    succs = _removeCycles(succs)
+    layers = _assignLayers(succs)
+    succs, preds, layers = _addDummyNodes(succs, layers)
+    order = _orderLayers(succs, preds, layers)
+
+    return _assignCoordinates(keys, nodes, order, origin_x, origin_y)
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Reverse back edges found by a depth-first search, which makes the graph acyclic
+def _removeCycles(succs):
+    count = len(succs)
+    state = [0] * count # 0: new, 1: in stack, 2: done
+    acyclic = [[] for _ in range(count)]
+
+    for root in range(count):
+        if state[root] != 0:
+            continue
+
+        state[root] = 1
+        stack = [(root, iter(succs[root]))]
+
+        while stack:
+            node, children = stack[-1]
+
+            for child in children:
+                if state[child] == 1:
+                    if node not in acyclic[child]:
+                        acyclic[child].append(node)
+                    continue
+
+                acyclic[node].append(child)
+
+                if state[child] == 0:
+                    state[child] = 1
+                    stack.append((child, iter(succs[child])))
+                    break
+
+            else:
+                state[node] = 2
+                stack.pop()
+
+    return acyclic
+
+# Longest path layering, with sinks pulled to the last layer
+def _assignLayers(succs):
+    count = len(succs)
+    indegree = [0] * count
+    for children in succs:
+        for child in children:
+            indegree[child] += 1
+
+    layers = [0] * count
+    queue = [node for node in range(count) if indegree[node] == 0]
+
+    for node in queue:
+        for child in succs[node]:
+            layers[child] = max(layers[child], layers[node] + 1)
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                queue.append(child)
+
+    last_layer = max(layers)
+    has_preds = [False] * count
+    for children in succs:
+        for child in children:
+            has_preds[child] = True
+
+    for node in range(count):
+        if has_preds[node] and not succs[node]:
+            layers[node] = last_layer
+
+    # Pull sources next to their closest successor, this avoids many long edges (and dummy nodes)
+    for node in range(count):
+        if not has_preds[node] and succs[node]:
+            layers[node] = min(layers[child] for child in succs[node]) - 1
+
+    return layers
+
+# Split edges spanning several layers with dummy nodes, so every edge connects adjacent layers
+def _addDummyNodes(succs, layers):
+    count = len(succs)
+    new_succs = [[] for _ in range(count)]
+    new_layers = list(layers)
+
+    for node in range(count):
+        for child in succs[node]:
+            prev = node
+            for layer in range(layers[node] + 1, layers[child]):
+                dummy = len(new_layers)
+                new_layers.append(layer)
+                new_succs.append([])
+                new_succs[prev].append(dummy)
+                prev = dummy
+            new_succs[prev].append(child)
+
+    preds = [[] for _ in range(len(new_succs))]
+    for node, children in enumerate(new_succs):
+        for child in children:
+            preds[child].append(node)
+
+    return new_succs, preds, new_layers
+
+# Barycenter heuristic, sweeping down and up, keeping the order with the least crossings
+def _orderLayers(succs, preds, layers):
+    order = [[] for _ in range(max(layers) + 1)]
+    for node, layer in enumerate(layers):
+        order[layer].append(node)
+
+    position = [0] * len(layers)
+    for nodes in order:
+        for i, node in enumerate(nodes):
+            position[node] = i
+
+    best_order = [list(nodes) for nodes in order]
+    best_crossings = _countCrossings(order, succs, position)
+
+    for sweep in range(LAYOUT_SWEEPS):
+        if best_crossings == 0:
+            break
+
+        # one sweep down (ordering by predecessors), then one up (by successors)
+        for layer_range, neighbours in ((range(1, len(order)), preds),
+                                        (range(len(order) - 2, -1, -1), succs)):
+            for layer in layer_range:
+                decorated = []
+
+                for node in order[layer]:
+                    others = neighbours[node]
+                    if others:
+                        barycenter = float(sum([position[other] for other in others])) / len(others)
+                    else:
+                        barycenter = position[node]
+                    decorated.append((barycenter, position[node], node))
+
+                decorated.sort()
+
+                nodes = order[layer] = [node for _, _, node in decorated]
+
+                for i, node in enumerate(nodes):
+                    position[node] = i
+
+        crossings = _countCrossings(order, succs, position)
+
+        if crossings >= best_crossings:
+            break
+
+        best_crossings = crossings
+        best_order = [list(nodes) for nodes in order]
+
+    return best_order
+
+def _countCrossings(order, succs, position):
+    crossings = 0
+
+    for nodes in order[:-1]:
+        targets = []
+        for node in nodes:
+            children = succs[node]
+            if len(children) == 1:
+                targets.append(position[children[0]])
+            elif children:
+                targets.extend(sorted([position[child] for child in children]))
+
+        if len(targets) < 2:
+            continue
+
+        # count inversions with a fenwick tree
+        size = max(targets) + 1
+        tree = [0] * (size + 1)
+        seen = 0
+
+        for target in targets:
+            i = target + 1
+            less_or_equal = 0
+            while i > 0:
+                less_or_equal += tree[i]
+                i -= i & -i
+            crossings += seen - less_or_equal
+            seen += 1
+
+            i = target + 1
+            while i <= size:
+                tree[i] += 1
+                i += i & -i
+
+    return crossings
+
+def _assignCoordinates(keys, nodes, order, origin_x, origin_y):
+    real_count = len(keys)
+
+    layer_widths = []
+    layer_heights = []
+
+    for layer_nodes in order:
+        width = height = 0
+        for node in layer_nodes:
+            if node >= real_count:
+                continue
+            node_width, node_height = nodes[keys[node]]
+            width = max(width, node_width)
+            height += node_height + LAYOUT_NODE_SPACING
+        layer_widths.append(width)
+        layer_heights.append(height)
+
+    max_height = max(layer_heights)
+    positions = {}
+    x = origin_x
+
+    for layer, layer_nodes in enumerate(order):
+        # center each layer vertically against the tallest one
+        y = origin_y + (max_height - layer_heights[layer]) / 2
+
+        for node in layer_nodes:
+            if node >= real_count:
+                continue
+            key = keys[node]
+            positions[key] = (int(x), int(y))
+            y += nodes[key][1] + LAYOUT_NODE_SPACING
+
+        if layer_widths[layer] > 0:
+            x += layer_widths[layer] + LAYOUT_LAYER_SPACING
+
+    return positions
+
+# ------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchBay Canvas engine using QGraphicsView/Scene
+# Copyright (C) 2010-2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Patchbay graph model, without any widgets.
+#
+# Keeps groups, ports and connections (plus the indexes needed to query them quickly) as plain python data,
+# and reports every change to registered listeners as listener(event, item).
+# The canvas updates its model next to the scene items on every patchcanvas call, and uses it for connection
+# and plugin lookups, layouts and snapshots. The scene items are not driven by model events.
+# The layout code and benchmarks can use a model on its own, without a QGraphicsScene.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom)
+
+from . import ICON_APPLICATION, MAX_PLUGIN_ID_ALLOWED, PORT_MODE_INPUT, PORT_MODE_OUTPUT
+from .layout import computeLayeredLayout
+from .snapshot import (
+    diffGraphSnapshots,
+    isGraphDiffEmpty,
+    newGraphSnapshot,
+    SNAPSHOT_GROUP_NAME,
+    SNAPSHOT_GROUP_ICON,
+    SNAPSHOT_GROUP_SPLIT,
+    SNAPSHOT_GROUP_PLUGIN_ID,
+    SNAPSHOT_GROUP_PLUGIN_UI,
+    SNAPSHOT_GROUP_PLUGIN_INLINE,
+    SNAPSHOT_GROUP_POS,
+)
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Model events, item is the group/port/connection involved (None for cleared)
+MODEL_EVENT_GROUP_ADDED         = 0
+MODEL_EVENT_GROUP_REMOVED       = 1
+MODEL_EVENT_GROUP_CHANGED       = 2 # name, icon, split, plugin or position
+MODEL_EVENT_PORT_ADDED          = 3
+MODEL_EVENT_PORT_REMOVED        = 4
+MODEL_EVENT_PORT_RENAMED        = 5
+MODEL_EVENT_CONNECTION_ADDED    = 6
+MODEL_EVENT_CONNECTION_REMOVED  = 7
+MODEL_EVENT_CLEARED             = 8
+
+# Box size estimates, used for layouts when there are no widgets to measure
+MODEL_BOX_MIN_WIDTH     = 50
+MODEL_BOX_HEADER_HEIGHT = 25
+MODEL_BOX_PORT_HEIGHT   = 18
+MODEL_BOX_CHAR_WIDTH    = 7
+
+# ------------------------------------------------------------------------------------------------------------
+
+class group_model_t(object):
+    __slots__ = [
+        'group_id',
+        'group_name',
+        'split',
+        'icon',
+        'plugin_id',
+        'plugin_ui',
+        'plugin_inline',
+        'pos',
+        'port_ids'
+    ]
+
+class port_model_t(object):
+    __slots__ = [
+        'group_id',
+        'port_id',
+        'port_name',
+        'port_mode',
+        'port_type',
+        'is_alternate'
+    ]
+
+class connection_model_t(object):
+    __slots__ = [
+        'connection_id',
+        'group_in_id',
+        'port_in_id',
+        'group_out_id',
+        'port_out_id'
+    ]
+
+# ------------------------------------------------------------------------------------------------------------
+
+class PatchbayModel(object):
+    def __init__(self):
+        self.group_map = {}         # group_id -> group_model_t
+        self.port_map = {}          # (group_id, port_id) -> port_model_t
+        self.connection_map = {}    # connection_id -> connection_model_t
+        self.port_connections = {}  # (group_id, port_id) -> set of connection_id
+        self.group_connections = {} # group_id -> set of connection_id
+        self.group_plugin_map = {}  # plugin_id -> group_model_t
+        self.listeners = []
+
+    # --------------------------------------------------------------------------------------------------------
+
+    def addListener(self, listener):
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def removeListener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def notify(self, event, item):
+        for listener in self.listeners:
+            listener(event, item)
+
+    # --------------------------------------------------------------------------------------------------------
+
+    def clear(self):
+        self.group_map = {}
+        self.port_map = {}
+        self.connection_map = {}
+        self.port_connections = {}
+        self.group_connections = {}
+        self.group_plugin_map = {}
+
+        if self.listeners:
+            self.notify(MODEL_EVENT_CLEARED, None)
+
+    # --------------------------------------------------------------------------------------------------------
+    # Groups
+
+    def addGroup(self, group_id, group_name, split=False, icon=ICON_APPLICATION):
+        if group_id in self.group_map:
+            return None
+
+        group = group_model_t()
+        group.group_id = group_id
+        group.group_name = group_name
+        group.split = split
+        group.icon = icon
+        group.plugin_id = -1
+        group.plugin_ui = False
+        group.plugin_inline = False
+        group.pos = None
+        group.port_ids = {} # port_id -> None, in insertion order
+        self.group_map[group_id] = group
+
+        if self.listeners:
+            self.notify(MODEL_EVENT_GROUP_ADDED, group)
+
+        return group
+
+    # Ports and connections still in the group are removed as well
+    def removeGroup(self, group_id):
+        group = self.group_map.get(group_id, None)
+
+        if group is None:
+            return None
+
+        for port_id in list(group.port_ids):
+            self.removePort(group_id, port_id)
+
+        for connection_id in list(self.group_connections.get(group_id, ())):
+            self.disconnectPorts(connection_id)
+
+        del self.group_map[group_id]
+        self.group_connections.pop(group_id, None)
+
+        if self.group_plugin_map.get(group.plugin_id, None) is group:
+            del self.group_plugin_map[group.plugin_id]
+
+        if self.listeners:
+            self.notify(MODEL_EVENT_GROUP_REMOVED, group)
+
+        return group
+
+    def renameGroup(self, group_id, new_group_name):
+        group = self.group_map.get(group_id, None)
+
+        if group is None or group.group_name == new_group_name:
+            return
+
+        group.group_name = new_group_name
+        self.groupChanged(group)
+
+    def setGroupIcon(self, group_id, icon):
+        group = self.group_map.get(group_id, None)
+
+        if group is None or group.icon == icon:
+            return
+
+        group.icon = icon
+        self.groupChanged(group)
+
+    def setGroupSplit(self, group_id, split):
+        group = self.group_map.get(group_id, None)
+
+        if group is None or group.split == split:
+            return
+
+        group.split = split
+        self.groupChanged(group)
+
+    def splitGroup(self, group_id):
+        self.setGroupSplit(group_id, True)
+
+    def joinGroup(self, group_id):
+        self.setGroupSplit(group_id, False)
+
+    # A negative plugin_id turns the group back into a regular one
+    def setGroupAsPlugin(self, group_id, plugin_id, hasUI, hasInlineDisplay):
+        group = self.group_map.get(group_id, None)
+
+        if group is None:
+            return
+
+        if self.group_plugin_map.get(group.plugin_id, None) is group:
+            del self.group_plugin_map[group.plugin_id]
+
+        if plugin_id < 0:
+            plugin_id = -1
+            hasUI = hasInlineDisplay = False
+        else:
+            self.group_plugin_map[plugin_id] = group
+
+        group.plugin_id = plugin_id
+        group.plugin_ui = hasUI
+        group.plugin_inline = hasInlineDisplay
+        self.groupChanged(group)
+
+    def setGroupPos(self, group_id, group_pos_x, group_pos_y):
+        self.setGroupPosFull(group_id, group_pos_x, group_pos_y, group_pos_x, group_pos_y)
+
+    def setGroupPosFull(self, group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group_pos_y_i):
+        group = self.group_map.get(group_id, None)
+
+        if group is None:
+            return
+
+        pos = (int(group_pos_x_o), int(group_pos_y_o), int(group_pos_x_i), int(group_pos_y_i))
+
+        if group.pos == pos:
+            return
+
+        group.pos = pos
+        self.groupChanged(group)
+
+    def groupChanged(self, group):
+        if self.listeners:
+            self.notify(MODEL_EVENT_GROUP_CHANGED, group)
+
+    def getGroupPorts(self, group_id, port_mode=None):
+        group = self.group_map.get(group_id, None)
+
+        if group is None:
+            return []
+
+        ports = [self.port_map[(group_id, port_id)] for port_id in group.port_ids]
+
+        if port_mode is None:
+            return ports
+
+        return [port for port in ports if port.port_mode == port_mode]
+
+    # --------------------------------------------------------------------------------------------------------
+    # Plugins
+
+    # Plugin ids after the removed one move down by one
+    def handlePluginRemoved(self, plugin_id):
+        group = self.group_plugin_map.pop(plugin_id, None)
+
+        if group is not None:
+            group.plugin_id = -1
+            group.plugin_ui = False
+            group.plugin_inline = False
+            self.groupChanged(group)
+
+        group_plugin_map = {}
+
+        for group_plugin_id, group in self.group_plugin_map.items():
+            if group_plugin_id < plugin_id or group_plugin_id > MAX_PLUGIN_ID_ALLOWED:
+                group_plugin_map[group_plugin_id] = group
+                continue
+
+            group.plugin_id -= 1
+            group_plugin_map[group.plugin_id] = group
+            self.groupChanged(group)
+
+        self.group_plugin_map = group_plugin_map
+
+    def handleAllPluginsRemoved(self):
+        self.group_plugin_map = {}
+
+        for group in self.group_map.values():
+            if group.plugin_id < 0 or group.plugin_id > MAX_PLUGIN_ID_ALLOWED:
+                continue
+
+            group.plugin_id = -1
+            group.plugin_ui = False
+            group.plugin_inline = False
+            self.groupChanged(group)
+
+    # --------------------------------------------------------------------------------------------------------
+    # Ports
+
+    def addPort(self, group_id, port_id, port_name, port_mode, port_type, is_alternate=False):
+        group = self.group_map.get(group_id, None)
+
+        if group is None or (group_id, port_id) in self.port_map:
+            return None
+
+        port = port_model_t()
+        port.group_id = group_id
+        port.port_id = port_id
+        port.port_name = port_name
+        port.port_mode = port_mode
+        port.port_type = port_type
+        port.is_alternate = is_alternate
+        self.port_map[(group_id, port_id)] = port
+        group.port_ids[port_id] = None
+
+        if self.listeners:
+            self.notify(MODEL_EVENT_PORT_ADDED, port)
+
+        return port
+
+    # Connections to the port are removed as well
+    def removePort(self, group_id, port_id):
+        port = self.port_map.get((group_id, port_id), None)
+
+        if port is None:
+            return None
+
+        for connection_id in list(self.port_connections.get((group_id, port_id), ())):
+            self.disconnectPorts(connection_id)
+
+        del self.port_map[(group_id, port_id)]
+        self.port_connections.pop((group_id, port_id), None)
+
+        group = self.group_map.get(group_id, None)
+        if group is not None:
+            group.port_ids.pop(port_id, None)
+
+        if self.listeners:
+            self.notify(MODEL_EVENT_PORT_REMOVED, port)
+
+        return port
+
+    def renamePort(self, group_id, port_id, new_port_name):
+        port = self.port_map.get((group_id, port_id), None)
+
+        if port is None or port.port_name == new_port_name:
+            return
+
+        port.port_name = new_port_name
+
+        if self.listeners:
+            self.notify(MODEL_EVENT_PORT_RENAMED, port)
+
+    # --------------------------------------------------------------------------------------------------------
+    # Connections
+
+    def connectPorts(self, connection_id, group_out_id, port_out_id, group_in_id, port_in_id):
+        if connection_id in self.connection_map:
+            return None
+
+        key_out = (group_out_id, port_out_id)
+        key_in = (group_in_id, port_in_id)
+
+        if key_out not in self.port_map or key_in not in self.port_map:
+            return None
+
+        connection = connection_model_t()
+        connection.connection_id = connection_id
+        connection.group_in_id = group_in_id
+        connection.port_in_id = port_in_id
+        connection.group_out_id = group_out_id
+        connection.port_out_id = port_out_id
+        self.connection_map[connection_id] = connection
+
+        self.port_connections.setdefault(key_out, set()).add(connection_id)
+        self.port_connections.setdefault(key_in, set()).add(connection_id)
+        self.group_connections.setdefault(group_out_id, set()).add(connection_id)
+        self.group_connections.setdefault(group_in_id, set()).add(connection_id)
+
+        if self.listeners:
+            self.notify(MODEL_EVENT_CONNECTION_ADDED, connection)
+
+        return connection
+
+    def disconnectPorts(self, connection_id):
+        connection = self.connection_map.pop(connection_id, None)
+
+        if connection is None:
+            return None
+
+        for key in ((connection.group_out_id, connection.port_out_id),
+                    (connection.group_in_id, connection.port_in_id)):
+            connection_ids = self.port_connections.get(key, None)
+            if connection_ids is not None:
+                connection_ids.discard(connection_id)
+
+        for group_id in (connection.group_out_id, connection.group_in_id):
+            connection_ids = self.group_connections.get(group_id, None)
+            if connection_ids is not None:
+                connection_ids.discard(connection_id)
+
+        if self.listeners:
+            self.notify(MODEL_EVENT_CONNECTION_REMOVED, connection)
+
+        return connection
+
+    def getPortConnections(self, group_id, port_id):
+        return [self.connection_map[connection_id]
+                for connection_id in sorted(self.port_connections.get((group_id, port_id), ()))]
+
+    # --------------------------------------------------------------------------------------------------------
+    # Snapshots
+
+    def exportSnapshot(self):
+        snapshot = newGraphSnapshot()
+
+        for group in self.group_map.values():
+            snapshot['groups'][group.group_id] = [
+                group.group_name, group.icon, group.split,
+                group.plugin_id, group.plugin_ui, group.plugin_inline, group.pos
+            ]
+
+        for port in self.port_map.values():
+            snapshot['ports'][(port.group_id, port.port_id)] = [
+                port.port_name, port.port_mode, port.port_type, port.is_alternate
+            ]
+
+        for connection in self.connection_map.values():
+            snapshot['connections'][connection.connection_id] = [
+                connection.group_out_id, connection.port_out_id, connection.group_in_id, connection.port_in_id
+            ]
+
+        return snapshot
+
+    # Bring the model to the state of a full snapshot, only applying what changed
+    def loadSnapshot(self, snapshot):
+        delta = diffGraphSnapshots(self.exportSnapshot(), snapshot)
+        self.applyDiff(delta)
+        return delta
+
+    def applyDiff(self, delta):
+        if isGraphDiffEmpty(delta):
+            return
+
+        for connection_id in delta['connections_removed']:
+            self.disconnectPorts(connection_id)
+
+        for group_id, port_id in delta['ports_removed']:
+            self.removePort(group_id, port_id)
+
+        for group_id in delta['groups_removed']:
+            self.removeGroup(group_id)
+
+        for group_id, data in delta['groups_added'].items():
+            self.addGroup(group_id, data[SNAPSHOT_GROUP_NAME], bool(data[SNAPSHOT_GROUP_SPLIT]),
+                          data[SNAPSHOT_GROUP_ICON])
+            self.applyGroupData(group_id, data)
+
+        for group_id, (old_data, new_data) in delta['groups_changed'].items():
+            self.applyGroupData(group_id, new_data)
+
+        for (group_id, port_id), data in delta['ports_added'].items():
+            self.addPort(group_id, port_id, data[0], data[1], data[2], data[3])
+
+        for (group_id, port_id), port_name in delta['ports_renamed'].items():
+            self.renamePort(group_id, port_id, port_name)
+
+        for connection_id in sorted(delta['connections_added'].keys()):
+            group_out_id, port_out_id, group_in_id, port_in_id = delta['connections_added'][connection_id]
+            self.connectPorts(connection_id, group_out_id, port_out_id, group_in_id, port_in_id)
+
+    def applyGroupData(self, group_id, data):
+        self.renameGroup(group_id, data[SNAPSHOT_GROUP_NAME])
+        self.setGroupIcon(group_id, data[SNAPSHOT_GROUP_ICON])
+
+        if data[SNAPSHOT_GROUP_SPLIT] is not None:
+            self.setGroupSplit(group_id, data[SNAPSHOT_GROUP_SPLIT])
+
+        group = self.group_map[group_id]
+        plugin_data = (data[SNAPSHOT_GROUP_PLUGIN_ID], data[SNAPSHOT_GROUP_PLUGIN_UI], data[SNAPSHOT_GROUP_PLUGIN_INLINE])
+
+        if plugin_data != (group.plugin_id, group.plugin_ui, group.plugin_inline):
+            self.setGroupAsPlugin(group_id, plugin_data[0], plugin_data[1], plugin_data[2])
+
+        pos = data[SNAPSHOT_GROUP_POS]
+
+        if pos is not None:
+            self.setGroupPosFull(group_id, pos[0], pos[1], pos[2], pos[3])
+
+    # --------------------------------------------------------------------------------------------------------
+    # Layout
+
+    # Each box is a layout node, keyed as (group_id, box index), index 1 being the input box of split groups.
+    # box_size(group, index) returns (width, height), box sizes are estimated from the ports if not set.
+    def getLayoutGraph(self, box_size=None):
+        if box_size is None:
+            box_size = self.estimateBoxSize
+
+        nodes = {}
+        edges = []
+
+        for group in self.group_map.values():
+            for i in range(2 if group.split else 1):
+                nodes[(group.group_id, i)] = box_size(group, i)
+
+        # Connections go from the output box of a group to the input box of another
+        for connection in self.connection_map.values():
+            group_in = self.group_map.get(connection.group_in_id, None)
+            if group_in is None:
+                continue
+            edges.append(((connection.group_out_id, 0),
+                          (connection.group_in_id, 1 if group_in.split else 0)))
+
+        return nodes, edges
+
+    def estimateBoxSize(self, group, index):
+        if not group.split:
+            port_modes = (PORT_MODE_INPUT, PORT_MODE_OUTPUT)
+        elif index == 0:
+            port_modes = (PORT_MODE_OUTPUT,)
+        else:
+            port_modes = (PORT_MODE_INPUT,)
+
+        text_width = len(group.group_name)
+        mode_counts = dict((port_mode, 0) for port_mode in port_modes)
+        mode_widths = dict((port_mode, 0) for port_mode in port_modes)
+
+        for port_id in group.port_ids:
+            port = self.port_map[(group.group_id, port_id)]
+            if port.port_mode not in mode_counts:
+                continue
+            mode_counts[port.port_mode] += 1
+            mode_widths[port.port_mode] = max(mode_widths[port.port_mode], len(port.port_name))
+
+        # inputs and outputs are drawn side by side
+        text_width = max(text_width, sum(mode_widths.values()))
+        port_count = max(mode_counts.values())
+
+        return (max(MODEL_BOX_MIN_WIDTH, text_width * MODEL_BOX_CHAR_WIDTH + MODEL_BOX_MIN_WIDTH),
+                MODEL_BOX_HEADER_HEIGHT + port_count * MODEL_BOX_PORT_HEIGHT)
+
+    def computeLayout(self, origin_x=0, origin_y=0, box_size=None):
+        nodes, edges = self.getLayoutGraph(box_size)
+        return computeLayeredLayout(nodes, edges, origin_x, origin_y)
+
+    # Positions as returned by computeLayout()
+    def applyLayout(self, positions):
+        for group in self.group_map.values():
+            pos_o = positions.get((group.group_id, 0), None)
+
+            if pos_o is None:
+                continue
+
+            pos_i = positions.get((group.group_id, 1), pos_o) if group.split else pos_o
+            self.setGroupPosFull(group.group_id, pos_o[0], pos_o[1], pos_i[0], pos_i[1])
+
+# ------------------------------------------------------------------------------------------------------------
@@ -19,8 +19,8 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
-from PyQt5.QtCore import pyqtSlot, qCritical, qFatal, qWarning, QObject
-from PyQt5.QtCore import QPointF, QRectF, QTimer
+from PyQt5.QtCore import pyqtSlot, qCritical, qFatal, qWarning, QObject, QThread
+from PyQt5.QtCore import QPointF, QRectF
 from PyQt5.QtWidgets import QGraphicsObject
 
 # ------------------------------------------------------------------------------------------------------------
@@ -56,8 +56,30 @@ from . import (
 from .canvasbox import CanvasBox
 from .canvasbezierline import CanvasBezierLine
 from .canvasline import CanvasLine
+from .inlinedisplay import InlineDisplayService
+from .layout import computeLayeredLayout
+from .snapshot import (
+    diffGraphSnapshots,
+    graphSnapshotIdsChanged,
+    isGraphDiffEmpty,
+    newGraphSnapshot,
+    SNAPSHOT_GROUP_NAME,
+    SNAPSHOT_GROUP_ICON,
+    SNAPSHOT_GROUP_SPLIT,
+    SNAPSHOT_GROUP_PLUGIN_ID,
+    SNAPSHOT_GROUP_PLUGIN_INLINE,
+    SNAPSHOT_GROUP_POS,
+)
 from .theme import Theme, getDefaultTheme, getThemeName
-from .utils import CanvasCallback, CanvasGetNewGroupPos, CanvasItemFX, CanvasRemoveItemFX
+from .utils import (
+    fontHorizontalAdvanceCacheClear,
+    CanvasCallback,
+    CanvasGetNewGroupPos,
+    CanvasGetPluginGroup,
+    CanvasItemFX,
+    CanvasRemoveItemFX,
+    CanvasUpdateSceneLater,
+)
 
 # FIXME
 from . import *
@@ -144,18 +166,27 @@ class CanvasObject(QObject):
 
         CanvasCallback(ACTION_PORTS_DISCONNECT, connectionId, 0, "")
 
+    @pyqtSlot()
+    def ArrangeThreadFinished(self):
+        thread = canvas.arrange_thread
+        canvas.arrange_thread = None
+
+        if thread is not None:
+            thread.wait()
+            applyArrangedPositions(thread.m_positions)
+
     @pyqtSlot(int, bool, int, int)
     def boxPositionChanged(self, groupId, split, x, y):
         x2 = y2 = 0
 
         if split:
-            for group in canvas.group_list:
-                if group.group_id == groupId:
-                    if group.split:
-                        pos = group.widgets[1].pos()
-                        x2  = pos.x()
-                        y2  = pos.y()
-                    break
+            group = canvas.group_map.get(groupId, None)
+            if group is not None and group.split:
+                pos = group.widgets[1].pos()
+                x2  = pos.x()
+                y2  = pos.y()
+
+        canvas.model.setGroupPosFull(groupId, x, y, x2, y2)
 
         valueStr = "%i:%i:%i:%i" % (x, y, x2, y2)
         CanvasCallback(ACTION_GROUP_POSITION, groupId, 0, valueStr)
@@ -164,18 +195,34 @@ class CanvasObject(QObject):
     def sboxPositionChanged(self, groupId, split, x2, y2):
         x = y = 0
 
-        for group in canvas.group_list:
-            if group.group_id == groupId:
-                pos = group.widgets[0].pos()
-                x = pos.x()
-                y = pos.y()
-                break
+        group = canvas.group_map.get(groupId, None)
+        if group is not None:
+            pos = group.widgets[0].pos()
+            x = pos.x()
+            y = pos.y()
+
+        canvas.model.setGroupPosFull(groupId, x, y, x2, y2)
 
         valueStr = "%i:%i:%i:%i" % (x, y, x2, y2)
         CanvasCallback(ACTION_GROUP_POSITION, groupId, 0, valueStr)
 
 # ------------------------------------------------------------------------------------------------------------
 
+class ArrangeThread(QThread):
+    def __init__(self, nodes, edges, origin_x, origin_y, parent=None):
+        QThread.__init__(self, parent)
+
+        self.m_nodes = nodes
+        self.m_edges = edges
+        self.m_origin_x = origin_x
+        self.m_origin_y = origin_y
+        self.m_positions = {}
+
+    def run(self):
+        self.m_positions = computeLayeredLayout(self.m_nodes, self.m_edges, self.m_origin_x, self.m_origin_y)
+
+# ------------------------------------------------------------------------------------------------------------
+
 def getStoredCanvasPosition(key, fallback_pos):
     try:
         return canvas.settings.value("CanvasPositions/" + key, fallback_pos, type=QPointF)
@@ -188,6 +235,11 @@ def getStoredCanvasSplit(group_name, fallback_split_mode):
     except:
         return fallback_split_mode
 
+def storeGroupPosInModel(group):
+    pos1 = group.widgets[0].pos()
+    pos2 = group.widgets[1].pos() if group.split and group.widgets[1] else QPointF(0, 0)
+    canvas.model.setGroupPosFull(group.group_id, pos1.x(), pos1.y(), pos2.x(), pos2.y())
+
 # ------------------------------------------------------------------------------------------------------------
 
 def init(appName, scene, callback, debug=False):
@@ -213,6 +265,8 @@ def init(appName, scene, callback, debug=False):
 
     if not canvas.qobject:
         canvas.qobject = CanvasObject()
+    if not canvas.inline_display:
+        canvas.inline_display = InlineDisplayService()
     if not canvas.settings:
         canvas.settings = QSafeSettings("falkTX", appName)
 
@@ -231,6 +285,8 @@ def init(appName, scene, callback, debug=False):
 
     canvas.scene.updateTheme()
 
+    fontHorizontalAdvanceCacheClear()
+
     canvas.initiated = True
 
 def clear():
@@ -238,41 +294,35 @@ def clear():
         print("PatchCanvas::clear()")
 
     group_pos = {}
-    group_list_ids = []
-    port_list_ids = []
-    connection_list_ids = []
 
-    for group in canvas.group_list:
+    for group in canvas.group_map.values():
         group_pos[group.group_name] = (
             group.split,
             group.widgets[0].pos(),
             group.widgets[1].pos() if group.split else None,
         )
-        group_list_ids.append(group.group_id)
 
-    for port in canvas.port_list:
-        port_list_ids.append((port.group_id, port.port_id))
-
-    for connection in canvas.connection_list:
-        connection_list_ids.append(connection.connection_id)
-
-    for idx in connection_list_ids:
+    for idx in list(canvas.connection_map.keys()):
         disconnectPorts(idx)
 
-    for group_id, port_id in port_list_ids:
+    for group_id, port_id in list(canvas.port_map.keys()):
         removePort(group_id, port_id)
 
-    for idx in group_list_ids:
+    for idx in list(canvas.group_map.keys()):
         removeGroup(idx)
 
     canvas.last_z_value = 0
     canvas.last_connection_id = 0
 
-    canvas.group_list = []
-    canvas.port_list = []
-    canvas.connection_list = []
-    canvas.group_plugin_map = {}
+    canvas.group_map = {}
+    canvas.port_map = {}
+    canvas.connection_map = {}
+    canvas.model.clear()
     canvas.old_group_pos = group_pos
+    canvas.batch_boxes = set()
+    canvas.batch_lines = {}
+    canvas.spatial_index.clear()
+    canvas.inline_display.clear()
 
     canvas.scene.clearSelection()
 
@@ -288,7 +338,60 @@ def clear():
 
     canvas.initiated = False
 
-    QTimer.singleShot(0, canvas.scene.update)
+    CanvasUpdateSceneLater()
+
+# ------------------------------------------------------------------------------------------------------------
+
+def beginBatch():
+    if canvas.debug:
+        print("PatchCanvas::beginBatch()")
+
+    canvas.batch_depth += 1
+
+def endBatch():
+    if canvas.debug:
+        print("PatchCanvas::endBatch()")
+
+    if canvas.batch_depth == 0:
+        qWarning("PatchCanvas::endBatch() - not inside a batch")
+        return
+
+    canvas.batch_depth -= 1
+
+    if canvas.batch_depth > 0:
+        return
+
+    flushBatchedBoxes()
+
+    # New lines go on top, in a single z-value step
+    if canvas.batch_lines:
+        canvas.last_z_value += 1
+        for line in canvas.batch_lines.values():
+            line.setZValue(canvas.last_z_value)
+        canvas.batch_lines = {}
+
+    if canvas.batch_scene_update:
+        canvas.batch_scene_update = False
+        CanvasUpdateSceneLater()
+
+def inBatch():
+    return canvas.batch_depth > 0
+
+def flushBatchedBoxes():
+    if not canvas.batch_boxes:
+        return
+
+    boxes = canvas.batch_boxes
+    canvas.batch_boxes = set()
+
+    # updatePositions() must not be deferred again
+    batch_depth = canvas.batch_depth
+    canvas.batch_depth = 0
+
+    for box in boxes:
+        box.updatePositions()
+
+    canvas.batch_depth = batch_depth
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -315,14 +418,17 @@ def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon=ICON_APPLICATION):
         print("PatchCanvas::addGroup(%i, %s, %s, %s)" % (
               group_id, group_name.encode(), split2str(split), icon2str(icon)))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            qWarning("PatchCanvas::addGroup(%i, %s, %s, %s) - group already exists" % (
-                     group_id, group_name.encode(), split2str(split), icon2str(icon)))
-            return None
+    if group_id in canvas.group_map:
+        qWarning("PatchCanvas::addGroup(%i, %s, %s, %s) - group already exists" % (
+                 group_id, group_name.encode(), split2str(split), icon2str(icon)))
+        return None
 
     old_matching_group = canvas.old_group_pos.pop(group_name, None)
 
+    # New positions are computed from the size of existing boxes
+    if canvas.batch_boxes and old_matching_group is None:
+        flushBatchedBoxes()
+
     if split == SPLIT_UNDEF:
         isHardware = bool(icon == ICON_HARDWARE)
 
@@ -398,12 +504,15 @@ def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon=ICON_APPLICATION):
     group_box.checkItemPos()
     group_box.blockSignals(False)
 
-    canvas.group_list.append(group_dict)
+    canvas.group_map[group_id] = group_dict
+
+    canvas.model.addGroup(group_id, group_name, group_dict.split, icon)
+    storeGroupPosInModel(group_dict)
 
     if options.eyecandy == EYECANDY_FULL and not options.auto_hide_groups:
         CanvasItemFX(group_box, True, False)
     else:
-        QTimer.singleShot(0, canvas.scene.update)
+        CanvasUpdateSceneLater()
 
     return group_dict
 
@@ -411,62 +520,71 @@ def removeGroup(group_id):
     if canvas.debug:
         print("PatchCanvas::removeGroup(%i)" % group_id)
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            item = group.widgets[0]
-            group_name = group.group_name
+    group = canvas.group_map.pop(group_id, None)
 
-            if group.split:
-                s_item = group.widgets[1]
+    if group is None:
+        qCritical("PatchCanvas::removeGroup(%i) - unable to find group to remove" % group_id)
+        return
 
-                if features.handle_group_pos:
-                    canvas.settings.setValue("CanvasPositions/%s_OUTPUT" % group_name, item.pos())
-                    canvas.settings.setValue("CanvasPositions/%s_INPUT" % group_name, s_item.pos())
-                    canvas.settings.setValue("CanvasPositions/%s_SPLIT" % group_name, SPLIT_YES)
+    item = group.widgets[0]
+    group_name = group.group_name
 
-                if options.eyecandy == EYECANDY_FULL:
-                    CanvasItemFX(s_item, False, True)
-                else:
-                    s_item.removeIconFromScene()
-                    canvas.scene.removeItem(s_item)
-                    del s_item
+    if group.split:
+        s_item = group.widgets[1]
 
-            else:
-                if features.handle_group_pos:
-                    canvas.settings.setValue("CanvasPositions/%s" % group_name, item.pos())
-                    canvas.settings.setValue("CanvasPositions/%s_SPLIT" % group_name, SPLIT_NO)
+        if features.handle_group_pos:
+            canvas.settings.setValue("CanvasPositions/%s_OUTPUT" % group_name, item.pos())
+            canvas.settings.setValue("CanvasPositions/%s_INPUT" % group_name, s_item.pos())
+            canvas.settings.setValue("CanvasPositions/%s_SPLIT" % group_name, SPLIT_YES)
 
-            if options.eyecandy == EYECANDY_FULL:
-                CanvasItemFX(item, False, True)
-            else:
-                item.removeIconFromScene()
-                canvas.scene.removeItem(item)
-                del item
+        if options.eyecandy == EYECANDY_FULL:
+            CanvasItemFX(s_item, False, True)
+        else:
+            s_item.removeIconFromScene()
+            canvas.scene.removeItem(s_item)
+            del s_item
 
-            canvas.group_list.remove(group)
-            canvas.group_plugin_map.pop(group.plugin_id, None)
+    else:
+        if features.handle_group_pos:
+            canvas.settings.setValue("CanvasPositions/%s" % group_name, item.pos())
+            canvas.settings.setValue("CanvasPositions/%s_SPLIT" % group_name, SPLIT_NO)
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    if options.eyecandy == EYECANDY_FULL:
+        CanvasItemFX(item, False, True)
+    else:
+        item.removeIconFromScene()
+        canvas.scene.removeItem(item)
+        del item
 
-    qCritical("PatchCanvas::removeGroup(%i) - unable to find group to remove" % group_id)
+    canvas.model.removeGroup(group_id)
+    canvas.batch_boxes.discard(group.widgets[0])
+    canvas.batch_boxes.discard(group.widgets[1])
+    canvas.spatial_index.removeBox(group.widgets[0])
+    canvas.spatial_index.removeBox(group.widgets[1])
+    canvas.inline_display.removeBox(group.widgets[0])
+    canvas.inline_display.removeBox(group.widgets[1])
+
+    CanvasUpdateSceneLater()
 
 def renameGroup(group_id, new_group_name):
     if canvas.debug:
         print("PatchCanvas::renameGroup(%i, %s)" % (group_id, new_group_name.encode()))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            group.group_name = new_group_name
-            group.widgets[0].setGroupName(new_group_name)
+    group = canvas.group_map.get(group_id, None)
 
-            if group.split and group.widgets[1]:
-                group.widgets[1].setGroupName(new_group_name)
+    if group is None:
+        qCritical("PatchCanvas::renameGroup(%i, %s) - unable to find group to rename" % (
+                  group_id, new_group_name.encode()))
+        return
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    group.group_name = new_group_name
+    group.widgets[0].setGroupName(new_group_name)
+    canvas.model.renameGroup(group_id, new_group_name)
+
+    if group.split and group.widgets[1]:
+        group.widgets[1].setGroupName(new_group_name)
 
-    qCritical("PatchCanvas::renameGroup(%i, %s) - unable to find group to rename" % (group_id, new_group_name.encode()))
+    CanvasUpdateSceneLater()
 
 def splitGroup(group_id):
     if canvas.debug:
@@ -483,21 +601,21 @@ def splitGroup(group_id):
     conns_data = []
 
     # Step 1 - Store all Item data
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            if group.split:
-                if canvas.debug:
-                    print("PatchCanvas::splitGroup(%i) - group is already split" % group_id)
-                return
+    group = canvas.group_map.get(group_id, None)
 
-            item = group.widgets[0]
-            group_name = group.group_name
-            group_icon = group.icon
-            group_pos = item.pos()
-            plugin_id = group.plugin_id
-            plugin_ui = group.plugin_ui
-            plugin_inline = group.plugin_inline
-            break
+    if group is not None:
+        if group.split:
+            if canvas.debug:
+                print("PatchCanvas::splitGroup(%i) - group is already split" % group_id)
+            return
+
+        item = group.widgets[0]
+        group_name = group.group_name
+        group_icon = group.icon
+        group_pos = item.pos()
+        plugin_id = group.plugin_id
+        plugin_ui = group.plugin_ui
+        plugin_inline = group.plugin_inline
 
     if not item:
         qCritical("PatchCanvas::splitGroup(%i) - unable to find group to split" % group_id)
@@ -505,29 +623,36 @@ def splitGroup(group_id):
 
     port_list_ids = list(item.getPortList())
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id in port_list_ids:
-            port_dict = port_dict_t()
-            port_dict.group_id = port.group_id
-            port_dict.port_id = port.port_id
-            port_dict.port_name = port.port_name
-            port_dict.port_mode = port.port_mode
-            port_dict.port_type = port.port_type
-            port_dict.is_alternate = port.is_alternate
-            port_dict.widget = None
-            ports_data.append(port_dict)
-
-    for connection in canvas.connection_list:
-        if (connection.group_in_id == group_id and connection.port_in_id in port_list_ids) or \
-           (connection.group_out_id == group_id and connection.port_out_id in port_list_ids):
-            connection_dict = connection_dict_t()
-            connection_dict.connection_id = connection.connection_id
-            connection_dict.group_in_id = connection.group_in_id
-            connection_dict.port_in_id = connection.port_in_id
-            connection_dict.group_out_id = connection.group_out_id
-            connection_dict.port_out_id = connection.port_out_id
-            connection_dict.widget = None
-            conns_data.append(connection_dict)
+    connection_ids = set()
+
+    for port_id in port_list_ids:
+        port = canvas.port_map.get((group_id, port_id), None)
+
+        if port is None:
+            continue
+
+        port_dict = port_dict_t()
+        port_dict.group_id = port.group_id
+        port_dict.port_id = port.port_id
+        port_dict.port_name = port.port_name
+        port_dict.port_mode = port.port_mode
+        port_dict.port_type = port.port_type
+        port_dict.is_alternate = port.is_alternate
+        port_dict.widget = None
+        ports_data.append(port_dict)
+
+        connection_ids.update(canvas.model.port_connections.get((group_id, port_id), ()))
+
+    for connection_id in sorted(connection_ids):
+        connection = canvas.connection_map[connection_id]
+        connection_dict = connection_dict_t()
+        connection_dict.connection_id = connection.connection_id
+        connection_dict.group_in_id = connection.group_in_id
+        connection_dict.port_in_id = connection.port_in_id
+        connection_dict.group_out_id = connection.group_out_id
+        connection_dict.port_out_id = connection.port_out_id
+        connection_dict.widget = None
+        conns_data.append(connection_dict)
 
     # Step 2 - Remove Item and Children
     for conn in conns_data:
@@ -561,10 +686,11 @@ def splitGroup(group_id):
         group.widgets[1].setPos(group2_pos)
         group.widgets[1].checkItemPos()
         group.widgets[1].blockSignals(False)
+        storeGroupPosInModel(group)
         valueStr = "%i:%i:%i:%i" % (group_pos.x(), group_pos.y(), group2_pos.x(), group2_pos.y())
         CanvasCallback(ACTION_GROUP_POSITION, group_id, 0, valueStr)
 
-    QTimer.singleShot(0, canvas.scene.update)
+    CanvasUpdateSceneLater()
 
 def joinGroup(group_id):
     if canvas.debug:
@@ -582,22 +708,22 @@ def joinGroup(group_id):
     conns_data = []
 
     # Step 1 - Store all Item data
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            if not group.split:
-                if canvas.debug:
-                    print("PatchCanvas::joinGroup(%i) - group is not split" % group_id)
-                return
+    group = canvas.group_map.get(group_id, None)
 
-            item = group.widgets[0]
-            s_item = group.widgets[1]
-            group_name = group.group_name
-            group_icon = group.icon
-            group_pos = item.pos()
-            plugin_id = group.plugin_id
-            plugin_ui = group.plugin_ui
-            plugin_inline = group.plugin_inline
-            break
+    if group is not None:
+        if not group.split:
+            if canvas.debug:
+                print("PatchCanvas::joinGroup(%i) - group is not split" % group_id)
+            return
+
+        item = group.widgets[0]
+        s_item = group.widgets[1]
+        group_name = group.group_name
+        group_icon = group.icon
+        group_pos = item.pos()
+        plugin_id = group.plugin_id
+        plugin_ui = group.plugin_ui
+        plugin_inline = group.plugin_inline
 
     # FIXME
     if not (item and s_item):
@@ -611,29 +737,36 @@ def joinGroup(group_id):
         if port_id not in port_list_ids:
             port_list_ids.append(port_id)
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id in port_list_ids:
-            port_dict = port_dict_t()
-            port_dict.group_id = port.group_id
-            port_dict.port_id = port.port_id
-            port_dict.port_name = port.port_name
-            port_dict.port_mode = port.port_mode
-            port_dict.port_type = port.port_type
-            port_dict.is_alternate = port.is_alternate
-            port_dict.widget = None
-            ports_data.append(port_dict)
-
-    for connection in canvas.connection_list:
-        if (connection.group_in_id == group_id and connection.port_in_id in port_list_ids) or \
-           (connection.group_out_id == group_id and connection.port_out_id in port_list_ids):
-            connection_dict = connection_dict_t()
-            connection_dict.connection_id = connection.connection_id
-            connection_dict.group_in_id = connection.group_in_id
-            connection_dict.port_in_id = connection.port_in_id
-            connection_dict.group_out_id = connection.group_out_id
-            connection_dict.port_out_id = connection.port_out_id
-            connection_dict.widget = None
-            conns_data.append(connection_dict)
+    connection_ids = set()
+
+    for port_id in port_list_ids:
+        port = canvas.port_map.get((group_id, port_id), None)
+
+        if port is None:
+            continue
+
+        port_dict = port_dict_t()
+        port_dict.group_id = port.group_id
+        port_dict.port_id = port.port_id
+        port_dict.port_name = port.port_name
+        port_dict.port_mode = port.port_mode
+        port_dict.port_type = port.port_type
+        port_dict.is_alternate = port.is_alternate
+        port_dict.widget = None
+        ports_data.append(port_dict)
+
+        connection_ids.update(canvas.model.port_connections.get((group_id, port_id), ()))
+
+    for connection_id in sorted(connection_ids):
+        connection = canvas.connection_map[connection_id]
+        connection_dict = connection_dict_t()
+        connection_dict.connection_id = connection.connection_id
+        connection_dict.group_in_id = connection.group_in_id
+        connection_dict.port_in_id = connection.port_in_id
+        connection_dict.group_out_id = connection.group_out_id
+        connection_dict.port_out_id = connection.port_out_id
+        connection_dict.widget = None
+        conns_data.append(connection_dict)
 
     # Step 2 - Remove Item and Children
     for conn in conns_data:
@@ -661,10 +794,11 @@ def joinGroup(group_id):
         group.widgets[0].setPos(group_pos)
         group.widgets[0].checkItemPos()
         group.widgets[0].blockSignals(False)
+        storeGroupPosInModel(group)
         valueStr = "%i:%i:%i:%i" % (group_pos.x(), group_pos.y(), 0, 0)
         CanvasCallback(ACTION_GROUP_POSITION, group_id, 0, valueStr)
 
-    QTimer.singleShot(0, canvas.scene.update)
+    CanvasUpdateSceneLater()
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -672,12 +806,13 @@ def getGroupPos(group_id, port_mode=PORT_MODE_OUTPUT):
     if canvas.debug:
         print("PatchCanvas::getGroupPos(%i, %s)" % (group_id, port_mode2str(port_mode)))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            return group.widgets[1 if (group.split and port_mode == PORT_MODE_INPUT) else 0].pos()
+    group = canvas.group_map.get(group_id, None)
 
-    qCritical("PatchCanvas::getGroupPos(%i, %s) - unable to find group" % (group_id, port_mode2str(port_mode)))
-    return QPointF(0, 0)
+    if group is None:
+        qCritical("PatchCanvas::getGroupPos(%i, %s) - unable to find group" % (group_id, port_mode2str(port_mode)))
+        return QPointF(0, 0)
+
+    return group.widgets[1 if (group.split and port_mode == PORT_MODE_INPUT) else 0].pos()
 
 def saveGroupPositions():
     if canvas.debug:
@@ -685,7 +820,7 @@ def saveGroupPositions():
 
     ret = []
 
-    for group in canvas.group_list:
+    for group in canvas.group_map.values():
         if group.split:
             pos1 = group.widgets[0].pos()
             pos2 = group.widgets[1].pos()
@@ -710,7 +845,7 @@ def restoreGroupPositions(dataList):
 
     mapping = {}
 
-    for group in canvas.group_list:
+    for group in canvas.group_map.values():
         mapping[group.group_name] = group
 
     for data in dataList:
@@ -729,6 +864,8 @@ def restoreGroupPositions(dataList):
             group.widgets[1].setPos(data['pos2x'], data['pos2y'])
             group.widgets[1].blockSignals(False)
 
+        storeGroupPosInModel(group)
+
 def setGroupPos(group_id, group_pos_x, group_pos_y):
     setGroupPosFull(group_id, group_pos_x, group_pos_y, group_pos_x, group_pos_y)
 
@@ -737,24 +874,27 @@ def setGroupPosFull(group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group
         print("PatchCanvas::setGroupPos(%i, %i, %i, %i, %i)" % (
               group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group_pos_y_i))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            group.widgets[0].blockSignals(True)
-            group.widgets[0].setPos(group_pos_x_o, group_pos_y_o)
-            group.widgets[0].checkItemPos()
-            group.widgets[0].blockSignals(False)
+    group = canvas.group_map.get(group_id, None)
 
-            if group.split and group.widgets[1]:
-                group.widgets[1].blockSignals(True)
-                group.widgets[1].setPos(group_pos_x_i, group_pos_y_i)
-                group.widgets[1].checkItemPos()
-                group.widgets[1].blockSignals(False)
+    if group is None:
+        qCritical("PatchCanvas::setGroupPos(%i, %i, %i, %i, %i) - unable to find group to reposition" % (
+                  group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group_pos_y_i))
+        return
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    group.widgets[0].blockSignals(True)
+    group.widgets[0].setPos(group_pos_x_o, group_pos_y_o)
+    group.widgets[0].checkItemPos()
+    group.widgets[0].blockSignals(False)
 
-    qCritical("PatchCanvas::setGroupPos(%i, %i, %i, %i, %i) - unable to find group to reposition" % (
-              group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group_pos_y_i))
+    if group.split and group.widgets[1]:
+        group.widgets[1].blockSignals(True)
+        group.widgets[1].setPos(group_pos_x_i, group_pos_y_i)
+        group.widgets[1].checkItemPos()
+        group.widgets[1].blockSignals(False)
+
+    storeGroupPosInModel(group)
+
+    CanvasUpdateSceneLater()
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -762,39 +902,41 @@ def setGroupIcon(group_id, icon):
     if canvas.debug:
         print("PatchCanvas::setGroupIcon(%i, %s)" % (group_id, icon2str(icon)))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            group.icon = icon
-            group.widgets[0].setIcon(icon)
+    group = canvas.group_map.get(group_id, None)
 
-            if group.split and group.widgets[1]:
-                group.widgets[1].setIcon(icon)
+    if group is None:
+        qCritical("PatchCanvas::setGroupIcon(%i, %s) - unable to find group to change icon" % (group_id, icon2str(icon)))
+        return
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    group.icon = icon
+    group.widgets[0].setIcon(icon)
+    canvas.model.setGroupIcon(group_id, icon)
 
-    qCritical("PatchCanvas::setGroupIcon(%i, %s) - unable to find group to change icon" % (group_id, icon2str(icon)))
+    if group.split and group.widgets[1]:
+        group.widgets[1].setIcon(icon)
+
+    CanvasUpdateSceneLater()
 
 def setGroupAsPlugin(group_id, plugin_id, hasUI, hasInlineDisplay):
     if canvas.debug:
         print("PatchCanvas::setGroupAsPlugin(%i, %i, %s, %s)" % (
               group_id, plugin_id, bool2str(hasUI), bool2str(hasInlineDisplay)))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            group.plugin_id = plugin_id
-            group.plugin_ui = hasUI
-            group.plugin_inline = hasInlineDisplay
-            group.widgets[0].setAsPlugin(plugin_id, hasUI, hasInlineDisplay)
+    group = canvas.group_map.get(group_id, None)
 
-            if group.split and group.widgets[1]:
-                group.widgets[1].setAsPlugin(plugin_id, hasUI, hasInlineDisplay)
+    if group is None:
+        qCritical("PatchCanvas::setGroupAsPlugin(%i, %i, %s, %s) - unable to find group to set as plugin" % (
+                  group_id, plugin_id, bool2str(hasUI), bool2str(hasInlineDisplay)))
+        return
 
-            canvas.group_plugin_map[plugin_id] = group
-            return
+    group.plugin_id = plugin_id
+    group.plugin_ui = hasUI
+    group.plugin_inline = hasInlineDisplay
+    group.widgets[0].setAsPlugin(plugin_id, hasUI, hasInlineDisplay)
+    canvas.model.setGroupAsPlugin(group_id, plugin_id, hasUI, hasInlineDisplay)
 
-    qCritical("PatchCanvas::setGroupAsPlugin(%i, %i, %s, %s) - unable to find group to set as plugin" % (
-              group_id, plugin_id, bool2str(hasUI), bool2str(hasInlineDisplay)))
+    if group.split and group.widgets[1]:
+        group.widgets[1].setAsPlugin(plugin_id, hasUI, hasInlineDisplay)
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -805,19 +947,22 @@ def focusGroupUsingPluginId(plugin_id):
     if plugin_id < 0 or plugin_id >= MAX_PLUGIN_ID_ALLOWED:
         return False
 
-    for group in canvas.group_list:
-        if group.plugin_id == plugin_id:
-            item = group.widgets[0]
-            canvas.scene.clearSelection()
-            canvas.scene.getView().centerOn(item)
-            item.setSelected(True)
-            return True
+    group = CanvasGetPluginGroup(plugin_id)
+
+    if group is None:
+        return False
+
+    item = group.widgets[0]
+    canvas.scene.clearSelection()
+    canvas.scene.getView().centerOn(item)
+    item.setSelected(True)
+    return True
 
 def focusGroupUsingGroupName(group_name):
     if canvas.debug:
         print("PatchCanvas::focusGroupUsingGroupName(%s)" % (group_name,))
 
-    for group in canvas.group_list:
+    for group in canvas.group_map.values():
         if group.group_name == group_name:
             item = group.widgets[0]
             canvas.scene.clearSelection()
@@ -833,24 +978,23 @@ def addPort(group_id, port_id, port_name, port_mode, port_type, is_alternate=Fal
               group_id, port_id, port_name.encode(),
               port_mode2str(port_mode), port_type2str(port_type), bool2str(is_alternate)))
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id == port_id:
-            qWarning("PatchCanvas::addPort(%i, %i, %s, %s, %s) - port already exists" % (
-                     group_id, port_id, port_name.encode(), port_mode2str(port_mode), port_type2str(port_type)))
-            return
+    if (group_id, port_id) in canvas.port_map:
+        qWarning("PatchCanvas::addPort(%i, %i, %s, %s, %s) - port already exists" % (
+                 group_id, port_id, port_name.encode(), port_mode2str(port_mode), port_type2str(port_type)))
+        return
 
     box_widget = None
     port_widget = None
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            if group.split and group.widgets[0].getSplitMode() != port_mode and group.widgets[1]:
-                n = 1
-            else:
-                n = 0
-            box_widget = group.widgets[n]
-            port_widget = box_widget.addPortFromGroup(port_id, port_mode, port_type, port_name, is_alternate)
-            break
+    group = canvas.group_map.get(group_id, None)
+
+    if group is not None:
+        if group.split and group.widgets[0].getSplitMode() != port_mode and group.widgets[1]:
+            n = 1
+        else:
+            n = 0
+        box_widget = group.widgets[n]
+        port_widget = box_widget.addPortFromGroup(port_id, port_mode, port_type, port_name, is_alternate)
 
     if not (box_widget and port_widget):
         qCritical("PatchCanvas::addPort(%i, %i, %s, %s, %s) - Unable to find parent group" % (
@@ -865,7 +1009,8 @@ def addPort(group_id, port_id, port_name, port_mode, port_type, is_alternate=Fal
     port_dict.port_type = port_type
     port_dict.is_alternate = is_alternate
     port_dict.widget = port_widget
-    canvas.port_list.append(port_dict)
+    canvas.port_map[(group_id, port_id)] = port_dict
+    canvas.model.addPort(group_id, port_id, port_name, port_mode, port_type, is_alternate)
 
     box_widget.updatePositions()
 
@@ -873,45 +1018,49 @@ def addPort(group_id, port_id, port_name, port_mode, port_type, is_alternate=Fal
         CanvasItemFX(port_widget, True, False)
         return
 
-    QTimer.singleShot(0, canvas.scene.update)
+    CanvasUpdateSceneLater()
 
 def removePort(group_id, port_id):
     if canvas.debug:
         print("PatchCanvas::removePort(%i, %i)" % (group_id, port_id))
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id == port_id:
-            item = port.widget
-            try:
-                pitem = item.parentItem()
-                canvas.scene.removeItem(item)
-            except RuntimeError:
-                pass
-            else:
-                pitem.removePortFromGroup(port_id)
-            canvas.port_list.remove(port)
-            del item
+    port = canvas.port_map.pop((group_id, port_id), None)
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    if port is None:
+        qCritical("PatchCanvas::removePort(%i, %i) - Unable to find port to remove" % (group_id, port_id))
+        return
+
+    item = port.widget
+    try:
+        pitem = item.parentItem()
+        canvas.scene.removeItem(item)
+    except RuntimeError:
+        pass
+    else:
+        pitem.removePortFromGroup(port_id)
+    del item
 
-    qCritical("PatchCanvas::removePort(%i, %i) - Unable to find port to remove" % (group_id, port_id))
+    canvas.model.removePort(group_id, port_id)
+
+    CanvasUpdateSceneLater()
 
 def renamePort(group_id, port_id, new_port_name):
     if canvas.debug:
         print("PatchCanvas::renamePort(%i, %i, %s)" % (group_id, port_id, new_port_name.encode()))
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id == port_id:
-            port.port_name = new_port_name
-            port.widget.setPortName(new_port_name)
-            port.widget.parentItem().updatePositions()
+    port = canvas.port_map.get((group_id, port_id), None)
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    if port is None:
+        qCritical("PatchCanvas::renamePort(%i, %i, %s) - Unable to find port to rename" % (
+                  group_id, port_id, new_port_name.encode()))
+        return
+
+    port.port_name = new_port_name
+    port.widget.setPortName(new_port_name)
+    canvas.model.renamePort(group_id, port_id, new_port_name)
+    port.widget.parentItem().renamePortFromGroup(port_id, new_port_name)
 
-    qCritical("PatchCanvas::renamePort(%i, %i, %s) - Unable to find port to rename" % (
-              group_id, port_id, new_port_name.encode()))
+    CanvasUpdateSceneLater()
 
 def connectPorts(connection_id, group_out_id, port_out_id, group_in_id, port_in_id, fromSplitOrJoin = False):
     if canvas.last_connection_id >= connection_id and not fromSplitOrJoin:
@@ -930,13 +1079,15 @@ def connectPorts(connection_id, group_out_id, port_out_id, group_in_id, port_in_
     port_out_parent = None
     port_in_parent = None
 
-    for port in canvas.port_list:
-        if port.group_id == group_out_id and port.port_id == port_out_id:
-            port_out = port.widget
-            port_out_parent = port_out.parentItem()
-        elif port.group_id == group_in_id and port.port_id == port_in_id:
-            port_in = port.widget
-            port_in_parent = port_in.parentItem()
+    port = canvas.port_map.get((group_out_id, port_out_id), None)
+    if port is not None:
+        port_out = port.widget
+        port_out_parent = port_out.parentItem()
+
+    port = canvas.port_map.get((group_in_id, port_in_id), None)
+    if port is not None:
+        port_in = port.widget
+        port_in_parent = port_in.parentItem()
 
     # FIXME
     if not (port_out and port_in):
@@ -961,21 +1112,28 @@ def connectPorts(connection_id, group_out_id, port_out_id, group_in_id, port_in_
     port_out_parent.addLineFromGroup(connection_dict.widget, connection_id)
     port_in_parent.addLineFromGroup(connection_dict.widget, connection_id)
 
-    canvas.last_z_value += 1
-    port_out_parent.setZValue(canvas.last_z_value)
-    port_in_parent.setZValue(canvas.last_z_value)
+    canvas.spatial_index.markBoxDirty(port_out_parent)
+    canvas.spatial_index.markBoxDirty(port_in_parent)
 
-    canvas.last_z_value += 1
-    connection_dict.widget.setZValue(canvas.last_z_value)
+    if canvas.batch_depth > 0:
+        canvas.batch_lines[connection_id] = connection_dict.widget
+    else:
+        canvas.last_z_value += 1
+        port_out_parent.setZValue(canvas.last_z_value)
+        port_in_parent.setZValue(canvas.last_z_value)
 
-    canvas.connection_list.append(connection_dict)
+        canvas.last_z_value += 1
+        connection_dict.widget.setZValue(canvas.last_z_value)
+
+    canvas.connection_map[connection_id] = connection_dict
+    canvas.model.connectPorts(connection_id, group_out_id, port_out_id, group_in_id, port_in_id)
 
     if options.eyecandy == EYECANDY_FULL:
         item = connection_dict.widget
         CanvasItemFX(item, True, False)
         return
 
-    QTimer.singleShot(0, canvas.scene.update)
+    CanvasUpdateSceneLater()
 
 def disconnectPorts(connection_id):
     if canvas.debug:
@@ -987,33 +1145,33 @@ def disconnectPorts(connection_id):
     group1id = port1id = 0
     group2id = port2id = 0
 
-    for connection in canvas.connection_list:
-        if connection.connection_id == connection_id:
-            group1id = connection.group_out_id
-            group2id = connection.group_in_id
-            port1id = connection.port_out_id
-            port2id = connection.port_in_id
-            line = connection.widget
-            canvas.connection_list.remove(connection)
-            break
+    connection = canvas.connection_map.pop(connection_id, None)
+
+    if connection is not None:
+        group1id = connection.group_out_id
+        group2id = connection.group_in_id
+        port1id = connection.port_out_id
+        port2id = connection.port_in_id
+        line = connection.widget
+        canvas.batch_lines.pop(connection_id, None)
+        canvas.spatial_index.removeLine(line)
+        canvas.model.disconnectPorts(connection_id)
 
     if not line:
         qCritical("PatchCanvas::disconnectPorts(%i) - unable to find connection ports" % connection_id)
         return
 
-    for port in canvas.port_list:
-        if port.group_id == group1id and port.port_id == port1id:
-            item1 = port.widget
-            break
+    port = canvas.port_map.get((group1id, port1id), None)
+    if port is not None:
+        item1 = port.widget
 
     if not item1:
         qCritical("PatchCanvas::disconnectPorts(%i) - unable to find output port" % connection_id)
         return
 
-    for port in canvas.port_list:
-        if port.group_id == group2id and port.port_id == port2id:
-            item2 = port.widget
-            break
+    port = canvas.port_map.get((group2id, port2id), None)
+    if port is not None:
+        item2 = port.widget
 
     if not item2:
         qCritical("PatchCanvas::disconnectPorts(%i) - unable to find input port" % connection_id)
@@ -1033,13 +1191,70 @@ def disconnectPorts(connection_id):
     canvas.scene.removeItem(line)
     del line
 
-    QTimer.singleShot(0, canvas.scene.update)
+    CanvasUpdateSceneLater()
 
 # ------------------------------------------------------------------------------------------------------------
 
-def arrange():
+ARRANGE_MARGIN = 20
+ARRANGE_THREAD_MIN_NODES = 500
+
+def arrange(threaded=None):
     if canvas.debug:
-        print("PatchCanvas::arrange()")
+        print("PatchCanvas::arrange(%s)" % threaded)
+
+    if canvas.arrange_thread is not None:
+        qWarning("PatchCanvas::arrange() - already arranging")
+        return
+
+    # Layout nodes come from the model, sized after the boxes
+    def boxSize(group, index):
+        rect = canvas.group_map[group.group_id].widgets[index].boundingRect()
+        return (rect.width(), rect.height())
+
+    nodes, edges = canvas.model.getLayoutGraph(boxSize)
+
+    if not nodes:
+        return
+
+    origin_x = min(canvas.group_map[group_id].widgets[i].x() for group_id, i in nodes)
+    origin_y = min(canvas.group_map[group_id].widgets[i].y() for group_id, i in nodes)
+
+    # Position values of 0 have a special meaning for split groups, keep a margin
+    origin_x = max(ARRANGE_MARGIN, origin_x)
+    origin_y = max(ARRANGE_MARGIN, origin_y)
+
+    if threaded is None:
+        threaded = len(nodes) >= ARRANGE_THREAD_MIN_NODES
+
+    if not threaded:
+        applyArrangedPositions(computeLayeredLayout(nodes, edges, origin_x, origin_y))
+        return
+
+    canvas.arrange_thread = ArrangeThread(nodes, edges, origin_x, origin_y)
+    canvas.arrange_thread.finished.connect(canvas.qobject.ArrangeThreadFinished)
+    canvas.arrange_thread.start()
+
+def applyArrangedPositions(positions):
+    if canvas.debug:
+        print("PatchCanvas::applyArrangedPositions(...)")
+
+    # Groups might have changed in the meantime (when arranging in a thread), skip unknown ones
+    for group in list(canvas.group_map.values()):
+        pos_o = positions.get((group.group_id, 0), None)
+
+        if pos_o is None:
+            continue
+
+        split = bool(group.split and group.widgets[1])
+        pos_i = positions.get((group.group_id, 1), pos_o) if split else pos_o
+
+        setGroupPosFull(group.group_id, pos_o[0], pos_o[1], pos_i[0], pos_i[1])
+
+        # setGroupPosFull blocks box signals, report the new positions so they get saved
+        pos1 = group.widgets[0].pos()
+        pos2 = group.widgets[1].pos() if split else QPointF(0, 0)
+        valueStr = "%i:%i:%i:%i" % (pos1.x(), pos1.y(), pos2.x(), pos2.y())
+        CanvasCallback(ACTION_GROUP_POSITION, group.group_id, 0, valueStr)
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -1047,7 +1262,7 @@ def updateZValues():
     if canvas.debug:
         print("PatchCanvas::updateZValues()")
 
-    for group in canvas.group_list:
+    for group in canvas.group_map.values():
         group.widgets[0].resetLinesZValue()
 
         if group.split and group.widgets[1]:
@@ -1056,7 +1271,7 @@ def updateZValues():
 # ------------------------------------------------------------------------------------------------------------
 
 def redrawPluginGroup(plugin_id):
-    group = canvas.group_plugin_map.get(plugin_id, None)
+    group = CanvasGetPluginGroup(plugin_id)
 
     if group is None:
         #qCritical("PatchCanvas::redrawPluginGroup(%i) - unable to find group" % plugin_id)
@@ -1072,37 +1287,38 @@ def handlePluginRemoved(plugin_id):
         print("PatchCanvas::handlePluginRemoved(%i)" % plugin_id)
 
     canvas.scene.clearSelection()
+    canvas.model.handlePluginRemoved(plugin_id)
 
-    group = canvas.group_plugin_map.pop(plugin_id, None)
+    # the model has moved the plugin ids, bring the boxes in line with it
+    for group in canvas.group_map.values():
+        model_group = canvas.model.group_map.get(group.group_id, None)
 
-    if group is not None:
-        group.plugin_id = -1
-        group.plugin_ui = False
-        group.plugin_inline = False
-        group.widgets[0].removeAsPlugin()
+        if model_group is None or model_group.plugin_id == group.plugin_id:
+            continue
 
-        if group.split and group.widgets[1]:
-            group.widgets[1].removeAsPlugin()
+        if model_group.plugin_id < 0:
+            group.plugin_id = -1
+            group.plugin_ui = False
+            group.plugin_inline = False
+            group.widgets[0].removeAsPlugin()
 
-    for group in canvas.group_list:
-        if group.plugin_id < plugin_id or group.plugin_id > MAX_PLUGIN_ID_ALLOWED:
+            if group.split and group.widgets[1]:
+                group.widgets[1].removeAsPlugin()
             continue
 
-        group.plugin_id -= 1
-        group.widgets[0].m_plugin_id -= 1
+        group.plugin_id = model_group.plugin_id
+        group.widgets[0].m_plugin_id = group.plugin_id
 
         if group.split and group.widgets[1]:
-            group.widgets[1].m_plugin_id -= 1
-
-        canvas.group_plugin_map[plugin_id] = group
+            group.widgets[1].m_plugin_id = group.plugin_id
 
 def handleAllPluginsRemoved():
     if canvas.debug:
         print("PatchCanvas::handleAllPluginsRemoved()")
 
-    canvas.group_plugin_map = {}
+    canvas.model.handleAllPluginsRemoved()
 
-    for group in canvas.group_list:
+    for group in canvas.group_map.values():
         if group.plugin_id < 0:
             continue
         if group.plugin_id > MAX_PLUGIN_ID_ALLOWED:
@@ -1117,3 +1333,119 @@ def handleAllPluginsRemoved():
             group.widgets[1].removeAsPlugin()
 
 # ------------------------------------------------------------------------------------------------------------
+
+def exportGraphSnapshot():
+    if canvas.debug:
+        print("PatchCanvas::exportGraphSnapshot()")
+
+    # boxes can be moved without notice (like by checkItemPos), take their current positions
+    for group in canvas.group_map.values():
+        storeGroupPosInModel(group)
+
+    return canvas.model.exportSnapshot()
+
+# Bring the canvas to the state of a full snapshot, only applying what changed
+# With full_reload, or when the snapshot ids do not match the canvas ones, everything is removed and added again.
+# clear() keeps group positions by name, so boxes still end up where they were.
+def loadGraphSnapshot(snapshot, full_reload=False):
+    if canvas.debug:
+        print("PatchCanvas::loadGraphSnapshot(..., %s)" % bool2str(full_reload))
+
+    current = exportGraphSnapshot()
+
+    if full_reload or graphSnapshotIdsChanged(current, snapshot):
+        clear()
+        current = newGraphSnapshot()
+
+    delta = diffGraphSnapshots(current, snapshot)
+    applyGraphDiff(delta)
+
+    # connection ids start again on each host refresh
+    canvas.last_connection_id = max(snapshot['connections'].keys(), default=0)
+
+    return delta
+
+def applyGraphDiff(delta):
+    if canvas.debug:
+        print("PatchCanvas::applyGraphDiff(...)")
+
+    if isGraphDiffEmpty(delta):
+        return
+
+    beginBatch()
+
+    try:
+        for connection_id in delta['connections_removed']:
+            disconnectPorts(connection_id)
+
+        for group_id, port_id in delta['ports_removed']:
+            removePort(group_id, port_id)
+
+        for group_id in delta['groups_removed']:
+            removeGroup(group_id)
+
+        for group_id, data in delta['groups_added'].items():
+            split = data[SNAPSHOT_GROUP_SPLIT]
+            if split is None:
+                split = SPLIT_UNDEF
+            else:
+                split = SPLIT_YES if split else SPLIT_NO
+
+            addGroup(group_id, data[SNAPSHOT_GROUP_NAME], split, data[SNAPSHOT_GROUP_ICON])
+            applyGroupSnapshotData(group_id, None, data)
+
+        for group_id, (old_data, new_data) in delta['groups_changed'].items():
+            applyGroupSnapshotData(group_id, old_data, new_data)
+
+        for (group_id, port_id), data in delta['ports_added'].items():
+            addPort(group_id, port_id, data[0], data[1], data[2], data[3])
+
+        for (group_id, port_id), port_name in delta['ports_renamed'].items():
+            renamePort(group_id, port_id, port_name)
+
+        for connection_id in sorted(delta['connections_added'].keys()):
+            group_out_id, port_out_id, group_in_id, port_in_id = delta['connections_added'][connection_id]
+            connectPorts(connection_id, group_out_id, port_out_id, group_in_id, port_in_id, True)
+
+    finally:
+        endBatch()
+
+def applyGroupSnapshotData(group_id, old_data, new_data):
+    if old_data is not None:
+        if new_data[SNAPSHOT_GROUP_NAME] != old_data[SNAPSHOT_GROUP_NAME]:
+            renameGroup(group_id, new_data[SNAPSHOT_GROUP_NAME])
+        if new_data[SNAPSHOT_GROUP_ICON] != old_data[SNAPSHOT_GROUP_ICON]:
+            setGroupIcon(group_id, new_data[SNAPSHOT_GROUP_ICON])
+
+        split = new_data[SNAPSHOT_GROUP_SPLIT]
+        if split is not None and split != old_data[SNAPSHOT_GROUP_SPLIT]:
+            if split:
+                splitGroup(group_id)
+            else:
+                joinGroup(group_id)
+
+    plugin_data = new_data[SNAPSHOT_GROUP_PLUGIN_ID:SNAPSHOT_GROUP_PLUGIN_INLINE + 1]
+
+    if old_data is None or plugin_data != old_data[SNAPSHOT_GROUP_PLUGIN_ID:SNAPSHOT_GROUP_PLUGIN_INLINE + 1]:
+        group = canvas.group_map.get(group_id, None)
+
+        if group is not None:
+            if plugin_data[0] >= 0:
+                setGroupAsPlugin(group_id, plugin_data[0], plugin_data[1], plugin_data[2])
+
+            elif group.plugin_id >= 0:
+                group.plugin_id = -1
+                group.plugin_ui = False
+                group.plugin_inline = False
+                group.widgets[0].removeAsPlugin()
+                canvas.model.setGroupAsPlugin(group_id, -1, False, False)
+
+                if group.split and group.widgets[1]:
+                    group.widgets[1].removeAsPlugin()
+
+    pos = new_data[SNAPSHOT_GROUP_POS]
+
+    if pos is not None and (old_data is None or pos != old_data[SNAPSHOT_GROUP_POS]):
+        setGroupPosFull(group_id, pos[0], pos[1], pos[2], pos[3])
+
+# ------------------------------------------------------------------------------------------------------------
@@ -22,7 +22,7 @@
 from math import floor
 
 from PyQt5.QtCore import QT_VERSION, pyqtSignal, pyqtSlot, qFatal, Qt, QPointF, QRectF
-from PyQt5.QtGui import QCursor, QPixmap, QPolygonF
+from PyQt5.QtGui import QCursor, QPainterPath, QPixmap, QPolygonF
 from PyQt5.QtWidgets import QGraphicsRectItem, QGraphicsScene
 
 # ------------------------------------------------------------------------------------------------------------
@@ -40,6 +40,8 @@ from . import (
     MAX_PLUGIN_ID_ALLOWED,
 )
 
+from .utils import CanvasSetScaleFactor
+
 # ------------------------------------------------------------------------------------------------------------
 
 class RubberbandRect(QGraphicsRectItem):
@@ -83,6 +85,7 @@ class PatchScene(QGraphicsScene):
 
         self.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.selectionChanged.connect(self.slot_selectionChanged)
+        self.scaleChanged.connect(self.slot_scaleChanged)
 
     def getDevicePixelRatioF(self):
         if QT_VERSION < 0x50600:
@@ -208,7 +211,7 @@ class PatchScene(QGraphicsScene):
                 self.fixScaleFactor()
 
             else:
-                items_list = self.items()
+                items_list = canvas.spatial_index.boxesIn(self.m_rubberband.rect())
                 for item in items_list:
                     if item and item.isVisible() and item.type() == CanvasBoxType:
                         item_rect = item.sceneBoundingRect()
@@ -274,6 +277,10 @@ class PatchScene(QGraphicsScene):
 
         self.pluginSelected.emit(plugin_list)
 
+    @pyqtSlot(float)
+    def slot_scaleChanged(self, scale):
+        CanvasSetScaleFactor(scale)
+
     def keyPressEvent(self, event):
         if not self.m_view:
             event.ignore()
@@ -357,9 +364,11 @@ class PatchScene(QGraphicsScene):
 
         if self.m_connection_cut_mode:
             trail = QPolygonF([event.scenePos(), event.lastScenePos(), event.scenePos()])
-            items = self.items(trail)
-            for item in items:
-                if item and item.type() in (CanvasLineType, CanvasBezierLineType):
+            trail_path = QPainterPath()
+            trail_path.addPolygon(trail)
+            trail_rect = trail.boundingRect().adjusted(-1, -1, 1, 1)
+            for item in canvas.spatial_index.linesIn(trail_rect):
+                if item.collidesWithPath(item.mapFromScene(trail_path)):
                     item.triggerDisconnect()
 
         QGraphicsScene.mouseMoveEvent(self, event)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchBay Canvas engine using QGraphicsView/Scene
+# Copyright (C) 2010-2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Graph snapshots, a compact and diffable description of the whole patchbay.
+#
+# Works on plain python data only:
+#  - groups:      group_id -> [name, icon, split, plugin_id, plugin_ui, plugin_inline, pos]
+#  - ports:       (group_id, port_id) -> [name, mode, type, is_alternate]
+#  - connections: connection_id -> [group_out_id, port_out_id, group_in_id, port_in_id]
+# A group split or pos of None means unknown, and is left as-is when applied.
+# pos is a (x1, y1, x2, y2) tuple, like setGroupPosFull() arguments.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom)
+
+from . import ICON_APPLICATION, SPLIT_NO, SPLIT_YES
+
+# ------------------------------------------------------------------------------------------------------------
+
+GRAPH_SNAPSHOT_VERSION = 1
+
+# group data indexes
+SNAPSHOT_GROUP_NAME          = 0
+SNAPSHOT_GROUP_ICON          = 1
+SNAPSHOT_GROUP_SPLIT         = 2
+SNAPSHOT_GROUP_PLUGIN_ID     = 3
+SNAPSHOT_GROUP_PLUGIN_UI     = 4
+SNAPSHOT_GROUP_PLUGIN_INLINE = 5
+SNAPSHOT_GROUP_POS           = 6
+
+# ------------------------------------------------------------------------------------------------------------
+
+def newGraphSnapshot():
+    return {
+        'version': GRAPH_SNAPSHOT_VERSION,
+        'groups': {},
+        'ports': {},
+        'connections': {},
+    }
+
+# ------------------------------------------------------------------------------------------------------------
+
+def diffGraphSnapshots(old, new):
+    delta = {
+        'groups_added': {},
+        'groups_removed': [],
+        'groups_changed': {}, # group_id -> (old data, new data)
+        'ports_added': {},
+        'ports_removed': [],
+        'ports_renamed': {},
+        'connections_added': {},
+        'connections_removed': [],
+    }
+
+    old_groups = old['groups']
+    new_groups = new['groups']
+
+    for group_id, old_data in old_groups.items():
+        new_data = new_groups.get(group_id, None)
+
+        if new_data is None:
+            delta['groups_removed'].append(group_id)
+            continue
+
+        for i, value in enumerate(new_data):
+            if value is not None and value != old_data[i]:
+                delta['groups_changed'][group_id] = (old_data, new_data)
+                break
+
+    for group_id, new_data in new_groups.items():
+        if group_id not in old_groups:
+            delta['groups_added'][group_id] = new_data
+
+    # ports changing mode or type are removed and added again
+    old_ports = old['ports']
+    new_ports = new['ports']
+
+    for key, old_data in old_ports.items():
+        new_data = new_ports.get(key, None)
+        if new_data is None or new_data[1:] != old_data[1:]:
+            delta['ports_removed'].append(key)
+        elif new_data[0] != old_data[0]:
+            delta['ports_renamed'][key] = new_data[0]
+
+    for key, new_data in new_ports.items():
+        old_data = old_ports.get(key, None)
+        if old_data is None or old_data[1:] != new_data[1:]:
+            delta['ports_added'][key] = new_data
+
+    # connections to re-created ports need to be re-created too
+    recreated_ports = set(delta['ports_removed'])
+    old_connections = old['connections']
+    new_connections = new['connections']
+
+    for connection_id, old_data in old_connections.items():
+        new_data = new_connections.get(connection_id, None)
+        if (new_data != old_data or
+            (old_data[0], old_data[1]) in recreated_ports or (old_data[2], old_data[3]) in recreated_ports):
+            delta['connections_removed'].append(connection_id)
+
+    removed_connections = set(delta['connections_removed'])
+
+    for connection_id, new_data in new_connections.items():
+        if connection_id not in old_connections or connection_id in removed_connections:
+            delta['connections_added'][connection_id] = new_data
+
+    return delta
+
+# Hosts may give existing groups and ports new ids on refresh, or reuse ids for other clients.
+# Diffing by id would then rename boxes in place, keeping the position and split of another client.
+def graphSnapshotIdsChanged(old, new):
+    old_groups = old['groups']
+    new_groups = new['groups']
+
+    for group_id, new_data in new_groups.items():
+        old_data = old_groups.get(group_id, None)
+        if old_data is not None and old_data[SNAPSHOT_GROUP_NAME] != new_data[SNAPSHOT_GROUP_NAME]:
+            return True
+
+    old_group_ids = dict((data[SNAPSHOT_GROUP_NAME], group_id) for group_id, data in old_groups.items())
+
+    for group_id, new_data in new_groups.items():
+        if old_group_ids.get(new_data[SNAPSHOT_GROUP_NAME], group_id) != group_id:
+            return True
+
+    old_port_ids = dict(((group_id, data[0]), port_id) for (group_id, port_id), data in old['ports'].items())
+
+    for (group_id, port_id), new_data in new['ports'].items():
+        if old_port_ids.get((group_id, new_data[0]), port_id) != port_id:
+            return True
+
+    return False
+
+def isGraphDiffEmpty(delta):
+    for value in delta.values():
+        if value:
+            return False
+    return True
+
+# ------------------------------------------------------------------------------------------------------------
+# Collects patchbay changes into a snapshot instead of applying them to the canvas.
+# Mirrors the patchcanvas functions used by hosts, so it can stand in for the module while replaying callbacks.
+
+class GraphSnapshotRecorder(object):
+    def __init__(self):
+        self.m_snapshot = newGraphSnapshot()
+
+    def snapshot(self):
+        return self.m_snapshot
+
+    def addGroup(self, group_id, group_name, split=None, icon=ICON_APPLICATION):
+        if split == SPLIT_YES:
+            split = True
+        elif split == SPLIT_NO:
+            split = False
+        else:
+            split = None
+
+        self.m_snapshot['groups'][group_id] = [group_name, icon, split, -1, False, False, None]
+
+    def removeGroup(self, group_id):
+        self.m_snapshot['groups'].pop(group_id, None)
+
+        ports = self.m_snapshot['ports']
+        for key in [key for key in ports if key[0] == group_id]:
+            del ports[key]
+
+        connections = self.m_snapshot['connections']
+        for connection_id in [connection_id for connection_id, data in connections.items()
+                              if data[0] == group_id or data[2] == group_id]:
+            del connections[connection_id]
+
+    def renameGroup(self, group_id, new_group_name):
+        self._setGroupValue(group_id, SNAPSHOT_GROUP_NAME, new_group_name)
+
+    def setGroupIcon(self, group_id, icon):
+        self._setGroupValue(group_id, SNAPSHOT_GROUP_ICON, icon)
+
+    def setGroupAsPlugin(self, group_id, plugin_id, hasUI, hasInlineDisplay):
+        self._setGroupValue(group_id, SNAPSHOT_GROUP_PLUGIN_ID, plugin_id)
+        self._setGroupValue(group_id, SNAPSHOT_GROUP_PLUGIN_UI, hasUI)
+        self._setGroupValue(group_id, SNAPSHOT_GROUP_PLUGIN_INLINE, hasInlineDisplay)
+
+    def splitGroup(self, group_id):
+        self._setGroupValue(group_id, SNAPSHOT_GROUP_SPLIT, True)
+
+    def joinGroup(self, group_id):
+        self._setGroupValue(group_id, SNAPSHOT_GROUP_SPLIT, False)
+
+    def setGroupPosFull(self, group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group_pos_y_i):
+        self._setGroupValue(group_id, SNAPSHOT_GROUP_POS,
+                            (group_pos_x_o, group_pos_y_o, group_pos_x_i, group_pos_y_i))
+
+    def addPort(self, group_id, port_id, port_name, port_mode, port_type, is_alternate=False):
+        self.m_snapshot['ports'][(group_id, port_id)] = [port_name, port_mode, port_type, is_alternate]
+
+    def removePort(self, group_id, port_id):
+        self.m_snapshot['ports'].pop((group_id, port_id), None)
+
+        key = [group_id, port_id]
+        connections = self.m_snapshot['connections']
+        for connection_id in [connection_id for connection_id, data in connections.items()
+                              if data[0:2] == key or data[2:4] == key]:
+            del connections[connection_id]
+
+    def renamePort(self, group_id, port_id, new_port_name):
+        port = self.m_snapshot['ports'].get((group_id, port_id), None)
+        if port is not None:
+            port[0] = new_port_name
+
+    def connectPorts(self, connection_id, group_out_id, port_out_id, group_in_id, port_in_id):
+        self.m_snapshot['connections'][connection_id] = [group_out_id, port_out_id, group_in_id, port_in_id]
+
+    def disconnectPorts(self, connection_id):
+        self.m_snapshot['connections'].pop(connection_id, None)
+
+    def _setGroupValue(self, group_id, index, value):
+        group = self.m_snapshot['groups'].get(group_id, None)
+        if group is not None:
+            group[index] = value
+
+# ------------------------------------------------------------------------------------------------------------
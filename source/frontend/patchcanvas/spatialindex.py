@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchBay Canvas engine using QGraphicsView/Scene
+# Copyright (C) 2010-2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+from math import floor
+
+from PyQt5.QtCore import QRectF
+
+# ------------------------------------------------------------------------------------------------------------
+
+SPATIAL_GRID_CELL_SIZE = 256
+SPATIAL_GRID_MAX_CELLS = 64
+
+# ------------------------------------------------------------------------------------------------------------
+# Uniform grid of scene rectangles, keyed by any hashable object.
+# Rectangles covering too many cells are kept aside and always checked.
+
+class SpatialGrid(object):
+    def __init__(self, cell_size=SPATIAL_GRID_CELL_SIZE):
+        self.m_cell_size = cell_size
+        self.m_cells = {}  # (cell_x, cell_y) -> set of keys
+        self.m_rects = {}  # key -> (rect, list of cells)
+        self.m_large = set()
+
+    def clear(self):
+        self.m_cells = {}
+        self.m_rects = {}
+        self.m_large = set()
+
+    def cellRange(self, rect):
+        size = self.m_cell_size
+        return (int(floor(rect.left() / size)), int(floor(rect.top() / size)),
+                int(floor(rect.right() / size)), int(floor(rect.bottom() / size)))
+
+    def insert(self, key, rect):
+        self.remove(key)
+
+        x1, y1, x2, y2 = self.cellRange(rect)
+
+        if (x2 - x1 + 1) * (y2 - y1 + 1) > SPATIAL_GRID_MAX_CELLS:
+            self.m_large.add(key)
+            self.m_rects[key] = (QRectF(rect), None)
+            return
+
+        cells = []
+        for cell_x in range(x1, x2 + 1):
+            for cell_y in range(y1, y2 + 1):
+                cell = (cell_x, cell_y)
+                self.m_cells.setdefault(cell, set()).add(key)
+                cells.append(cell)
+
+        self.m_rects[key] = (QRectF(rect), cells)
+
+    def remove(self, key):
+        data = self.m_rects.pop(key, None)
+
+        if data is None:
+            return
+
+        cells = data[1]
+
+        if cells is None:
+            self.m_large.discard(key)
+            return
+
+        for cell in cells:
+            keys = self.m_cells.get(cell, None)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self.m_cells[cell]
+
+    def query(self, rect):
+        x1, y1, x2, y2 = self.cellRange(rect)
+        candidates = set(self.m_large)
+
+        if (x2 - x1 + 1) * (y2 - y1 + 1) > len(self.m_cells):
+            for keys in self.m_cells.values():
+                candidates.update(keys)
+        else:
+            for cell_x in range(x1, x2 + 1):
+                for cell_y in range(y1, y2 + 1):
+                    keys = self.m_cells.get((cell_x, cell_y), None)
+                    if keys is not None:
+                        candidates.update(keys)
+
+        return [key for key in candidates if self.m_rects[key][0].intersects(rect)]
+
+    def queryPoint(self, point):
+        size = self.m_cell_size
+        candidates = set(self.m_large)
+
+        keys = self.m_cells.get((int(floor(point.x() / size)), int(floor(point.y() / size))), None)
+        if keys is not None:
+            candidates.update(keys)
+
+        return [key for key in candidates if self.m_rects[key][0].contains(point)]
+
+# ------------------------------------------------------------------------------------------------------------
+# Index of canvas boxes and connection lines.
+# Boxes are marked dirty when moved or resized, and re-indexed together with their lines on the next query.
+
+class CanvasSpatialIndex(object):
+    def __init__(self):
+        self.m_boxes = SpatialGrid()
+        self.m_lines = SpatialGrid()
+        self.m_dirty_boxes = set()
+
+    def clear(self):
+        self.m_boxes.clear()
+        self.m_lines.clear()
+        self.m_dirty_boxes = set()
+
+    def markBoxDirty(self, box):
+        self.m_dirty_boxes.add(box)
+
+    def removeBox(self, box):
+        self.m_dirty_boxes.discard(box)
+        self.m_boxes.remove(box)
+
+    def removeLine(self, line):
+        self.m_lines.remove(line)
+
+    def flush(self):
+        if not self.m_dirty_boxes:
+            return
+
+        boxes = self.m_dirty_boxes
+        self.m_dirty_boxes = set()
+
+        for box in boxes:
+            self.m_boxes.insert(box, box.sceneBoundingRect())
+
+            for connection in box.m_connection_lines.values():
+                self.m_lines.insert(connection.line, connection.line.sceneBoundingRect())
+
+    def boxesAt(self, point):
+        self.flush()
+        return [box for box in self.m_boxes.queryPoint(point) if box.isVisible()]
+
+    def boxesIn(self, rect, visible_only=True):
+        self.flush()
+        if not visible_only:
+            return self.m_boxes.query(rect)
+        return [box for box in self.m_boxes.query(rect) if box.isVisible()]
+
+    def linesIn(self, rect):
+        self.flush()
+        return [line for line in self.m_lines.query(rect) if line.isVisible()]
+
+    # Topmost visible port at point, ports of boxes with higher z-value win
+    def portAt(self, point, exclude=None):
+        found = None
+        found_z = None
+
+        for box in self.boxesAt(point):
+            z_value = box.zValue()
+
+            if found is not None and z_value <= found_z:
+                continue
+
+            for port in box.getPortDictList():
+                widget = port.widget
+                if widget is exclude or not widget.isVisible():
+                    continue
+                if widget.sceneBoundingRect().contains(point):
+                    found = widget
+                    found_z = z_value
+                    break
+
+        return found
+
+# ------------------------------------------------------------------------------------------------------------
@@ -19,14 +19,45 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
-from PyQt5.QtCore import qCritical, QPointF, QTimer
+from functools import lru_cache
+
+from PyQt5.QtCore import qCritical, QT_VERSION, QPointF, QRectF, QTimer
+from PyQt5.QtGui import QFontMetrics
+from PyQt5.QtWidgets import QGraphicsObject
 
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Custom)
 
-from . import bool2str, canvas, CanvasBoxType
+from . import bool2str, canvas, options, CanvasBoxType
 from .canvasfadeanimation import CanvasFadeAnimation
 
+# ------------------------------------------------------------------------------------------------------------
+# Text width, cached per font and string.
+# Backwards-compatible horizontalAdvance/width call, depending on Qt version
+
+TEXT_WIDTH_CACHE_SIZE = 8192
+
+_font_metrics = {} # font key -> QFontMetrics
+
+@lru_cache(maxsize=TEXT_WIDTH_CACHE_SIZE)
+def _fontKeyHorizontalAdvance(font_key, string):
+    if QT_VERSION >= 0x50b00:
+        return _font_metrics[font_key].horizontalAdvance(string)
+    return _font_metrics[font_key].width(string)
+
+def fontHorizontalAdvance(font, string):
+    font_key = font.key()
+
+    if font_key not in _font_metrics:
+        _font_metrics[font_key] = QFontMetrics(font)
+
+    return _fontKeyHorizontalAdvance(font_key, string)
+
+# Called on theme changes
+def fontHorizontalAdvanceCacheClear():
+    _font_metrics.clear()
+    _fontKeyHorizontalAdvance.cache_clear()
+
 # ------------------------------------------------------------------------------------------------------------
 
 def CanvasGetNewGroupPos(horizontal):
@@ -34,29 +65,25 @@ def CanvasGetNewGroupPos(horizontal):
         print("PatchCanvas::CanvasGetNewGroupPos(%s)" % bool2str(horizontal))
 
     new_pos = QPointF(canvas.initial_pos)
-    items = canvas.scene.items()
 
-    #break_loop = False
+    # move past any box at the candidate position, hidden ones included, topmost first like scene.items()
     while True:
-        break_for = False
-        for i, item in enumerate(items):
-            if item and item.type() == CanvasBoxType:
-                if item.sceneBoundingRect().adjusted(-5, -5, 5, 5).contains(new_pos):
-                    itemRect = item.boundingRect()
-                    if horizontal:
-                        new_pos += QPointF(itemRect.width() + 50, 0)
-                    else:
-                        itemHeight = itemRect.height()
-                        if itemHeight < 30:
-                            new_pos += QPointF(0, itemHeight + 50)
-                        else:
-                            new_pos.setY(item.scenePos().y() + itemHeight + 20)
-                    break_for = True
-                    break
+        items = canvas.spatial_index.boxesIn(QRectF(new_pos.x() - 5, new_pos.y() - 5, 10, 10), False)
+
+        if not items:
+            break
+
+        item = max(items, key=lambda box: box.zValue())
+        itemRect = item.boundingRect()
+
+        if horizontal:
+            new_pos += QPointF(itemRect.width() + 50, 0)
         else:
-            if not break_for:
-                break
-            #break_loop = True
+            itemHeight = itemRect.height()
+            if itemHeight < 30:
+                new_pos += QPointF(0, itemHeight + 50)
+            else:
+                new_pos.setY(item.scenePos().y() + itemHeight + 20)
 
     return new_pos
 
@@ -64,24 +91,35 @@ def CanvasGetFullPortName(group_id, port_id):
     if canvas.debug:
         print("PatchCanvas::CanvasGetFullPortName(%i, %i)" % (group_id, port_id))
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id == port_id:
-            group_id = port.group_id
-            for group in canvas.group_list:
-                if group.group_id == group_id:
-                    return group.group_name + ":" + port.port_name
-            break
+    port = canvas.port_map.get((group_id, port_id), None)
+
+    if port is not None:
+        group = canvas.group_map.get(group_id, None)
+        if group is not None:
+            return group.group_name + ":" + port.port_name
 
     qCritical("PatchCanvas::CanvasGetFullPortName(%i, %i) - unable to find port" % (group_id, port_id))
     return ""
 
+def CanvasGetPortConnections(group_id, port_id):
+    return [canvas.connection_map[connection_id]
+            for connection_id in sorted(canvas.model.port_connections.get((group_id, port_id), ()))]
+
+def CanvasGetPluginGroup(plugin_id):
+    model_group = canvas.model.group_plugin_map.get(plugin_id, None)
+
+    if model_group is None:
+        return None
+
+    return canvas.group_map.get(model_group.group_id, None)
+
 def CanvasGetPortConnectionList(group_id, port_id):
     if canvas.debug:
         print("PatchCanvas::CanvasGetPortConnectionList(%i, %i)" % (group_id, port_id))
 
     conn_list = []
 
-    for connection in canvas.connection_list:
+    for connection in CanvasGetPortConnections(group_id, port_id):
         if connection.group_out_id == group_id and connection.port_out_id == port_id:
             conn_list.append((connection.connection_id, connection.group_in_id, connection.port_in_id))
         elif connection.group_in_id == group_id and connection.port_in_id == port_id:
@@ -107,6 +145,25 @@ def CanvasItemFX(item, show, destroy):
             del animation
             break
 
+    # No animations while batching, apply the final state right away
+    if canvas.batch_depth > 0:
+        if destroy:
+            CanvasRemoveItemFX(item)
+        else:
+            item_is_object = isinstance(item, QGraphicsObject)
+            if item_is_object:
+                item.blockSignals(True)
+            if show:
+                item.setOpacity(1.0)
+                if item.type() == CanvasBoxType:
+                    item.setShadowOpacity(1.0)
+                item.show()
+            else:
+                item.hide()
+            if item_is_object:
+                item.blockSignals(False)
+        return
+
     animation = CanvasFadeAnimation(item, show)
     animation.setDuration(750 if show else 500)
 
@@ -132,6 +189,52 @@ def CanvasRemoveItemFX(item):
     canvas.scene.removeItem(item)
     del item
 
+    CanvasUpdateSceneLater()
+
+def CanvasUpdateSceneLater():
+    if canvas.batch_depth > 0:
+        canvas.batch_scene_update = True
+        return
+
     QTimer.singleShot(0, canvas.scene.update)
 
+def CanvasSetScaleFactor(scale):
+    old_scale = canvas.scale_factor
+    canvas.scale_factor = scale
+
+    def crossed(threshold):
+        return (old_scale < threshold) != (scale < threshold)
+
+    update_effects = crossed(options.lod_effects_scale)
+
+    if not (update_effects or crossed(options.lod_lines_scale) or
+            crossed(options.lod_text_scale) or crossed(options.lod_ports_scale)):
+        return
+
+    # shadows and glow are graphics effects, which need to be toggled on each item
+    if update_effects:
+        for group in canvas.group_map.values():
+            for box in group.widgets:
+                if box is not None:
+                    box.updateLevelOfDetail()
+
+        for connection in canvas.connection_map.values():
+            if connection.widget is not None:
+                connection.widget.updateLevelOfDetail()
+
+    canvas.scene.update()
+
+# Level of detail helpers, used while painting
+def CanvasShowPortText():
+    return canvas.scale_factor >= options.lod_text_scale
+
+def CanvasShowEffects():
+    return canvas.scale_factor >= options.lod_effects_scale
+
+def CanvasShowBezierLines():
+    return canvas.scale_factor >= options.lod_lines_scale
+
+def CanvasShowPorts():
+    return canvas.scale_factor >= options.lod_ports_scale
+
 # ------------------------------------------------------------------------------------------------------------
@@ -20,9 +20,14 @@
 # Imports (Global)
 
 import os
-
-from copy import deepcopy
-from subprocess import Popen, PIPE
+import signal
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from hashlib import sha1
+from selectors import DefaultSelector, EVENT_READ
+from subprocess import Popen, PIPE, TimeoutExpired
+from threading import Lock
+from time import monotonic
 from PyQt5.QtCore import qWarning
 
 # ---------------------------------------------------------------------------------------------------------------------
@@ -162,7 +167,17 @@ PyPluginInfo = {
     'parameters.outs': 0
 }
 
-gDiscoveryProcess = None
+# all values are immutable, a shallow copy is enough
+def newPluginInfo(itype, filename=""):
+    pinfo = PyPluginInfo.copy()
+    pinfo['type'] = itype
+    pinfo['filename'] = filename
+    return pinfo
+
+# processes currently running, shared by all discovery threads
+gDiscoveryProcesses = set()
+gDiscoverySkipped = set()
+gDiscoveryLock = Lock()
 
 def findWinePrefix(filename, recursionLimit = 10):
     if recursionLimit == 0 or len(filename) < 5 or "/" not in filename:
@@ -175,11 +190,7 @@ def findWinePrefix(filename, recursionLimit = 10):
 
     return findWinePrefix(path, recursionLimit-1)
 
-def runCarlaDiscovery(itype, stype, filename, tool, wineSettings=None):
-    if not os.path.exists(tool):
-        qWarning(f"runCarlaDiscovery() - tool '{tool}' does not exist")
-        return []
-
+def getDiscoveryCommand(stype, filename, tool, wineSettings=None):
     command = []
 
     if LINUX or MACOS:
@@ -216,146 +227,341 @@ def runCarlaDiscovery(itype, stype, filename, tool, wineSettings=None):
     command.append(stype)
     command.append(filename)
 
-    # pylint: disable=global-statement
-    global gDiscoveryProcess
-    # pylint: enable=global-statement
+    return command
+
+# timeout is in seconds, None to wait forever.
+# Returns None if the process was skipped or timed out, so its results are not cached.
+def runCarlaDiscovery(itype, stype, filename, tool, wineSettings=None, timeout=None):
+    if not os.path.exists(tool):
+        qWarning(f"runCarlaDiscovery() - tool '{tool}' does not exist")
+        return []
+
+    command = getDiscoveryCommand(stype, filename, tool, wineSettings)
 
+    # in its own process group, so that wine and other children can be killed together with it
     # pylint: disable=consider-using-with
-    gDiscoveryProcess = Popen(command, stdout=PIPE)
+    process = Popen(command, stdout=PIPE, start_new_session=not WINDOWS)
     # pylint: enable=consider-using-with
 
-    pinfo = None
-    plugins = []
-    fakeLabel = os.path.basename(filename).rsplit(".", 1)[0]
+    with gDiscoveryLock:
+        gDiscoveryProcesses.add(process)
 
-    while True:
-        try:
-            line = gDiscoveryProcess.stdout.readline().decode("utf-8", errors="ignore")
-        except:
-            print("ERROR: discovery readline failed")
-            break
+    parser = DiscoveryOutputParser(itype, filename)
 
-        # line is valid, strip it
-        if line:
-            line = line.strip()
+    try:
+        timedOut = not readCarlaDiscoveryOutput(process, parser, timeout)
+    finally:
+        with gDiscoveryLock:
+            gDiscoveryProcesses.discard(process)
+            skipped = process in gDiscoverySkipped
+            gDiscoverySkipped.discard(process)
 
-        # line is invalid, try poll() again
-        elif gDiscoveryProcess.poll() is None:
-            continue
+    if timedOut:
+        print(f"carla-discovery::timeout::{filename} did not finish discovery in {timeout}s")
+        return None
 
-        # line is invalid and poll() failed, stop here
-        else:
-            break
+    if skipped:
+        return None
 
-        if line == "carla-discovery::init::-----------":
-            pinfo = deepcopy(PyPluginInfo)
-            pinfo['type']     = itype
-            pinfo['filename'] = filename if filename != ":all" else ""
+    if process.returncode < 0:
+        print(f"carla-discovery::crash::{filename} crashed during discovery")
 
-        elif line == "carla-discovery::end::------------":
-            if pinfo is not None:
-                plugins.append(pinfo)
-                del pinfo
-                pinfo = None
+    return parser.finish()
+
+# Feeds the process output to parser as it comes, returns False on timeout (the process is killed then)
+def readCarlaDiscoveryOutput(process, parser, timeout):
+    # selectors do not work with pipes on Windows
+    if WINDOWS:
+        try:
+            output, _ = process.communicate(timeout=timeout)
+        except TimeoutExpired:
+            killDiscoveryProcess(process)
+            process.communicate()
+            return False
 
-        elif line == "Segmentation fault":
-            print(f"carla-discovery::crash::{filename} crashed during discovery")
+        parser.feed(output)
+        return True
 
-        elif line.startswith("err:module:import_dll Library"):
-            print(line)
+    deadline = monotonic() + timeout if timeout is not None else None
+    fd = process.stdout.fileno()
+    os.set_blocking(fd, False)
 
-        elif line.startswith("carla-discovery::info::"):
-            print(f"{line} - {filename}")
+    with DefaultSelector() as selector:
+        selector.register(fd, EVENT_READ)
 
-        elif line.startswith("carla-discovery::warning::"):
-            print(f"{line} - {filename}")
+        while True:
+            remaining = deadline - monotonic() if deadline is not None else None
 
-        elif line.startswith("carla-discovery::error::"):
-            print(f"{line} - {filename}")
+            if remaining is not None and remaining <= 0:
+                killDiscoveryProcess(process)
+                process.stdout.close()
+                process.wait()
+                return False
 
-        elif line.startswith("carla-discovery::"):
-            if pinfo is None:
+            if not selector.select(remaining):
                 continue
 
             try:
-                prop, value = line.replace("carla-discovery::", "").split("::", 1)
-            except:
+                data = os.read(fd, 0x10000)
+            except BlockingIOError:
                 continue
 
-            # pylint: disable=unsupported-assignment-operation
-            if prop == "build":
-                if value.isdigit():
-                    pinfo['build'] = int(value)
-            elif prop == "name":
-                pinfo['name'] = value if value else fakeLabel
-            elif prop == "label":
-                pinfo['label'] = value if value else fakeLabel
-            elif prop == "filename":
-                pinfo['filename'] = value
-            elif prop == "maker":
-                pinfo['maker'] = value
-            elif prop == "category":
-                pinfo['category'] = value
-            elif prop == "uniqueId":
-                if value.isdigit():
-                    pinfo['uniqueId'] = int(value)
-            elif prop == "hints":
-                if value.isdigit():
-                    pinfo['hints'] = int(value)
-            elif prop == "audio.ins":
-                if value.isdigit():
-                    pinfo['audio.ins'] = int(value)
-            elif prop == "audio.outs":
-                if value.isdigit():
-                    pinfo['audio.outs'] = int(value)
-            elif prop == "cv.ins":
-                if value.isdigit():
-                    pinfo['cv.ins'] = int(value)
-            elif prop == "cv.outs":
-                if value.isdigit():
-                    pinfo['cv.outs'] = int(value)
-            elif prop == "midi.ins":
-                if value.isdigit():
-                    pinfo['midi.ins'] = int(value)
-            elif prop == "midi.outs":
-                if value.isdigit():
-                    pinfo['midi.outs'] = int(value)
-            elif prop == "parameters.ins":
-                if value.isdigit():
-                    pinfo['parameters.ins'] = int(value)
-            elif prop == "parameters.outs":
-                if value.isdigit():
-                    pinfo['parameters.outs'] = int(value)
-            elif prop == "uri":
-                if value:
-                    pinfo['label'] = value
-                else:
-                    # cannot use empty URIs
-                    del pinfo
-                    pinfo = None
-                    continue
-            else:
-                print(f"{line} - {filename} (unknown property)")
-            # pylint: enable=unsupported-assignment-operation
+            # end of file, the process closed its output
+            if not data:
+                break
+
+            parser.feed(data)
+
+    process.stdout.close()
+    process.wait()
+    return True
+
+def parseCarlaDiscoveryOutput(itype, filename, lines):
+    parser = DiscoveryOutputParser(itype, filename)
+
+    for line in lines:
+        parser.parseLine(line.strip())
+
+    return parser.finish()
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Plugin Query (output parser)
+
+def _decodeInt(pinfo, key, value, fakeLabel):
+    if value.isdigit():
+        pinfo[key] = int(value)
+    return True
+
+def _decodeString(pinfo, key, value, fakeLabel):
+    pinfo[key] = value
+    return True
+
+def _decodeStringOrLabel(pinfo, key, value, fakeLabel):
+    pinfo[key] = value if value else fakeLabel
+    return True
+
+# cannot use empty URIs, the plugin is discarded
+def _decodeURI(pinfo, key, value, fakeLabel):
+    if not value:
+        return False
+    pinfo[key] = value
+    return True
+
+# "carla-discovery::<property>::<value>" lines, property -> (PyPluginInfo key, decoder)
+# decoders return False when the plugin must be discarded
+DISCOVERY_PROPERTY_DECODERS = {
+    'build':           ('build',           _decodeInt),
+    'name':            ('name',            _decodeStringOrLabel),
+    'label':           ('label',           _decodeStringOrLabel),
+    'filename':        ('filename',        _decodeString),
+    'maker':           ('maker',           _decodeString),
+    'category':        ('category',        _decodeString),
+    'uniqueId':        ('uniqueId',        _decodeInt),
+    'hints':           ('hints',           _decodeInt),
+    'audio.ins':       ('audio.ins',       _decodeInt),
+    'audio.outs':      ('audio.outs',      _decodeInt),
+    'cv.ins':          ('cv.ins',          _decodeInt),
+    'cv.outs':         ('cv.outs',         _decodeInt),
+    'midi.ins':        ('midi.ins',        _decodeInt),
+    'midi.outs':       ('midi.outs',       _decodeInt),
+    'parameters.ins':  ('parameters.ins',  _decodeInt),
+    'parameters.outs': ('parameters.outs', _decodeInt),
+    'uri':             ('label',           _decodeURI),
+}
+
+# messages printed as-is, with the filename appended
+DISCOVERY_MESSAGE_PREFIXES = (
+    "carla-discovery::info::",
+    "carla-discovery::warning::",
+    "carla-discovery::error::",
+)
+
+DISCOVERY_PREFIX     = "carla-discovery::"
+DISCOVERY_PREFIX_LEN = len(DISCOVERY_PREFIX)
+
+# Builds plugin infos out of carla-discovery output, which can be fed in chunks of any size
+class DiscoveryOutputParser(object):
+    def __init__(self, itype, filename):
+        self.fType = itype
+        self.fFilename = filename
+        self.fFakeLabel = os.path.basename(filename).rsplit(".", 1)[0]
+        self.fPluginInfo = None
+        self.fPlugins = []
+        self.fPending = b""
+
+    def feed(self, data):
+        data = self.fPending + data
+
+        # only complete lines are parsed, cutting at a newline never splits an utf-8 sequence
+        end = data.rfind(b"\n") + 1
+        self.fPending = data[end:]
+
+        for line in data[:end].decode("utf-8", errors="ignore").splitlines():
+            self.parseLine(line.strip())
+
+    # Returns the plugins found
+    def finish(self):
+        if self.fPending:
+            pending = self.fPending
+            self.fPending = b""
+            self.parseLine(pending.decode("utf-8", errors="ignore").strip())
+
+        return self.fPlugins
+
+    def parseLine(self, line):
+        if not line.startswith(DISCOVERY_PREFIX):
+            if line == "Segmentation fault":
+                print(f"carla-discovery::crash::{self.fFilename} crashed during discovery")
+            elif line.startswith("err:module:import_dll Library"):
+                print(line)
+            return
+
+        if line == "carla-discovery::init::-----------":
+            self.fPluginInfo = newPluginInfo(self.fType, self.fFilename if self.fFilename != ":all" else "")
+            return
+
+        if line == "carla-discovery::end::------------":
+            if self.fPluginInfo is not None:
+                self.fPlugins.append(self.fPluginInfo)
+                self.fPluginInfo = None
+            return
+
+        if line.startswith(DISCOVERY_MESSAGE_PREFIXES):
+            print(f"{line} - {self.fFilename}")
+            return
 
-    tmp = gDiscoveryProcess
-    gDiscoveryProcess = None
-    del tmp
+        pinfo = self.fPluginInfo
 
-    return plugins
+        if pinfo is None:
+            return
 
+        prop, sep, value = line[DISCOVERY_PREFIX_LEN:].partition("::")
+
+        if not sep:
+            return
+
+        decoder = DISCOVERY_PROPERTY_DECODERS.get(prop, None)
+
+        if decoder is None:
+            print(f"{line} - {self.fFilename} (unknown property)")
+            return
+
+        key, decode = decoder
+
+        if not decode(pinfo, key, value, self.fFakeLabel):
+            self.fPluginInfo = None
+
+# Kills all running discovery processes, their binaries are skipped
 def killDiscovery():
-    # pylint: disable=global-variable-not-assigned
-    global gDiscoveryProcess
-    # pylint: enable=global-variable-not-assigned
+    with gDiscoveryLock:
+        processes = list(gDiscoveryProcesses)
+        gDiscoverySkipped.update(processes)
+
+    for process in processes:
+        killDiscoveryProcess(process)
+
+def killDiscoveryProcess(process):
+    try:
+        if WINDOWS:
+            process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Plugin Query (process pool)
+
+# Runs discovery jobs, as (itype, stype, filename, tool, wineSettings) tuples, in parallel.
+# Each binary is discovered in its own process, so a crash or timeout only loses that binary.
+class DiscoveryPool(object):
+    def __init__(self, maxWorkers=0, timeout=0):
+        self.fMaxWorkers = maxWorkers if maxWorkers > 0 else (os.cpu_count() or 1)
+        self.fTimeout = timeout if timeout > 0 else None
+
+    # isRunning() is polled while waiting, when it returns False all processes are killed.
+    # progress(count, filename) is called as each job finishes.
+    # Returns the discovered plugins of each job in the order of jobs, None for jobs that did not complete.
+    def run(self, jobs, isRunning, progress):
+        results = [None] * len(jobs)
+
+        if not jobs:
+            return results
+
+        pending = {}
+        nextJob = 0
+        finished = 0
+
+        with ThreadPoolExecutor(max_workers=min(self.fMaxWorkers, len(jobs))) as executor:
+            while True:
+                running = isRunning()
+
+                while running and nextJob < len(jobs) and len(pending) < self.fMaxWorkers:
+                    itype, stype, filename, tool, wineSettings = jobs[nextJob]
+                    future = executor.submit(runCarlaDiscovery,
+                                             itype, stype, filename, tool, wineSettings, self.fTimeout)
+                    pending[future] = nextJob
+                    nextJob += 1
+
+                if not pending:
+                    break
 
-    if gDiscoveryProcess is not None:
-        gDiscoveryProcess.kill()
+                if not running:
+                    killDiscovery()
+
+                done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index = pending.pop(future)
+                    finished += 1
+
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        print(f"carla-discovery::error::{e} - {jobs[index][2]}")
+
+                    if running:
+                        progress(finished, jobs[index][2])
+
+        return results
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Plugin Query (cache)
+
+# Discovery results are stored per binary together with its fingerprint, see plugindatabase.py.
+# A binary is only probed again when its fingerprint changes.
+
+# Fingerprint of a binary or bundle, None if it does not exist.
+# Bundles (VST3, macOS and LV2 style directories) also hash the name, size and mtime of all their files.
+def getBinaryFingerprint(filename):
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+
+    if not os.path.isdir(filename):
+        return [stat.st_mtime_ns, stat.st_size, stat.st_ino]
+
+    bundleHash = sha1()
+
+    for root, dirs, files in os.walk(filename, followlinks=True):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            try:
+                fstat = os.stat(path)
+            except OSError:
+                continue
+            bundleHash.update(f"{os.path.relpath(path, filename)}:{fstat.st_size}:{fstat.st_mtime_ns}\n".encode())
+
+    return [stat.st_mtime_ns, 0, stat.st_ino, bundleHash.hexdigest()]
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Plugin Query (single binary)
 
 def checkPluginCached(desc, ptype):
-    pinfo = deepcopy(PyPluginInfo)
+    pinfo = newPluginInfo(ptype)
     pinfo['build'] = BINARY_NATIVE
-    pinfo['type']  = ptype
     pinfo['hints'] = desc['hints']
     pinfo['name']  = desc['name']
     pinfo['label'] = desc['label']
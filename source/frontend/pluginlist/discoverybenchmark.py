@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Carla plugin list code
+# Copyright (C) 2011-2022 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Microbenchmark for the carla-discovery output parser.
+# Run from source/frontend as:
+#   python3 -m pluginlist.discoverybenchmark [--generated] [transcript ...]
+# Transcripts are recorded discovery outputs, as in:
+#   carla-discovery-native vst2 /path/to/plugin.so > vst2-plugin.txt
+# The plugin type is taken from the file name prefix, VST2 if unknown.
+# Without transcripts, the ones recorded in pluginlist/fixtures/ are used.
+# --generated adds a large generated transcript, for scaling.
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import os
+import sys
+
+from copy import deepcopy
+from time import perf_counter
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Imports (Carla)
+
+from carla_backend import (
+    PLUGIN_DSSI,
+    PLUGIN_INTERNAL,
+    PLUGIN_LADSPA,
+    PLUGIN_LV2,
+    PLUGIN_VST2,
+    PLUGIN_VST3,
+)
+
+from .discovery import (
+    newPluginInfo,
+    parseCarlaDiscoveryOutput,
+    DiscoveryOutputParser,
+    PyPluginInfo,
+)
+
+# ---------------------------------------------------------------------------------------------------------------------
+
+REPEATS = 20
+CHUNK_SIZE = 0x10000
+GENERATED_PLUGIN_COUNT = 1000
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+PLUGIN_TYPES = {
+    'internal': PLUGIN_INTERNAL,
+    'ladspa': PLUGIN_LADSPA,
+    'dssi': PLUGIN_DSSI,
+    'lv2': PLUGIN_LV2,
+    'vst2': PLUGIN_VST2,
+    'vst3': PLUGIN_VST3,
+}
+
+def getTranscriptType(filename):
+    return PLUGIN_TYPES.get(os.path.basename(filename).split("-", 1)[0].lower(), PLUGIN_VST2)
+
+def readTranscripts(filenames):
+    transcripts = []
+
+    for filename in filenames:
+        with open(filename, "rb") as fh:
+            transcripts.append((filename, getTranscriptType(filename), fh.read()))
+
+    return transcripts
+
+def generateTranscript(count):
+    lines = []
+
+    for i in range(count):
+        lines += [
+            "carla-discovery::init::-----------",
+            "carla-discovery::build::2",
+            "carla-discovery::hints::%i" % (i & 0x1ff),
+            "carla-discovery::category::synth",
+            "carla-discovery::name::Plugin %i" % i,
+            "carla-discovery::label::plugin_%i" % i,
+            "carla-discovery::maker::Maker %i" % (i % 50),
+            "carla-discovery::uniqueId::%i" % (1000000 + i),
+            "carla-discovery::audio.ins::2",
+            "carla-discovery::audio.outs::2",
+            "carla-discovery::cv.ins::0",
+            "carla-discovery::cv.outs::0",
+            "carla-discovery::midi.ins::1",
+            "carla-discovery::midi.outs::0",
+            "carla-discovery::parameters.ins::%i" % (i % 64),
+            "carla-discovery::parameters.outs::0",
+            "carla-discovery::end::------------",
+        ]
+
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+def measure(func):
+    start = perf_counter()
+    for _ in range(REPEATS):
+        result = func()
+    return (perf_counter() - start) / REPEATS, result
+
+def run(name, itype, data):
+    def parseStreaming():
+        parser = DiscoveryOutputParser(itype, name)
+        for i in range(0, len(data), CHUNK_SIZE):
+            parser.feed(data[i:i + CHUNK_SIZE])
+        return parser.finish()
+
+    def parseLines():
+        return parseCarlaDiscoveryOutput(itype, name, data.decode("utf-8", errors="ignore").splitlines())
+
+    results = []
+
+    elapsed, plugins = measure(parseStreaming)
+    results.append(("streaming parser", elapsed, len(plugins)))
+
+    elapsed, plugins = measure(parseLines)
+    results.append(("line parser", elapsed, len(plugins)))
+
+    count = max(1, len(plugins))
+
+    elapsed, _ = measure(lambda: [newPluginInfo(itype, name) for _ in range(count)])
+    results.append(("newPluginInfo", elapsed, count))
+
+    elapsed, _ = measure(lambda: [deepcopy(PyPluginInfo) for _ in range(count)])
+    results.append(("deepcopy (old)", elapsed, count))
+
+    return results
+
+def main(args):
+    generated = "--generated" in args
+    filenames = [arg for arg in args if arg != "--generated"]
+
+    if not filenames:
+        filenames = sorted(os.path.join(FIXTURES_DIR, filename)
+                           for filename in os.listdir(FIXTURES_DIR) if filename.endswith(".txt"))
+
+    transcripts = readTranscripts(filenames)
+
+    if generated:
+        transcripts.append(("generated", PLUGIN_VST2, generateTranscript(GENERATED_PLUGIN_COUNT)))
+
+    print("%-24s  %-18s  %10s  %8s  %12s" % ("transcript", "operation", "total ms", "items", "us per item"))
+
+    for filename, itype, data in transcripts:
+        name = os.path.basename(filename)
+        for operation, elapsed, count in run(name, itype, data):
+            print("%-24s  %-18s  %10.3f  %8i  %12.3f" % (
+                  name[-24:], operation, elapsed * 1000.0, count, elapsed * 1000000.0 / max(1, count)))
+
+# ---------------------------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -33,6 +33,7 @@ from carla_backend import (
     PLUGIN_JSFX,
     PLUGIN_LADSPA,
     PLUGIN_LV2,
+    PLUGIN_SF2,
     PLUGIN_SFZ,
     PLUGIN_VST2,
     PLUGIN_VST3,
@@ -49,6 +50,8 @@ from carla_shared import (
     CARLA_DEFAULT_VST2_PATH,
     CARLA_DEFAULT_VST3_PATH,
     CARLA_DEFAULT_CLAP_PATH,
+    CARLA_DEFAULT_DISCOVERY_TIMEOUT,
+    CARLA_DEFAULT_DISCOVERY_WORKERS,
     CARLA_DEFAULT_WINE_AUTO_PREFIX,
     CARLA_DEFAULT_WINE_EXECUTABLE,
     CARLA_DEFAULT_WINE_FALLBACK_PREFIX,
@@ -61,6 +64,8 @@ from carla_shared import (
     CARLA_KEY_PATHS_VST2,
     CARLA_KEY_PATHS_VST3,
     CARLA_KEY_PATHS_CLAP,
+    CARLA_KEY_DISCOVERY_TIMEOUT,
+    CARLA_KEY_DISCOVERY_WORKERS,
     CARLA_KEY_WINE_AUTO_PREFIX,
     CARLA_KEY_WINE_EXECUTABLE,
     CARLA_KEY_WINE_FALLBACK_PREFIX,
@@ -76,20 +81,18 @@ from utils import QSafeSettings
 
 from .discovery import (
     checkAllPluginsAU,
-    checkFileSF2,
     checkPluginCached,
-    checkPluginDSSI,
-    checkPluginLADSPA,
-    checkPluginVST2,
-    checkPluginVST3,
-    checkPluginCLAP,
+    getBinaryFingerprint,
     findBinaries,
     findFilenames,
     findMacBundles,
     findVST3Binaries,
-    findCLAPBinaries
+    findCLAPBinaries,
+    DiscoveryPool,
 )
 
+from .plugindatabase import PluginDatabase
+
 # ---------------------------------------------------------------------------------------------------------------------
 # Separate Thread for Plugin Search
 
@@ -100,6 +103,7 @@ class SearchPluginsThread(QThread):
         QThread.__init__(self, parent)
 
         self.fContinueChecking = False
+        self.fForceFullScan    = False
         self.fPathBinaries     = pathBinaries
 
         self.fCheckNative  = False
@@ -119,13 +123,21 @@ class SearchPluginsThread(QThread):
         self.fCheckSFZ    = False
         self.fCheckJSFX   = False
 
+        settings = QSafeSettings("falkTX", "Carla2")
+
+        # created on the discovery thread, sqlite connections cannot be shared between threads
+        self.fDatabase = None
+
+        self.fDiscoveryPool = DiscoveryPool(
+            settings.value(CARLA_KEY_DISCOVERY_WORKERS, CARLA_DEFAULT_DISCOVERY_WORKERS, int),
+            settings.value(CARLA_KEY_DISCOVERY_TIMEOUT, CARLA_DEFAULT_DISCOVERY_TIMEOUT, int))
+
         if WINDOWS:
             toolNative = "carla-discovery-native.exe"
             self.fWineSettings = None
 
         else:
             toolNative = "carla-discovery-native"
-            settings = QSafeSettings("falkTX", "Carla2")
             self.fWineSettings = {
                 'executable'    : settings.value(CARLA_KEY_WINE_EXECUTABLE,
                                                  CARLA_DEFAULT_WINE_EXECUTABLE, str),
@@ -134,7 +146,8 @@ class SearchPluginsThread(QThread):
                 'fallbackPrefix': settings.value(CARLA_KEY_WINE_FALLBACK_PREFIX,
                                                  CARLA_DEFAULT_WINE_FALLBACK_PREFIX, str),
             }
-            del settings
+
+        del settings
 
         self.fToolNative = os.path.join(pathBinaries, toolNative)
 
@@ -172,6 +185,10 @@ class SearchPluginsThread(QThread):
         self.fCheckSFZ    = sfz
         self.fCheckJSFX   = jsfx
 
+    # Probe all binaries again, instead of only new or changed ones
+    def setForceFullScan(self, force: bool):
+        self.fForceFullScan = force
+
     def stop(self):
         self.fContinueChecking = False
 
@@ -179,8 +196,15 @@ class SearchPluginsThread(QThread):
     # protected reimplemented methods
 
     def run(self):
-        settingsDB = QSafeSettings("falkTX", "CarlaPlugins5")
+        self.fDatabase = PluginDatabase()
 
+        try:
+            self._run()
+        finally:
+            self.fDatabase.close()
+            self.fDatabase = None
+
+    def _run(self):
         self.fContinueChecking = True
         self.fCurCount = 0
 
@@ -273,209 +297,166 @@ class SearchPluginsThread(QThread):
 
         if self.fCheckLADSPA:
             if self.fCheckNative:
-                plugins = self._checkLADSPA(OS, self.fToolNative)
-                settingsDB.setValue("Plugins/LADSPA_native", plugins)
+                self._checkLADSPA(OS, self.fToolNative, "LADSPA_native")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckPosix32:
                 tool = os.path.join(self.fPathBinaries, "carla-discovery-posix32")
-                plugins = self._checkLADSPA(OS, tool)
-                settingsDB.setValue("Plugins/LADSPA_posix32", plugins)
+                self._checkLADSPA(OS, tool, "LADSPA_posix32")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckPosix64:
                 tool = os.path.join(self.fPathBinaries, "carla-discovery-posix64")
-                plugins = self._checkLADSPA(OS, tool)
-                settingsDB.setValue("Plugins/LADSPA_posix64", plugins)
+                self._checkLADSPA(OS, tool, "LADSPA_posix64")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckWin32:
                 tool = os.path.join(self.fPathBinaries, "carla-discovery-win32.exe")
-                plugins = self._checkLADSPA("WINDOWS", tool, not WINDOWS)
-                settingsDB.setValue("Plugins/LADSPA_win32", plugins)
+                self._checkLADSPA("WINDOWS", tool, "LADSPA_win32", not WINDOWS)
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckWin64:
                 tool = os.path.join(self.fPathBinaries, "carla-discovery-win64.exe")
-                plugins = self._checkLADSPA("WINDOWS", tool, not WINDOWS)
-                settingsDB.setValue("Plugins/LADSPA_win64", plugins)
+                self._checkLADSPA("WINDOWS", tool, "LADSPA_win64", not WINDOWS)
 
-            settingsDB.sync()
             if not self.fContinueChecking:
                 return
 
         if self.fCheckDSSI:
             if self.fCheckNative:
-                plugins = self._checkDSSI(OS, self.fToolNative)
-                settingsDB.setValue("Plugins/DSSI_native", plugins)
+                self._checkDSSI(OS, self.fToolNative, "DSSI_native")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckPosix32:
-                plugins = self._checkDSSI(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
-                settingsDB.setValue("Plugins/DSSI_posix32", plugins)
+                self._checkDSSI(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix32"), "DSSI_posix32")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckPosix64:
-                plugins = self._checkDSSI(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix64"))
-                settingsDB.setValue("Plugins/DSSI_posix64", plugins)
+                self._checkDSSI(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix64"), "DSSI_posix64")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckWin32:
                 tool = os.path.join(self.fPathBinaries, "carla-discovery-win32.exe")
-                plugins = self._checkDSSI("WINDOWS", tool, not WINDOWS)
-                settingsDB.setValue("Plugins/DSSI_win32", plugins)
+                self._checkDSSI("WINDOWS", tool, "DSSI_win32", not WINDOWS)
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckWin64:
                 tool = os.path.join(self.fPathBinaries, "carla-discovery-win64.exe")
-                plugins = self._checkDSSI("WINDOWS", tool, not WINDOWS)
-                settingsDB.setValue("Plugins/DSSI_win64", plugins)
+                self._checkDSSI("WINDOWS", tool, "DSSI_win64", not WINDOWS)
 
-            settingsDB.sync()
             if not self.fContinueChecking:
                 return
 
         if self.fCheckLV2:
-            plugins = self._checkCached(True)
-            settingsDB.setValue("Plugins/LV2", plugins)
-            settingsDB.sync()
+            self.fDatabase.replaceSource("LV2", self._checkCached(True))
             if not self.fContinueChecking:
                 return
 
         if self.fCheckVST2:
             if self.fCheckNative:
-                plugins = self._checkVST2(OS, self.fToolNative)
-                settingsDB.setValue("Plugins/VST2_native", plugins)
+                self._checkVST2(OS, self.fToolNative, "VST2_native")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckPosix32:
-                plugins = self._checkVST2(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
-                settingsDB.setValue("Plugins/VST2_posix32", plugins)
+                self._checkVST2(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix32"), "VST2_posix32")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckPosix64:
-                plugins = self._checkVST2(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix64"))
-                settingsDB.setValue("Plugins/VST2_posix64", plugins)
+                self._checkVST2(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix64"), "VST2_posix64")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckWin32:
                 tool = os.path.join(self.fPathBinaries, "carla-discovery-win32.exe")
-                plugins = self._checkVST2("WINDOWS", tool, not WINDOWS)
-                settingsDB.setValue("Plugins/VST2_win32", plugins)
+                self._checkVST2("WINDOWS", tool, "VST2_win32", not WINDOWS)
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckWin64:
                 tool = os.path.join(self.fPathBinaries, "carla-discovery-win64.exe")
-                plugins = self._checkVST2("WINDOWS", tool, not WINDOWS)
-                settingsDB.setValue("Plugins/VST2_win64", plugins)
-                if not self.fContinueChecking:
-                    return
+                self._checkVST2("WINDOWS", tool, "VST2_win64", not WINDOWS)
 
-            settingsDB.sync()
             if not self.fContinueChecking:
                 return
 
         if self.fCheckVST3:
             if self.fCheckNative and (LINUX or MACOS or WINDOWS):
-                plugins = self._checkVST3(self.fToolNative)
-                settingsDB.setValue("Plugins/VST3_native", plugins)
+                self._checkVST3(self.fToolNative, "VST3_native")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckPosix32:
-                plugins = self._checkVST3(os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
-                settingsDB.setValue("Plugins/VST3_posix32", plugins)
+                self._checkVST3(os.path.join(self.fPathBinaries, "carla-discovery-posix32"), "VST3_posix32")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckPosix64:
-                plugins = self._checkVST3(os.path.join(self.fPathBinaries, "carla-discovery-posix64"))
-                settingsDB.setValue("Plugins/VST3_posix64", plugins)
+                self._checkVST3(os.path.join(self.fPathBinaries, "carla-discovery-posix64"), "VST3_posix64")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckWin32:
                 tool = os.path.join(self.fPathBinaries, "carla-discovery-win32.exe")
-                plugins = self._checkVST3(tool, not WINDOWS)
-                settingsDB.setValue("Plugins/VST3_win32", plugins)
+                self._checkVST3(tool, "VST3_win32", not WINDOWS)
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckWin64:
                 tool = os.path.join(self.fPathBinaries, "carla-discovery-win64.exe")
-                plugins = self._checkVST3(tool, not WINDOWS)
-                settingsDB.setValue("Plugins/VST3_win64", plugins)
-                if not self.fContinueChecking:
-                    return
+                self._checkVST3(tool, "VST3_win64", not WINDOWS)
 
-            settingsDB.sync()
             if not self.fContinueChecking:
                 return
 
         if self.fCheckCLAP:
             if self.fCheckNative:
-                plugins = self._checkCLAP(self.fToolNative)
-                settingsDB.setValue("Plugins/CLAP_native", plugins)
+                self._checkCLAP(self.fToolNative, "CLAP_native")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckPosix32:
-                plugins = self._checkCLAP(os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
-                settingsDB.setValue("Plugins/CLAP_posix32", plugins)
+                self._checkCLAP(os.path.join(self.fPathBinaries, "carla-discovery-posix32"), "CLAP_posix32")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckPosix64:
-                plugins = self._checkCLAP(os.path.join(self.fPathBinaries, "carla-discovery-posix64"))
-                settingsDB.setValue("Plugins/CLAP_posix64", plugins)
+                self._checkCLAP(os.path.join(self.fPathBinaries, "carla-discovery-posix64"), "CLAP_posix64")
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckWin32:
                 tool = os.path.join(self.fPathBinaries, "carla-discovery-win32.exe")
-                plugins = self._checkCLAP(tool, not WINDOWS)
-                settingsDB.setValue("Plugins/CLAP_win32", plugins)
+                self._checkCLAP(tool, "CLAP_win32", not WINDOWS)
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckWin64:
                 tool = os.path.join(self.fPathBinaries, "carla-discovery-win64.exe")
-                plugins = self._checkCLAP(tool, not WINDOWS)
-                settingsDB.setValue("Plugins/CLAP_win64", plugins)
-                if not self.fContinueChecking:
-                    return
+                self._checkCLAP(tool, "CLAP_win64", not WINDOWS)
 
-            settingsDB.sync()
             if not self.fContinueChecking:
                 return
 
         if self.fCheckAU:
             if self.fCheckNative:
-                plugins = self._checkCached(False)
-                settingsDB.setValue("Plugins/AU", plugins)
-                settingsDB.sync()
+                self.fDatabase.replaceSource("AU", self._checkCached(False))
                 if not self.fContinueChecking:
                     return
 
             if self.fCheckPosix32:
                 plugins = self._checkAU(os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
-                settingsDB.setValue("Plugins/AU_posix32", self.fAuPlugins)
-                if not self.fContinueChecking:
-                    return
+                self.fDatabase.replaceSource("AU_posix32", plugins)
 
-            settingsDB.sync()
             if not self.fContinueChecking:
                 return
 
@@ -484,28 +465,21 @@ class SearchPluginsThread(QThread):
             SF2_PATH = settings.value(CARLA_KEY_PATHS_SF2, CARLA_DEFAULT_SF2_PATH, list)
             del settings
 
-            kits = self._checkKIT(SF2_PATH, "sf2")
-            settingsDB.setValue("Plugins/SF2", kits)
-            settingsDB.sync()
+            self._checkKIT(SF2_PATH, "sf2", "SF2")
             if not self.fContinueChecking:
                 return
 
         if self.fCheckSFZ:
-            kits = self._checkSfzCached()
-            settingsDB.setValue("Plugins/SFZ", kits)
-            settingsDB.sync()
+            self.fDatabase.replaceSource("SFZ", self._checkSfzCached())
 
         if self.fCheckJSFX:
-            kits = self._checkJsfxCached()
-            settingsDB.setValue("Plugins/JSFX", kits)
-            settingsDB.sync()
+            self.fDatabase.replaceSource("JSFX", self._checkJsfxCached())
 
     # -----------------------------------------------------------------------------------------------------------------
     # private methods
 
-    def _checkLADSPA(self, OS, tool, isWine=False):
+    def _checkLADSPA(self, OS, tool, source, isWine=False):
         ladspaBinaries = []
-        ladspaPlugins = []
 
         self._pluginLook(self.fLastCheckValue, "LADSPA plugins...")
 
@@ -522,26 +496,14 @@ class SearchPluginsThread(QThread):
         ladspaBinaries.sort()
 
         if not self.fContinueChecking:
-            return ladspaPlugins
-
-        for i in range(len(ladspaBinaries)):
-            ladspa  = ladspaBinaries[i]
-            percent = ( float(i) / len(ladspaBinaries) ) * self.fCurPercentValue
-            self._pluginLook((self.fLastCheckValue + percent) * 0.9, ladspa)
-
-            plugins = checkPluginLADSPA(ladspa, tool, self.fWineSettings if isWine else None)
-            if plugins:
-                ladspaPlugins.append(plugins)
+            return
 
-            if not self.fContinueChecking:
-                break
+        self._discoverBinaries(PLUGIN_LADSPA, "LADSPA", ladspaBinaries, tool, isWine, source)
 
         self.fLastCheckValue += self.fCurPercentValue
-        return ladspaPlugins
 
-    def _checkDSSI(self, OS, tool, isWine=False):
+    def _checkDSSI(self, OS, tool, source, isWine=False):
         dssiBinaries = []
-        dssiPlugins = []
 
         self._pluginLook(self.fLastCheckValue, "DSSI plugins...")
 
@@ -558,26 +520,14 @@ class SearchPluginsThread(QThread):
         dssiBinaries.sort()
 
         if not self.fContinueChecking:
-            return dssiPlugins
-
-        for i in range(len(dssiBinaries)):
-            dssi    = dssiBinaries[i]
-            percent = ( float(i) / len(dssiBinaries) ) * self.fCurPercentValue
-            self._pluginLook(self.fLastCheckValue + percent, dssi)
-
-            plugins = checkPluginDSSI(dssi, tool, self.fWineSettings if isWine else None)
-            if plugins:
-                dssiPlugins.append(plugins)
+            return
 
-            if not self.fContinueChecking:
-                break
+        self._discoverBinaries(PLUGIN_DSSI, "DSSI", dssiBinaries, tool, isWine, source)
 
         self.fLastCheckValue += self.fCurPercentValue
-        return dssiPlugins
 
-    def _checkVST2(self, OS, tool, isWine=False):
+    def _checkVST2(self, OS, tool, source, isWine=False):
         vst2Binaries = []
-        vst2Plugins = []
 
         if MACOS and not isWine:
             self._pluginLook(self.fLastCheckValue, "VST2 bundles...")
@@ -600,26 +550,14 @@ class SearchPluginsThread(QThread):
         vst2Binaries.sort()
 
         if not self.fContinueChecking:
-            return vst2Plugins
-
-        for i in range(len(vst2Binaries)):
-            vst2    = vst2Binaries[i]
-            percent = ( float(i) / len(vst2Binaries) ) * self.fCurPercentValue
-            self._pluginLook(self.fLastCheckValue + percent, vst2)
+            return
 
-            plugins = checkPluginVST2(vst2, tool, self.fWineSettings if isWine else None)
-            if plugins:
-                vst2Plugins.append(plugins)
-
-            if not self.fContinueChecking:
-                break
+        self._discoverBinaries(PLUGIN_VST2, "VST2", vst2Binaries, tool, isWine, source)
 
         self.fLastCheckValue += self.fCurPercentValue
-        return vst2Plugins
 
-    def _checkVST3(self, tool, isWine=False):
+    def _checkVST3(self, tool, source, isWine=False):
         vst3Binaries = []
-        vst3Plugins = []
 
         if MACOS and not isWine:
             self._pluginLook(self.fLastCheckValue, "VST3 bundles...")
@@ -642,26 +580,14 @@ class SearchPluginsThread(QThread):
         vst3Binaries.sort()
 
         if not self.fContinueChecking:
-            return vst3Plugins
-
-        for i in range(len(vst3Binaries)):
-            vst3    = vst3Binaries[i]
-            percent = ( float(i) / len(vst3Binaries) ) * self.fCurPercentValue
-            self._pluginLook(self.fLastCheckValue + percent, vst3)
-
-            plugins = checkPluginVST3(vst3, tool, self.fWineSettings if isWine else None)
-            if plugins:
-                vst3Plugins.append(plugins)
+            return
 
-            if not self.fContinueChecking:
-                break
+        self._discoverBinaries(PLUGIN_VST3, "VST3", vst3Binaries, tool, isWine, source)
 
         self.fLastCheckValue += self.fCurPercentValue
-        return vst3Plugins
 
-    def _checkCLAP(self, tool, isWine=False):
+    def _checkCLAP(self, tool, source, isWine=False):
         clapBinaries = []
-        clapPlugins = []
 
         self._pluginLook(self.fLastCheckValue, "CLAP plugins...")
 
@@ -681,36 +607,20 @@ class SearchPluginsThread(QThread):
         clapBinaries.sort()
 
         if not self.fContinueChecking:
-            return clapPlugins
-
-        for i in range(len(clapBinaries)):
-            clap    = clapBinaries[i]
-            percent = ( float(i) / len(clapBinaries) ) * self.fCurPercentValue
-            self._pluginLook(self.fLastCheckValue + percent, clap)
-
-            plugins = checkPluginCLAP(clap, tool, self.fWineSettings if isWine else None)
-            if plugins:
-                clapPlugins.append(plugins)
+            return
 
-            if not self.fContinueChecking:
-                break
+        self._discoverBinaries(PLUGIN_CLAP, "CLAP", clapBinaries, tool, isWine, source)
 
         self.fLastCheckValue += self.fCurPercentValue
-        return clapPlugins
 
     def _checkAU(self, tool):
-        auPlugins = []
-
-        plugins = checkAllPluginsAU(tool)
-        if plugins:
-            auPlugins.append(plugins)
+        auPlugins = checkAllPluginsAU(tool) or []
 
         self.fLastCheckValue += self.fCurPercentValue
         return auPlugins
 
-    def _checkKIT(self, kitPATH, kitExtension):
+    def _checkKIT(self, kitPATH, kitExtension, source):
         kitFiles = []
-        kitPlugins = []
 
         for iPATH in kitPATH:
             files = findFilenames(iPATH, kitExtension)
@@ -721,26 +631,12 @@ class SearchPluginsThread(QThread):
         kitFiles.sort()
 
         if not self.fContinueChecking:
-            return kitPlugins
-
-        for i in range(len(kitFiles)):
-            kit     = kitFiles[i]
-            percent = ( float(i) / len(kitFiles) ) * self.fCurPercentValue
-            self._pluginLook(self.fLastCheckValue + percent, kit)
-
-            if kitExtension == "sf2":
-                plugins = checkFileSF2(kit, self.fToolNative)
-            else:
-                plugins = None
-
-            if plugins:
-                kitPlugins.append(plugins)
+            return
 
-            if not self.fContinueChecking:
-                break
+        if kitExtension == "sf2":
+            self._discoverBinaries(PLUGIN_SF2, "SF2", kitFiles, self.fToolNative, False, source)
 
         self.fLastCheckValue += self.fCurPercentValue
-        return kitPlugins
 
     def _checkCached(self, isLV2):
         if isLV2:
@@ -845,6 +741,47 @@ class SearchPluginsThread(QThread):
         self.fLastCheckValue += self.fCurPercentValue
         return jsfxPlugins
 
+    # Runs carla-discovery on binaries through the process pool, storing the plugins of each binary in the database.
+    # Unless doing a full scan, binaries that did not change since the last scan keep their stored results.
+    def _discoverBinaries(self, itype, stype, binaries, tool, isWine, source):
+        toolFingerprint = getBinaryFingerprint(tool)
+        oldFingerprints = {} if self.fForceFullScan else self.fDatabase.getBinaryFingerprints(source, toolFingerprint)
+
+        wineSettings = self.fWineSettings if isWine else None
+        fingerprints = []
+        found = set()
+        jobs = []
+
+        for binary in binaries:
+            fingerprint = getBinaryFingerprint(binary)
+
+            if fingerprint is not None and oldFingerprints.get(binary, None) == fingerprint:
+                found.add(binary)
+            else:
+                jobs.append((itype, stype, binary, tool, wineSettings))
+                fingerprints.append(fingerprint)
+
+        if jobs:
+            cachedCount = len(found)
+
+            def progress(count, binary):
+                percent = ( float(cachedCount + count) / len(binaries) ) * self.fCurPercentValue
+                self._pluginLook(self.fLastCheckValue + percent, binary)
+
+            results = self.fDiscoveryPool.run(jobs, self._isChecking, progress)
+
+            for job, fingerprint, plugins in zip(jobs, fingerprints, results):
+                # binaries that were skipped or not checked are left out, and probed again next time
+                if plugins is None:
+                    continue
+                self.fDatabase.storeBinary(source, job[2], fingerprint, plugins)
+                found.add(job[2])
+
+        self.fDatabase.finishSource(source, toolFingerprint, found)
+
+    def _isChecking(self):
+        return self.fContinueChecking
+
     def _pluginLook(self, percent, plugin):
         self.pluginLook.emit(percent, plugin)
 
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Carla plugin host
+# Copyright (C) 2011-2022 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import json
+import os
+import sqlite3
+
+from PyQt5.QtCore import qWarning, QStandardPaths
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Imports (Carla)
+
+from utils import QSafeSettings
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Imports (Local)
+
+from .discovery import PLUGIN_QUERY_API_VERSION
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Plugin database
+#
+# Plugins are grouped by source, matching the old "Plugins/<source>" settings keys,
+# like "VST2_native", "LADSPA_win64", "SF2", "LV2" or "Internal".
+# Each source has one binary entry per scanned file, holding the plugins found in it.
+# Sources queried through the backend cache (LV2, AU, SFZ, JSFX and Internal) keep all their plugins in a single entry.
+
+PLUGIN_DATABASE_FILENAME = "CarlaPlugins5.db"
+
+# bump on changes to the tables below
+PLUGIN_DATABASE_REVISION = 1
+
+# a different discovery API means all stored results are outdated, so it is part of the version too
+PLUGIN_DATABASE_VERSION = PLUGIN_QUERY_API_VERSION * 100 + PLUGIN_DATABASE_REVISION
+
+# plugin info key, table column
+PLUGIN_DATABASE_FIELDS = (
+    ('build',           'build'),
+    ('type',            'type'),
+    ('hints',           'hints'),
+    ('category',        'category'),
+    ('filename',        'filename'),
+    ('name',            'name'),
+    ('label',           'label'),
+    ('maker',           'maker'),
+    ('uniqueId',        'unique_id'),
+    ('audio.ins',       'audio_ins'),
+    ('audio.outs',      'audio_outs'),
+    ('cv.ins',          'cv_ins'),
+    ('cv.outs',         'cv_outs'),
+    ('midi.ins',        'midi_ins'),
+    ('midi.outs',       'midi_outs'),
+    ('parameters.ins',  'parameters_ins'),
+    ('parameters.outs', 'parameters_outs'),
+)
+
+PLUGIN_DATABASE_KEYS    = tuple(key for key, _ in PLUGIN_DATABASE_FIELDS)
+PLUGIN_DATABASE_COLUMNS = ", ".join(column for _, column in PLUGIN_DATABASE_FIELDS)
+
+# meta table key, set once the old settings based plugin lists have been imported
+PLUGIN_DATABASE_META_MIGRATED = "migratedFromSettings"
+
+PLUGIN_DATABASE_SCHEMA = (
+    """
+    CREATE TABLE meta (
+        key   TEXT PRIMARY KEY,
+        value TEXT
+    )
+    """,
+    """
+    CREATE TABLE sources (
+        name  TEXT PRIMARY KEY,
+        tool  TEXT,
+        count INTEGER NOT NULL DEFAULT -1
+    )
+    """,
+    """
+    CREATE TABLE binaries (
+        id          INTEGER PRIMARY KEY,
+        source      TEXT NOT NULL REFERENCES sources(name) ON DELETE CASCADE,
+        filename    TEXT NOT NULL,
+        fingerprint TEXT,
+        UNIQUE (source, filename)
+    )
+    """,
+    """
+    CREATE TABLE plugins (
+        id              INTEGER PRIMARY KEY,
+        binary          INTEGER NOT NULL REFERENCES binaries(id) ON DELETE CASCADE,
+        build           INTEGER NOT NULL,
+        type            INTEGER NOT NULL,
+        hints           INTEGER NOT NULL,
+        category        TEXT NOT NULL,
+        filename        TEXT NOT NULL,
+        name            TEXT NOT NULL,
+        label           TEXT NOT NULL,
+        maker           TEXT NOT NULL,
+        unique_id       INTEGER NOT NULL,
+        audio_ins       INTEGER NOT NULL,
+        audio_outs      INTEGER NOT NULL,
+        cv_ins          INTEGER NOT NULL,
+        cv_outs         INTEGER NOT NULL,
+        midi_ins        INTEGER NOT NULL,
+        midi_outs       INTEGER NOT NULL,
+        parameters_ins  INTEGER NOT NULL,
+        parameters_outs INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX plugins_binary ON plugins (binary)",
+    "CREATE INDEX plugins_name ON plugins (name COLLATE NOCASE)",
+    "CREATE INDEX plugins_maker ON plugins (maker COLLATE NOCASE)",
+    "CREATE INDEX plugins_category ON plugins (category)",
+    "CREATE INDEX plugins_type ON plugins (type)",
+    "CREATE INDEX plugins_build ON plugins (build)",
+)
+
+def getPluginDatabaseFilename():
+    configDir = QStandardPaths.writableLocation(QStandardPaths.GenericConfigLocation)
+    return os.path.join(configDir, "falkTX", PLUGIN_DATABASE_FILENAME)
+
+def encodeFingerprint(fingerprint):
+    return None if fingerprint is None else json.dumps(fingerprint)
+
+def decodeFingerprint(fingerprint):
+    return None if fingerprint is None else json.loads(fingerprint)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Plugin database, one instance per thread
+
+class PluginDatabase(object):
+    def __init__(self):
+        filename = getPluginDatabaseFilename()
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+        # transactions are handled manually, see _Transaction
+        self.fConnection = sqlite3.connect(filename, timeout=30.0, isolation_level=None)
+        self.fConnection.execute("PRAGMA foreign_keys = ON")
+        self.fConnection.execute("PRAGMA journal_mode = WAL")
+        self.fConnection.execute("PRAGMA synchronous = NORMAL")
+
+        self._setupSchema()
+
+        # retried on every open until it succeeds
+        if self._getMeta(PLUGIN_DATABASE_META_MIGRATED) is None:
+            self._migrateFromSettings()
+
+    def close(self):
+        if self.fConnection is None:
+            return
+        self.fConnection.close()
+        self.fConnection = None
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # sources
+
+    # Number of plugins the backend reported for a cached source, or -1 if unknown
+    def getSourceCount(self, source):
+        row = self.fConnection.execute("SELECT count FROM sources WHERE name = ?", (source,)).fetchone()
+        return -1 if row is None else row[0]
+
+    def countPlugins(self, source):
+        return self.fConnection.execute("""
+            SELECT COUNT(*) FROM plugins JOIN binaries ON plugins.binary = binaries.id WHERE binaries.source = ?
+        """, (source,)).fetchone()[0]
+
+    # Replaces all plugins of a source with a single entry, used for sources queried through the backend cache
+    def replaceSource(self, source, plugins, count=None):
+        with _Transaction(self.fConnection) as cursor:
+            self._ensureSource(cursor, source)
+            cursor.execute("DELETE FROM binaries WHERE source = ?", (source,))
+            self._insertBinary(cursor, source, "", None, plugins)
+
+            if count is not None:
+                cursor.execute("UPDATE sources SET count = ? WHERE name = ?", (count, source))
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # binaries
+
+    # Fingerprints of the binaries last scanned for a source with the same discovery tool
+    def getBinaryFingerprints(self, source, toolFingerprint):
+        row = self.fConnection.execute("SELECT tool FROM sources WHERE name = ?", (source,)).fetchone()
+
+        if row is None or decodeFingerprint(row[0]) != toolFingerprint:
+            return {}
+
+        return {
+            filename: decodeFingerprint(fingerprint)
+            for filename, fingerprint in self.fConnection.execute(
+                "SELECT filename, fingerprint FROM binaries WHERE source = ? AND fingerprint IS NOT NULL", (source,))
+        }
+
+    # Stores the plugins found in a binary, replacing any previous results for it
+    def storeBinary(self, source, filename, fingerprint, plugins):
+        with _Transaction(self.fConnection) as cursor:
+            self._ensureSource(cursor, source)
+            cursor.execute("DELETE FROM binaries WHERE source = ? AND filename = ?", (source, filename))
+            self._insertBinary(cursor, source, filename, fingerprint, plugins)
+
+    # Removes binaries not found on the last scan, and remembers which tool was used for it
+    def finishSource(self, source, toolFingerprint, filenames):
+        filenames = set(filenames)
+
+        with _Transaction(self.fConnection) as cursor:
+            self._ensureSource(cursor, source)
+            cursor.execute("UPDATE sources SET tool = ? WHERE name = ?", (encodeFingerprint(toolFingerprint), source))
+
+            stale = [(source, filename)
+                     for filename, in cursor.execute("SELECT filename FROM binaries WHERE source = ?", (source,))
+                     if filename not in filenames]
+            cursor.executemany("DELETE FROM binaries WHERE source = ? AND filename = ?", stale)
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # plugins
+
+    # All plugins as tuples, with values in PLUGIN_DATABASE_KEYS order
+    def getPluginRows(self):
+        return self.fConnection.execute(f"SELECT {PLUGIN_DATABASE_COLUMNS} FROM plugins ORDER BY id").fetchall()
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # private methods
+
+    def _setupSchema(self):
+        version = self.fConnection.execute("PRAGMA user_version").fetchone()[0]
+
+        if version == PLUGIN_DATABASE_VERSION:
+            return
+
+        with _Transaction(self.fConnection) as cursor:
+            if version != 0:
+                qWarning(f"Plugin database version changed from {version} to {PLUGIN_DATABASE_VERSION}, "
+                         f"a plugin rescan is needed")
+                for table in ("plugins", "binaries", "sources", "meta"):
+                    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+            for statement in PLUGIN_DATABASE_SCHEMA:
+                cursor.execute(statement)
+
+            cursor.execute(f"PRAGMA user_version = {PLUGIN_DATABASE_VERSION}")
+
+    def _getMeta(self, key, cursor=None):
+        row = (cursor or self.fConnection).execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _setMeta(self, cursor, key, value):
+        cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _ensureSource(self, cursor, source):
+        cursor.execute("INSERT OR IGNORE INTO sources (name) VALUES (?)", (source,))
+
+    def _insertBinary(self, cursor, source, filename, fingerprint, plugins):
+        cursor.execute("INSERT INTO binaries (source, filename, fingerprint) VALUES (?, ?, ?)",
+                       (source, filename, encodeFingerprint(fingerprint)))
+        binaryId = cursor.lastrowid
+
+        cursor.executemany(
+            f"INSERT INTO plugins (binary, {PLUGIN_DATABASE_COLUMNS}) VALUES (?{', ?' * len(PLUGIN_DATABASE_KEYS)})",
+            [(binaryId,) + tuple(plugin[key] for key in PLUGIN_DATABASE_KEYS) for plugin in plugins])
+
+    # Imports the plugin lists previously stored as settings, once.
+    # Done together with setting the migrated flag, so a failed import is tried again next time.
+    # The old keys are left alone, older Carla versions keep using them.
+    def _migrateFromSettings(self):
+        settingsDB = QSafeSettings("falkTX", "CarlaPlugins5")
+
+        settingsDB.beginGroup("Plugins")
+        sources = settingsDB.childKeys()
+        settingsDB.endGroup()
+
+        try:
+            with _Transaction(self.fConnection) as cursor:
+                # another thread might have done it meanwhile
+                if self._getMeta(PLUGIN_DATABASE_META_MIGRATED, cursor) is not None:
+                    return
+
+                for source in sources:
+                    self._migrateSource(cursor, settingsDB, source)
+
+                self._setMeta(cursor, PLUGIN_DATABASE_META_MIGRATED, "1")
+        except (KeyError, TypeError, sqlite3.Error) as e:
+            qWarning(f"Failed to import plugin list from settings, will retry next time: {e}")
+
+    def _migrateSource(self, cursor, settingsDB, source):
+        # already rescanned since a previous failed import, the database is newer than the settings
+        if cursor.execute("SELECT 1 FROM sources WHERE name = ?", (source,)).fetchone() is not None:
+            return
+
+        entries = settingsDB.value("Plugins/" + source, [], list)
+
+        # sources discovered per binary store a list of plugin lists
+        perBinary = bool(entries) and isinstance(entries[0], list)
+
+        self._ensureSource(cursor, source)
+        cursor.execute("UPDATE sources SET count = ? WHERE name = ?",
+                       (settingsDB.value("PluginCount/" + source, -1, int), source))
+
+        if not perBinary:
+            plugins = [plugin for plugin in entries if plugin['API'] == PLUGIN_QUERY_API_VERSION]
+            self._insertBinary(cursor, source, "", None, plugins)
+            return
+
+        binaries = {}
+        for plugins in entries:
+            for plugin in plugins:
+                if plugin['API'] == PLUGIN_QUERY_API_VERSION:
+                    binaries.setdefault(plugin['filename'], []).append(plugin)
+
+        # no fingerprints, the next rescan probes these binaries again
+        for filename, plugins in binaries.items():
+            self._insertBinary(cursor, source, filename, None, plugins)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Transaction helper, rolls back on errors
+
+class _Transaction(object):
+    def __init__(self, connection):
+        self.fConnection = connection
+
+    def __enter__(self):
+        self.fConnection.execute("BEGIN IMMEDIATE")
+        return self.fConnection.cursor()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.fConnection.execute("COMMIT")
+        else:
+            self.fConnection.execute("ROLLBACK")
+        return False
+
+# ---------------------------------------------------------------------------------------------------------------------
@@ -19,10 +19,8 @@
 # ---------------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
-import os
-
-from PyQt5.QtCore import pyqtSlot, Qt, QByteArray, QEventLoop
-from PyQt5.QtWidgets import QApplication, QDialog, QHeaderView, QTableWidgetItem, QWidget
+from PyQt5.QtCore import pyqtSlot, Qt, QByteArray, QEventLoop, QModelIndex
+from PyQt5.QtWidgets import QApplication, QDialog, QHeaderView, QTableView, QTableWidget, QWidget
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Imports (Carla)
@@ -40,7 +38,6 @@ from carla_backend import (
     PLUGIN_HAS_INLINE_DISPLAY,
     PLUGIN_INTERNAL,
     PLUGIN_IS_BRIDGE,
-    PLUGIN_IS_RTSAFE,
     PLUGIN_IS_SYNTH,
     PLUGIN_JSFX,
     PLUGIN_LADSPA,
@@ -55,7 +52,6 @@ from carla_backend import (
 from carla_shared import (
     CARLA_DEFAULT_LV2_PATH,
     CARLA_KEY_PATHS_LV2,
-    HAIKU,
     LINUX,
     MACOS,
     WINDOWS,
@@ -73,7 +69,26 @@ from utils import QSafeSettings
 # ---------------------------------------------------------------------------------------------------------------------
 # Imports (Local)
 
-from .discovery import PLUGIN_QUERY_API_VERSION, checkPluginCached
+from .discovery import checkPluginCached
+from .plugindatabase import PluginDatabase
+from .pluginlistmodel import (
+    PLUGIN_LIST_FLAG_BRIDGED,
+    PLUGIN_LIST_FLAG_BRIDGED_WINE,
+    PLUGIN_LIST_FLAG_CV,
+    PLUGIN_LIST_FLAG_EFFECT,
+    PLUGIN_LIST_FLAG_FAVORITE,
+    PLUGIN_LIST_FLAG_GUI,
+    PLUGIN_LIST_FLAG_INLINE_DISPLAY,
+    PLUGIN_LIST_FLAG_INSTRUMENT,
+    PLUGIN_LIST_FLAG_KIT,
+    PLUGIN_LIST_FLAG_MIDI,
+    PLUGIN_LIST_FLAG_NATIVE,
+    PLUGIN_LIST_FLAG_OTHER,
+    PLUGIN_LIST_FLAG_RTSAFE,
+    PLUGIN_LIST_FLAG_STEREO,
+    getPluginTypeFlag,
+    PluginListModel,
+)
 from .pluginlistdialog_ui import Ui_PluginListDialog
 from .pluginlistrefreshdialog import PluginRefreshW
 
@@ -81,11 +96,11 @@ from .pluginlistrefreshdialog import PluginRefreshW
 # Plugin Database Dialog
 
 class PluginListDialog(QDialog):
-    TABLEWIDGET_ITEM_FAVORITE = 0
-    TABLEWIDGET_ITEM_NAME     = 1
-    TABLEWIDGET_ITEM_LABEL    = 2
-    TABLEWIDGET_ITEM_MAKER    = 3
-    TABLEWIDGET_ITEM_BINARY   = 4
+    TABLEWIDGET_ITEM_FAVORITE = PluginListModel.COLUMN_FAVORITE
+    TABLEWIDGET_ITEM_NAME     = PluginListModel.COLUMN_NAME
+    TABLEWIDGET_ITEM_LABEL    = PluginListModel.COLUMN_LABEL
+    TABLEWIDGET_ITEM_MAKER    = PluginListModel.COLUMN_MAKER
+    TABLEWIDGET_ITEM_BINARY   = PluginListModel.COLUMN_BINARY
 
     def __init__(self, parent: QWidget, host, useSystemIcons: bool):
         QDialog.__init__(self, parent)
@@ -99,7 +114,6 @@ class PluginListDialog(QDialog):
         # ----------------------------------------------------------------------------------------------------
         # Internal stuff
 
-        self.fLastTableIndex = 0
         self.fRetPlugin  = None
         self.fRealParent = parent
         self.fFavoritePlugins = []
@@ -110,6 +124,13 @@ class PluginListDialog(QDialog):
         self.fTrNo     = self.tr("No")
         self.fTrNative = self.tr("Native")
 
+        # ----------------------------------------------------------------------------------------------------
+        # Set-up plugin list
+
+        self.fModel = PluginListModel(self)
+        self.ui.tableView = self._createTableView(self.ui.tableWidget)
+        del self.ui.tableWidget
+
         # ----------------------------------------------------------------------------------------------------
         # Set-up GUI
 
@@ -173,8 +194,7 @@ class PluginListDialog(QDialog):
             self.ui.b_cancel.setIcon(getIcon('dialog-cancel', 16, 'svgz'))
             self.ui.b_clear_filters.setIcon(getIcon('edit-clear', 16, 'svgz'))
             self.ui.b_refresh.setIcon(getIcon('view-refresh', 16, 'svgz'))
-            hhi = self.ui.tableWidget.horizontalHeaderItem(self.TABLEWIDGET_ITEM_FAVORITE)
-            hhi.setIcon(getIcon('bookmarks', 16, 'svgz'))
+            self.fModel.setHeader(self.TABLEWIDGET_ITEM_FAVORITE, "", getIcon('bookmarks', 16, 'svgz'))
 
         # ----------------------------------------------------------------------------------------------------
         # Set-up connections
@@ -185,9 +205,9 @@ class PluginListDialog(QDialog):
         self.ui.b_refresh.clicked.connect(self.slot_refreshPlugins)
         self.ui.b_clear_filters.clicked.connect(self.slot_clearFilters)
         self.ui.lineEdit.textChanged.connect(self.slot_checkFilters)
-        self.ui.tableWidget.currentCellChanged.connect(self.slot_checkPlugin)
-        self.ui.tableWidget.cellClicked.connect(self.slot_cellClicked)
-        self.ui.tableWidget.cellDoubleClicked.connect(self.slot_cellDoubleClicked)
+        self.ui.tableView.selectionModel().currentRowChanged.connect(self.slot_currentRowChanged)
+        self.ui.tableView.doubleClicked.connect(self.slot_doubleClicked)
+        self.fModel.favoriteChanged.connect(self.slot_favoriteChanged)
 
         self.ui.ch_internal.clicked.connect(self.slot_checkFilters)
         self.ui.ch_ladspa.clicked.connect(self.slot_checkFilters)
@@ -231,29 +251,30 @@ class PluginListDialog(QDialog):
 
     # --------------------------------------------------------------------------------------------------------
 
-    @pyqtSlot(int, int)
-    def slot_cellClicked(self, row, column):
-        if column == self.TABLEWIDGET_ITEM_FAVORITE:
-            widget = self.ui.tableWidget.item(row, self.TABLEWIDGET_ITEM_FAVORITE)
-            plugin = self.ui.tableWidget.item(row, self.TABLEWIDGET_ITEM_NAME).data(Qt.UserRole+1)
-            plugin = self._createFavoritePluginDict(plugin)
-
-            if widget.checkState() == Qt.Checked:
-                if not plugin in self.fFavoritePlugins:
-                    self.fFavoritePlugins.append(plugin)
-                    self.fFavoritePluginsChanged = True
-            else:
-                try:
-                    self.fFavoritePlugins.remove(plugin)
-                    self.fFavoritePluginsChanged = True
-                except ValueError:
-                    pass
-
-    @pyqtSlot(int, int)
-    def slot_cellDoubleClicked(self, _, column):
-        if column != self.TABLEWIDGET_ITEM_FAVORITE:
+    @pyqtSlot(dict, bool)
+    def slot_favoriteChanged(self, plugin, checked):
+        plugin = self._createFavoritePluginDict(plugin)
+
+        if checked:
+            if not plugin in self.fFavoritePlugins:
+                self.fFavoritePlugins.append(plugin)
+                self.fFavoritePluginsChanged = True
+        else:
+            try:
+                self.fFavoritePlugins.remove(plugin)
+                self.fFavoritePluginsChanged = True
+            except ValueError:
+                pass
+
+    @pyqtSlot(QModelIndex)
+    def slot_doubleClicked(self, index):
+        if index.column() != self.TABLEWIDGET_ITEM_FAVORITE:
             self.slot_addPlugin()
 
+    @pyqtSlot(QModelIndex, QModelIndex)
+    def slot_currentRowChanged(self, current, _):
+        self.slot_checkPlugin(current.row())
+
     @pyqtSlot()
     def slot_focusSearchFieldAndSelectAll(self):
         self.ui.lineEdit.setFocus()
@@ -261,19 +282,18 @@ class PluginListDialog(QDialog):
 
     @pyqtSlot()
     def slot_addPlugin(self):
-        if self.ui.tableWidget.currentRow() >= 0:
-            self.fRetPlugin = self.ui.tableWidget.item(self.ui.tableWidget.currentRow(),
-                                                       self.TABLEWIDGET_ITEM_NAME).data(Qt.UserRole+1)
+        if self.ui.tableView.currentIndex().row() >= 0:
+            self.fRetPlugin = self.fModel.getPlugin(self.ui.tableView.currentIndex().row())
             self.accept()
         else:
             self.reject()
 
     @pyqtSlot(int)
     def slot_checkPlugin(self, row):
-        if row >= 0:
+        plugin = self.fModel.getPlugin(row)
+
+        if plugin is not None:
             self.ui.b_add.setEnabled(True)
-            plugin = self.ui.tableWidget.item(self.ui.tableWidget.currentRow(),
-                                              self.TABLEWIDGET_ITEM_NAME).data(Qt.UserRole+1)
 
             isSynth  = bool(plugin['hints'] & PLUGIN_IS_SYNTH)
             isEffect = bool(plugin['audio.ins'] > 0 < plugin['audio.outs'] and not isSynth)
@@ -439,7 +459,7 @@ class PluginListDialog(QDialog):
     def slot_saveSettings(self):
         settings = QSafeSettings("falkTX", "CarlaDatabase2")
         settings.setValue("PluginDatabase/Geometry", self.saveGeometry())
-        settings.setValue("PluginDatabase/TableGeometry_6", self.ui.tableWidget.horizontalHeader().saveState())
+        settings.setValue("PluginDatabase/TableGeometry_6", self.ui.tableView.horizontalHeader().saveState())
         settings.setValue("PluginDatabase/ShowEffects", self.ui.ch_effects.isChecked())
         settings.setValue("PluginDatabase/ShowInstruments", self.ui.ch_instruments.isChecked())
         settings.setValue("PluginDatabase/ShowMIDI", self.ui.ch_midi.isChecked())
@@ -552,16 +572,16 @@ class PluginListDialog(QDialog):
             self.ui.ch_cat_other.setChecked(":other:" in categoryhash)
 
         tableGeometry = settings.value("PluginDatabase/TableGeometry_6", QByteArray(), QByteArray)
-        horizontalHeader = self.ui.tableWidget.horizontalHeader()
+        horizontalHeader = self.ui.tableView.horizontalHeader()
         if not tableGeometry.isNull():
             horizontalHeader.restoreState(tableGeometry)
         else:
             horizontalHeader.setSectionResizeMode(self.TABLEWIDGET_ITEM_FAVORITE, QHeaderView.Fixed)
-            self.ui.tableWidget.setColumnWidth(self.TABLEWIDGET_ITEM_FAVORITE, 24)
-            self.ui.tableWidget.setColumnWidth(self.TABLEWIDGET_ITEM_NAME, 250)
-            self.ui.tableWidget.setColumnWidth(self.TABLEWIDGET_ITEM_LABEL, 200)
-            self.ui.tableWidget.setColumnWidth(self.TABLEWIDGET_ITEM_MAKER, 150)
-            self.ui.tableWidget.sortByColumn(self.TABLEWIDGET_ITEM_NAME, Qt.AscendingOrder)
+            self.ui.tableView.setColumnWidth(self.TABLEWIDGET_ITEM_FAVORITE, 24)
+            self.ui.tableView.setColumnWidth(self.TABLEWIDGET_ITEM_NAME, 250)
+            self.ui.tableView.setColumnWidth(self.TABLEWIDGET_ITEM_LABEL, 200)
+            self.ui.tableView.setColumnWidth(self.TABLEWIDGET_ITEM_MAKER, 150)
+            self.ui.tableView.sortByColumn(self.TABLEWIDGET_ITEM_NAME, Qt.AscendingOrder)
 
     # --------------------------------------------------------------------------------------------------------
 
@@ -576,192 +596,145 @@ class PluginListDialog(QDialog):
         }
 
     def _checkFilters(self):
-        text = self.ui.lineEdit.text().lower()
-
-        hideEffects     = not self.ui.ch_effects.isChecked()
-        hideInstruments = not self.ui.ch_instruments.isChecked()
-        hideMidi        = not self.ui.ch_midi.isChecked()
-        hideOther       = not self.ui.ch_other.isChecked()
-
-        hideInternal = not self.ui.ch_internal.isChecked()
-        hideLadspa   = not self.ui.ch_ladspa.isChecked()
-        hideDssi     = not self.ui.ch_dssi.isChecked()
-        hideLV2      = not self.ui.ch_lv2.isChecked()
-        hideVST2     = not self.ui.ch_vst.isChecked()
-        hideVST3     = not self.ui.ch_vst3.isChecked()
-        hideCLAP     = not self.ui.ch_clap.isChecked()
-        hideAU       = not self.ui.ch_au.isChecked()
-        hideJSFX     = not self.ui.ch_jsfx.isChecked()
-        hideKits     = not self.ui.ch_kits.isChecked()
-
-        hideNative  = not self.ui.ch_native.isChecked()
-        hideBridged = not self.ui.ch_bridged.isChecked()
-        hideBridgedWine = not self.ui.ch_bridged_wine.isChecked()
-
-        hideNonFavs   = self.ui.ch_favorites.isChecked()
-        hideNonRtSafe = self.ui.ch_rtsafe.isChecked()
-        hideNonCV     = self.ui.ch_cv.isChecked()
-        hideNonGui    = self.ui.ch_gui.isChecked()
-        hideNonIDisp  = self.ui.ch_inline_display.isChecked()
-        hideNonStereo = self.ui.ch_stereo.isChecked()
-
-        if HAIKU or LINUX or MACOS:
-            nativeBins = [BINARY_POSIX32, BINARY_POSIX64]
-            wineBins   = [BINARY_WIN32, BINARY_WIN64]
-        elif WINDOWS:
-            nativeBins = [BINARY_WIN32, BINARY_WIN64]
-            wineBins   = []
-        else:
-            nativeBins = []
-            wineBins   = []
-
-        self.ui.tableWidget.setRowCount(self.fLastTableIndex)
-
-        for i in range(self.fLastTableIndex):
-            plugin = self.ui.tableWidget.item(i, self.TABLEWIDGET_ITEM_NAME).data(Qt.UserRole+1)
-            ptext  = self.ui.tableWidget.item(i, self.TABLEWIDGET_ITEM_NAME).data(Qt.UserRole+2)
-            aIns   = plugin['audio.ins']
-            aOuts  = plugin['audio.outs']
-            cvIns  = plugin['cv.ins']
-            cvOuts = plugin['cv.outs']
-            mIns   = plugin['midi.ins']
-            mOuts  = plugin['midi.outs']
-            phints = plugin['hints']
-            ptype  = plugin['type']
-            categ  = plugin['category']
-            isSynth  = bool(phints & PLUGIN_IS_SYNTH)
-            isEffect = bool(aIns > 0 < aOuts and not isSynth)
-            isMidi   = bool(aIns == 0 and aOuts == 0 and mIns > 0 < mOuts)
-            isKit    = bool(ptype in (PLUGIN_SF2, PLUGIN_SFZ))
-            isOther  = bool(not (isEffect or isSynth or isMidi or isKit))
-            isNative = bool(plugin['build'] == BINARY_NATIVE)
-            isRtSafe = bool(phints & PLUGIN_IS_RTSAFE)
-            isStereo = bool(aIns == 2 and aOuts == 2) or (isSynth and aOuts == 2)
-            hasCV    = bool(cvIns + cvOuts > 0)
-            hasGui   = bool(phints & PLUGIN_HAS_CUSTOM_UI)
-            hasIDisp = bool(phints & PLUGIN_HAS_INLINE_DISPLAY)
-
-            isBridged = bool(not isNative and plugin['build'] in nativeBins)
-            isBridgedWine = bool(not isNative and plugin['build'] in wineBins)
-
-            if hideEffects and isEffect:
-                self.ui.tableWidget.hideRow(i)
-            elif hideInstruments and isSynth:
-                self.ui.tableWidget.hideRow(i)
-            elif hideMidi and isMidi:
-                self.ui.tableWidget.hideRow(i)
-            elif hideOther and isOther:
-                self.ui.tableWidget.hideRow(i)
-            elif hideKits and isKit:
-                self.ui.tableWidget.hideRow(i)
-            elif hideInternal and ptype == PLUGIN_INTERNAL:
-                self.ui.tableWidget.hideRow(i)
-            elif hideLadspa and ptype == PLUGIN_LADSPA:
-                self.ui.tableWidget.hideRow(i)
-            elif hideDssi and ptype == PLUGIN_DSSI:
-                self.ui.tableWidget.hideRow(i)
-            elif hideLV2 and ptype == PLUGIN_LV2:
-                self.ui.tableWidget.hideRow(i)
-            elif hideVST2 and ptype == PLUGIN_VST2:
-                self.ui.tableWidget.hideRow(i)
-            elif hideVST3 and ptype == PLUGIN_VST3:
-                self.ui.tableWidget.hideRow(i)
-            elif hideCLAP and ptype == PLUGIN_CLAP:
-                self.ui.tableWidget.hideRow(i)
-            elif hideAU and ptype == PLUGIN_AU:
-                self.ui.tableWidget.hideRow(i)
-            elif hideJSFX and ptype == PLUGIN_JSFX:
-                self.ui.tableWidget.hideRow(i)
-            elif hideNative and isNative:
-                self.ui.tableWidget.hideRow(i)
-            elif hideBridged and isBridged:
-                self.ui.tableWidget.hideRow(i)
-            elif hideBridgedWine and isBridgedWine:
-                self.ui.tableWidget.hideRow(i)
-            elif hideNonRtSafe and not isRtSafe:
-                self.ui.tableWidget.hideRow(i)
-            elif hideNonCV and not hasCV:
-                self.ui.tableWidget.hideRow(i)
-            elif hideNonGui and not hasGui:
-                self.ui.tableWidget.hideRow(i)
-            elif hideNonIDisp and not hasIDisp:
-                self.ui.tableWidget.hideRow(i)
-            elif hideNonStereo and not isStereo:
-                self.ui.tableWidget.hideRow(i)
-            elif text and not all(t in ptext for t in text.strip().split(' ')):
-                self.ui.tableWidget.hideRow(i)
-            elif hideNonFavs and self._createFavoritePluginDict(plugin) not in self.fFavoritePlugins:
-                self.ui.tableWidget.hideRow(i)
-            elif (self.ui.ch_cat_all.isChecked() or
-                  (self.ui.ch_cat_delay.isChecked() and categ == "delay") or
-                  (self.ui.ch_cat_distortion.isChecked() and categ == "distortion") or
-                  (self.ui.ch_cat_dynamics.isChecked() and categ == "dynamics") or
-                  (self.ui.ch_cat_eq.isChecked() and categ == "eq") or
-                  (self.ui.ch_cat_filter.isChecked() and categ == "filter") or
-                  (self.ui.ch_cat_modulator.isChecked() and categ == "modulator") or
-                  (self.ui.ch_cat_synth.isChecked() and categ == "synth") or
-                  (self.ui.ch_cat_utility.isChecked() and categ == "utility") or
-                  (self.ui.ch_cat_other.isChecked() and categ == "other")):
-                self.ui.tableWidget.showRow(i)
-            else:
-                self.ui.tableWidget.hideRow(i)
+        hideFlags = 0
+        requireFlags = 0
+
+        if not self.ui.ch_effects.isChecked():
+            hideFlags |= PLUGIN_LIST_FLAG_EFFECT
+        if not self.ui.ch_instruments.isChecked():
+            hideFlags |= PLUGIN_LIST_FLAG_INSTRUMENT
+        if not self.ui.ch_midi.isChecked():
+            hideFlags |= PLUGIN_LIST_FLAG_MIDI
+        if not self.ui.ch_other.isChecked():
+            hideFlags |= PLUGIN_LIST_FLAG_OTHER
+        if not self.ui.ch_kits.isChecked():
+            hideFlags |= PLUGIN_LIST_FLAG_KIT
+
+        if not self.ui.ch_internal.isChecked():
+            hideFlags |= getPluginTypeFlag(PLUGIN_INTERNAL)
+        if not self.ui.ch_ladspa.isChecked():
+            hideFlags |= getPluginTypeFlag(PLUGIN_LADSPA)
+        if not self.ui.ch_dssi.isChecked():
+            hideFlags |= getPluginTypeFlag(PLUGIN_DSSI)
+        if not self.ui.ch_lv2.isChecked():
+            hideFlags |= getPluginTypeFlag(PLUGIN_LV2)
+        if not self.ui.ch_vst.isChecked():
+            hideFlags |= getPluginTypeFlag(PLUGIN_VST2)
+        if not self.ui.ch_vst3.isChecked():
+            hideFlags |= getPluginTypeFlag(PLUGIN_VST3)
+        if not self.ui.ch_clap.isChecked():
+            hideFlags |= getPluginTypeFlag(PLUGIN_CLAP)
+        if not self.ui.ch_au.isChecked():
+            hideFlags |= getPluginTypeFlag(PLUGIN_AU)
+        if not self.ui.ch_jsfx.isChecked():
+            hideFlags |= getPluginTypeFlag(PLUGIN_JSFX)
+
+        if not self.ui.ch_native.isChecked():
+            hideFlags |= PLUGIN_LIST_FLAG_NATIVE
+        if not self.ui.ch_bridged.isChecked():
+            hideFlags |= PLUGIN_LIST_FLAG_BRIDGED
+        if not self.ui.ch_bridged_wine.isChecked():
+            hideFlags |= PLUGIN_LIST_FLAG_BRIDGED_WINE
+
+        if self.ui.ch_favorites.isChecked():
+            requireFlags |= PLUGIN_LIST_FLAG_FAVORITE
+        if self.ui.ch_rtsafe.isChecked():
+            requireFlags |= PLUGIN_LIST_FLAG_RTSAFE
+        if self.ui.ch_cv.isChecked():
+            requireFlags |= PLUGIN_LIST_FLAG_CV
+        if self.ui.ch_gui.isChecked():
+            requireFlags |= PLUGIN_LIST_FLAG_GUI
+        if self.ui.ch_inline_display.isChecked():
+            requireFlags |= PLUGIN_LIST_FLAG_INLINE_DISPLAY
+        if self.ui.ch_stereo.isChecked():
+            requireFlags |= PLUGIN_LIST_FLAG_STEREO
 
-    # --------------------------------------------------------------------------------------------------------
-
-    def _addPluginToTable(self, plugin, ptype):
-        if plugin['API'] != PLUGIN_QUERY_API_VERSION:
-            return
-        if ptype in (self.tr("Internal"), "LV2", "SF2", "SFZ", "JSFX"):
-            plugin['build'] = BINARY_NATIVE
-
-        index = self.fLastTableIndex
-
-        isFav = bool(self._createFavoritePluginDict(plugin) in self.fFavoritePlugins)
-        favItem = QTableWidgetItem()
-        favItem.setCheckState(Qt.Checked if isFav else Qt.Unchecked)
-        favItem.setText(" " if isFav else "  ")
-
-        pluginText = (plugin['name']+plugin['label']+plugin['maker']+plugin['filename']).lower()
-        self.ui.tableWidget.setItem(index, self.TABLEWIDGET_ITEM_FAVORITE, favItem)
-        self.ui.tableWidget.setItem(index, self.TABLEWIDGET_ITEM_NAME, QTableWidgetItem(plugin['name']))
-        self.ui.tableWidget.setItem(index, self.TABLEWIDGET_ITEM_LABEL, QTableWidgetItem(plugin['label']))
-        self.ui.tableWidget.setItem(index, self.TABLEWIDGET_ITEM_MAKER, QTableWidgetItem(plugin['maker']))
-        self.ui.tableWidget.setItem(index, self.TABLEWIDGET_ITEM_BINARY, QTableWidgetItem(os.path.basename(plugin['filename'])))
-        self.ui.tableWidget.item(index, self.TABLEWIDGET_ITEM_NAME).setData(Qt.UserRole+1, plugin)
-        self.ui.tableWidget.item(index, self.TABLEWIDGET_ITEM_NAME).setData(Qt.UserRole+2, pluginText)
+        if self.ui.ch_cat_all.isChecked():
+            categories = None
+        else:
+            categories = set()
+            if self.ui.ch_cat_delay.isChecked():
+                categories.add("delay")
+            if self.ui.ch_cat_distortion.isChecked():
+                categories.add("distortion")
+            if self.ui.ch_cat_dynamics.isChecked():
+                categories.add("dynamics")
+            if self.ui.ch_cat_eq.isChecked():
+                categories.add("eq")
+            if self.ui.ch_cat_filter.isChecked():
+                categories.add("filter")
+            if self.ui.ch_cat_modulator.isChecked():
+                categories.add("modulator")
+            if self.ui.ch_cat_synth.isChecked():
+                categories.add("synth")
+            if self.ui.ch_cat_utility.isChecked():
+                categories.add("utility")
+            if self.ui.ch_cat_other.isChecked():
+                categories.add("other")
+            categories = frozenset(categories)
 
-        self.fLastTableIndex += 1
+        self.fModel.setFilter(hideFlags, requireFlags, categories, self.ui.lineEdit.text())
 
     # --------------------------------------------------------------------------------------------------------
 
-    def _reAddInternalHelper(self, settingsDB, ptype, path):
+    # The ui file table widget is shared with the C++ dialog, here it gets replaced by a view on fModel
+    def _createTableView(self, tableWidget: QTableWidget):
+        tableView = QTableView(self)
+        tableView.setObjectName("tableView")
+        tableView.setSizePolicy(tableWidget.sizePolicy())
+        tableView.setEditTriggers(tableWidget.editTriggers())
+        tableView.setDragDropOverwriteMode(tableWidget.dragDropOverwriteMode())
+        tableView.setAlternatingRowColors(tableWidget.alternatingRowColors())
+        tableView.setSelectionMode(tableWidget.selectionMode())
+        tableView.setSelectionBehavior(tableWidget.selectionBehavior())
+        tableView.setShowGrid(tableWidget.showGrid())
+        tableView.setGridStyle(tableWidget.gridStyle())
+        tableView.setWordWrap(tableWidget.wordWrap())
+
+        for oldHeader, newHeader in ((tableWidget.horizontalHeader(), tableView.horizontalHeader()),
+                                     (tableWidget.verticalHeader(), tableView.verticalHeader())):
+            newHeader.setVisible(not oldHeader.isHidden())
+            newHeader.setMinimumSectionSize(oldHeader.minimumSectionSize())
+            newHeader.setDefaultSectionSize(oldHeader.defaultSectionSize())
+            newHeader.setStretchLastSection(oldHeader.stretchLastSection())
+
+        for column in range(tableWidget.columnCount()):
+            item = tableWidget.horizontalHeaderItem(column)
+            self.fModel.setHeader(column, item.text(), item.icon())
+
+        tableView.setModel(self.fModel)
+        tableView.setSortingEnabled(tableWidget.isSortingEnabled())
+
+        self.layout().replaceWidget(tableWidget, tableView)
+        QWidget.setTabOrder(tableView, self.ui.b_add)
+        tableWidget.hide()
+        tableWidget.deleteLater()
+
+        return tableView
+
+    # Updates the plugins of a backend cached type in the database, if their count changed
+    def _reAddInternalHelper(self, database, ptype, path):
         if ptype == PLUGIN_INTERNAL:
-            ptypeStr   = "Internal"
-            ptypeStrTr = self.tr("Internal")
+            ptypeStr = "Internal"
         elif ptype == PLUGIN_LV2:
-            ptypeStr   = "LV2"
-            ptypeStrTr = ptypeStr
+            ptypeStr = "LV2"
         elif ptype == PLUGIN_AU:
-            ptypeStr   = "AU"
-            ptypeStrTr = ptypeStr
+            ptypeStr = "AU"
         #elif ptype == PLUGIN_SFZ:
-            #ptypeStr   = "SFZ"
-            #ptypeStrTr = ptypeStr
+            #ptypeStr = "SFZ"
         # TODO(jsfx) what to do here?
         else:
-            return 0
+            return
 
-        plugins     = settingsDB.value("Plugins/" + ptypeStr, [], list)
-        pluginCount = settingsDB.value("PluginCount/" + ptypeStr, 0, int)
+        pluginCount = database.getSourceCount(ptypeStr)
 
         if ptype == PLUGIN_AU:
             gCarla.utils.juce_init()
 
         pluginCountNew = gCarla.utils.get_cached_plugin_count(ptype, path)
 
-        if pluginCountNew != pluginCount or len(plugins) != pluginCount or (len(plugins) > 0 and plugins[0]['API'] != PLUGIN_QUERY_API_VERSION):
-            plugins     = []
-            pluginCount = pluginCountNew
+        if pluginCountNew != pluginCount or database.countPlugins(ptypeStr) != pluginCount:
+            plugins = []
 
             QApplication.processEvents(QEventLoop.ExcludeUserInputEvents, 50)
             if ptype == PLUGIN_AU:
@@ -782,26 +755,13 @@ class PluginListDialog(QDialog):
                     if ptype == PLUGIN_AU:
                         gCarla.utils.juce_idle()
 
-            settingsDB.setValue("Plugins/" + ptypeStr, plugins)
-            settingsDB.setValue("PluginCount/" + ptypeStr, pluginCount)
+            database.replaceSource(ptypeStr, plugins, pluginCountNew)
 
         if ptype == PLUGIN_AU:
             gCarla.utils.juce_cleanup()
 
-        # prepare rows in advance
-        self.ui.tableWidget.setRowCount(self.fLastTableIndex + len(plugins))
-
-        for plugin in plugins:
-            self._addPluginToTable(plugin, ptypeStrTr)
-
-        return pluginCount
-
     def _reAddPlugins(self):
-        settingsDB = QSafeSettings("falkTX", "CarlaPlugins5")
-
-        self.fLastTableIndex = 0
-        self.ui.tableWidget.setSortingEnabled(False)
-        self.ui.tableWidget.clearContents()
+        database = PluginDatabase()
 
         settings = QSafeSettings("falkTX", "Carla2")
         LV2_PATH = splitter.join(settings.value(CARLA_KEY_PATHS_LV2, CARLA_DEFAULT_LV2_PATH, list))
@@ -810,163 +770,42 @@ class PluginListDialog(QDialog):
         # ----------------------------------------------------------------------------------------------------
         # plugins handled through backend
 
-        internalCount = self._reAddInternalHelper(settingsDB, PLUGIN_INTERNAL, "")
-        lv2Count      = self._reAddInternalHelper(settingsDB, PLUGIN_LV2, LV2_PATH)
-        auCount       = self._reAddInternalHelper(settingsDB, PLUGIN_AU, "") if MACOS else 0
+        self._reAddInternalHelper(database, PLUGIN_INTERNAL, "")
+        self._reAddInternalHelper(database, PLUGIN_LV2, LV2_PATH)
 
-        # ----------------------------------------------------------------------------------------------------
-        # LADSPA
-
-        ladspaPlugins  = []
-        ladspaPlugins += settingsDB.value("Plugins/LADSPA_native", [], list)
-        ladspaPlugins += settingsDB.value("Plugins/LADSPA_posix32", [], list)
-        ladspaPlugins += settingsDB.value("Plugins/LADSPA_posix64", [], list)
-        ladspaPlugins += settingsDB.value("Plugins/LADSPA_win32", [], list)
-        ladspaPlugins += settingsDB.value("Plugins/LADSPA_win64", [], list)
-
-        # ----------------------------------------------------------------------------------------------------
-        # DSSI
-
-        dssiPlugins  = []
-        dssiPlugins += settingsDB.value("Plugins/DSSI_native", [], list)
-        dssiPlugins += settingsDB.value("Plugins/DSSI_posix32", [], list)
-        dssiPlugins += settingsDB.value("Plugins/DSSI_posix64", [], list)
-        dssiPlugins += settingsDB.value("Plugins/DSSI_win32", [], list)
-        dssiPlugins += settingsDB.value("Plugins/DSSI_win64", [], list)
-
-        # ----------------------------------------------------------------------------------------------------
-        # VST2
-
-        vst2Plugins  = []
-        vst2Plugins += settingsDB.value("Plugins/VST2_native", [], list)
-        vst2Plugins += settingsDB.value("Plugins/VST2_posix32", [], list)
-        vst2Plugins += settingsDB.value("Plugins/VST2_posix64", [], list)
-        vst2Plugins += settingsDB.value("Plugins/VST2_win32", [], list)
-        vst2Plugins += settingsDB.value("Plugins/VST2_win64", [], list)
-
-        # ----------------------------------------------------------------------------------------------------
-        # VST3
-
-        vst3Plugins  = []
-        vst3Plugins += settingsDB.value("Plugins/VST3_native", [], list)
-        vst3Plugins += settingsDB.value("Plugins/VST3_posix32", [], list)
-        vst3Plugins += settingsDB.value("Plugins/VST3_posix64", [], list)
-        vst3Plugins += settingsDB.value("Plugins/VST3_win32", [], list)
-        vst3Plugins += settingsDB.value("Plugins/VST3_win64", [], list)
-
-        # ----------------------------------------------------------------------------------------------------
-        # CLAP
-
-        clapPlugins  = []
-        clapPlugins += settingsDB.value("Plugins/CLAP_native", [], list)
-        clapPlugins += settingsDB.value("Plugins/CLAP_posix32", [], list)
-        clapPlugins += settingsDB.value("Plugins/CLAP_posix64", [], list)
-        clapPlugins += settingsDB.value("Plugins/CLAP_win32", [], list)
-        clapPlugins += settingsDB.value("Plugins/CLAP_win64", [], list)
-
-        # ----------------------------------------------------------------------------------------------------
-        # AU (extra non-cached)
-
-        auPlugins32 = settingsDB.value("Plugins/AU_posix32", [], list) if MACOS else []
-
-        # ----------------------------------------------------------------------------------------------------
-        # JSFX
-
-        jsfxPlugins = settingsDB.value("Plugins/JSFX", [], list)
-
-        # ----------------------------------------------------------------------------------------------------
-        # Kits
-
-        sf2s = settingsDB.value("Plugins/SF2", [], list)
-        sfzs = settingsDB.value("Plugins/SFZ", [], list)
+        if MACOS:
+            self._reAddInternalHelper(database, PLUGIN_AU, "")
 
         # ----------------------------------------------------------------------------------------------------
-        # count plugins first, so we can create rows in advance
-
-        ladspaCount = 0
-        dssiCount   = 0
-        vstCount    = 0
-        vst3Count   = 0
-        clapCount   = 0
-        au32Count   = 0
-        jsfxCount   = len(jsfxPlugins)
-        sf2Count    = 0
-        sfzCount    = len(sfzs)
-
-        for plugins in ladspaPlugins:
-            ladspaCount += len(plugins)
-
-        for plugins in dssiPlugins:
-            dssiCount += len(plugins)
-
-        for plugins in vst2Plugins:
-            vstCount += len(plugins)
+        # everything else comes from discovery
 
-        for plugins in vst3Plugins:
-            vst3Count += len(plugins)
+        self.fModel.setPlugins(database.getPluginRows(), self.fFavoritePlugins)
+        database.close()
 
-        for plugins in clapPlugins:
-            clapCount += len(plugins)
+        counts = self.fModel.getPluginTypeCounts()
 
-        for plugins in auPlugins32:
-            au32Count += len(plugins)
-
-        for plugins in sf2s:
-            sf2Count += len(plugins)
-
-        self.ui.tableWidget.setRowCount(self.fLastTableIndex +
-                                        ladspaCount + dssiCount + vstCount + vst3Count + clapCount +
-                                        auCount + au32Count + jsfxCount + sf2Count + sfzCount)
+        internalCount = counts[PLUGIN_INTERNAL]
+        ladspaCount   = counts[PLUGIN_LADSPA]
+        dssiCount     = counts[PLUGIN_DSSI]
+        lv2Count      = counts[PLUGIN_LV2]
+        vstCount      = counts[PLUGIN_VST2]
+        vst3Count     = counts[PLUGIN_VST3]
+        clapCount     = counts[PLUGIN_CLAP]
+        auCount       = counts[PLUGIN_AU] if MACOS else 0
+        jsfxCount     = counts[PLUGIN_JSFX]
+        kitCount      = counts[PLUGIN_SF2] + counts[PLUGIN_SFZ]
 
         if MACOS:
             self.ui.label.setText(self.tr("Have %i Internal, %i LADSPA, %i DSSI, %i LV2, %i VST2, %i VST3, %i CLAP, %i AudioUnit and %i JSFX plugins, plus %i Sound Kits" % (
-                                          internalCount, ladspaCount, dssiCount, lv2Count, vstCount, vst3Count, clapCount, auCount+au32Count, jsfxCount, sf2Count+sfzCount)))
+                                          internalCount, ladspaCount, dssiCount, lv2Count, vstCount, vst3Count, clapCount, auCount, jsfxCount, kitCount)))
         else:
             self.ui.label.setText(self.tr("Have %i Internal, %i LADSPA, %i DSSI, %i LV2, %i VST2, %i VST3, %i CLAP and %i JSFX plugins, plus %i Sound Kits" % (
-                                          internalCount, ladspaCount, dssiCount, lv2Count, vstCount, vst3Count, clapCount, jsfxCount, sf2Count+sfzCount)))
-
-        # ----------------------------------------------------------------------------------------------------
-        # now add all plugins to the table
-
-        for plugins in ladspaPlugins:
-            for plugin in plugins:
-                self._addPluginToTable(plugin, "LADSPA")
-
-        for plugins in dssiPlugins:
-            for plugin in plugins:
-                self._addPluginToTable(plugin, "DSSI")
-
-        for plugins in vst2Plugins:
-            for plugin in plugins:
-                self._addPluginToTable(plugin, "VST2")
-
-        for plugins in vst3Plugins:
-            for plugin in plugins:
-                self._addPluginToTable(plugin, "VST3")
-
-        for plugins in clapPlugins:
-            for plugin in plugins:
-                self._addPluginToTable(plugin, "CLAP")
-
-        for plugins in auPlugins32:
-            for plugin in plugins:
-                self._addPluginToTable(plugin, "AU")
-
-        for plugin in jsfxPlugins:
-            self._addPluginToTable(plugin, "JSFX")
-
-        for sf2 in sf2s:
-            for sf2_i in sf2:
-                self._addPluginToTable(sf2_i, "SF2")
-
-        for sfz in sfzs:
-            self._addPluginToTable(sfz, "SFZ")
+                                          internalCount, ladspaCount, dssiCount, lv2Count, vstCount, vst3Count, clapCount, jsfxCount, kitCount)))
 
         # ----------------------------------------------------------------------------------------------------
 
-        self.ui.tableWidget.setSortingEnabled(True)
         self._checkFilters()
-        self.slot_checkPlugin(self.ui.tableWidget.currentRow())
+        self.slot_checkPlugin(self.ui.tableView.currentIndex().row())
 
     # --------------------------------------------------------------------------------------------------------
 
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Carla plugin host
+# Copyright (C) 2011-2022 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import os
+
+from collections import Counter
+
+from PyQt5.QtCore import pyqtSignal, Qt, QAbstractTableModel, QModelIndex
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Imports (Carla)
+
+from carla_backend import (
+    BINARY_NATIVE,
+    BINARY_POSIX32,
+    BINARY_POSIX64,
+    BINARY_WIN32,
+    BINARY_WIN64,
+    PLUGIN_HAS_CUSTOM_UI,
+    PLUGIN_HAS_INLINE_DISPLAY,
+    PLUGIN_INTERNAL,
+    PLUGIN_IS_RTSAFE,
+    PLUGIN_IS_SYNTH,
+    PLUGIN_JSFX,
+    PLUGIN_LV2,
+    PLUGIN_SF2,
+    PLUGIN_SFZ,
+)
+
+from carla_shared import (
+    HAIKU,
+    LINUX,
+    MACOS,
+    WINDOWS,
+)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Imports (Local)
+
+from .discovery import PyPluginInfo
+from .plugindatabase import PLUGIN_DATABASE_KEYS
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Plugin filter flags, computed once per plugin
+
+PLUGIN_LIST_FLAG_EFFECT         = 1 << 0
+PLUGIN_LIST_FLAG_INSTRUMENT     = 1 << 1
+PLUGIN_LIST_FLAG_MIDI           = 1 << 2
+PLUGIN_LIST_FLAG_OTHER          = 1 << 3
+PLUGIN_LIST_FLAG_KIT            = 1 << 4
+PLUGIN_LIST_FLAG_NATIVE         = 1 << 5
+PLUGIN_LIST_FLAG_BRIDGED        = 1 << 6
+PLUGIN_LIST_FLAG_BRIDGED_WINE   = 1 << 7
+PLUGIN_LIST_FLAG_RTSAFE         = 1 << 8
+PLUGIN_LIST_FLAG_CV             = 1 << 9
+PLUGIN_LIST_FLAG_GUI            = 1 << 10
+PLUGIN_LIST_FLAG_INLINE_DISPLAY = 1 << 11
+PLUGIN_LIST_FLAG_STEREO         = 1 << 12
+PLUGIN_LIST_FLAG_FAVORITE       = 1 << 13
+
+# plugin types get one flag each, after the ones above
+PLUGIN_LIST_FLAG_TYPE_SHIFT = 16
+
+if HAIKU or LINUX or MACOS:
+    kNativeBinaries = (BINARY_POSIX32, BINARY_POSIX64)
+    kWineBinaries   = (BINARY_WIN32, BINARY_WIN64)
+elif WINDOWS:
+    kNativeBinaries = (BINARY_WIN32, BINARY_WIN64)
+    kWineBinaries   = ()
+else:
+    kNativeBinaries = ()
+    kWineBinaries   = ()
+
+# these are always loaded by the host itself
+kAlwaysNativeTypes = (PLUGIN_INTERNAL, PLUGIN_LV2, PLUGIN_SF2, PLUGIN_SFZ, PLUGIN_JSFX)
+
+FAVORITE_KEYS = ('name', 'build', 'type', 'filename', 'label', 'uniqueId')
+
+def getPluginTypeFlag(ptype):
+    return 1 << (PLUGIN_LIST_FLAG_TYPE_SHIFT + ptype)
+
+def getPluginFlags(build, ptype, hints, aIns, aOuts, cvIns, cvOuts, mIns, mOuts):
+    isSynth  = bool(hints & PLUGIN_IS_SYNTH)
+    isEffect = bool(aIns > 0 < aOuts and not isSynth)
+    isMidi   = bool(aIns == 0 and aOuts == 0 and mIns > 0 < mOuts)
+    isKit    = bool(ptype in (PLUGIN_SF2, PLUGIN_SFZ))
+    isNative = bool(build == BINARY_NATIVE)
+
+    flags = getPluginTypeFlag(ptype)
+
+    if isEffect:
+        flags |= PLUGIN_LIST_FLAG_EFFECT
+    if isSynth:
+        flags |= PLUGIN_LIST_FLAG_INSTRUMENT
+    if isMidi:
+        flags |= PLUGIN_LIST_FLAG_MIDI
+    if isKit:
+        flags |= PLUGIN_LIST_FLAG_KIT
+    if not (isEffect or isSynth or isMidi or isKit):
+        flags |= PLUGIN_LIST_FLAG_OTHER
+
+    if isNative:
+        flags |= PLUGIN_LIST_FLAG_NATIVE
+    elif build in kNativeBinaries:
+        flags |= PLUGIN_LIST_FLAG_BRIDGED
+    elif build in kWineBinaries:
+        flags |= PLUGIN_LIST_FLAG_BRIDGED_WINE
+
+    if hints & PLUGIN_IS_RTSAFE:
+        flags |= PLUGIN_LIST_FLAG_RTSAFE
+    if cvIns + cvOuts > 0:
+        flags |= PLUGIN_LIST_FLAG_CV
+    if hints & PLUGIN_HAS_CUSTOM_UI:
+        flags |= PLUGIN_LIST_FLAG_GUI
+    if hints & PLUGIN_HAS_INLINE_DISPLAY:
+        flags |= PLUGIN_LIST_FLAG_INLINE_DISPLAY
+    if (aIns == 2 and aOuts == 2) or (isSynth and aOuts == 2):
+        flags |= PLUGIN_LIST_FLAG_STEREO
+
+    return flags
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Plugin List Model
+#
+# Plugins are stored as one list per field, indexed by plugin number.
+# Filtering and sorting only shuffle plugin numbers around, and items are only created for visible rows by the view.
+
+class PluginListModel(QAbstractTableModel):
+    COLUMN_FAVORITE = 0
+    COLUMN_NAME     = 1
+    COLUMN_LABEL    = 2
+    COLUMN_MAKER    = 3
+    COLUMN_BINARY   = 4
+    COLUMN_COUNT    = 5
+
+    # plugin info, favorite state
+    favoriteChanged = pyqtSignal(dict, bool)
+
+    def __init__(self, parent):
+        QAbstractTableModel.__init__(self, parent)
+
+        self.fColumns  = {key: [] for key in PLUGIN_DATABASE_KEYS}
+        self.fBinaries = []
+        self.fTexts    = []
+        self.fFlags    = []
+        self.fDisplay  = ()
+        self.fSortKeys = {}
+
+        # all plugins in sort order, and the ones matching the current filter
+        self.fOrder = []
+        self.fRows  = []
+
+        self.fSortColumn = self.COLUMN_NAME
+        self.fSortOrder  = Qt.AscendingOrder
+
+        self.fFilter     = None
+        self.fFilterText = ""
+
+        self.fHeaderTexts = [""] * self.COLUMN_COUNT
+        self.fHeaderIcons = [None] * self.COLUMN_COUNT
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # public methods
+
+    def setHeader(self, column, text, icon):
+        self.fHeaderTexts[column] = text
+        self.fHeaderIcons[column] = icon
+        self.headerDataChanged.emit(Qt.Horizontal, column, column)
+
+    # Takes plugin rows as stored in the database, and the favorites as saved in settings
+    def setPlugins(self, rows, favorites):
+        self.beginResetModel()
+
+        if rows:
+            self.fColumns = {key: list(values) for key, values in zip(PLUGIN_DATABASE_KEYS, zip(*rows))}
+        else:
+            self.fColumns = {key: [] for key in PLUGIN_DATABASE_KEYS}
+
+        columns = self.fColumns
+        builds  = columns['build']
+
+        for i, ptype in enumerate(columns['type']):
+            if ptype in kAlwaysNativeTypes:
+                builds[i] = BINARY_NATIVE
+
+        favoriteKeys = set()
+        for favorite in favorites:
+            favoriteKeys.add(tuple(favorite.get(key, None) for key in FAVORITE_KEYS))
+
+        self.fBinaries = [os.path.basename(filename) for filename in columns['filename']]
+        self.fTexts = [(name + label + maker + filename).lower()
+                       for name, label, maker, filename in zip(columns['name'], columns['label'],
+                                                               columns['maker'], columns['filename'])]
+        self.fFlags = [getPluginFlags(*values)
+                       for values in zip(builds, columns['type'], columns['hints'],
+                                         columns['audio.ins'], columns['audio.outs'],
+                                         columns['cv.ins'], columns['cv.outs'],
+                                         columns['midi.ins'], columns['midi.outs'])]
+
+        for i, key in enumerate(zip(*(columns[key] for key in FAVORITE_KEYS))):
+            if key in favoriteKeys:
+                self.fFlags[i] |= PLUGIN_LIST_FLAG_FAVORITE
+
+        self.fDisplay  = (None, columns['name'], columns['label'], columns['maker'], self.fBinaries)
+        self.fSortKeys = {}
+
+        self.fOrder = sorted(range(len(self.fFlags)),
+                             key=self._getSortKey(self.fSortColumn),
+                             reverse=self.fSortOrder == Qt.DescendingOrder)
+        self.fRows  = list(self.fOrder)
+
+        self.fFilter     = None
+        self.fFilterText = ""
+
+        self.endResetModel()
+
+    def getPluginCount(self):
+        return len(self.fFlags)
+
+    def getPluginTypeCounts(self):
+        return Counter(self.fColumns['type'])
+
+    def getPlugin(self, row):
+        if row < 0 or row >= len(self.fRows):
+            return None
+
+        plugin = self.fRows[row]
+        pinfo  = PyPluginInfo.copy()
+
+        for key, values in self.fColumns.items():
+            pinfo[key] = values[plugin]
+
+        return pinfo
+
+    # Shows plugins which have none of the hide flags, all of the require flags,
+    # one of the categories (None for any) and all of the words in text.
+    # When only more text is typed, just the plugins currently shown are checked again.
+    def setFilter(self, hideFlags, requireFlags, categories, text):
+        text = text.lower().strip()
+        filter_ = (hideFlags, requireFlags, categories)
+        refine = filter_ == self.fFilter and text.startswith(self.fFilterText)
+
+        if refine and text == self.fFilterText:
+            return
+
+        if refine:
+            rows = self.fRows
+        else:
+            rows  = self.fOrder
+            flags = self.fFlags
+
+            if hideFlags or requireFlags:
+                rows = [plugin for plugin in rows
+                        if not flags[plugin] & hideFlags and flags[plugin] & requireFlags == requireFlags]
+
+            if categories is not None:
+                pluginCategories = self.fColumns['category']
+                rows = [plugin for plugin in rows if pluginCategories[plugin] in categories]
+
+        if text:
+            texts = self.fTexts
+            for word in text.split(' '):
+                rows = [plugin for plugin in rows if word in texts[plugin]]
+
+        self.fFilter     = filter_
+        self.fFilterText = text
+
+        self.layoutAboutToBeChanged.emit()
+        oldRows = self.fRows
+        self.fRows = rows if rows is not self.fOrder else list(rows)
+        self._updatePersistentIndexes(oldRows)
+        self.layoutChanged.emit()
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # reimplemented methods
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.fRows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.COLUMN_COUNT
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation != Qt.Horizontal:
+            return None
+        if role == Qt.DisplayRole:
+            return self.fHeaderTexts[section]
+        if role == Qt.DecorationRole:
+            return self.fHeaderIcons[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        column = index.column()
+        plugin = self.fRows[index.row()]
+
+        if column == self.COLUMN_FAVORITE:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if self.fFlags[plugin] & PLUGIN_LIST_FLAG_FAVORITE else Qt.Unchecked
+            return None
+
+        if role == Qt.DisplayRole:
+            return self.fDisplay[column][plugin]
+
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if index.column() != self.COLUMN_FAVORITE or role != Qt.CheckStateRole:
+            return False
+
+        plugin  = self.fRows[index.row()]
+        checked = value == Qt.Checked
+
+        if checked:
+            self.fFlags[plugin] |= PLUGIN_LIST_FLAG_FAVORITE
+        else:
+            self.fFlags[plugin] &= ~PLUGIN_LIST_FLAG_FAVORITE
+
+        # the favorites filter needs a full pass again
+        self.fFilter = None
+
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.favoriteChanged.emit(self.getPlugin(index.row()), checked)
+        return True
+
+    def flags(self, index):
+        if index.column() == self.COLUMN_FAVORITE:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.fSortColumn = column
+        self.fSortOrder  = order
+
+        key = self._getSortKey(column)
+        reverse = order == Qt.DescendingOrder
+
+        self.layoutAboutToBeChanged.emit()
+        oldRows = self.fRows
+        self.fOrder.sort(key=key, reverse=reverse)
+        self.fRows = sorted(self.fRows, key=key, reverse=reverse)
+        self._updatePersistentIndexes(oldRows)
+        self.layoutChanged.emit()
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # private methods
+
+    def _getSortKey(self, column):
+        if column == self.COLUMN_FAVORITE:
+            flags = self.fFlags
+            return lambda plugin: not flags[plugin] & PLUGIN_LIST_FLAG_FAVORITE
+
+        try:
+            keys = self.fSortKeys[column]
+        except KeyError:
+            keys = self.fSortKeys[column] = [value.lower() for value in self.fDisplay[column]]
+
+        return keys.__getitem__
+
+    def _updatePersistentIndexes(self, oldRows):
+        oldIndexes = self.persistentIndexList()
+
+        if not oldIndexes:
+            return
+
+        newRows = {plugin: row for row, plugin in enumerate(self.fRows)}
+        newIndexes = []
+
+        for index in oldIndexes:
+            row = newRows.get(oldRows[index.row()], None)
+            newIndexes.append(QModelIndex() if row is None else self.index(row, index.column()))
+
+        self.changePersistentIndexList(oldIndexes, newIndexes)
+
+# ---------------------------------------------------------------------------------------------------------------------
@@ -388,6 +388,7 @@ class PluginRefreshW(QDialog):
                                                                   self.ui.ch_au.isChecked(), self.ui.ch_sf2.isChecked(),
                                                                   self.ui.ch_sfz.isChecked(), self.ui.ch_jsfx.isChecked())
 
+        self.fThread.setForceFullScan(self.ui.ch_force_full.isChecked())
         self.fThread.setSearchBinaryTypes(native, posix32, posix64, win32, win64)
         self.fThread.setSearchPluginTypes(ladspa, dssi, lv2, vst, vst3, clap, au, sf2, sfz, jsfx)
         self.fThread.start()
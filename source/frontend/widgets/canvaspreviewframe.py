@@ -19,16 +19,107 @@
 # ---------------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
+from collections import namedtuple
 from math import floor, ceil
 
-from PyQt5.QtCore import pyqtSignal, Qt, QRectF, QTimer, QEvent, QPoint
-from PyQt5.QtGui import QBrush, QColor, QCursor, QPainter, QPainterPath, QPen, QPixmap
+from PyQt5.QtCore import pyqtSignal, pyqtSlot, Qt, QLineF, QRectF, QThread, QTimer, QEvent, QPoint
+from PyQt5.QtGui import QBrush, QColor, QCursor, QImage, QPainter, QPainterPath, QPen, QPixmap
 from PyQt5.QtWidgets import QFrame, QGraphicsScene
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Antialiasing settings
 
-from patchcanvas import options, ANTIALIASING_FULL
+from patchcanvas import (
+    canvas,
+    options,
+    ANTIALIASING_FULL,
+    PORT_TYPE_AUDIO_JACK,
+    PORT_TYPE_MIDI_ALSA,
+    PORT_TYPE_MIDI_JACK,
+    PORT_TYPE_PARAMETER,
+)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Snapshot of the scene as plain values, taken in the main thread for the simplified render
+
+CanvasPreviewSnapshot = namedtuple("CanvasPreviewSnapshot", (
+    "size",       # (width, height) of the image to render
+    "pixelRatio", # device pixel ratio of the image
+    "source",     # scene rect to render
+    "bgColor",
+    "boxBrush",
+    "boxPen",
+    "boxes",      # list of box scene rects
+    "lines",      # list of (line, color) tuples
+))
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Simplified scene render, boxes and straight lines only, safe to run outside the main thread
+
+class CanvasPreviewRenderThread(QThread):
+    def __init__(self, parent, snapshot: CanvasPreviewSnapshot):
+        QThread.__init__(self, parent)
+
+        self.fSnapshot = snapshot
+        self.fImage    = None
+
+    def run(self):
+        snapshot = self.fSnapshot
+        width, height = snapshot.size
+        image = QImage(max(1, int(width * snapshot.pixelRatio)), max(1, int(height * snapshot.pixelRatio)),
+                       QImage.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(snapshot.pixelRatio)
+        image.fill(snapshot.bgColor)
+
+        painter = QPainter(image)
+        painter.scale(width / snapshot.source.width(), height / snapshot.source.height())
+        painter.translate(-snapshot.source.x(), -snapshot.source.y())
+
+        pen = QPen(Qt.black, 0)
+        for line, color in snapshot.lines:
+            pen.setColor(color)
+            painter.setPen(pen)
+            painter.drawLine(line)
+
+        painter.setBrush(snapshot.boxBrush)
+        painter.setPen(snapshot.boxPen)
+        for rect in snapshot.boxes:
+            painter.drawRect(rect)
+
+        painter.end()
+        self.fImage = image
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Scene preview cache, regenerated (throttled) only when the scene changes
+
+class CanvasPreviewCache():
+    def __init__(self, parent, interval, callback):
+        self.image  = None
+        self.dirty  = True
+        self.thread = None
+
+        self.timer = QTimer(parent)
+        self.timer.setInterval(interval)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(callback)
+
+    def invalidate(self):
+        self.dirty = True
+
+        if not self.timer.isActive():
+            self.timer.start()
+
+    # Take the image from a finished render thread, returns False if there was none
+    def takeRenderResult(self):
+        thread = self.thread
+        self.thread = None
+
+        if thread is None:
+            return False
+
+        thread.wait()
+        self.image = thread.fImage
+        return True
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Widget Class
@@ -61,6 +152,12 @@ class CanvasPreviewFrame(QFrame):
     _RUBBERBAND_BLENDING_PLUS = 1
     _RUBBERBAND_BLENDING_DIFF = 2
 
+    # minimum time between preview renders, in ms
+    _kCacheUpdateInterval = 250
+
+    # render a simplified snapshot in a thread when the canvas has this many groups
+    _kSimplifiedRenderMinGroups = 150
+
     # -----------------------------------------------------------------------------------------------------------------
 
     def __init__(self, parent):
@@ -103,11 +200,19 @@ class CanvasPreviewFrame(QFrame):
         self.fZoomCursors[self._kCursorZoomIn] = QCursor(QPixmap(":/cursors/zoom-in_black.png"), 8, 7)
         self.fZoomCursors[self._kCursorZoomOut] = QCursor(QPixmap(":/cursors/zoom-out_black.png"), 8, 7)
 
+        self.fCache = CanvasPreviewCache(self, self._kCacheUpdateInterval, self.slot_updateCache)
+
     def init(self, scene: QGraphicsScene, realWidth: float, realHeight: float, useCustomPaint: bool = False):
+        if self.fScene is not scene:
+            if self.fScene is not None:
+                self.fScene.changed.disconnect(self.invalidateCache)
+            scene.changed.connect(self.invalidateCache)
+
         self.fScene = scene
         self.fRenderSource = QRectF(0.0, 0.0, realWidth, realHeight)
         self.fInternalRatio = realWidth / realHeight
         self._updateStyle()
+        self.invalidateCache()
 
         if self.fUseCustomPaint != useCustomPaint:
             self.fUseCustomPaint = useCustomPaint
@@ -168,6 +273,44 @@ class CanvasPreviewFrame(QFrame):
 
     # -----------------------------------------------------------------------------------------------------------------
 
+    @pyqtSlot()
+    @pyqtSlot(list)
+    def invalidateCache(self, _=None):
+        self.fCache.invalidate()
+
+    @pyqtSlot()
+    def slot_updateCache(self):
+        if self.fScene is None or not self.fCache.dirty:
+            return
+
+        # try again once the current render is done
+        if self.fCache.thread is not None:
+            return
+
+        # nothing to do while hidden, showEvent triggers a new render
+        if not self.isVisible():
+            return
+
+        self.fCache.dirty = False
+
+        if len(canvas.group_map) >= self._kSimplifiedRenderMinGroups:
+            self._startSimplifiedRender()
+        else:
+            self.fCache.image = self._renderScene()
+            self.update()
+
+    @pyqtSlot()
+    def slot_renderThreadFinished(self):
+        if not self.fCache.takeRenderResult():
+            return
+
+        self.update()
+
+        if self.fCache.dirty:
+            self.fCache.timer.start()
+
+    # -----------------------------------------------------------------------------------------------------------------
+
     def changeEvent(self, event):
         if event.type() in (QEvent.StyleChange, QEvent.PaletteChange):
             self._updateStyle()
@@ -276,7 +419,11 @@ class CanvasPreviewFrame(QFrame):
                                            self.height()-frameWidth*2), rounding, rounding)
             painter.setClipPath(clipPath)
 
-        self.fScene.render(painter, self.fRenderTarget, self.fRenderSource, Qt.KeepAspectRatio)
+        if self.fCache.image is None:
+            self.fCache.dirty = False
+            self.fCache.image = self._renderScene()
+
+        painter.drawImage(self.fRenderTarget, self.fCache.image)
 
         # Allow cursor frame to look joined with minicanvas frame
         painter.setClipping(False)
@@ -339,8 +486,16 @@ class CanvasPreviewFrame(QFrame):
         if self.fRealParent is not None:
             QTimer.singleShot(0, self.fRealParent.slot_miniCanvasCheckAll)
 
+        self.invalidateCache()
+
         QFrame.resizeEvent(self, event)
 
+    def showEvent(self, event):
+        if self.fCache.dirty:
+            self.invalidateCache()
+
+        QFrame.showEvent(self, event)
+
     # -----------------------------------------------------------------------------------------------------------------
 
     def _moveViewRect(self, x: float, y: float):
@@ -405,4 +560,63 @@ class CanvasPreviewFrame(QFrame):
     def _updateStyle(self):
         self.fFrameWidth = 1 if self.fUseCustomPaint else self.frameWidth()
 
+    def _createCacheImage(self):
+        pixelRatio = self.devicePixelRatioF()
+        image = QImage(max(1, int(self.fInternalWidth * pixelRatio)), max(1, int(self.fInternalHeight * pixelRatio)),
+                       QImage.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(pixelRatio)
+        image.fill(Qt.transparent)
+        return image
+
+    def _renderScene(self):
+        image = self._createCacheImage()
+
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing, bool(options.antialiasing == ANTIALIASING_FULL))
+        self.fScene.render(painter,
+                           QRectF(0.0, 0.0, float(self.fInternalWidth), float(self.fInternalHeight)),
+                           self.fRenderSource, Qt.KeepAspectRatio)
+        painter.end()
+
+        return image
+
+    def _startSimplifiedRender(self):
+        theme = canvas.theme
+        lineColors = {
+            PORT_TYPE_AUDIO_JACK: theme.line_audio_jack,
+            PORT_TYPE_MIDI_JACK: theme.line_midi_jack,
+            PORT_TYPE_MIDI_ALSA: theme.line_midi_alsa,
+            PORT_TYPE_PARAMETER: theme.line_parameter,
+        }
+
+        # snapshot of the scene as plain values, the scene itself must not be touched from the thread
+        boxes = []
+        for group in canvas.group_map.values():
+            for box in group.widgets:
+                if box is not None and box.isVisible():
+                    boxes.append(box.sceneBoundingRect())
+
+        lines = []
+        for connection in canvas.connection_map.values():
+            line = connection.widget
+            if line is None or not line.isVisible():
+                continue
+            rect1 = line.item1.sceneBoundingRect()
+            rect2 = line.item2.sceneBoundingRect()
+            lines.append((QLineF(rect1.right(), rect1.center().y(), rect2.left(), rect2.center().y()),
+                          QColor(lineColors.get(line.item1.getPortType(), theme.line_audio_jack))))
+
+        snapshot = CanvasPreviewSnapshot(size=(float(self.fInternalWidth), float(self.fInternalHeight)),
+                                         pixelRatio=self.devicePixelRatioF(),
+                                         source=QRectF(self.fRenderSource),
+                                         bgColor=self.fScene.backgroundBrush().color(),
+                                         boxBrush=QBrush(theme.box_bg_1),
+                                         boxPen=QPen(theme.box_pen),
+                                         boxes=boxes,
+                                         lines=lines)
+
+        self.fCache.thread = CanvasPreviewRenderThread(self, snapshot)
+        self.fCache.thread.finished.connect(self.slot_renderThreadFinished)
+        self.fCache.thread.start()
+
 # ---------------------------------------------------------------------------------------------------------------------
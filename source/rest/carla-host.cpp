@@ -1221,3 +1221,204 @@ void handle_carla_get_host_osc_url_udp(const std::shared_ptr<Session> session)
 }
 
 // -------------------------------------------------------------------------------------------------------------------
+
+// multi-call, runs several simple calls in a single request
+// the request body has one call per line, as "method arg1 arg2 ...",
+// and the response is a JSON array with one value per call (null for setters and failed calls)
+
+static const char* multi_call_dispatch(const char* const method, const char* const args)
+{
+    uint pluginId, index, subIndex;
+    double value;
+
+    // setters
+    if (std::strcmp(method, "set_parameter_value") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %u %lf", &pluginId, &index, &value) == 3, nullptr);
+        carla_set_parameter_value(pluginId, index, value);
+        return "null";
+    }
+    if (std::strcmp(method, "set_active") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %u", &pluginId, &index) == 2, nullptr);
+        carla_set_active(pluginId, index != 0);
+        return "null";
+    }
+    if (std::strcmp(method, "set_drywet") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %lf", &pluginId, &value) == 2, nullptr);
+        carla_set_drywet(pluginId, value);
+        return "null";
+    }
+    if (std::strcmp(method, "set_volume") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %lf", &pluginId, &value) == 2, nullptr);
+        carla_set_volume(pluginId, value);
+        return "null";
+    }
+    if (std::strcmp(method, "set_balance_left") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %lf", &pluginId, &value) == 2, nullptr);
+        carla_set_balance_left(pluginId, value);
+        return "null";
+    }
+    if (std::strcmp(method, "set_balance_right") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %lf", &pluginId, &value) == 2, nullptr);
+        carla_set_balance_right(pluginId, value);
+        return "null";
+    }
+    if (std::strcmp(method, "set_panning") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %lf", &pluginId, &value) == 2, nullptr);
+        carla_set_panning(pluginId, value);
+        return "null";
+    }
+    if (std::strcmp(method, "set_program") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %u", &pluginId, &index) == 2, nullptr);
+        carla_set_program(pluginId, index);
+        return "null";
+    }
+    if (std::strcmp(method, "set_midi_program") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %u", &pluginId, &index) == 2, nullptr);
+        carla_set_midi_program(pluginId, index);
+        return "null";
+    }
+
+    // getters
+    if (std::strcmp(method, "get_current_parameter_value") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %u", &pluginId, &index) == 2, nullptr);
+        return str_buf_float(carla_get_current_parameter_value(pluginId, index));
+    }
+    if (std::strcmp(method, "get_default_parameter_value") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %u", &pluginId, &index) == 2, nullptr);
+        return str_buf_float(carla_get_default_parameter_value(pluginId, index));
+    }
+    if (std::strcmp(method, "get_parameter_text") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %u", &pluginId, &index) == 2, nullptr);
+        return str_buf_string_quoted(carla_get_parameter_text(pluginId, index));
+    }
+    if (std::strcmp(method, "get_program_name") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %u", &pluginId, &index) == 2, nullptr);
+        return str_buf_string_quoted(carla_get_program_name(pluginId, index));
+    }
+    if (std::strcmp(method, "get_midi_program_name") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %u", &pluginId, &index) == 2, nullptr);
+        return str_buf_string_quoted(carla_get_midi_program_name(pluginId, index));
+    }
+
+    if (std::strcmp(method, "get_parameter_data") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %u", &pluginId, &index) == 2, nullptr);
+        const ParameterData* const info = carla_get_parameter_data(pluginId, index);
+
+        char* jsonBuf;
+        jsonBuf = json_buf_start();
+        jsonBuf = json_buf_add_uint(jsonBuf, "type", info->type);
+        jsonBuf = json_buf_add_uint(jsonBuf, "hints", info->hints);
+        jsonBuf = json_buf_add_int(jsonBuf, "index", info->index);
+        jsonBuf = json_buf_add_int(jsonBuf, "rindex", info->rindex);
+        jsonBuf = json_buf_add_uint(jsonBuf, "midiChannel", info->midiChannel);
+        jsonBuf = json_buf_add_int(jsonBuf, "mappedControlIndex", info->mappedControlIndex);
+        jsonBuf = json_buf_add_float(jsonBuf, "mappedMinimum", info->mappedMinimum);
+        jsonBuf = json_buf_add_float(jsonBuf, "mappedMaximum", info->mappedMaximum);
+        jsonBuf = json_buf_add_uint(jsonBuf, "mappedFlags", info->mappedFlags);
+        return json_buf_end(jsonBuf);
+    }
+    if (std::strcmp(method, "get_parameter_ranges") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %u", &pluginId, &index) == 2, nullptr);
+        const ParameterRanges* const info = carla_get_parameter_ranges(pluginId, index);
+
+        char* jsonBuf;
+        jsonBuf = json_buf_start();
+        jsonBuf = json_buf_add_float(jsonBuf, "def", info->def);
+        jsonBuf = json_buf_add_float(jsonBuf, "min", info->min);
+        jsonBuf = json_buf_add_float(jsonBuf, "max", info->max);
+        jsonBuf = json_buf_add_float(jsonBuf, "step", info->step);
+        jsonBuf = json_buf_add_float(jsonBuf, "stepSmall", info->stepSmall);
+        jsonBuf = json_buf_add_float(jsonBuf, "stepLarge", info->stepLarge);
+        return json_buf_end(jsonBuf);
+    }
+    if (std::strcmp(method, "get_parameter_info") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %u", &pluginId, &index) == 2, nullptr);
+        const CarlaParameterInfo* const info = carla_get_parameter_info(pluginId, index);
+
+        char* jsonBuf;
+        jsonBuf = json_buf_start();
+        jsonBuf = json_buf_add_string(jsonBuf, "name", info->name);
+        jsonBuf = json_buf_add_string(jsonBuf, "symbol", info->symbol);
+        jsonBuf = json_buf_add_string(jsonBuf, "unit", info->unit);
+        jsonBuf = json_buf_add_string(jsonBuf, "comment", info->comment);
+        jsonBuf = json_buf_add_string(jsonBuf, "groupName", info->groupName);
+        jsonBuf = json_buf_add_uint(jsonBuf, "scalePointCount", info->scalePointCount);
+        return json_buf_end(jsonBuf);
+    }
+    if (std::strcmp(method, "get_parameter_scalepoint_info") == 0)
+    {
+        CARLA_SAFE_ASSERT_RETURN(std::sscanf(args, "%u %u %u", &pluginId, &index, &subIndex) == 3, nullptr);
+        const CarlaScalePointInfo* const info = carla_get_parameter_scalepoint_info(pluginId, index, subIndex);
+
+        char* jsonBuf;
+        jsonBuf = json_buf_start();
+        jsonBuf = json_buf_add_float(jsonBuf, "value", info->value);
+        jsonBuf = json_buf_add_string(jsonBuf, "label", info->label);
+        return json_buf_end(jsonBuf);
+    }
+
+    carla_stderr2("multi_call: unknown method '%s'", method);
+    return nullptr;
+}
+
+void handle_carla_multi_call(const std::shared_ptr<Session> session)
+{
+    const std::shared_ptr<const Request> request = session->get_request();
+
+    const std::size_t length = request->get_header("Content-Length", 0);
+
+    session->fetch(length, [](const std::shared_ptr<Session> session, const restbed::Bytes& body)
+    {
+        const std::string calls(body.begin(), body.end());
+        std::string response("[");
+        bool firstLine = true;
+
+        std::size_t start = 0;
+        while (start < calls.size())
+        {
+            std::size_t end = calls.find('\n', start);
+            if (end == std::string::npos)
+                end = calls.size();
+
+            const std::string line(calls, start, end - start);
+            start = end + 1;
+
+            if (firstLine)
+                firstLine = false;
+            else
+                response += ',';
+
+            const std::size_t sep = line.find(' ');
+            const std::string method(line, 0, sep);
+            const char* const args = sep != std::string::npos ? line.c_str() + sep + 1 : "";
+
+            if (const char* const ret = multi_call_dispatch(method.c_str(), args))
+                response += ret;
+            else
+                response += "null";
+        }
+
+        response += ']';
+
+        session->close(OK, response, { { "Content-Length", std::to_string(response.size()) } } );
+    });
+}
+
+// -------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Carla REST API dummy server, for benchmarking the REST frontend round-trips
+# Copyright (C) 2011-2021 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# This answers every GET request with "0" and implements the "/multi_call" POST request,
+# without a real engine behind it. Only useful for measuring the HTTP overhead.
+#
+# Usage:
+#   ./rest-server-dummy.py [port]          run the server
+#   ./rest-server-dummy.py [port] --bench  run the server and measure round-trips per second against it
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import json
+import sys
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from time import monotonic
+
+# ---------------------------------------------------------------------------------------------------------------------
+
+class DummyRequestHandler(BaseHTTPRequestHandler):
+    # needed for keep-alive connections
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.reply("0")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        calls  = self.rfile.read(length).decode("utf-8").split("\n")
+
+        if not self.path.startswith("/multi_call"):
+            self.send_error(404)
+            return
+
+        self.reply(json.dumps([None if call.startswith("set_") else 0.0 for call in calls]))
+
+    def reply(self, text):
+        data = text.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        return
+
+# ---------------------------------------------------------------------------------------------------------------------
+
+def runBenchmark(port, count = 2000):
+    import requests
+
+    baseurl = "http://localhost:{}".format(port)
+    params  = { 'pluginId': 0, 'parameterId': 0, 'value': 0.5 }
+
+    def measure(name, func):
+        start = monotonic()
+        func()
+        elapsed = monotonic() - start
+        print("{:<32} {:>10.0f} calls/s".format(name, count / elapsed))
+
+    def singleRequests():
+        for _ in range(count):
+            requests.get(baseurl + "/set_parameter_value", params=params)
+
+    def sessionRequests():
+        session = requests.Session()
+        for _ in range(count):
+            session.get(baseurl + "/set_parameter_value", params=params)
+
+    def multiCallRequest():
+        session = requests.Session()
+        calls = "\n".join("set_parameter_value 0 {} 0.5".format(i) for i in range(count))
+        session.post(baseurl + "/multi_call", data=calls)
+
+    measure("new connection per request", singleRequests)
+    measure("keep-alive session", sessionRequests)
+    measure("single multi-call request", multiCallRequest)
+
+# ---------------------------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    port  = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 2228
+    bench = "--bench" in sys.argv
+
+    server = ThreadingHTTPServer(("localhost", port), DummyRequestHandler)
+
+    if not bench:
+        server.serve_forever()
+        sys.exit(0)
+
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    runBenchmark(port)
+    server.shutdown()
+
+# ---------------------------------------------------------------------------------------------------------------------
@@ -51,6 +51,25 @@ CarlaMutex gSessionMessagesMutex;
 
 std::map< string, shared_ptr< WebSocket > > sockets = { };
 
+static const std::size_t kPeaksFrameSize = sizeof(uint32_t) + sizeof(float)*4;
+
+// -------------------------------------------------------------------------------------------------------------------
+
+static void write_uint32_le(uint8_t* const ptr, const uint32_t value) noexcept
+{
+    ptr[0] = static_cast<uint8_t>(value);
+    ptr[1] = static_cast<uint8_t>(value >> 8);
+    ptr[2] = static_cast<uint8_t>(value >> 16);
+    ptr[3] = static_cast<uint8_t>(value >> 24);
+}
+
+static void write_float_le(uint8_t* const ptr, const float value) noexcept
+{
+    uint32_t bits;
+    std::memcpy(&bits, &value, sizeof(uint32_t));
+    write_uint32_le(ptr, bits);
+}
+
 // -------------------------------------------------------------------------------------------------------------------
 
 void send_server_side_message(const char* const message)
@@ -101,24 +120,31 @@ static void event_stream_handler(void)
     {
         if (const uint count = carla_get_current_plugin_count())
         {
-            char msgBuf[1024];
-            float* peaks;
+            // send peaks of all plugins as a single binary frame,
+            // 20 bytes per plugin: uint32 pluginId followed by 4 floats (little-endian)
+            Bytes peaksFrame(count * kPeaksFrameSize);
+            uint8_t* peaksFramePtr = peaksFrame.data();
+            const float* peaks;
 
-            for (uint i=0; i<count; ++i)
+            for (uint32_t i=0; i<count; ++i, peaksFramePtr += kPeaksFrameSize)
             {
+                write_uint32_le(peaksFramePtr, i);
+
                 peaks = carla_get_peak_values(i);
-                CARLA_SAFE_ASSERT_BREAK(peaks != nullptr);
+                CARLA_SAFE_ASSERT_CONTINUE(peaks != nullptr);
+
+                for (uint32_t j=0; j<4; ++j)
+                    write_float_le(peaksFramePtr + sizeof(uint32_t) + sizeof(float)*j, peaks[j]);
+            }
 
-                std::snprintf(msgBuf, 1023, "Peaks: %u %f %f %f %f", i, peaks[0], peaks[1], peaks[2], peaks[3]);
-                msgBuf[1023] = '\0';
+            const auto message = make_shared<WebSocketMessage>(WebSocketMessage::BINARY_FRAME, peaksFrame);
 
-                for (auto entry : sockets)
-                {
-                    auto socket = entry.second;
+            for (auto entry : sockets)
+            {
+                auto socket = entry.second;
 
-                    if (socket->is_open())
-                        socket->send(msgBuf);
-                }
+                if (socket->is_open())
+                    socket->send(message);
             }
         }
     }
@@ -312,6 +338,16 @@ static void make_resource(Service& service,
     service.publish(resource);
 }
 
+static void make_post_resource(Service& service,
+                               const char* const path,
+                               const std::function<void (const std::shared_ptr<Session>)>& callback)
+{
+    std::shared_ptr<Resource> resource = std::make_shared<Resource>();
+    resource->set_path(path);
+    resource->set_method_handler("POST", callback);
+    service.publish(resource);
+}
+
 // -------------------------------------------------------------------------------------------------------------------
 
 int main(int, const char**)
@@ -429,6 +465,8 @@ int main(int, const char**)
     make_resource(service, "/get_host_osc_url_tcp", handle_carla_get_host_osc_url_tcp);
     make_resource(service, "/get_host_osc_url_udp", handle_carla_get_host_osc_url_udp);
 
+    make_post_resource(service, "/multi_call", handle_carla_multi_call);
+
     // carla-utils
     make_resource(service, "/get_complete_license_text", handle_carla_get_complete_license_text);
     make_resource(service, "/get_supported_file_extensions", handle_carla_get_supported_file_extensions);
@@ -442,7 +480,7 @@ int main(int, const char**)
 
     std::shared_ptr<Settings> settings = std::make_shared<Settings>();
     settings->set_port(2228);
-    settings->set_default_header("Connection", "close");
+    settings->set_default_header("Connection", "keep-alive");
 
     service.start(settings);
     return 0;